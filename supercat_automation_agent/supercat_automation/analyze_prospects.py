@@ -16,6 +16,10 @@ import time
 import re
 from urllib.parse import urlparse
 
+from scrapers.domain_health import get_domain_health_registry
+from scrapers.host_scheduler import get_host_scheduler
+from scrapers.keyword_matcher import KeywordMatcher
+
 class StandaloneEDPAnalyzer:
     """Analyzes companies for the 5 proven pain signals"""
     
@@ -28,6 +32,26 @@ class StandaloneEDPAnalyzer:
             'sku_complexity': 0.64,            # 64% of won deals
             'channel_conflict': 0.43           # 43% of won deals
         }
+        
+        # Page keywords behind each check, matched in a single scan per site
+        self.keyword_matcher = KeywordMatcher({
+            'product_search': ['product search', 'search products'],
+            'pdf': ['.pdf'],
+            'catalog': ['catalog'],
+            'rep_login': ['dealer login', 'rep login'],
+            'manual_quote': ['request quote', 'call for pricing'],
+            'legacy_tech': ['flash', 'silverlight'],
+            'rep_locator': ['find a rep', 'locate dealer'],
+            'territory': ['territory'],
+            'sales_resources': ['sales resources', 'dealer resources'],
+            'configurator': ['configure', 'customize'],
+            'options': ['options'],
+            'finishes': ['finishes'],
+            'dealer_price': ['dealer price'],
+            'retail_price': ['retail price'],
+            'where_to_buy': ['where to buy'],
+            'buy_online': ['buy online']
+        })
     
     def analyze_website(self, domain: str) -> Dict[str, Any]:
         """Analyze a website for pain signals"""
@@ -40,22 +64,30 @@ class StandaloneEDPAnalyzer:
         evidence = []
         
         try:
-            # Make request with timeout
-            response = requests.get(domain, timeout=10, verify=False)
+            # Known dead, parked or redirected domains fail fast
+            registry = get_domain_health_registry()
+            health = registry.check_sync(domain) if registry else None
+            if health and not health.ok:
+                raise RuntimeError(health.describe())
+            
+            # Make request with timeout, waiting for the host's turn
+            with get_host_scheduler().slot_sync(domain):
+                response = requests.get(domain, timeout=10, verify=False)
             html_content = response.text.lower()
+            hits = self.keyword_matcher.scan(html_content)
             
             # Check for Sales Enablement Collapse indicators
             sales_enablement_score = 0
-            if 'product search' not in html_content and 'search products' not in html_content:
+            if 'product_search' not in hits:
                 sales_enablement_score += 0.3
                 evidence.append("No product search functionality")
-            if '.pdf' in html_content and 'catalog' in html_content:
+            if 'pdf' in hits and 'catalog' in hits:
                 sales_enablement_score += 0.3
                 evidence.append("PDF-only catalogs")
-            if 'dealer login' in html_content or 'rep login' in html_content:
+            if 'rep_login' in hits:
                 sales_enablement_score += 0.2
                 evidence.append("Manual dealer/rep login systems")
-            if 'request quote' in html_content or 'call for pricing' in html_content:
+            if 'manual_quote' in hits:
                 sales_enablement_score += 0.2
                 evidence.append("Manual quote requests")
             edp_scores['sales_enablement_collapse'] = min(sales_enablement_score, 1.0)
@@ -72,30 +104,30 @@ class StandaloneEDPAnalyzer:
             if not response.url.startswith('https'):
                 tech_obsolescence_score += 0.3
                 evidence.append("No SSL certificate")
-            if 'flash' in html_content or 'silverlight' in html_content:
+            if 'legacy_tech' in hits:
                 tech_obsolescence_score += 0.3
                 evidence.append("Legacy technology detected")
             edp_scores['technology_obsolescence'] = min(tech_obsolescence_score, 1.0)
             
             # Check for Rep Performance Crisis
             rep_performance_score = 0
-            if 'find a rep' not in html_content and 'locate dealer' not in html_content:
+            if 'rep_locator' not in hits:
                 rep_performance_score += 0.3
                 evidence.append("No rep/dealer locator")
-            if 'territory' not in html_content:
+            if 'territory' not in hits:
                 rep_performance_score += 0.3
                 evidence.append("No territory information")
-            if 'sales resources' not in html_content and 'dealer resources' not in html_content:
+            if 'sales_resources' not in hits:
                 rep_performance_score += 0.4
                 evidence.append("No sales resources section")
             edp_scores['rep_performance_crisis'] = min(rep_performance_score, 1.0)
             
             # Check for SKU Complexity
             sku_complexity_score = 0
-            if 'configure' in html_content or 'customize' in html_content:
+            if 'configurator' in hits:
                 sku_complexity_score += 0.3
                 evidence.append("Product configuration complexity")
-            if 'options' in html_content and 'finishes' in html_content:
+            if 'options' in hits and 'finishes' in hits:
                 sku_complexity_score += 0.3
                 evidence.append("Multiple options and finishes")
             if re.search(r'\d{3,}\s*products', html_content) or re.search(r'\d{3,}\s*items', html_content):
@@ -108,10 +140,10 @@ class StandaloneEDPAnalyzer:
             if html_content.count('login') > 2:
                 channel_conflict_score += 0.4
                 evidence.append("Multiple login portals")
-            if 'dealer price' in html_content and 'retail price' in html_content:
+            if 'dealer_price' in hits and 'retail_price' in hits:
                 channel_conflict_score += 0.3
                 evidence.append("Multiple pricing tiers visible")
-            if 'where to buy' in html_content and 'buy online' in html_content:
+            if 'where_to_buy' in hits and 'buy_online' in hits:
                 channel_conflict_score += 0.3
                 evidence.append("Mixed channel messaging")
             edp_scores['channel_conflict'] = min(channel_conflict_score, 1.0)
@@ -237,9 +269,6 @@ def process_csv(file_path: str, limit: int = None, preview_only: bool = False):
             print(f"📊 Tier 3 (PSI: {analysis['psi_score']:.2f})")
         else:
             print(f"❌ Not Qualified")
-        
-        # Small delay to avoid overwhelming servers
-        time.sleep(0.5)
     
     # Save results
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+HTML Parser Backend Benchmark
+Compares parse time and peak memory of the evidence-extraction parser backends
+on saved pages, and checks that every backend yields the same analyzer inputs
+as html.parser.
+"""
+
+import argparse
+import hashlib
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Any
+
+from scrapers.html_parser import BACKENDS, BACKEND_HTML_PARSER, available_backends, parse_page
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _digest(page) -> str:
+    """Fingerprint of everything the EDP analyzers read from a parsed page"""
+    features = asdict(page.features)
+    features.pop('html_lower')
+    return hashlib.sha1(repr((page.text_content, features)).encode('utf-8')).hexdigest()
+
+
+def run_backend(backend: str, paths: List[str], repeat: int) -> Dict[str, Any]:
+    """Parse every page `repeat` times with one backend; runs in a fresh process"""
+    pages = [Path(path).read_text(encoding='utf-8', errors='replace') for path in paths]
+    baseline_rss = _peak_rss_mb()
+
+    timings = []
+    digests = {}
+    for path, html in zip(paths, pages):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            page = parse_page(html, backend)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings.append(best)
+        digests[path] = _digest(page)
+        del page
+
+    return {
+        'backend': backend,
+        'total_seconds': sum(timings),
+        'median_ms': statistics.median(timings) * 1000,
+        'max_ms': max(timings) * 1000,
+        'peak_rss_mb': _peak_rss_mb() - baseline_rss,
+        'digests': digests
+    }
+
+
+def benchmark(pages_dir: str, backends: List[str], repeat: int = 3):
+    paths = sorted(str(path) for path in Path(pages_dir).rglob('*') if path.suffix.lower() in ('.html', '.htm'))
+    if not paths:
+        print(f"❌ No .html pages found in {pages_dir}")
+        return
+
+    total_mb = sum(Path(path).stat().st_size for path in paths) / (1024 * 1024)
+    print(f"📄 {len(paths)} pages ({total_mb:.1f} MB), best of {repeat} runs per page\n")
+
+    # A fresh process per backend so peak RSS is not inherited from the previous run
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for backend in backends:
+        with context.Pool(1) as pool:
+            results.append(pool.apply(run_backend, (backend, paths, repeat)))
+
+    reference = next((r for r in results if r['backend'] == BACKEND_HTML_PARSER), results[0])
+    baseline_seconds = reference['total_seconds']
+
+    print(f"{'Backend':<12} {'Total s':>9} {'Median ms':>10} {'Max ms':>9} {'Peak RSS MB':>12} {'Speedup':>8} {'Mismatches':>11}")
+    for result in results:
+        mismatches = [path for path, digest in result['digests'].items() if digest != reference['digests'][path]]
+        result['mismatches'] = mismatches
+        speedup = baseline_seconds / result['total_seconds'] if result['total_seconds'] else 0
+        print(f"{result['backend']:<12} {result['total_seconds']:>9.3f} {result['median_ms']:>10.2f} "
+              f"{result['max_ms']:>9.2f} {result['peak_rss_mb']:>12.1f} {speedup:>7.2f}x {len(mismatches):>11}")
+
+    for result in results:
+        if result['mismatches']:
+            print(f"\n⚠️  {result['backend']} differs from {reference['backend']} on:")
+            for path in result['mismatches'][:20]:
+                print(f"   {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML parser backends on saved pages')
+    parser.add_argument('pages_dir', help='Directory of saved .html pages (searched recursively)')
+    parser.add_argument('--repeat', type=int, default=3, help='Parses per page; the fastest is kept')
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, help='Backends to compare (default: all installed)')
+
+    args = parser.parse_args()
+
+    backends = args.backends or available_backends()
+    missing = [backend for backend in backends if backend not in available_backends()]
+    if missing:
+        print(f"❌ Not installed: {', '.join(missing)}")
+        return
+
+    benchmark(args.pages_dir, backends, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
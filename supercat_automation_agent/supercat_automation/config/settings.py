@@ -41,7 +41,96 @@ class Settings(BaseSettings):
     # --- Rate Limiting ---
     max_daily_enrichments: int = Field(default=500, env='MAX_DAILY_ENRICHMENTS')
     max_concurrent_scrapers: int = Field(default=3, env='MAX_CONCURRENT_SCRAPERS')
-    
+
+    # --- Outbound API Pacing ---
+    outbound_api_concurrency: int = Field(default=1, env='OUTBOUND_API_CONCURRENCY')
+    outbound_api_delay_seconds: float = Field(default=2.0, env='OUTBOUND_API_DELAY_SECONDS')
+
+    # --- Database Writes ---
+    db_upsert_batch_size: int = Field(default=500, env='DB_UPSERT_BATCH_SIZE')
+
+    # --- Website Evidence Extraction ---
+    driver_pool_size: int = Field(default=2, env='DRIVER_POOL_SIZE')
+    driver_max_pages: int = Field(default=50, env='DRIVER_MAX_PAGES')
+    driver_page_load_timeout: int = Field(default=30, env='DRIVER_PAGE_LOAD_TIMEOUT')
+    static_fetch_timeout: int = Field(default=10, env='STATIC_FETCH_TIMEOUT')
+    render_min_text_ratio: float = Field(default=0.02, env='RENDER_MIN_TEXT_RATIO')
+    evidence_concurrency: int = Field(default=8, env='EVIDENCE_CONCURRENCY')
+    evidence_parse_processes: int = Field(default=0, env='EVIDENCE_PARSE_PROCESSES')  # 0 = one per CPU core
+    evidence_parse_queue_size: int = Field(default=0, env='EVIDENCE_PARSE_QUEUE_SIZE')  # 0 = two per parse process
+    render_block_resources: bool = Field(default=True, env='RENDER_BLOCK_RESOURCES')
+    render_max_page_mb: int = Field(default=10, env='RENDER_MAX_PAGE_MB')
+    page_settle_quiet_ms: int = Field(default=500, env='PAGE_SETTLE_QUIET_MS')
+    page_settle_max_seconds: float = Field(default=8, env='PAGE_SETTLE_MAX_SECONDS')
+    crawl_max_pages: int = Field(default=4, env='CRAWL_MAX_PAGES')
+    crawl_budget_seconds: float = Field(default=20, env='CRAWL_BUDGET_SECONDS')
+    evidence_worker_processes: int = Field(default=4, env='EVIDENCE_WORKER_PROCESSES')
+    evidence_worker_max_tasks: int = Field(default=25, env='EVIDENCE_WORKER_MAX_TASKS')
+    evidence_worker_max_rss_mb: int = Field(default=1024, env='EVIDENCE_WORKER_MAX_RSS_MB')
+    evidence_snapshot_cache_size: int = Field(default=16, env='EVIDENCE_SNAPSHOT_CACHE_SIZE')
+    evidence_snapshot_ttl_seconds: float = Field(default=900, env='EVIDENCE_SNAPSHOT_TTL_SECONDS')
+    edp_rules_path: str = Field(default='', env='EDP_RULES_PATH')  # '' = config/edp_rules.json
+
+    # --- Fetch Politeness ---
+    fetch_global_concurrency: int = Field(default=32, env='FETCH_GLOBAL_CONCURRENCY')
+    fetch_per_host_concurrency: int = Field(default=2, env='FETCH_PER_HOST_CONCURRENCY')
+    fetch_host_delay_seconds: float = Field(default=1.0, env='FETCH_HOST_DELAY_SECONDS')
+    robots_txt_respect: bool = Field(default=True, env='ROBOTS_TXT_RESPECT')
+    robots_max_crawl_delay: float = Field(default=10, env='ROBOTS_MAX_CRAWL_DELAY')
+    robots_cache_hours: int = Field(default=24, env='ROBOTS_CACHE_HOURS')
+
+    # --- HTML Parsing ---
+    html_parser_backend: str = Field(default='html.parser', env='HTML_PARSER_BACKEND')
+
+    # --- Page Cache ---
+    page_cache_enabled: bool = Field(default=True, env='PAGE_CACHE_ENABLED')
+    page_cache_dir: str = Field(default='cache/pages', env='PAGE_CACHE_DIR')
+    page_cache_ttl_hours: int = Field(default=24, env='PAGE_CACHE_TTL_HOURS')
+    page_cache_max_mb: int = Field(default=512, env='PAGE_CACHE_MAX_MB')
+
+    # --- Evidence Memo ---
+    evidence_memo_enabled: bool = Field(default=True, env='EVIDENCE_MEMO_ENABLED')
+    evidence_memo_dir: str = Field(default='cache/evidence', env='EVIDENCE_MEMO_DIR')
+
+    # --- Sitemaps ---
+    sitemap_max_files: int = Field(default=10, env='SITEMAP_MAX_FILES')
+    sitemap_max_urls: int = Field(default=50000, env='SITEMAP_MAX_URLS')
+    sitemap_catalog_enabled: bool = Field(default=True, env='SITEMAP_CATALOG_ENABLED')
+
+    # --- Incremental Re-scan ---
+    rescan_check_concurrency: int = Field(default=8, env='RESCAN_CHECK_CONCURRENCY')
+
+    # --- Exhibitor API Replay ---
+    api_replay_enabled: bool = Field(default=True, env='API_REPLAY_ENABLED')
+    api_replay_dir: str = Field(default='cache/api_endpoints', env='API_REPLAY_DIR')
+    api_replay_concurrency: int = Field(default=8, env='API_REPLAY_CONCURRENCY')
+    api_replay_page_size: int = Field(default=100, env='API_REPLAY_PAGE_SIZE')
+    api_replay_max_pages: int = Field(default=500, env='API_REPLAY_MAX_PAGES')
+
+    # --- Exhibitor Detail Pages ---
+    exhibitor_detail_concurrency: int = Field(default=6, env='EXHIBITOR_DETAIL_CONCURRENCY')
+    exhibitor_detail_timeout: float = Field(default=20, env='EXHIBITOR_DETAIL_TIMEOUT')
+    exhibitor_detail_max_pages: int = Field(default=200, env='EXHIBITOR_DETAIL_MAX_PAGES')
+
+    # --- Exhibitor Streaming ---
+    exhibitor_write_batch_size: int = Field(default=200, env='EXHIBITOR_WRITE_BATCH_SIZE')
+    scraper_evidence_enabled: bool = Field(default=False, env='SCRAPER_EVIDENCE_ENABLED')
+    scraper_evidence_queue_size: int = Field(default=0, env='SCRAPER_EVIDENCE_QUEUE_SIZE')  # 0 = four per evidence worker
+
+    # --- Page Archive ---
+    page_archive_enabled: bool = Field(default=True, env='PAGE_ARCHIVE_ENABLED')
+    page_archive_dir: str = Field(default='cache/archive', env='PAGE_ARCHIVE_DIR')
+    page_archive_max_file_mb: int = Field(default=256, env='PAGE_ARCHIVE_MAX_FILE_MB')
+    archive_replay: bool = Field(default=False, env='ARCHIVE_REPLAY')
+
+    # --- Domain Health ---
+    domain_health_enabled: bool = Field(default=True, env='DOMAIN_HEALTH_ENABLED')
+    domain_health_db: str = Field(default='cache/domain_health.sqlite', env='DOMAIN_HEALTH_DB')
+    preflight_timeout: float = Field(default=5, env='PREFLIGHT_TIMEOUT')
+    domain_health_ok_hours: int = Field(default=24, env='DOMAIN_HEALTH_OK_HOURS')
+    domain_health_backoff_hours: int = Field(default=6, env='DOMAIN_HEALTH_BACKOFF_HOURS')
+    domain_health_max_backoff_days: int = Field(default=30, env='DOMAIN_HEALTH_MAX_BACKOFF_DAYS')
+
     # --- Static Application Logic Configuration ---
     # Trade Show Configuration
     trade_shows_config: Dict[str, Any] = {
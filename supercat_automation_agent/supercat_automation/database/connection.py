@@ -99,14 +99,20 @@ class DatabaseManager:
     # COMPANY OPERATIONS
     # ============================================
     
+    @staticmethod
+    def clean_domain(domain: Optional[str]) -> str:
+        """Bare lowercase host of a domain or website URL"""
+        domain = (domain or '').lower().strip()
+        if domain.startswith('http'):
+            domain = domain.split('//')[-1].split('/')[0]
+        return domain
+    
     @retry_on_failure()
     def upsert_company(self, company_data: Dict[str, Any]) -> Optional[Dict]:
         """Insert or update a company"""
         try:
             # Clean the domain
-            domain = company_data.get('domain', '').lower().strip()
-            if domain.startswith('http'):
-                domain = domain.split('//')[-1].split('/')[0]
+            domain = self.clean_domain(company_data.get('domain', ''))
             company_data['domain'] = domain
             
             # Check if company exists
@@ -132,6 +138,71 @@ class DatabaseManager:
             logger.error(f"Error upserting company: {e}")
             return None
     
+    def bulk_upsert_companies(self, companies: List[Dict[str, Any]]) -> List[Dict]:
+        """
+        Insert or update many companies in batches; returns the stored rows.
+        Companies with a domain are upserted on the domain; those without one
+        are matched to existing domainless rows by name, and the rest inserted.
+        Duplicates in the input are merged, the last one winning.
+        """
+        batch_size = settings.db_upsert_batch_size
+        by_domain: Dict[str, Dict[str, Any]] = {}
+        by_name: Dict[str, Dict[str, Any]] = {}
+        for company in companies:
+            company = {**company, 'domain': self.clean_domain(company.get('domain'))}
+            if company['domain']:
+                by_domain[company['domain']] = company
+            elif company.get('company_name'):
+                # NULL, not '', so many domainless companies fit the unique domain column
+                company['domain'] = None
+                by_name[company['company_name'].lower()] = company
+        
+        stored = []
+        failed = 0
+        rows = list(by_domain.values())
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            try:
+                stored.extend(self._upsert_company_batch(batch))
+            except Exception as e:
+                # One bad batch should not cost the batches after it
+                logger.error(f"Error bulk upserting {len(batch)} companies: {e}")
+                failed += len(batch)
+        
+        rows = list(by_name.values())
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            try:
+                stored.extend(self._upsert_domainless_batch(batch))
+            except Exception as e:
+                logger.error(f"Error bulk upserting {len(batch)} companies without a domain: {e}")
+                failed += len(batch)
+        
+        if failed:
+            logger.warning(f"Upserted {len(stored)} companies in bulk, {failed} failed")
+        else:
+            logger.info(f"Upserted {len(stored)} companies in bulk")
+        return stored
+    
+    @retry_on_failure()
+    def _upsert_company_batch(self, rows: List[Dict[str, Any]]) -> List[Dict]:
+        result = self.client.table('companies').upsert(rows, on_conflict='domain').execute()
+        return result.data or []
+    
+    @retry_on_failure()
+    def _upsert_domainless_batch(self, rows: List[Dict[str, Any]]) -> List[Dict]:
+        existing = self.client.table('companies').select('*').in_(
+            'company_name', [row['company_name'] for row in rows]
+        ).execute()
+        matched = {row['company_name'].lower(): row for row in existing.data or [] if not row.get('domain')}
+        stored = list(matched.values())
+        
+        missing = [row for row in rows if row['company_name'].lower() not in matched]
+        if missing:
+            result = self.client.table('companies').insert(missing).execute()
+            stored.extend(result.data or [])
+        return stored
+    
     @retry_on_failure()
     def get_qualified_companies(self, tier: str = 'tier_1') -> List[Dict]:
         """Get companies that meet qualification criteria"""
@@ -201,6 +272,30 @@ class DatabaseManager:
             logger.error(f"Error linking exhibitor: {e}")
             return None
     
+    def bulk_link_exhibitors(self, links: List[Dict[str, Any]]) -> int:
+        """
+        Link many companies to trade shows in batches; returns how many links were stored.
+        Needs the unique (trade_show_id, company_id) index from the migrations;
+        without it, falls back to linking one at a time.
+        """
+        batch_size = settings.db_upsert_batch_size
+        # One link per company per show, so a batch never updates the same row twice
+        rows = list({(link['trade_show_id'], link['company_id']): link for link in links}.values())
+        
+        stored = 0
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            try:
+                result = self.client.table('exhibitors').upsert(
+                    batch, on_conflict='trade_show_id,company_id'
+                ).execute()
+                stored += len(result.data or [])
+            except Exception as e:
+                logger.warning(f"Bulk exhibitor upsert failed ({e}); linking {len(batch)} exhibitors one at a time")
+                stored += sum(1 for link in batch if self.link_exhibitor_to_show(link))
+        
+        return stored
+    
     # ============================================
     # CAMPAIGN OPERATIONS
     # ============================================
@@ -372,6 +467,55 @@ class DatabaseManager:
             logger.error(f"Error fetching companies for analysis: {e}")
             return []
     
+    @retry_on_failure()
+    def bulk_touch_website_scan(self, company_ids: List[Any], scanned_at: Optional[str] = None) -> int:
+        """Bump last_website_scan for companies whose sites have not changed, in one update per 500 ids"""
+        if not company_ids:
+            return 0
+        scanned_at = scanned_at or datetime.now().isoformat()
+        try:
+            updated = 0
+            # Ids travel in the request URL, so very long lists are split
+            for start in range(0, len(company_ids), 500):
+                result = self.client.table('companies').update(
+                    {'last_website_scan': scanned_at}
+                ).in_('id', company_ids[start:start + 500]).execute()
+                updated += len(result.data or [])
+            
+            return updated
+            
+        except Exception as e:
+            logger.error(f"Error bumping website scan dates: {e}")
+            return 0
+    
+    def bulk_save_website_evidence(self, evidence_by_domain: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Store website evidence on the companies with these domains; results with
+        an error are skipped. Returns how many companies were updated.
+        """
+        scanned_at = datetime.now().isoformat()
+        
+        updated = 0
+        for domain, evidence in evidence_by_domain.items():
+            if not evidence or evidence.get('error'):
+                continue
+            try:
+                updated += self._save_website_evidence(domain, evidence, scanned_at)
+            except Exception as e:
+                logger.error(f"Error saving website evidence for {domain}: {e}")
+        
+        return updated
+    
+    @retry_on_failure()
+    def _save_website_evidence(self, domain: str, evidence: Dict[str, Any], scanned_at: str) -> int:
+        # An update only touches existing rows, so unknown domains never become nameless companies
+        result = self.client.table('companies').update({
+            'website_evidence': evidence,
+            'last_website_scan': scanned_at
+        }).eq('domain', domain).execute()
+        
+        return len(result.data or [])
+    
     @retry_on_failure()
     def get_companies_by_tier(self, tier: str) -> List[Dict]:
         """Get all companies in a specific TAM tier"""
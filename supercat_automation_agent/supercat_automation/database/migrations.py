@@ -22,6 +22,9 @@ CREATE INDEX IF NOT EXISTS idx_companies_edp_tags ON companies USING GIN(edp_tag
 ALTER TABLE companies ADD COLUMN IF NOT EXISTS has_multiple_edps BOOLEAN DEFAULT FALSE;
 ALTER TABLE companies ADD COLUMN IF NOT EXISTS primary_edp VARCHAR(50);
 ALTER TABLE companies ADD COLUMN IF NOT EXISTS edp_count INTEGER DEFAULT 0;
+
+-- One exhibitor link per company per show; bulk exhibitor upserts conflict on it
+CREATE UNIQUE INDEX IF NOT EXISTS idx_exhibitors_show_company ON exhibitors(trade_show_id, company_id);
 """
 
 print("Copy and run these migrations in Supabase SQL editor:")
@@ -8,10 +8,12 @@ from typing import Dict, List, Any
 import pandas as pd
 
 from scrapers.orchestrator import ScraperOrchestrator
+from scrapers.rescan import ChangeDetector
 from analysis.pain_detector import MultiSourcePainDetector
 from analysis.qualification_scorer import WonDealQualificationScorer
 from generation.evidence_based_messages import EvidenceBasedMessageGenerator
 from database.connection import db
+from config.settings import settings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -24,10 +26,12 @@ class SupercatFullOrchestrator:
         self.pain_detector = MultiSourcePainDetector()
         self.qualifier = WonDealQualificationScorer()
         self.message_generator = EvidenceBasedMessageGenerator()
+        self.change_detector = ChangeDetector()
         self.stats = {
             'start_time': None,
             'companies_scraped': 0,
             'companies_analyzed': 0,
+            'companies_unchanged': 0,
             'tier1_qualified': 0,
             'tier2_qualified': 0,
             'campaigns_created': 0,
@@ -38,7 +42,8 @@ class SupercatFullOrchestrator:
     async def run_complete_pipeline(self, mode: str = 'full'):
         '''
         Run complete pipeline
-        Modes: full, analysis_only, campaign_only
+        Modes: full, analysis_only, campaign_only, rescan
+        (rescan re-analyzes only companies whose websites changed since their last scan)
         '''
         self.stats['start_time'] = datetime.now()
         
@@ -52,6 +57,9 @@ class SupercatFullOrchestrator:
                 await self._run_scrapers()
                 await self._analyze_companies()
             
+            if mode == 'rescan':
+                await self._analyze_companies(incremental=True)
+            
             if mode in ['full', 'campaign_only']:
                 await self._generate_campaigns()
                 await self._prepare_outreach()
@@ -79,15 +87,17 @@ class SupercatFullOrchestrator:
         
         print(f"✓ Scraped {self.stats['companies_scraped']} companies")
     
-    async def _analyze_companies(self):
-        '''Analyze all pending companies'''
+    async def _analyze_companies(self, incremental: bool = False):
+        '''Analyze all pending companies; incremental skips sites unchanged since their last scan'''
         print("\n🔍 PHASE 2: Pain Analysis")
         print("-" * 40)
         
         companies = db.get_companies_for_analysis(limit=50)
+        if incremental:
+            companies = await self._changed_companies(companies)
         
         # Run analysis concurrently for efficiency
-        analysis_tasks = [self.pain_detector.analyze_company(company) for company in companies]
+        analysis_tasks = [asyncio.to_thread(self.pain_detector.analyze_company, company) for company in companies]
         analyzed_results = await asyncio.gather(*analysis_tasks, return_exceptions=True)
 
         for i, result in enumerate(analyzed_results):
@@ -109,6 +119,27 @@ class SupercatFullOrchestrator:
             
             print(f"  ✓ {company['company_name']}: {qualification['tier']}")
     
+    async def _changed_companies(self, companies: List[Dict]) -> List[Dict]:
+        '''Companies whose websites changed; the rest get last_website_scan bumped in one update'''
+        semaphore = asyncio.Semaphore(settings.rescan_check_concurrency)
+        
+        async def check(company):
+            async with semaphore:
+                return await asyncio.to_thread(
+                    self.change_detector.check, company.get('domain') or '', company.get('last_website_scan')
+                )
+        
+        decisions = await asyncio.gather(*(check(company) for company in companies))
+        changed = [company for company, decision in zip(companies, decisions) if decision.changed]
+        unchanged_ids = [company['id'] for company, decision in zip(companies, decisions) if not decision.changed]
+        
+        if unchanged_ids:
+            db.bulk_touch_website_scan(unchanged_ids)
+        self.stats['companies_unchanged'] += len(unchanged_ids)
+        
+        print(f"  ↻ {len(changed)} changed, {len(unchanged_ids)} unchanged since last scan")
+        return changed
+    
     async def _generate_campaigns(self):
         '''Generate campaigns for qualified companies'''
         print("\n✉️ PHASE 3: Campaign Generation")
@@ -171,6 +202,7 @@ ORCHESTRATION COMPLETE
 Duration: {duration}
 Companies Scraped: {self.stats['companies_scraped']}
 Companies Analyzed: {self.stats['companies_analyzed']}
+Companies Unchanged: {self.stats['companies_unchanged']}
 Qualified (T1/T2): {self.stats['tier1_qualified']}/{self.stats['tier2_qualified']}
 Campaigns Created: {self.stats['campaigns_created']}
 Errors: {len(self.stats['errors'])}
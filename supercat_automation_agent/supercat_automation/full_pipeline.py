@@ -20,6 +20,8 @@ import sys
 # Add scrapers to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scrapers'))
 
+from scrapers.host_scheduler import get_host_scheduler
+
 # Import your existing website evidence extractor
 try:
     from scrapers.website_evidence import WebsiteEvidenceExtractor
@@ -155,7 +157,8 @@ class IntegratedPipelineProcessor:
         }
         
         try:
-            async with self.session.get(domain, timeout=10, ssl=False) as response:
+            async with get_host_scheduler().slot(domain, self.session), \
+                    self.session.get(domain, timeout=10, ssl=False) as response:
                 html = await response.text()
                 html_lower = html.lower()
                 
@@ -626,9 +629,6 @@ class IntegratedPipelineProcessor:
                 company_data = row.to_dict()
                 result = await self.process_company(company_data)
                 results.append(result)
-                
-                # Rate limiting
-                await asyncio.sleep(2 if self.evidence_extractor else 1)
         
         # Summary
         print(f"\n{'='*60}")
@@ -12,6 +12,7 @@ import sys
 import asyncio
 import aiohttp
 import logging
+from contextlib import asynccontextmanager
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 from pathlib import Path
@@ -25,7 +26,10 @@ try:
     from analysis.validated_psi_calculator import ValidatedPSICalculator
     from generation.validated_message_generator import ValidatedMessageGenerator
     from scrapers.website_evidence_v2 import WebsiteEvidenceExtractorV2
+    from scrapers.async_evidence import AsyncEvidenceEngine
+    from scrapers.evidence_workers import EvidenceWorkerPool
     from orchestration.clay_webhook import CompleteClayWebhookOrchestrator
+    from config.settings import settings
     HAS_ALL_COMPONENTS = True
 except ImportError as e:
     print(f"Import error: {e}")
@@ -73,16 +77,28 @@ class SuperCatPipelineV2:
     - Validated customer language patterns
     """
     
-    def __init__(self):
+    def __init__(self, replay: bool = False, isolated_workers: bool = False):
         self.session = None
         self.clay_webhook_url = CLAY_WEBHOOK_URL
         
+        # Replay re-scores archived pages with no network: no campaigns, Supabase or Clay
+        self.replay = replay
+        
         # Initialize validated components
         if HAS_ALL_COMPONENTS:
             self.psi_calculator = ValidatedPSICalculator()
             self.message_generator = ValidatedMessageGenerator(openai_api_key=OPENAI_API_KEY)
-            self.evidence_extractor = WebsiteEvidenceExtractorV2()
+            self.evidence_extractor = WebsiteEvidenceExtractorV2(replay=replay)
+            # Long runs analyze websites in recycled worker processes to keep memory flat
+            if isolated_workers:
+                self.evidence_engine = EvidenceWorkerPool(extractor=self.evidence_extractor)
+            else:
+                self.evidence_engine = AsyncEvidenceEngine(extractor=self.evidence_extractor)
             self.clay_webhook = CompleteClayWebhookOrchestrator() if CLAY_WEBHOOK_URL else None
+            # Companies in a batch run concurrently, but OpenAI and Clay calls stay paced
+            self._api_semaphore = asyncio.Semaphore(settings.outbound_api_concurrency)
+            self._api_delay = settings.outbound_api_delay_seconds
+            self._api_next_at = 0.0
         else:
             logger.error("Missing required components - cannot initialize pipeline")
             return
@@ -104,11 +120,24 @@ class SuperCatPipelineV2:
     
     async def __aenter__(self):
         self.session = aiohttp.ClientSession()
+        await self.evidence_engine.start()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             await self.session.close()
+        await self.evidence_engine.close()
+    
+    @asynccontextmanager
+    async def _api_slot(self):
+        """Hold one of the outbound API slots, started at least the API delay after the last call"""
+        async with self._api_semaphore:
+            loop = asyncio.get_running_loop()
+            wait = self._api_next_at - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._api_next_at = loop.time() + self._api_delay
+            yield
     
     async def process_company_v2(self, company_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -139,7 +168,7 @@ class SuperCatPipelineV2:
         try:
             # Step 1: Enhanced website evidence extraction
             print(f"  🔍 Extracting comprehensive website evidence...")
-            website_evidence = self.evidence_extractor.analyze_website_comprehensive(domain)
+            website_evidence = await self.evidence_engine.analyze(domain)
             
             if 'error' in website_evidence:
                 print(f"  ⚠️ Website analysis error: {website_evidence['error']}")
@@ -173,12 +202,17 @@ class SuperCatPipelineV2:
             if qualification_decision:
                 self.stats['qualified'] += 1
             
+            if self.replay:
+                result['status'] = 'completed'
+                return result
+            
             # Step 3: Generate validated campaign (if qualified)
             if qualification_decision:
                 print(f"  📧 Generating validated campaign...")
-                campaign = self.message_generator.generate_validated_campaign(
-                    company_data, website_evidence
-                )
+                async with self._api_slot():
+                    campaign = await asyncio.to_thread(
+                        self.message_generator.generate_validated_campaign, company_data, website_evidence
+                    )
                 result['campaign'] = campaign
                 self.stats['campaigns_generated'] += 1
                 
@@ -188,9 +222,10 @@ class SuperCatPipelineV2:
                 print(f"     • {len(campaign.get('ad_suggestions', []))} ad variations")
             else:
                 print(f"  📝 Company not qualified - generating nurture approach")
-                campaign = self.message_generator.generate_validated_campaign(
-                    company_data, website_evidence
-                )
+                async with self._api_slot():
+                    campaign = await asyncio.to_thread(
+                        self.message_generator.generate_validated_campaign, company_data, website_evidence
+                    )
                 result['campaign'] = campaign
             
             # Step 4: Save to Supabase (enhanced data)
@@ -199,7 +234,8 @@ class SuperCatPipelineV2:
             
             # Step 5: Send to Clay webhook (comprehensive data)
             if self.clay_webhook_url:
-                await self.send_to_clay_v2(company_data, psi_results, website_evidence, result.get('campaign'))
+                async with self._api_slot():
+                    await self.send_to_clay_v2(company_data, psi_results, website_evidence, result.get('campaign'))
             
             result['status'] = 'completed'
             
@@ -339,6 +375,7 @@ class SuperCatPipelineV2:
                     # EDP1: SKU Complexity
                     'sku_analysis': {
                         'sku_count_estimate': website_evidence.get('EDP1_SKU_Count_Estimate', 0),
+                        'sku_estimate_source': website_evidence.get('EDP1_SKU_Estimate_Source', 'Unknown'),
                         'product_categories': website_evidence.get('EDP1_Product_Categories', []),
                         'category_count': website_evidence.get('EDP1_Category_Count', 0),
                         'has_search': website_evidence.get('EDP1_Has_Search', False),
@@ -497,6 +534,8 @@ class SuperCatPipelineV2:
         print(f"  • ValidatedMessageGenerator (crisis intervention)")
         print(f"  • WebsiteEvidenceExtractorV2 (comprehensive analysis)")
         print(f"  • Enhanced Clay webhook integration")
+        if self.replay:
+            print(f"  • Replay mode: pages from the page archive, no network")
         print(f"")
         
         # Process companies in batches
@@ -504,31 +543,22 @@ class SuperCatPipelineV2:
         async with self:
             for i in range(0, len(df), batch_size):
                 batch = df.iloc[i:i+batch_size]
-                batch_results = []
                 
                 print(f"📦 Processing batch {i//batch_size + 1} ({len(batch)} companies)")
                 
-                # Process batch
-                for idx, row in batch.iterrows():
-                    company_data = row.to_dict()
-                    result = await self.process_company_v2(company_data)
-                    batch_results.append(result)
-                    results.append(result)
-                    
-                    # Rate limiting between companies
-                    await asyncio.sleep(2)
-                
-                # Rate limiting between batches
-                if i + batch_size < len(df):
-                    print(f"  ⏳ Batch complete, waiting 5 seconds before next batch...")
-                    await asyncio.sleep(5)
+                # Process batch concurrently; the evidence engine bounds browser and fetch concurrency,
+                # and _api_slot paces the OpenAI and Clay calls
+                batch_results = await asyncio.gather(
+                    *(self.process_company_v2(row.to_dict()) for idx, row in batch.iterrows())
+                )
+                results.extend(batch_results)
         
         # Generate summary
         summary = self._generate_processing_summary(results)
         
         # Save results
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        results_file = f"results_v2_enhanced_{timestamp}.json"
+        results_file = f"results_v2_{'replay' if self.replay else 'enhanced'}_{timestamp}.json"
         
         output_data = {
             'processing_version': 'v2_validated',
@@ -548,7 +578,7 @@ class SuperCatPipelineV2:
         qualified_results = [r for r in results if r.get('psi_analysis', {}).get('weighted_methodology', {}).get('qualification_decision', False)]
         if qualified_results:
             qualified_df = self._create_qualified_csv(qualified_results)
-            qualified_file = f"qualified_v2_{timestamp}.csv"
+            qualified_file = f"qualified_v2_{'replay_' if self.replay else ''}{timestamp}.csv"
             qualified_df.to_csv(qualified_file, index=False)
             print(f"📁 Qualified companies v2: {qualified_file}")
         
@@ -672,20 +702,25 @@ async def main():
     """Main execution function"""
     import sys
     
-    if len(sys.argv) < 2:
-        print("Usage: python full_pipeline_v2.py prospects.csv [batch_size]")
+    # --replay re-scores from the page archive without touching the network
+    replay = '--replay' in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != '--replay']
+    
+    if not args:
+        print("Usage: python full_pipeline_v2.py prospects.csv [batch_size] [--replay]")
         print("Example: python full_pipeline_v2.py prospects.csv 3")
+        print("Re-score archived pages offline: python full_pipeline_v2.py prospects.csv 50 --replay")
         sys.exit(1)
     
-    csv_file = sys.argv[1]
-    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    csv_file = args[0]
+    batch_size = int(args[1]) if len(args) > 1 else 5
     
     if not Path(csv_file).exists():
         print(f"❌ File not found: {csv_file}")
         sys.exit(1)
     
     # Initialize and run pipeline
-    pipeline = SuperCatPipelineV2()
+    pipeline = SuperCatPipelineV2(replay=replay)
     
     if not HAS_ALL_COMPONENTS:
         print("❌ Missing required components - cannot run pipeline")
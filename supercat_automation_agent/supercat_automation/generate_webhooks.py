@@ -21,6 +21,10 @@ import os
 # Add the parent directory to sys.path to import from sibling modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from scrapers.domain_health import get_domain_health_registry
+from scrapers.host_scheduler import get_host_scheduler
+from scrapers.keyword_matcher import KeywordMatcher
+
 # Suppress SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -70,6 +74,25 @@ class SuperCatWebhookProcessor:
             except Exception as e:
                 print(f"⚠️  Enhanced analysis failed to initialize: {e}")
                 self.evidence_extractor = None
+        
+        # Page keywords for the basic fallback analysis, matched in a single scan per site
+        self.keyword_matcher = KeywordMatcher({
+            'product_search': ['product search'],
+            'pdf': ['.pdf'],
+            'catalog': ['catalog'],
+            'dealer_login': ['dealer login'],
+            'request_quote': ['request quote'],
+            'csv': ['csv'],
+            'upload': ['upload'],
+            'rep_locator': ['find a rep'],
+            'sales_resources': ['sales resources'],
+            'territory': ['territory'],
+            'configurator': ['configure', 'customize'],
+            'options': ['options'],
+            'finishes': ['finishes'],
+            'dealer_price': ['dealer price'],
+            'where_to_buy': ['where to buy']
+        })
     
     def analyze_website(self, domain: str) -> Dict[str, Any]:
         """Analyze website for pain signals - enhanced version with detailed evidence"""
@@ -182,21 +205,29 @@ class SuperCatWebhookProcessor:
         evidence = []
         
         try:
-            response = requests.get(domain, timeout=10, verify=False)
+            # Known dead, parked or redirected domains fail fast
+            registry = get_domain_health_registry()
+            health = registry.check_sync(domain) if registry else None
+            if health and not health.ok:
+                raise RuntimeError(health.describe())
+            
+            with get_host_scheduler().slot_sync(domain):
+                response = requests.get(domain, timeout=10, verify=False)
             html_content = response.text.lower()
+            hits = self.keyword_matcher.scan(html_content)
             
             # Sales Enablement Collapse
             sales_score = 0
-            if 'product search' not in html_content:
+            if 'product_search' not in hits:
                 sales_score += 0.3
                 evidence.append("No product search")
-            if '.pdf' in html_content and 'catalog' in html_content:
+            if 'pdf' in hits and 'catalog' in hits:
                 sales_score += 0.3
                 evidence.append("PDF-only catalogs")
-            if 'dealer login' in html_content:
+            if 'dealer_login' in hits:
                 sales_score += 0.2
                 evidence.append("Manual dealer login")
-            if 'request quote' in html_content:
+            if 'request_quote' in hits:
                 sales_score += 0.2
                 evidence.append("Manual quote requests")
             edp_scores['sales_enablement_collapse'] = min(sales_score, 1.0)
@@ -210,30 +241,30 @@ class SuperCatWebhookProcessor:
             if not response.url.startswith('https'):
                 tech_score += 0.3
                 evidence.append("No SSL")
-            if 'csv' in html_content and 'upload' in html_content:
+            if 'csv' in hits and 'upload' in hits:
                 tech_score += 0.3
                 evidence.append("CSV-based processes")
             edp_scores['technology_obsolescence'] = min(tech_score, 1.0)
             
             # Rep Performance Crisis
             rep_score = 0
-            if 'find a rep' not in html_content:
+            if 'rep_locator' not in hits:
                 rep_score += 0.3
                 evidence.append("No rep locator")
-            if 'sales resources' not in html_content:
+            if 'sales_resources' not in hits:
                 rep_score += 0.4
                 evidence.append("No sales resources")
-            if 'territory' not in html_content:
+            if 'territory' not in hits:
                 rep_score += 0.3
                 evidence.append("No territory info")
             edp_scores['rep_performance_crisis'] = min(rep_score, 1.0)
             
             # SKU Complexity
             sku_score = 0
-            if 'configure' in html_content or 'customize' in html_content:
+            if 'configurator' in hits:
                 sku_score += 0.3
                 evidence.append("Configuration complexity")
-            if 'options' in html_content and 'finishes' in html_content:
+            if 'options' in hits and 'finishes' in hits:
                 sku_score += 0.3
                 evidence.append("Multiple options/finishes")
             if re.search(r'\d{3,}\s*products', html_content):
@@ -246,10 +277,10 @@ class SuperCatWebhookProcessor:
             if html_content.count('login') > 2:
                 channel_score += 0.4
                 evidence.append("Multiple logins")
-            if 'dealer price' in html_content:
+            if 'dealer_price' in hits:
                 channel_score += 0.3
                 evidence.append("Multiple pricing tiers")
-            if 'where to buy' in html_content:
+            if 'where_to_buy' in hits:
                 channel_score += 0.3
                 evidence.append("Mixed channels")
             edp_scores['channel_conflict'] = min(channel_score, 1.0)
@@ -1011,8 +1042,6 @@ def process_csv_to_webhooks(file_path: str, limit: int = None, output_dir: str =
             print(f"  ⚠️ {error_msg}")
             errors.append(error_msg)
             continue
-        
-        time.sleep(0.5)  # Rate limiting
     
     # Save batch webhook files
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
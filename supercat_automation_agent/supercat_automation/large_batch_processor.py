@@ -43,6 +43,7 @@ class LargeBatchProcessor:
     - Progress tracking and resumption capability
     - Robust error handling and recovery
     - Optimized batch sizes for API rate limits
+    - Website analysis in recycled worker processes, so memory stays flat
     """
     
     def __init__(self, batch_name: str):
@@ -115,7 +116,7 @@ class LargeBatchProcessor:
         # Initialize V2 pipeline
         try:
             from full_pipeline_v2 import SuperCatPipelineV2
-            pipeline = SuperCatPipelineV2()
+            pipeline = SuperCatPipelineV2(isolated_workers=True)
         except ImportError as e:
             self.logger.error(f"Failed to import V2 pipeline: {e}")
             return
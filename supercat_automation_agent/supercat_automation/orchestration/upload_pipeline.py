@@ -130,10 +130,6 @@ class UploadPipeline:
                         'error': str(e)
                     })
                     print(f"  ⚠️ Error analyzing {company['company_name']}: {str(e)}")
-                    
-            # Small delay between batches
-            if i + batch_size < len(companies):
-                await asyncio.sleep(2)
         
         # Step 4: Generate campaigns for qualified companies
         if auto_campaign:
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+EDP Rule Rescoring
+Re-scores the website evidence stored in v2 result files with the pain score
+rules (config/edp_rules.json, or another rules file) and reports how the
+scores would change. Lets a weight change be checked against thousands of
+companies in seconds without fetching a page.
+"""
+
+import argparse
+import glob
+import json
+import time
+from typing import Dict, List, Any
+
+from scrapers.edp_rules import RuleSet, RuleError, as_score
+
+
+def load_evidence(patterns: List[str]) -> List[Dict[str, Any]]:
+    """website_evidence records of every analyzed company in the result files"""
+    records = []
+    for path in sorted({path for pattern in patterns for path in glob.glob(pattern)}):
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️  Skipping {path}: {e}")
+            continue
+        for result in data.get('results', []):
+            evidence = result.get('website_evidence')
+            if evidence and not evidence.get('error'):
+                records.append(evidence)
+    return records
+
+
+def rescore(patterns: List[str], rules_path: str = None, show_rules: bool = False):
+    try:
+        rules = RuleSet.load(rules_path)
+    except RuleError as e:
+        print(f"❌ {e}")
+        return
+
+    if show_rules:
+        for score, rule in rules.describe():
+            print(f"  {score:<36} {rule}")
+        print()
+
+    records = load_evidence(patterns)
+    if not records:
+        print(f"❌ No website evidence found in {', '.join(patterns)}")
+        return
+
+    start = time.perf_counter()
+    scores = rules.score_batch(records)
+    elapsed = time.perf_counter() - start
+    print(f"📊 {len(records)} companies scored with rules {rules.fingerprint} in {elapsed * 1000:.1f} ms\n")
+
+    print(f"{'Score':<36} {'Changed':>8} {'Stored avg':>11} {'New avg':>8}")
+    for column, score in enumerate(rules.scores):
+        new = [as_score(row[column]) for row in scores]
+        stored = [record.get(score, 0) or 0 for record in records]
+        changed = sum(1 for old, value in zip(stored, new) if old != value)
+        print(f"{score:<36} {changed:>8} {sum(stored) / len(stored):>11.1f} {sum(new) / len(new):>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-score stored v2 website evidence with the EDP rules')
+    parser.add_argument('results', nargs='*', default=['results_v2_*.json'],
+                        help='Result JSON files or glob patterns (default: results_v2_*.json)')
+    parser.add_argument('--rules', help='Rules file to try (default: config/edp_rules.json)')
+    parser.add_argument('--show-rules', action='store_true', help='Print the rules before scoring')
+    args = parser.parse_args()
+
+    rescore(args.results, args.rules, args.show_rules)
+
+
+if __name__ == "__main__":
+    main()
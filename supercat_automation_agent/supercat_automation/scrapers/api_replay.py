@@ -0,0 +1,347 @@
+# scrapers/api_replay.py
+"""
+Browserless replay of JSON APIs discovered while a page loads.
+When a directory page fetches its data from a JSON endpoint, the request is
+recorded as an ApiEndpoint: URL, method, query or JSON body, the headers and
+cookies it needed, which parameter pages through the results and the total
+the API reported. ApiReplayer then pulls every page straight from the API
+with one pooled aiohttp session, many pages at once, instead of scrolling
+the page in a browser, and can stream the pages as they arrive. Recorded
+endpoints are saved to disk, so later runs replay them directly. The browser
+is only needed again when the API rejects the saved cookies or tokens.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import re
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Any, AsyncIterator, Callable, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl
+
+import aiohttp
+
+try:
+    from supercat_automation.config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PAGE_PARAMS = ('page', 'pageNumber', 'page_number', 'pageNo', 'pageIndex', 'currentPage', 'p')
+OFFSET_PARAMS = ('offset', 'skip', 'start', 'startIndex', 'from')
+SIZE_PARAMS = ('pageSize', 'page_size', 'perPage', 'per_page', 'limit', 'size', 'take', 'rows', 'pagesize')
+TOTAL_KEYS = ('total', 'totalCount', 'total_count', 'totalResults', 'totalRecords', 'recordsTotal',
+              'totalItems', 'total_items', 'nbHits', 'found')
+CONTAINER_KEYS = ('meta', 'pagination', 'paging', 'pageInfo', 'data')
+
+# Request headers worth replaying; the rest are set by the HTTP client or only describe the browser
+REPLAY_HEADERS = {'accept', 'accept-language', 'authorization', 'content-type', 'origin', 'referer', 'user-agent'}
+AUTH_STATUSES = {401, 403, 419}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ReplayError(Exception):
+    """The API could not be replayed"""
+
+
+class ReplayAuthError(ReplayError):
+    """The API rejected the recorded cookies or tokens; a browser visit must refresh them"""
+
+
+@dataclass
+class ApiEndpoint:
+    """How to request any page of a paginated JSON API"""
+    url: str
+    method: str = 'GET'
+    params: Dict[str, str] = field(default_factory=dict)
+    body: Optional[Dict[str, Any]] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    cookies: Dict[str, str] = field(default_factory=dict)
+    page_param: Optional[str] = None
+    page_location: str = 'query'   # 'query', 'body' or 'variables' (GraphQL)
+    style: Optional[str] = None    # 'page', 'offset' or None for a single request
+    first: int = 0
+    size_param: Optional[str] = None
+    page_size: int = 0
+    total: Optional[int] = None
+
+    @property
+    def paginated(self) -> bool:
+        return self.style is not None
+
+    def with_page_size(self, size: int) -> 'ApiEndpoint':
+        """Copy asking for `size` records per request, when the API exposes a size parameter"""
+        if not self.size_param or size <= self.page_size:
+            return self
+        endpoint = ApiEndpoint(**{**asdict(self), 'page_size': size})
+        endpoint._set(self.size_param, size)
+        return endpoint
+
+    def request(self, index: int) -> Tuple[str, Dict[str, str], Optional[Dict[str, Any]]]:
+        """(url, query params, JSON body) of the index-th page, counting from the first"""
+        endpoint = ApiEndpoint(**asdict(self))
+        if self.style == 'page':
+            endpoint._set(self.page_param, self.first + index)
+        elif self.style == 'offset':
+            endpoint._set(self.page_param, self.first + index * self.page_size)
+        return endpoint.url, endpoint.params, endpoint.body
+
+    def _set(self, name: str, value: int):
+        if self.page_location == 'query':
+            self.params[name] = str(value)
+        elif self.page_location == 'variables':
+            self.body['variables'][name] = value
+        else:
+            self.body[name] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ApiEndpoint':
+        return cls(**data)
+
+
+def _as_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _find_param(mapping: Dict[str, Any], names) -> Optional[str]:
+    """First of `names` in mapping with an integer value (case-insensitive)"""
+    lowered = {key.lower(): key for key in mapping}
+    for name in names:
+        key = lowered.get(name.lower())
+        if key is not None and _as_int(mapping[key]) is not None:
+            return key
+    return None
+
+
+def find_total(payload: Any) -> Optional[int]:
+    """Total record count reported by an API response, if any"""
+    if not isinstance(payload, dict):
+        return None
+    for key in TOTAL_KEYS:
+        total = _as_int(payload.get(key))
+        if total is not None:
+            return total
+    for key in CONTAINER_KEYS:
+        if isinstance(payload.get(key), dict):
+            total = find_total(payload[key])
+            if total is not None:
+                return total
+    return None
+
+
+def _site_cookies(cookies: List[Dict[str, Any]], url: str) -> Dict[str, str]:
+    """Browser cookies (Playwright format) that the browser would send to url"""
+    host = (urlsplit(url).hostname or '').lower()
+    selected = {}
+    for cookie in cookies or []:
+        domain = (cookie.get('domain') or '').lower().lstrip('.')
+        if domain and (host == domain or host.endswith(f'.{domain}')):
+            selected[cookie['name']] = cookie['value']
+    return selected
+
+
+def discover_endpoint(url: str, method: str, headers: Dict[str, str], post_data: Optional[str],
+                      payload: Any, records: int, cookies: Optional[List[Dict[str, Any]]] = None) -> ApiEndpoint:
+    """
+    Recipe for replaying a captured API request.
+    records is how many records the captured response held; it stands in for
+    the page size when the request does not name one.
+    """
+    parts = urlsplit(url)
+    base_url = urlunsplit((parts.scheme, parts.netloc, parts.path, '', ''))
+    params = dict(parse_qsl(parts.query, keep_blank_values=True))
+
+    body = None
+    if post_data:
+        try:
+            body = json.loads(post_data)
+        except (TypeError, ValueError):
+            body = None
+        if not isinstance(body, dict):
+            body = None
+
+    endpoint = ApiEndpoint(
+        url=base_url,
+        method=method.upper(),
+        params=params,
+        body=body,
+        headers={name: value for name, value in (headers or {}).items()
+                 if name.lower() in REPLAY_HEADERS or name.lower().startswith('x-')},
+        cookies=_site_cookies(cookies, url),
+        total=find_total(payload)
+    )
+
+    locations = [('query', params)]
+    if body is not None:
+        locations.append(('body', body))
+        if isinstance(body.get('variables'), dict):
+            locations.append(('variables', body['variables']))
+
+    for location, mapping in locations:
+        for style, names in (('page', PAGE_PARAMS), ('offset', OFFSET_PARAMS)):
+            name = _find_param(mapping, names)
+            if name:
+                size_param = _find_param(mapping, SIZE_PARAMS)
+                endpoint.page_param, endpoint.page_location, endpoint.style = name, location, style
+                # Replay from the first page, whichever one the browser happened to record
+                endpoint.first = min(_as_int(mapping[name]), 1) if style == 'page' else 0
+                endpoint.size_param = size_param
+                endpoint.page_size = _as_int(mapping[size_param]) if size_param else records
+                return endpoint
+    return endpoint
+
+
+class ApiReplayer:
+    """
+    Pulls every page of a recorded endpoint over one pooled aiohttp session.
+    With a known total, all remaining pages are requested at once (up to
+    `concurrency` in flight); otherwise pages are requested in waves of
+    `concurrency` until one comes back short, empty or repeated.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, page_size: Optional[int] = None,
+                 max_pages: Optional[int] = None, timeout: Optional[float] = None):
+        self.concurrency = concurrency or settings.api_replay_concurrency
+        self.page_size = page_size or settings.api_replay_page_size
+        self.max_pages = max_pages or settings.api_replay_max_pages
+        self.timeout = timeout or settings.static_fetch_timeout
+        self.stats = {'requests': 0, 'retries': 0, 'pages': 0}
+
+    async def fetch_all(self, endpoint: ApiEndpoint,
+                        extract: Callable[[Any], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Records of every page; extract turns one response into its records"""
+        return [record async for records in self.iter_pages(endpoint, extract) for record in records]
+
+    async def iter_pages(self, endpoint: ApiEndpoint,
+                         extract: Callable[[Any], List[Dict[str, Any]]]) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Records of each page as soon as it arrives, so callers can act on early
+        pages while later ones are in flight. Pages already yielded are kept by
+        the caller even if a later page fails.
+        """
+        recorded_size = endpoint.page_size
+        endpoint = endpoint.with_page_size(self.page_size)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(headers=endpoint.headers, cookies=endpoint.cookies,
+                                         connector=connector, timeout=timeout) as session:
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def page(index: int) -> List[Dict[str, Any]]:
+                async with semaphore:
+                    return extract(await self._get(session, endpoint, index))
+
+            first_payload = await self._get(session, endpoint, 0)
+            first = extract(first_payload)
+            pages = 1
+            yield first
+            if endpoint.paginated and first:
+                total = find_total(first_payload) or endpoint.total
+                if len(first) < endpoint.page_size and (total > len(first) if total else endpoint.page_size > recorded_size):
+                    # The API capped the size we asked for; step by what it actually returns
+                    endpoint = ApiEndpoint(**{**asdict(endpoint), 'page_size': len(first)})
+                step = endpoint.page_size or len(first)
+
+                if total:
+                    count = min(math.ceil(total / step), self.max_pages)
+                    tasks = [asyncio.ensure_future(page(index)) for index in range(1, count)]
+                    try:
+                        for finished in asyncio.as_completed(tasks):
+                            records = await finished
+                            pages += 1
+                            yield records
+                    finally:
+                        for task in tasks:
+                            task.cancel()
+                        await asyncio.gather(*tasks, return_exceptions=True)
+                else:
+                    seen = {self._signature(first)}
+                    index, done = 1, len(first) < step
+                    while not done and index < self.max_pages:
+                        wave = range(index, min(index + self.concurrency, self.max_pages))
+                        for records in await asyncio.gather(*(page(i) for i in wave)):
+                            signature = self._signature(records)
+                            if not records or signature in seen:
+                                # Past the end, or the API ignores the page parameter
+                                done = True
+                                break
+                            seen.add(signature)
+                            pages += 1
+                            yield records
+                            if len(records) < step:
+                                done = True
+                                break
+                        index += len(wave)
+
+        self.stats['pages'] += pages
+        logger.info(f"Replayed {endpoint.url}: {pages} pages, {self.stats['requests']} requests")
+
+    async def _get(self, session: aiohttp.ClientSession, endpoint: ApiEndpoint, index: int, attempts: int = 3) -> Any:
+        url, params, body = endpoint.request(index)
+        for attempt in range(attempts):
+            self.stats['requests'] += 1
+            try:
+                async with session.request(endpoint.method, url, params=params, json=body) as response:
+                    if response.status in AUTH_STATUSES:
+                        raise ReplayAuthError(f"{url} answered {response.status}")
+                    if response.status in RETRY_STATUSES and attempt < attempts - 1:
+                        self.stats['retries'] += 1
+                        delay = _as_int(response.headers.get('Retry-After')) or 2 ** attempt
+                        await asyncio.sleep(min(delay, 30))
+                        continue
+                    if response.status != 200:
+                        raise ReplayError(f"{url} answered {response.status}")
+                    if 'json' not in response.headers.get('Content-Type', ''):
+                        # Usually a login or bot-challenge page in place of the data
+                        raise ReplayAuthError(f"{url} did not return JSON")
+                    return await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == attempts - 1:
+                    raise ReplayError(f"{url}: {e}") from e
+                self.stats['retries'] += 1
+                await asyncio.sleep(2 ** attempt)
+        raise ReplayError(f"{url}: no response after {attempts} attempts")
+
+    @staticmethod
+    def _signature(records: List[Dict[str, Any]]) -> str:
+        return json.dumps(records[:3], sort_keys=True, default=str)
+
+
+# --- Recorded endpoints ---
+
+def _recipe_path(name: str) -> Path:
+    directory = Path(settings.api_replay_dir)
+    return directory / f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', name)}.json"
+
+
+def load_endpoint(name: str) -> Optional[ApiEndpoint]:
+    """Endpoint recorded under name by an earlier run"""
+    path = _recipe_path(name)
+    try:
+        with open(path, encoding='utf-8') as f:
+            return ApiEndpoint.from_dict(json.load(f))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable API recipe {path}: {e}")
+        return None
+
+
+def save_endpoint(name: str, endpoint: ApiEndpoint):
+    """Record an endpoint for later runs; it holds session cookies and tokens, so it stays in the local cache"""
+    path = _recipe_path(name)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(endpoint.to_dict(), f, indent=2)
+    except OSError as e:
+        logger.warning(f"Could not save API recipe {path}: {e}")
@@ -0,0 +1,196 @@
+# scrapers/async_evidence.py
+"""
+Async website evidence engine for the v2 pipeline.
+Produces the same output schema as WebsiteEvidenceExtractorV2.analyze_website_comprehensive
+while analyzing many domains concurrently: static fetches share one aiohttp session,
+JavaScript renders share one Playwright browser with an isolated context per domain.
+In replay mode (taken from the extractor) pages come from the page archive instead.
+
+Work runs in two stages. The I/O stage fetches and crawls on the event loop;
+the CPU stage parses and scores in a process pool, so BeautifulSoup and the
+EDP heuristics use every core instead of contending for the GIL. Fetched
+pages wait for the CPU stage in a bounded queue: when parsing falls behind,
+fetchers pause instead of piling up HTML in memory.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Any, Optional
+
+import aiohttp
+
+from .browser_pool import BrowserContextPool, DEFAULT_CONTEXT_OPTIONS
+from .evidence_workers import new_worker_executor, parse_in_worker, score_in_worker
+from .page_settle import install_settle_probe, wait_for_settled
+from .render_profile import RenderProfile, RenderReport
+from .tiered_fetcher import TieredFetcher, DEFAULT_HEADERS
+from .website_evidence_v2 import WebsiteEvidenceExtractorV2
+
+try:
+    from supercat_automation.config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncEvidenceEngine:
+    """
+    Concurrent, non-blocking evidence extraction.
+    At most `concurrency` domains are fetched at once, and `parse_processes`
+    worker processes parse and score them; the two are tuned separately.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None,
+                 extractor: Optional[WebsiteEvidenceExtractorV2] = None,
+                 parse_processes: Optional[int] = None):
+        self.concurrency = concurrency or settings.evidence_concurrency
+        self.parse_processes = (parse_processes or settings.evidence_parse_processes
+                                or os.cpu_count() or 1)
+        self.parse_queue_size = settings.evidence_parse_queue_size or self.parse_processes * 2
+        self.render_timeout = settings.driver_page_load_timeout * 1000
+        self.extractor = extractor or WebsiteEvidenceExtractorV2()
+        self.render_profile = RenderProfile()
+        self.browser_pool = BrowserContextPool(
+            max_contexts=self.concurrency,
+            launch_options={'headless': True, 'args': self.render_profile.chrome_arguments()},
+            context_options={**DEFAULT_CONTEXT_OPTIONS, **self.render_profile.context_options()}
+        )
+        self.fetcher = TieredFetcher(render=self._render, replay=self.extractor.replay)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        self._parse_queue: Optional[asyncio.Queue] = None
+        self._parse_tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """Open the shared HTTP session and start the parse stage; the browser launches on first render"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.concurrency * 2)
+            self._session = aiohttp.ClientSession(headers=DEFAULT_HEADERS, connector=connector)
+        if self._parse_pool is None:
+            self._parse_pool = new_worker_executor(self.parse_processes)
+        if not self._parse_tasks:
+            self._parse_queue = asyncio.Queue(maxsize=self.parse_queue_size)
+            self._parse_tasks = [asyncio.ensure_future(self._parse_stage()) for _ in range(self.parse_processes)]
+
+    async def close(self):
+        """Close the HTTP session, the parse workers and the shared browser"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+        for task in self._parse_tasks:
+            task.cancel()
+        await asyncio.gather(*self._parse_tasks, return_exceptions=True)
+        self._parse_tasks = []
+        if self._parse_queue is not None:
+            while not self._parse_queue.empty():
+                done, _ = self._parse_queue.get_nowait()
+                done.cancel()
+        if self._parse_pool is not None:
+            pool, self._parse_pool = self._parse_pool, None
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, functools.partial(pool.shutdown, wait=True, cancel_futures=True))
+
+        await self.browser_pool.close()
+
+    async def analyze(self, domain: str) -> Dict[str, Any]:
+        """Analyze one domain; same result dict as analyze_website_comprehensive"""
+        if not domain.startswith('http'):
+            domain = f'https://{domain}'
+        await self.start()
+
+        async with self._semaphore:
+            registry = self.extractor.domain_health
+            if registry:
+                health = await registry.check(domain, self._session)
+                if not health.ok:
+                    return self.extractor.error_results(domain, health.describe())
+
+            try:
+                fetch = await self.fetcher.fetch(domain, session=self._session)
+            except Exception as e:
+                logger.error(f"Error analyzing {domain}: {e}")
+                return self.extractor.error_results(domain, str(e))
+
+            # Sitemaps are read in a thread while the crawl runs
+            catalog_task = asyncio.ensure_future(asyncio.to_thread(self.extractor.estimate_catalog, fetch['final_url']))
+
+            # Fetch the most relevant internal pages concurrently within the crawl budget
+            loop = asyncio.get_running_loop()
+            page, page_digest, subpages = None, None, []
+            try:
+                page, page_digest = await loop.run_in_executor(self._parse_pool, parse_in_worker, fetch['html'],
+                                                               self.extractor.replay)
+                subpages = await self.extractor.crawl_planner.crawl(
+                    self.fetcher, fetch['final_url'], page.features.links, session=self._session
+                )
+            except Exception as e:
+                logger.warning(f"Crawl failed for {domain}, using the homepage only: {e}")
+            catalog = await catalog_task
+
+            # Hand the pages to the CPU stage; holds this fetch slot while the queue is full.
+            # A parsed homepage travels without its HTML, which the worker already saw once
+            done = loop.create_future()
+            html = '' if page is not None else fetch['html']
+            job = (domain, html, fetch['elapsed'], fetch['tier'], subpages, page, catalog, page_digest)
+            await self._parse_queue.put((done, job))
+
+        return await done
+
+    async def analyze_many(self, domains: List[str]) -> List[Dict[str, Any]]:
+        """Analyze a list of domains concurrently, preserving input order"""
+        return await asyncio.gather(*(self.analyze(domain) for domain in domains))
+
+    async def _parse_stage(self):
+        """Feed queued pages to the parse workers, one job per worker at a time"""
+        loop = asyncio.get_running_loop()
+        while True:
+            done, job = await self._parse_queue.get()
+            pool = self._parse_pool
+            try:
+                result = await loop.run_in_executor(pool, score_in_worker, self.extractor.replay, *job)
+            except asyncio.CancelledError:
+                done.cancel()
+                raise
+            except BrokenProcessPool as e:
+                # A worker died; later jobs go to a fresh pool
+                if pool is self._parse_pool:
+                    self._parse_pool = new_worker_executor(self.parse_processes)
+                    pool.shutdown(wait=False)
+                logger.error(f"Parse worker crashed while analyzing {job[0]}: {e}")
+                result = self.extractor.error_results(job[0], f"Parse worker crashed: {e}")
+            except Exception as e:
+                logger.error(f"Error analyzing {job[0]}: {e}")
+                result = self.extractor.error_results(job[0], str(e))
+
+            if not done.done():
+                done.set_result(result)
+
+    async def _render(self, url: str) -> str:
+        """Render a page in its own browser context with the lightweight render profile"""
+        report = RenderReport(url)
+        async with self.browser_pool.context() as context:
+            page = await context.new_page()
+            await self.render_profile.attach(page, report)
+            await install_settle_probe(page)
+            start_time = time.time()
+            await page.goto(url, wait_until='domcontentloaded', timeout=self.render_timeout)
+            report.elapsed = time.time() - start_time
+            await wait_for_settled(page)  # Wait for dynamic content
+            html = await page.content()
+        self.render_profile.record(report)
+        return html
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -3,24 +3,35 @@
 Base scraper class that all trade show scrapers inherit from.
 UPDATED to support connecting to a remote Scraping Browser (e.g., Bright Data)
 via a WebSocket URL for maximum stealth and reliability.
+Scrapers run in a context leased from a BrowserContextPool. The orchestrator
+shares one pool (one browser or CDP session) between all of them.
+Exhibitors are streamed in batches from stream_exhibitor_list into batched
+database writes (and any other sinks) while scraping is still going on.
 """
 
 import asyncio
 import logging
 import random
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, AsyncIterator, Optional, Sequence
 from abc import ABC, abstractmethod
 from datetime import datetime
 from functools import wraps
 
-from playwright.async_api import async_playwright, Page, Browser, Playwright, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 from twocaptcha import TwoCaptcha
 
 from database.connection import db
 from config.settings import settings
+from .browser_pool import BrowserContextPool, DEFAULT_CONTEXT_OPTIONS
+from .exhibitor_stream import BatchedExhibitorWriter
 
 logger = logging.getLogger(__name__)
 
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36',
+]
+
 def retry_async(retries=3, delay=5, backoff=2):
     """
     An async decorator to retry a function on failure with exponential backoff.
@@ -44,6 +55,43 @@ def retry_async(retries=3, delay=5, backoff=2):
     return decorator
 
 
+def _http_proxy() -> Optional[Dict[str, str]]:
+    """Standard HTTP proxy configuration for the local browser"""
+    if settings.use_proxies and settings.proxy_list:
+        proxy_url = random.choice(settings.proxy_list)
+        try:
+            auth, endpoint = proxy_url.split('@')
+            user, password = auth.replace('http://', '').split(':')
+            server = f"http://{endpoint}"
+            return {"server": server, "username": user, "password": password}
+        except ValueError:
+            return {"server": proxy_url}
+    return None
+
+
+def create_browser_pool(max_contexts: Optional[int] = None) -> BrowserContextPool:
+    """
+    Browser pool for trade show scrapers: the remote scraping browser when
+    BRIGHT_DATA_WSS_URL is set, otherwise a local browser behind a standard proxy.
+    Contexts are kept and reused across scrapers and retries.
+    """
+    launch_options = {"headless": True}
+    if settings.BRIGHT_DATA_WSS_URL:
+        logger.info("Using Bright Data Scraping Browser")
+    else:
+        proxy_config = _http_proxy()
+        if proxy_config:
+            launch_options["proxy"] = proxy_config
+            logger.info(f"Using HTTP proxy: {proxy_config['server']}")
+    return BrowserContextPool(
+        max_contexts=max_contexts or settings.max_concurrent_scrapers,
+        launch_options=launch_options,
+        context_options={**DEFAULT_CONTEXT_OPTIONS, 'user_agent': random.choice(USER_AGENTS)},
+        cdp_url=settings.BRIGHT_DATA_WSS_URL,
+        reuse_contexts=True
+    )
+
+
 class BaseTradeshowScraper(ABC):
     """Base class for all trade show scrapers using Playwright."""
 
@@ -64,6 +112,14 @@ class BaseTradeshowScraper(ABC):
         """Scrape the list of exhibitors - must be implemented by child class."""
         pass
 
+    async def stream_exhibitor_list(self, page: Page) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield exhibitors in batches as each page or scroll batch is parsed.
+        By default the whole scrape_exhibitor_list result is one batch; child
+        classes override this to yield as they go.
+        """
+        yield await self.scrape_exhibitor_list(page)
+
     def validate_exhibitor_data(self, exhibitor: Dict) -> bool:
         """Validate that exhibitor data has required fields."""
         return 'company_name' in exhibitor and exhibitor['company_name']
@@ -78,42 +134,70 @@ class BaseTradeshowScraper(ABC):
                 name = name[:-len(suffix)].strip()
         return name
 
-    async def _save_and_link_exhibitor(self, exhibitor: Dict):
-        """Saves a company and links it to the trade show as an exhibitor."""
-        if self.validate_exhibitor_data(exhibitor):
-            exhibitor['company_name'] = self.clean_company_name(exhibitor['company_name'])
-            company_data = {
-                'company_name': exhibitor['company_name'],
-                'domain': exhibitor.get('website', ''),
+    def _exhibitor_key(self, exhibitor: Dict) -> Optional[str]:
+        """Dedupe key of a valid exhibitor: its domain, or its cleaned name without one"""
+        if not self.validate_exhibitor_data(exhibitor):
+            return None
+        name = self.clean_company_name(exhibitor['company_name'])
+        if not name:
+            return None
+        return db.clean_domain(exhibitor.get('website', '')) or name.lower()
+
+    def _save_exhibitors(self, exhibitors: List[Dict]) -> int:
+        """
+        Saves all exhibitors in bulk: normalizes and dedupes them, upserts the
+        companies in batches, then links them to the trade show in batches.
+        Returns how many exhibitors were linked.
+        """
+        companies: Dict[str, Dict[str, Any]] = {}
+        booths: Dict[str, str] = {}
+        for exhibitor in exhibitors:
+            key = self._exhibitor_key(exhibitor)
+            if not key:
+                continue
+            companies[key] = {
+                'company_name': self.clean_company_name(exhibitor['company_name']),
+                'domain': db.clean_domain(exhibitor.get('website', '')),
                 'source': f"{self.trade_show_name}_exhibitor"
             }
-            company_record = db.upsert_company(company_data)
+            if exhibitor.get('booth_number'):
+                booths[key] = exhibitor['booth_number']
 
-            if company_record and self.trade_show_id:
-                exhibitor_link = {
-                    'trade_show_id': self.trade_show_id,
-                    'company_id': company_record['id'],
-                    'booth_number': exhibitor.get('booth_number'),
-                }
-                db.link_exhibitor_to_show(exhibitor_link)
-                return True
-        return False
+        if not companies:
+            return 0
+        company_records = db.bulk_upsert_companies(list(companies.values()))
+        if not self.trade_show_id:
+            return 0
+
+        exhibitor_links = [{
+            'trade_show_id': self.trade_show_id,
+            'company_id': record['id'],
+            'booth_number': booths.get(record.get('domain') or record['company_name'].lower()),
+        } for record in company_records]
+        return db.bulk_link_exhibitors(exhibitor_links)
+
+    async def run(self, browser_pool: Optional[BrowserContextPool] = None, exhibitor_sinks: Sequence = ()) -> Dict[str, Any]:
+        """
+        Main execution method using Playwright.
+        Runs in a context from the given shared pool, or from a pool of its own.
+        Streamed exhibitors are saved in batches and also handed to each of
+        exhibitor_sinks (objects with an async put(exhibitors)).
+        """
+        pool = browser_pool or create_browser_pool(1)
+        try:
+            return await self._run_in_pool(pool, exhibitor_sinks)
+        finally:
+            if browser_pool is None:
+                await pool.close()
 
     @retry_async(retries=2, delay=10)
-    async def run(self) -> Dict[str, Any]:
-        """Main execution method using Playwright."""
-        async with async_playwright() as p:
-            browser = await self._get_browser(p)
-            if not browser:
-                return {'success': False, 'error': 'Failed to launch or connect to browser.'}
-            
+    async def _run_in_pool(self, pool: BrowserContextPool, exhibitor_sinks: Sequence = ()) -> Dict[str, Any]:
+        """One scraping attempt; retries lease again from the same pool"""
+        # Supabase calls block; the writer keeps them off the loop the other scrapers share
+        writer = BatchedExhibitorWriter(self._save_exhibitors)
+        async with pool.context() as context:
+            page = await context.new_page()
             try:
-                context = await browser.new_context(
-                    user_agent=self._get_random_user_agent(),
-                    viewport={'width': 1920, 'height': 1080},
-                    locale='en-US'
-                )
-                page = await context.new_page()
                 await self._apply_stealth(page)
 
                 logger.info(f"🚀 Starting scraper for {self.trade_show_name}")
@@ -124,60 +208,51 @@ class BaseTradeshowScraper(ABC):
                     if trade_show_record:
                         self.trade_show_id = trade_show_record['id']
 
-                exhibitors_raw = await self.scrape_exhibitor_list(page)
-
-                processed_count = 0
-                for exhibitor in exhibitors_raw:
-                    if await self._save_and_link_exhibitor(exhibitor):
-                        processed_count += 1
+                exhibitors_found = await self._stream_exhibitors(page, writer, exhibitor_sinks)
                 
-                logger.info(f"✅ Processed and saved {processed_count} exhibitors for {self.trade_show_name}")
+                logger.info(f"✅ Processed and saved {writer.saved} exhibitors for {self.trade_show_name}")
 
                 return {
                     'success': True,
                     'trade_show': self.trade_show_name,
-                    'exhibitors_found': len(exhibitors_raw),
-                    'exhibitors_processed': processed_count
+                    'exhibitors_found': exhibitors_found,
+                    'exhibitors_processed': writer.saved
                 }
 
             except Exception as e:
                 logger.error(f"❌ Scraper run failed for {self.trade_show_name}: {e}", exc_info=True)
-                return {'success': False, 'error': str(e)}
-            finally:
-                if browser.is_connected():
-                    await browser.close()
+                return {'success': False, 'error': str(e), 'exhibitors_processed': writer.saved}
 
-    async def _get_browser(self, p: Playwright) -> Optional[Browser]:
+    async def _stream_exhibitors(self, page: Page, writer: BatchedExhibitorWriter, exhibitor_sinks: Sequence = ()) -> int:
         """
-        Connects to a remote scraping browser if WSS_URL is set, otherwise
-        launches a local browser with a standard proxy.
+        Feed the exhibitor stream to the batched writer and the other sinks while
+        scraping goes on; returns how many exhibitors were found. What was
+        streamed before a failure is still saved.
         """
-        if settings.BRIGHT_DATA_WSS_URL:
-            logger.info("Connecting to Bright Data Scraping Browser...")
-            return await p.chromium.connect_over_cdp(settings.BRIGHT_DATA_WSS_URL)
-        else:
-            logger.info("Launching local Playwright browser...")
-            proxy_config = self._get_http_proxy()
-            launch_options = {"headless": True}
-            if proxy_config:
-                launch_options["proxy"] = proxy_config
-                logger.info(f"Using HTTP proxy: {proxy_config['server']}")
-            return await p.chromium.launch(**launch_options)
+        sinks = [writer, *exhibitor_sinks]
+        seen = set()
+        found = 0
+        try:
+            async for batch in self.stream_exhibitor_list(page):
+                found += len(batch)
+                fresh = []
+                for exhibitor in batch:
+                    key = self._exhibitor_key(exhibitor)
+                    if key and key not in seen:
+                        seen.add(key)
+                        fresh.append(exhibitor)
+                if fresh:
+                    for sink in sinks:
+                        await sink.put(fresh)
+        finally:
+            await writer.close()
+        return found
 
     def _get_http_proxy(self) -> Optional[Dict[str, str]]:
         """
         Fetches standard HTTP proxy configuration for local browser fallback.
         """
-        if settings.use_proxies and settings.proxy_list:
-            proxy_url = random.choice(settings.proxy_list)
-            try:
-                auth, endpoint = proxy_url.split('@')
-                user, password = auth.replace('http://', '').split(':')
-                server = f"http://{endpoint}"
-                return {"server": server, "username": user, "password": password}
-            except ValueError:
-                return {"server": proxy_url}
-        return None
+        return _http_proxy()
 
     async def _apply_stealth(self, page: Page):
         """Applies techniques to make Playwright harder to detect."""
@@ -185,11 +260,7 @@ class BaseTradeshowScraper(ABC):
 
     def _get_random_user_agent(self) -> str:
         """Provides a random, realistic User-Agent string."""
-        user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36',
-        ]
-        return random.choice(user_agents)
+        return random.choice(USER_AGENTS)
 
     async def _simulate_human_behavior(self, page: Page):
         """Performs small, randomized actions to mimic a human user."""
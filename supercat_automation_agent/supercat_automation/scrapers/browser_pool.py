@@ -0,0 +1,188 @@
+# scrapers/browser_pool.py
+"""
+Async Playwright browser shared by many isolated browser contexts.
+One Chromium process is launched (or one remote CDP session opened) and each
+lease gets its own context, so cookies and storage never leak between
+concurrent users. With reuse_contexts, a released context has its pages
+closed and is handed to the next lease with the same options instead of
+being torn down, so consecutive scrapers and retries skip context setup.
+PagePool does the same for pages within one context.
+"""
+
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTEXT_OPTIONS = {
+    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36',
+    'viewport': {'width': 1920, 'height': 1080},
+    'locale': 'en-US'
+}
+
+
+class BrowserContextPool:
+    """
+    Owns one Playwright browser and hands out isolated contexts,
+    bounded by max_contexts concurrent leases.
+    cdp_url connects to a remote browser (e.g. Bright Data) instead of launching one.
+    """
+
+    def __init__(self, max_contexts: int = 8, launch_options: Optional[Dict[str, Any]] = None,
+                 context_options: Optional[Dict[str, Any]] = None, cdp_url: Optional[str] = None,
+                 reuse_contexts: bool = False):
+        self.max_contexts = max_contexts
+        self.launch_options = launch_options or {'headless': True}
+        self.context_options = context_options or DEFAULT_CONTEXT_OPTIONS
+        self.cdp_url = cdp_url
+        self.reuse_contexts = reuse_contexts
+        self.stats = {
+            'launches': 0,
+            'contexts_created': 0,
+            'contexts_reused': 0
+        }
+        self._semaphore = asyncio.Semaphore(max_contexts)
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._start_lock = asyncio.Lock()
+        self._idle: List[Tuple[str, BrowserContext]] = []
+
+    async def start(self):
+        """Launch (or connect to) the shared browser if it is not already running"""
+        async with self._start_lock:
+            if self._browser and self._browser.is_connected():
+                return
+            # Idle contexts died with the previous browser
+            self._idle = []
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            if self.cdp_url:
+                self._browser = await self._playwright.chromium.connect_over_cdp(self.cdp_url)
+                logger.info(f"Connected to remote browser for up to {self.max_contexts} contexts")
+            else:
+                self._browser = await self._playwright.chromium.launch(**self.launch_options)
+                logger.info(f"Launched shared browser for up to {self.max_contexts} contexts")
+            self.stats['launches'] += 1
+
+    async def close(self):
+        """Close the idle contexts and the browser, and stop Playwright"""
+        idle, self._idle = self._idle, []
+        for _, context in idle:
+            await self._discard(context)
+        if self._browser and self._browser.is_connected():
+            await self._browser.close()
+        self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    @asynccontextmanager
+    async def context(self, **overrides):
+        """Lease an isolated browser context: a fresh one, or an idle one with the same options"""
+        async with self._semaphore:
+            if not self._browser or not self._browser.is_connected():
+                await self.start()
+            options = {**self.context_options, **overrides}
+            key = json.dumps(options, sort_keys=True, default=str)
+
+            context = self._take_idle(key) if self.reuse_contexts else None
+            if context is None:
+                context = await self._browser.new_context(**options)
+                self.stats['contexts_created'] += 1
+            else:
+                self.stats['contexts_reused'] += 1
+
+            try:
+                yield context
+            finally:
+                if self.reuse_contexts and await self._reset(context):
+                    self._idle.append((key, context))
+                    if len(self._idle) > self.max_contexts:
+                        await self._discard(self._idle.pop(0)[1])
+                else:
+                    await self._discard(context)
+
+    def _take_idle(self, key: str) -> Optional[BrowserContext]:
+        for index, (idle_key, context) in enumerate(self._idle):
+            if idle_key == key:
+                del self._idle[index]
+                return context
+        return None
+
+    async def _reset(self, context: BrowserContext) -> bool:
+        """Close a released context's pages; False if it is no longer usable"""
+        if not self._browser or not self._browser.is_connected():
+            return False
+        try:
+            for page in list(context.pages):
+                await page.close()
+            return True
+        except Exception as e:
+            logger.debug(f"Dropping browser context that could not be reset: {e}")
+            return False
+
+    async def _discard(self, context: BrowserContext):
+        try:
+            await context.close()
+        except Exception as e:
+            logger.debug(f"Error closing browser context: {e}")
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+class PagePool:
+    """
+    Up to `size` pages of one browser context, for visiting many URLs at once.
+    Pages open on demand and are handed to the next lease when released
+    cleanly; a page whose lease failed or timed out is closed instead, so a
+    stuck navigation never carries over.
+    """
+
+    def __init__(self, context: BrowserContext, size: int = 4):
+        self.context = context
+        self.size = size
+        self._semaphore = asyncio.Semaphore(size)
+        self._idle: List[Page] = []
+
+    @asynccontextmanager
+    async def page(self):
+        """Lease a page of the context"""
+        async with self._semaphore:
+            page = self._idle.pop() if self._idle else await self.context.new_page()
+            healthy = False
+            try:
+                yield page
+                healthy = True
+            finally:
+                if healthy and not page.is_closed():
+                    self._idle.append(page)
+                else:
+                    await self._discard(page)
+
+    async def close(self):
+        """Close the idle pages"""
+        idle, self._idle = self._idle, []
+        for page in idle:
+            await self._discard(page)
+
+    async def _discard(self, page: Page):
+        try:
+            await page.close()
+        except Exception as e:
+            logger.debug(f"Error closing page: {e}")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1,200 @@
+# scrapers/crawl_planner.py
+"""
+Per-domain crawl planner for website evidence extraction.
+Ranks a homepage's internal links by how likely they are to carry EDP
+evidence (product catalog, dealer/rep network, sales resources, trade-show
+events) and fetches the best few in parallel, within a per-domain page and
+time budget. The extractor merges the fetched pages into one result.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from .host_scheduler import host_key
+from .page_cache import normalize_url
+
+try:
+    from supercat_automation.config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Category -> (weight, terms matched against the link path and anchor text)
+LINK_CATEGORIES = {
+    'catalog': (3.0, ['products', 'product', 'catalog', 'collections', 'collection', 'shop']),
+    'dealer': (2.5, ['dealer', 'where-to-buy', 'where to buy', 'find-a-rep', 'find a rep', 'sales-rep',
+                     'sales rep', 'representative', 'locator', 'showroom']),
+    'resources': (2.0, ['resources', 'downloads', 'download', 'literature', 'price-list', 'price list',
+                        'spec-sheet', 'spec sheet', 'brochure', 'library']),
+    'events': (1.5, ['trade-show', 'tradeshow', 'trade show', 'events', 'high-point', 'high point',
+                     'neocon', 'market'])
+}
+
+# Anchor text matches count for less than the URL path
+TEXT_MATCH_FACTOR = 0.75
+
+# Pages that never carry evidence or need a session
+SKIPPED_PATH_TERMS = ('login', 'signin', 'sign-in', 'account', 'cart', 'checkout', 'wp-admin', 'wp-login')
+SKIPPED_EXTENSIONS = ('.pdf', '.zip', '.doc', '.docx', '.xls', '.xlsx', '.dwg', '.jpg', '.jpeg', '.png',
+                      '.gif', '.svg', '.mp4', '.mp3')
+
+
+@dataclass
+class CrawlTarget:
+    """An internal page chosen for fetching"""
+    url: str
+    category: str
+    score: float
+
+
+class CrawlPlanner:
+    """
+    Chooses and fetches up to max_pages subpages per domain within max_seconds.
+    Picks the best link of each category in turn so one busy category
+    (say, dozens of product links) cannot crowd out the rest.
+    """
+
+    def __init__(self, max_pages: Optional[int] = None, max_seconds: Optional[float] = None):
+        self.max_pages = max_pages if max_pages is not None else settings.crawl_max_pages
+        self.max_seconds = max_seconds or settings.crawl_budget_seconds
+        self.stats = {
+            'planned': 0,
+            'fetched': 0,
+            'failed': 0,
+            'over_budget': 0
+        }
+
+    def plan(self, base_url: str, links: List[Tuple[str, str]]) -> List[CrawlTarget]:
+        """Rank a page's (href, anchor text) links and pick the subpages to fetch"""
+        if self.max_pages <= 0:
+            return []
+
+        site = host_key(base_url)
+        seen = {normalize_url(base_url)}
+        candidates: Dict[str, List[CrawlTarget]] = {category: [] for category in LINK_CATEGORIES}
+
+        for href, text in links:
+            url = self._internal_url(base_url, site, href)
+            if url is None:
+                continue
+            key = normalize_url(url)
+            if key in seen:
+                continue
+
+            category, score = self._score(url, text)
+            if category is None:
+                continue
+            seen.add(key)
+            candidates[category].append(CrawlTarget(url=url, category=category, score=score))
+
+        # Best first within each category, then take one from each category per round
+        for targets in candidates.values():
+            targets.sort(key=lambda target: target.score, reverse=True)
+        queues = [candidates[category] for category in LINK_CATEGORIES if candidates[category]]
+
+        plan = []
+        while queues and len(plan) < self.max_pages:
+            for queue in list(queues):
+                if len(plan) >= self.max_pages:
+                    break
+                plan.append(queue.pop(0))
+                if not queue:
+                    queues.remove(queue)
+
+        self.stats['planned'] += len(plan)
+        return plan
+
+    def crawl_sync(self, fetcher, base_url: str, links: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Fetch the planned subpages on worker threads; pages not back within the budget are dropped"""
+        plan = self.plan(base_url, links)
+        if not plan:
+            return []
+
+        executor = ThreadPoolExecutor(max_workers=len(plan), thread_name_prefix='crawl')
+        futures = {executor.submit(fetcher.fetch_sync, target.url): target for target in plan}
+        done, pending = wait(futures, timeout=self.max_seconds)
+        # Don't wait for stragglers; their results are simply not used
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        fetched = {}
+        for future in done:
+            try:
+                fetched[futures[future].url] = self._page(futures[future], future.result())
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.debug(f"Could not fetch {futures[future].url}: {e}")
+        return self._finish(base_url, plan, fetched, len(pending))
+
+    async def crawl(self, fetcher, base_url: str, links: List[Tuple[str, str]], session=None) -> List[Dict[str, Any]]:
+        """Fetch the planned subpages concurrently; pages not back within the budget are cancelled"""
+        plan = self.plan(base_url, links)
+        if not plan:
+            return []
+
+        tasks = {asyncio.ensure_future(fetcher.fetch(target.url, session=session)): target for target in plan}
+        done, pending = await asyncio.wait(tasks, timeout=self.max_seconds)
+        for task in pending:
+            task.cancel()
+
+        fetched = {}
+        for task in done:
+            try:
+                fetched[tasks[task].url] = self._page(tasks[task], task.result())
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.debug(f"Could not fetch {tasks[task].url}: {e}")
+        return self._finish(base_url, plan, fetched, len(pending))
+
+    def _page(self, target: CrawlTarget, fetch: Dict[str, Any]) -> Dict[str, Any]:
+        return {**fetch, 'category': target.category}
+
+    def _finish(self, base_url: str, plan: List[CrawlTarget], fetched: Dict[str, Dict[str, Any]],
+                over_budget: int) -> List[Dict[str, Any]]:
+        """Fetched pages in plan order, with budget bookkeeping"""
+        pages = [fetched[target.url] for target in plan if target.url in fetched and fetched[target.url].get('html')]
+        self.stats['fetched'] += len(pages)
+        self.stats['over_budget'] += over_budget
+        if over_budget:
+            logger.info(f"Crawl budget of {self.max_seconds}s hit for {base_url}; dropped {over_budget} pages")
+        return pages
+
+    def _internal_url(self, base_url: str, site: str, href: str) -> Optional[str]:
+        """Absolute URL for a same-site page link, or None for anything else"""
+        href = (href or '').strip()
+        if not href or href.startswith(('#', 'mailto:', 'tel:', 'javascript:')):
+            return None
+
+        url = urljoin(base_url, href)
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or host_key(url) != site:
+            return None
+
+        path = parts.path.lower()
+        if path.endswith(SKIPPED_EXTENSIONS) or any(term in path for term in SKIPPED_PATH_TERMS):
+            return None
+        return url.split('#', 1)[0]
+
+    def _score(self, url: str, text: str) -> Tuple[Optional[str], float]:
+        """Most relevant category for a link and its score; shallow pages rank higher"""
+        path = urlsplit(url).path.lower()
+        text = (text or '').strip().lower()
+
+        best_category, best_score = None, 0.0
+        for category, (weight, terms) in LINK_CATEGORIES.items():
+            score = 0.0
+            if any(term in path for term in terms):
+                score += weight
+            if any(term in text for term in terms):
+                score += weight * TEXT_MATCH_FACTOR
+            if score > best_score:
+                best_category, best_score = category, score
+
+        if best_category is None:
+            return None, 0.0
+        depth = len([segment for segment in path.split('/') if segment])
+        return best_category, best_score - 0.1 * max(depth - 1, 0)
@@ -0,0 +1,223 @@
+# scrapers/dom_features.py
+"""
+Single-pass DOM feature collection for the EDP analyzers.
+Every element of the parsed page is visited exactly once and all the counters
+the analyzers need are filled in that walk, instead of each analyzer running
+its own find_all() passes and re-serializing the soup.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+NAV_CLASS_TERMS = ('nav', 'menu', 'category', 'product')
+FILTER_CLASS_TERMS = ('filter', 'sort', 'refine')
+DOWNLOAD_EXTENSIONS = ('.pdf', '.zip', '.doc', '.xls', '.dwg', '.cad')
+NAV_LINKS_PER_CONTAINER = 10
+
+PRODUCT_COUNT_PATTERN = re.compile(r'\d+\s*(products|items|SKUs)', re.I)
+FIRST_NUMBER = re.compile(r'(\d+)')
+
+
+@dataclass
+class PageFeatures:
+    """Everything the EDP analyzers read from a page's DOM"""
+
+    # Raw page, lowercased once for substring checks
+    html_lower: str = ''
+
+    # Search
+    search_type_inputs: int = 0
+    search_placeholder_inputs: int = 0
+    search_buttons: int = 0
+
+    # Navigation and filters
+    nav_link_texts: List[str] = field(default_factory=list)
+    filter_options: List[str] = field(default_factory=list)
+    brand_block_count: int = 0
+
+    # Links and downloads
+    links: List[Tuple[str, str]] = field(default_factory=list)  # (href, lowercased anchor text)
+    pdf_link_count: int = 0
+    download_hrefs: List[str] = field(default_factory=list)  # lowercased
+
+    # Forms, head and assets
+    form_actions: List[str] = field(default_factory=list)  # lowercased
+    input_count: int = 0
+    select_count: int = 0
+    meta_tags: Dict[str, str] = field(default_factory=dict)
+    script_srcs: List[str] = field(default_factory=list)
+    stylesheet_count: int = 0
+
+    # Text
+    sku_count_max: int = 0
+
+    @property
+    def search_element_count(self) -> int:
+        """Same precedence as the original chained find_all() search detection"""
+        return self.search_type_inputs or self.search_placeholder_inputs or self.search_buttons
+
+    @property
+    def has_viewport_meta(self) -> bool:
+        return 'viewport' in self.meta_tags
+
+
+def _class_matches(tag: Tag, terms: Tuple[str, ...]) -> bool:
+    classes = tag.get('class')
+    if not classes:
+        return False
+    if isinstance(classes, str):
+        classes = [classes]
+    return any(term in value.lower() for value in classes for term in terms)
+
+
+def collect_page_features(soup: BeautifulSoup, html: str) -> PageFeatures:
+    """Walk the parsed page once and fill every counter the analyzers use"""
+    features = PageFeatures(html_lower=html.lower())
+
+    # Nav containers seen so far, keyed by id(), with the number of links taken from each
+    nav_link_counts: Dict[int, int] = {}
+
+    for element in soup.descendants:
+        if isinstance(element, NavigableString):
+            if PRODUCT_COUNT_PATTERN.search(element):
+                match = FIRST_NUMBER.search(element)
+                if match:
+                    features.sku_count_max = max(features.sku_count_max, int(match.group(1)))
+            continue
+
+        if not isinstance(element, Tag):
+            continue
+
+        name = element.name
+
+        if name == 'a':
+            if nav_link_counts:
+                _collect_nav_link(element, nav_link_counts, features)
+            href = element.get('href')
+            if href is not None:
+                href_lower = href.lower()
+                features.links.append((href, element.get_text().lower()))
+                if '.pdf' in href_lower:
+                    features.pdf_link_count += 1
+                if any(ext in href_lower for ext in DOWNLOAD_EXTENSIONS):
+                    features.download_hrefs.append(href_lower)
+
+        elif name == 'input':
+            features.input_count += 1
+            if element.get('type') == 'search':
+                features.search_type_inputs += 1
+            placeholder = element.get('placeholder')
+            if placeholder and 'search' in placeholder.lower():
+                features.search_placeholder_inputs += 1
+            if _class_matches(element, FILTER_CLASS_TERMS):
+                features.filter_options.append(f"Input: {element.get('name', 'unknown')}")
+
+        elif name == 'select':
+            features.select_count += 1
+            if _class_matches(element, FILTER_CLASS_TERMS) and len(element.find_all('option')) > 1:
+                features.filter_options.append(f"Select: {element.get('name', 'unknown')}")
+
+        elif name == 'button':
+            button_text = element.string
+            if button_text and 'search' in button_text.lower():
+                features.search_buttons += 1
+
+        elif name == 'form':
+            features.form_actions.append(element.get('action', '').lower())
+
+        elif name == 'meta':
+            meta_name = element.get('name')
+            if meta_name:
+                features.meta_tags[meta_name] = element.get('content', '')
+
+        elif name == 'script':
+            src = element.get('src')
+            if src:
+                features.script_srcs.append(src)
+
+        elif name == 'link':
+            if 'stylesheet' in (element.get('rel') or []):
+                features.stylesheet_count += 1
+
+        if name in ('nav', 'ul', 'div') and _class_matches(element, NAV_CLASS_TERMS):
+            nav_link_counts[id(element)] = 0
+        if name in ('div', 'section') and _class_matches(element, ('brand',)):
+            features.brand_block_count += 1
+
+    return features
+
+
+def _collect_nav_link(link: Tag, nav_link_counts: Dict[int, int], features: PageFeatures):
+    """Credit a link to each enclosing nav container that still has room"""
+    for parent in link.parents:
+        key = id(parent)
+        count = nav_link_counts.get(key)
+        if count is None or count >= NAV_LINKS_PER_CONTAINER:
+            continue
+        nav_link_counts[key] = count + 1
+        text = link.get_text().strip()
+        if len(text) > 2 and len(text) < 50:
+            features.nav_link_texts.append(text)
+
+
+def merge_page_features(primary: PageFeatures, others: Iterable[PageFeatures]) -> PageFeatures:
+    """
+    Combine a homepage's features with those of other pages on the same site.
+    Site chrome repeats on every page, so element counts take the largest page
+    and lists only gain entries the earlier pages did not already have.
+    """
+    merged = PageFeatures(
+        html_lower=primary.html_lower,
+        search_type_inputs=primary.search_type_inputs,
+        search_placeholder_inputs=primary.search_placeholder_inputs,
+        search_buttons=primary.search_buttons,
+        nav_link_texts=list(primary.nav_link_texts),
+        filter_options=list(primary.filter_options),
+        brand_block_count=primary.brand_block_count,
+        links=list(primary.links),
+        pdf_link_count=primary.pdf_link_count,
+        download_hrefs=list(primary.download_hrefs),
+        form_actions=list(primary.form_actions),
+        input_count=primary.input_count,
+        select_count=primary.select_count,
+        meta_tags=dict(primary.meta_tags),
+        script_srcs=list(primary.script_srcs),
+        stylesheet_count=primary.stylesheet_count,
+        sku_count_max=primary.sku_count_max
+    )
+    seen_hrefs = {href for href, _ in merged.links}
+
+    for page in others:
+        merged.html_lower += '\n' + page.html_lower
+
+        # The search-element precedence is per page, so keep the page whose search counts win
+        if page.search_element_count > merged.search_element_count:
+            merged.search_type_inputs = page.search_type_inputs
+            merged.search_placeholder_inputs = page.search_placeholder_inputs
+            merged.search_buttons = page.search_buttons
+
+        merged.brand_block_count = max(merged.brand_block_count, page.brand_block_count)
+        merged.input_count = max(merged.input_count, page.input_count)
+        merged.select_count = max(merged.select_count, page.select_count)
+        merged.stylesheet_count = max(merged.stylesheet_count, page.stylesheet_count)
+        merged.sku_count_max = max(merged.sku_count_max, page.sku_count_max)
+
+        for href, text in page.links:
+            if href not in seen_hrefs:
+                seen_hrefs.add(href)
+                merged.links.append((href, text))
+                if '.pdf' in href.lower():
+                    merged.pdf_link_count += 1
+
+        for name in ('nav_link_texts', 'filter_options', 'download_hrefs', 'form_actions', 'script_srcs'):
+            values = getattr(merged, name)
+            known = set(values)
+            values.extend(value for value in dict.fromkeys(getattr(page, name)) if value not in known)
+
+        for name, content in page.meta_tags.items():
+            merged.meta_tags.setdefault(name, content)
+
+    return merged
@@ -0,0 +1,378 @@
+# scrapers/domain_health.py
+"""
+Pre-flight health checks for prospect domains, with a persistent registry.
+Before any browser is launched a domain gets a DNS lookup and one short GET,
+and the response is checked for parking pages and redirects to marketplaces
+or social profiles. Outcomes are stored in SQLite: bad domains are skipped
+without any network traffic until their re-check time, which backs off
+exponentially with every consecutive failure; healthy domains are not
+re-checked until the healthy TTL runs out. Timeouts and certificate errors
+are inconclusive: they are not stored and the domain is fetched as usual.
+The pre-flight GET waits for its turn in the shared host scheduler.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+
+from .host_scheduler import HostScheduler, FetchDisallowed, get_host_scheduler, host_key
+
+try:
+    from supercat_automation.config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+STATUS_HEALTHY = 'healthy'
+STATUS_DNS_FAILURE = 'dns_failure'
+STATUS_UNREACHABLE = 'unreachable'
+STATUS_HTTP_ERROR = 'http_error'
+STATUS_PARKED = 'parked'
+STATUS_MARKETPLACE = 'marketplace_redirect'
+# Not stored: the pre-flight could not tell either way
+STATUS_INCONCLUSIVE = 'inconclusive'
+
+# Enough of the body to recognize a parking page
+MAX_BODY_BYTES = 64 * 1024
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+PARKING_HOSTS = (
+    'sedoparking.com', 'sedo.com', 'bodis.com', 'parkingcrew.net', 'above.com', 'dan.com', 'afternic.com',
+    'hugedomains.com', 'domainmarket.com', 'undeveloped.com', 'buydomains.com', 'parklogic.com',
+    'domainnamesales.com', 'brandbucket.com', 'squadhelp.com', 'atom.com', 'uniregistry.com'
+)
+
+PARKING_MARKERS = (
+    'this domain is for sale', 'this domain may be for sale', 'buy this domain', 'domain is parked',
+    'parked free', 'parked domain', 'domain has expired', 'this domain has been registered',
+    'the domain name is for sale', 'make an offer on this domain', 'sedoparking', 'parkingcrew',
+    'window.park', 'is available for purchase', 'related searches', 'domain names for sale',
+    'this web page is parked', 'renew this domain', 'future home of something quite cool'
+)
+# Generic phrases ('related searches') only count together with another marker
+MIN_PARKING_MARKERS = 2
+STRONG_PARKING_MARKERS = ('sedoparking', 'parkingcrew', 'window.park', 'this domain is for sale',
+                          'buy this domain', 'domain is parked', 'this web page is parked',
+                          'future home of something quite cool')
+
+MARKETPLACE_HOSTS = (
+    'amazon.com', 'etsy.com', 'ebay.com', 'wayfair.com', 'alibaba.com', 'aliexpress.com', 'houzz.com',
+    'facebook.com', 'instagram.com', 'linkedin.com', 'twitter.com', 'x.com', 'pinterest.com',
+    'yelp.com', 'google.com', 'sites.google.com', 'wixsite.com'
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS domain_health (
+    domain TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    reason TEXT,
+    final_url TEXT,
+    failures INTEGER NOT NULL DEFAULT 0,
+    checked_at REAL NOT NULL,
+    next_check_at REAL NOT NULL
+);
+"""
+
+
+@dataclass
+class DomainHealth:
+    """Latest pre-flight outcome for a domain"""
+    domain: str
+    status: str
+    reason: str = ''
+    final_url: Optional[str] = None
+    failures: int = 0
+    checked_at: float = 0.0
+    next_check_at: float = 0.0
+    from_registry: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """Whether the domain should be fetched"""
+        return self.status in (STATUS_HEALTHY, STATUS_INCONCLUSIVE)
+
+    def describe(self) -> str:
+        return f"Domain {self.status.replace('_', ' ')}: {self.reason}" if self.reason else f"Domain {self.status}"
+
+
+def _host_matches(host: str, candidates: Tuple[str, ...]) -> bool:
+    return any(host == candidate or host.endswith('.' + candidate) for candidate in candidates)
+
+
+def classify_response(domain: str, final_url: str, status: int, body: str) -> Tuple[str, str]:
+    """Health status and reason for a pre-flight response"""
+    final_host = (urlsplit(final_url).hostname or '').lower()
+    if final_host and host_key(final_url) != host_key(domain):
+        if _host_matches(final_host, PARKING_HOSTS):
+            return STATUS_PARKED, f'redirects to {final_host}'
+        if _host_matches(final_host, MARKETPLACE_HOSTS):
+            return STATUS_MARKETPLACE, f'redirects to {final_host}'
+
+    body = body.lower()
+    markers = [marker for marker in PARKING_MARKERS if marker in body]
+    if len(markers) >= MIN_PARKING_MARKERS or any(marker in STRONG_PARKING_MARKERS for marker in markers):
+        return STATUS_PARKED, f"parking page ({', '.join(markers[:3])})"
+
+    # 401/403/429 usually mean bot protection on a live site; a browser may still get through
+    if status >= 500 or status in (404, 410):
+        return STATUS_HTTP_ERROR, f'HTTP {status}'
+    return STATUS_HEALTHY, ''
+
+
+def _is_temporary_dns_failure(error: socket.gaierror) -> bool:
+    return error.errno == getattr(socket, 'EAI_AGAIN', None)
+
+
+class DomainHealthRegistry:
+    """
+    Persistent pre-flight results keyed by domain.
+    check() and check_sync() answer from the registry while a result is
+    current, and run a pre-flight otherwise.
+    """
+
+    def __init__(self, path: Optional[str] = None, timeout: Optional[float] = None,
+                 scheduler: Optional[HostScheduler] = None):
+        self.path = Path(path or settings.domain_health_db)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout or settings.preflight_timeout
+        self.scheduler = scheduler or get_host_scheduler()
+        self.healthy_ttl = settings.domain_health_ok_hours * 3600
+        self.backoff_base = settings.domain_health_backoff_hours * 3600
+        self.backoff_max = settings.domain_health_max_backoff_days * 86400
+
+        self.stats = {
+            'checked': 0,
+            'skipped': 0,
+            'healthy': 0,
+            'unhealthy': 0,
+            'inconclusive': 0
+        }
+        self._lock = threading.RLock()
+        # getaddrinfo() has no timeout of its own, so blocking lookups run here
+        self._resolver: Optional[ThreadPoolExecutor] = None
+        self._resolver_pid: Optional[int] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+
+    # --- Lookups ---
+
+    def get(self, domain: str) -> Optional[DomainHealth]:
+        with self._lock:
+            row = self._db().execute(
+                'SELECT domain, status, reason, final_url, failures, checked_at, next_check_at '
+                'FROM domain_health WHERE domain = ?', (host_key(domain),)
+            ).fetchone()
+        if row is None:
+            return None
+        return DomainHealth(*row, from_registry=True)
+
+    def current(self, domain: str) -> Optional[DomainHealth]:
+        """Stored result if it does not need re-checking yet"""
+        try:
+            health = self.get(domain)
+        except sqlite3.Error as e:
+            logger.warning(f"Domain health lookup failed for {domain}: {e}")
+            return None
+        if health is None or health.next_check_at <= time.time():
+            return None
+        if not health.ok:
+            self.stats['skipped'] += 1
+        return health
+
+    # --- Pre-flight ---
+
+    async def check(self, domain: str, session: Optional[aiohttp.ClientSession] = None) -> DomainHealth:
+        """Current health of a domain, running an async pre-flight if the registry has none"""
+        loop = asyncio.get_running_loop()
+        health = await loop.run_in_executor(None, self.current, domain)
+        if health is not None:
+            return health
+
+        url = domain if domain.startswith('http') else f'https://{domain}'
+        host = urlsplit(url).hostname or ''
+        try:
+            await asyncio.wait_for(loop.getaddrinfo(host, 443, type=socket.SOCK_STREAM), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            return self._inconclusive(domain, 'DNS lookup timed out')
+        except socket.gaierror as e:
+            if _is_temporary_dns_failure(e):
+                return self._inconclusive(domain, str(e))
+            return await loop.run_in_executor(None, self.record, domain, STATUS_DNS_FAILURE, str(e))
+        except UnicodeError as e:
+            return await loop.run_in_executor(None, self.record, domain, STATUS_DNS_FAILURE, str(e))
+
+        try:
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            async with self.scheduler.slot(url, session):
+                if session is None:
+                    async with aiohttp.ClientSession(headers={'User-Agent': USER_AGENT}) as own_session:
+                        final_url, status, body = await self._get(own_session, url, timeout)
+                else:
+                    final_url, status, body = await self._get(session, url, timeout)
+        except FetchDisallowed as e:
+            return self._inconclusive(domain, str(e))
+        except asyncio.TimeoutError:
+            return self._inconclusive(domain, 'request timed out')
+        except aiohttp.ClientSSLError as e:
+            # A bad certificate does not make a site dead; the fetcher decides what to do with it
+            return self._inconclusive(domain, f'TLS error: {e}')
+        except Exception as e:
+            return await loop.run_in_executor(
+                None, self.record, domain, STATUS_UNREACHABLE, str(e) or type(e).__name__
+            )
+
+        status_name, reason = classify_response(url, final_url, status, body)
+        return await loop.run_in_executor(None, self.record, domain, status_name, reason, final_url)
+
+    def check_sync(self, domain: str) -> DomainHealth:
+        """Blocking variant of check() for the synchronous extractors"""
+        health = self.current(domain)
+        if health is not None:
+            return health
+
+        url = domain if domain.startswith('http') else f'https://{domain}'
+        host = urlsplit(url).hostname or ''
+        try:
+            self._resolve_sync(host)
+        except FutureTimeoutError:
+            return self._inconclusive(domain, 'DNS lookup timed out')
+        except socket.gaierror as e:
+            if _is_temporary_dns_failure(e):
+                return self._inconclusive(domain, str(e))
+            return self.record(domain, STATUS_DNS_FAILURE, str(e))
+        except UnicodeError as e:
+            return self.record(domain, STATUS_DNS_FAILURE, str(e))
+
+        try:
+            with self.scheduler.slot_sync(url):
+                with requests.get(url, timeout=self.timeout, stream=True,
+                                  headers={'User-Agent': USER_AGENT}) as response:
+                    body = response.raw.read(MAX_BODY_BYTES, decode_content=True).decode(
+                        response.encoding or 'utf-8', errors='replace'
+                    )
+                    final_url, status = response.url, response.status_code
+        except FetchDisallowed as e:
+            return self._inconclusive(domain, str(e))
+        except requests.Timeout:
+            return self._inconclusive(domain, 'request timed out')
+        except requests.exceptions.SSLError as e:
+            return self._inconclusive(domain, f'TLS error: {e}')
+        except Exception as e:
+            return self.record(domain, STATUS_UNREACHABLE, str(e) or type(e).__name__)
+
+        status_name, reason = classify_response(url, final_url, status, body)
+        return self.record(domain, status_name, reason, final_url)
+
+    def _resolve_sync(self, host: str):
+        """getaddrinfo() bounded by the pre-flight timeout; a stuck lookup is left to finish in its thread"""
+        with self._lock:
+            # Executor threads do not survive a fork, so child processes start their own
+            if self._resolver is None or self._resolver_pid != os.getpid():
+                self._resolver = ThreadPoolExecutor(max_workers=8, thread_name_prefix='preflight-dns')
+                self._resolver_pid = os.getpid()
+            resolver = self._resolver
+        resolver.submit(socket.getaddrinfo, host, 443, type=socket.SOCK_STREAM).result(timeout=self.timeout)
+
+    async def _get(self, session: aiohttp.ClientSession, url: str, timeout: aiohttp.ClientTimeout):
+        async with session.get(url, timeout=timeout, allow_redirects=True) as response:
+            body = await response.content.read(MAX_BODY_BYTES)
+            return str(response.url), response.status, body.decode(response.charset or 'utf-8', errors='replace')
+
+    def _inconclusive(self, domain: str, reason: str) -> DomainHealth:
+        """Outcome that says nothing about the domain; not stored, so the next run checks again"""
+        self.stats['inconclusive'] += 1
+        logger.debug(f"{host_key(domain)}: pre-flight inconclusive ({reason})")
+        return DomainHealth(host_key(domain), STATUS_INCONCLUSIVE, reason, checked_at=time.time())
+
+    # --- Updates ---
+
+    def record(self, domain: str, status: str, reason: str = '', final_url: Optional[str] = None) -> DomainHealth:
+        """Store a pre-flight outcome and schedule the next check"""
+        now = time.time()
+        key = host_key(domain)
+        self.stats['checked'] += 1
+
+        with self._lock:
+            try:
+                previous = self.get(domain)
+            except sqlite3.Error:
+                previous = None
+
+            if status == STATUS_HEALTHY:
+                failures = 0
+                next_check_at = now + self.healthy_ttl
+                self.stats['healthy'] += 1
+            else:
+                # Each consecutive failure doubles the wait before the domain is tried again
+                failures = (previous.failures if previous else 0) + 1
+                next_check_at = now + min(self.backoff_base * 2 ** (failures - 1), self.backoff_max)
+                self.stats['unhealthy'] += 1
+                logger.info(f"{key}: {status} ({reason}); re-check in {(next_check_at - now) / 3600:.0f}h")
+
+            health = DomainHealth(key, status, reason, final_url, failures, now, next_check_at)
+            try:
+                self._db().execute(
+                    'INSERT OR REPLACE INTO domain_health (domain, status, reason, final_url, failures, '
+                    'checked_at, next_check_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (key, status, reason, final_url, failures, now, next_check_at)
+                )
+                self._db().commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not record domain health for {key}: {e}")
+        return health
+
+    def forget(self, domain: str):
+        """Drop a domain's record so the next check runs a fresh pre-flight"""
+        with self._lock:
+            self._db().execute('DELETE FROM domain_health WHERE domain = ?', (host_key(domain),))
+            self._db().commit()
+
+    def close(self):
+        with self._lock:
+            if self._resolver is not None:
+                self._resolver.shutdown(wait=False)
+                self._resolver = None
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so reopen in child processes
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(SCHEMA)
+            self._conn_pid = os.getpid()
+        return self._conn
+
+
+_registry: Optional[DomainHealthRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_domain_health_registry() -> Optional[DomainHealthRegistry]:
+    """Process-wide registry, or None when pre-flight checks are disabled"""
+    global _registry
+    if not settings.domain_health_enabled:
+        return None
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = DomainHealthRegistry()
+                atexit.register(_registry.close)
+    return _registry
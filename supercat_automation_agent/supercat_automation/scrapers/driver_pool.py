@@ -0,0 +1,257 @@
+# scrapers/driver_pool.py
+"""
+Pool of warm, reusable headless Chrome drivers for website evidence extraction.
+The chromedriver binary is resolved once per process and drivers are leased per
+fetch instead of being launched and quit for every URL.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, List
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service as ChromeService
+from webdriver_manager.chrome import ChromeDriverManager
+
+from .page_settle import install_settle_probe_driver, wait_for_settled_driver
+from .render_profile import RenderProfile, RenderReport
+
+try:
+    from supercat_automation.config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_driver_path: Optional[str] = None
+_driver_path_lock = threading.Lock()
+
+
+def resolve_driver_path() -> str:
+    """Resolve the chromedriver binary once per process"""
+    global _driver_path
+    if _driver_path is None:
+        with _driver_path_lock:
+            if _driver_path is None:
+                _driver_path = ChromeDriverManager().install()
+                logger.info(f"Resolved chromedriver at {_driver_path}")
+    return _driver_path
+
+
+def build_chrome_options(profile: Optional[RenderProfile] = None) -> Options:
+    """Headless Chrome options shared by every pooled driver"""
+    chrome_options = Options()
+    chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-logging')
+    chrome_options.add_argument('--log-level=3')
+    if profile is not None:
+        for argument in profile.chrome_arguments():
+            chrome_options.add_argument(argument)
+        # Network events feed the per-render byte accounting
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        chrome_options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+    return chrome_options
+
+
+class PooledDriver:
+    """A Chrome driver plus the bookkeeping needed to decide when to recycle it"""
+
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.pages_served = 0
+        self.created_at = time.time()
+
+
+class ChromeDriverPool:
+    """
+    Fixed-size pool of headless Chrome drivers.
+    Drivers are health-checked on lease, recycled after max_pages fetches,
+    and discarded when a fetch crashes the browser. A page-load timeout
+    returns the driver to the pool like any other finished fetch.
+    """
+
+    def __init__(self, size: Optional[int] = None, max_pages: Optional[int] = None,
+                 page_load_timeout: Optional[int] = None, render_profile: Optional[RenderProfile] = None):
+        self.size = size or settings.driver_pool_size
+        self.max_pages = max_pages or settings.driver_max_pages
+        self.page_load_timeout = page_load_timeout or settings.driver_page_load_timeout
+        self.render_profile = render_profile or RenderProfile()
+
+        self._idle: "queue.LifoQueue[PooledDriver]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._live: List[PooledDriver] = []
+        self._closed = False
+
+        self.stats = {
+            'drivers_started': 0,
+            'drivers_recycled': 0,
+            'drivers_crashed': 0,
+            'leases': 0
+        }
+
+    def warm_up(self, count: Optional[int] = None):
+        """Start drivers ahead of time so the first fetches skip browser startup"""
+        count = min(count or self.size, self.size)
+        while self._idle.qsize() < count and len(self._live) < self.size:
+            self._idle.put(self._start_driver())
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """Lease a healthy driver for the duration of one fetch"""
+        if self._closed:
+            raise RuntimeError("Driver pool is closed")
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No Chrome driver available within {timeout}s")
+
+        pooled = None
+        crashed = False
+        try:
+            pooled = self._checkout()
+            self.stats['leases'] += 1
+            yield pooled.driver
+            pooled.pages_served += 1
+        except TimeoutException:
+            # A slow page, not a broken browser; the check-in reset still proves the session works
+            if pooled is not None:
+                pooled.pages_served += 1
+            raise
+        except WebDriverException:
+            crashed = True
+            raise
+        finally:
+            if pooled is not None:
+                self._checkin(pooled, crashed)
+            self._slots.release()
+
+    def close(self):
+        """Quit every driver owned by the pool"""
+        self._closed = True
+        with self._lock:
+            live, self._live = self._live, []
+        for pooled in live:
+            self._quit(pooled)
+        while not self._idle.empty():
+            self._idle.get_nowait()
+
+    def _checkout(self) -> PooledDriver:
+        """Take an idle driver if a healthy one exists, otherwise start a new one"""
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                return self._start_driver()
+            if self._is_healthy(pooled):
+                return pooled
+            logger.warning("Discarding unhealthy Chrome driver")
+            self.stats['drivers_crashed'] += 1
+            self._discard(pooled)
+
+    def _checkin(self, pooled: PooledDriver, crashed: bool):
+        """Return a driver to the pool, or retire it if crashed or worn out"""
+        if crashed or self._closed:
+            if crashed:
+                self.stats['drivers_crashed'] += 1
+            self._discard(pooled)
+            return
+        if pooled.pages_served >= self.max_pages:
+            logger.debug(f"Recycling Chrome driver after {pooled.pages_served} pages")
+            self.stats['drivers_recycled'] += 1
+            self._discard(pooled)
+            return
+        try:
+            pooled.driver.delete_all_cookies()
+            pooled.driver.get('about:blank')
+        except WebDriverException:
+            self.stats['drivers_crashed'] += 1
+            self._discard(pooled)
+            return
+        self._idle.put(pooled)
+
+    def _start_driver(self) -> PooledDriver:
+        """Launch a new headless Chrome using the process-wide driver binary"""
+        driver = webdriver.Chrome(
+            service=ChromeService(resolve_driver_path()),
+            options=build_chrome_options(self.render_profile)
+        )
+        driver.set_page_load_timeout(self.page_load_timeout)
+        self.render_profile.prepare_driver(driver)
+        install_settle_probe_driver(driver)
+        pooled = PooledDriver(driver)
+        with self._lock:
+            self._live.append(pooled)
+        self.stats['drivers_started'] += 1
+        return pooled
+
+    def _is_healthy(self, pooled: PooledDriver) -> bool:
+        """Cheap liveness probe against the browser session"""
+        try:
+            pooled.driver.execute_script('return 1')
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, pooled: PooledDriver):
+        with self._lock:
+            if pooled in self._live:
+                self._live.remove(pooled)
+        self._quit(pooled)
+
+    def _quit(self, pooled: PooledDriver):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.debug(f"Error quitting Chrome driver: {e}")
+
+
+_pool: Optional[ChromeDriverPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool() -> ChromeDriverPool:
+    """Process-wide driver pool shared by all evidence extractors"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ChromeDriverPool()
+                atexit.register(_pool.close)
+    return _pool
+
+
+def fetch_rendered_html(url: str, settle: bool = False) -> str:
+    """
+    Render a URL with a pooled driver and return the resulting page source.
+    With settle=True, waits for the page's network and DOM to go quiet first.
+    """
+    pool = get_driver_pool()
+    profile = pool.render_profile
+    report = RenderReport(url)
+
+    with pool.lease() as driver:
+        profile.drain_driver_log(driver)
+        start_time = time.time()
+        driver.get(url)
+        report.elapsed = time.time() - start_time
+        profile.read_driver_log(driver, report)
+
+        # A page already over the byte cap gets no extra time to load more
+        if settle and not profile.enforce_byte_cap(driver, report):
+            wait_for_settled_driver(driver)
+            profile.read_driver_log(driver, report)
+            profile.enforce_byte_cap(driver, report)
+
+        html = driver.page_source
+
+    profile.record(report)
+    return html
@@ -0,0 +1,217 @@
+# scrapers/edp_rules.py
+"""
+Declarative EDP pain score rules.
+The pain scores of the v2 evidence schema are defined in config/edp_rules.json
+as rules: a predicate on one evidence column plus the points it adds to a
+score, with a cap per score. Changing a weight is a data change. The rules
+are compiled once into a rule x score weight matrix, so a whole batch of
+evidence records (e.g. cached results) is scored with one matrix product:
+scores = min(firing @ weights, caps).
+"""
+
+import hashlib
+import json
+import logging
+import operator
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from supercat_automation.config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent.parent / 'config' / 'edp_rules.json'
+
+COMPARISONS = {
+    'gt': operator.gt,
+    'ge': operator.ge,
+    'lt': operator.lt,
+    'le': operator.le
+}
+NUMERIC_OPS = set(COMPARISONS) | {'excess'}
+OPS = NUMERIC_OPS | {'true', 'false', 'eq', 'ne', 'in'}
+
+
+class RuleError(ValueError):
+    """The rules file is malformed"""
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def as_score(value: float):
+    """Whole-number scores stay ints, as the hand-written scoring produced"""
+    value = float(value)
+    return int(value) if value.is_integer() else round(value, 2)
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Add `points` to `score` when `field op value` holds"""
+    score: str
+    field: str
+    op: str
+    points: float
+    value: Any = None
+
+    def amount(self, value: Any) -> float:
+        """1 when the predicate holds, 0 otherwise; units above the threshold for 'excess'"""
+        if self.op == 'true':
+            return float(bool(value))
+        if self.op == 'false':
+            return float(not value)
+        if self.op == 'eq':
+            return float(value == self.value)
+        if self.op == 'ne':
+            return float(value != self.value)
+        if self.op == 'in':
+            return float(value in self.value)
+        number = _number(value)
+        if self.op == 'excess':
+            return max(number - self.value, 0.0)
+        return float(COMPARISONS[self.op](number, self.value))
+
+
+class RuleSet:
+    """Compiled pain score rules; scores one evidence record or a batch of them"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.fingerprint = hashlib.sha1(json.dumps(spec, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+        self.scores: List[str] = []
+        self.caps: List[float] = []
+        self.rules: List[Rule] = []
+
+        for score, definition in (spec.get('scores') or {}).items():
+            self.scores.append(score)
+            self.caps.append(float(definition.get('cap', float('inf'))))
+            for rule in definition.get('rules', []):
+                self.rules.append(self._compile(score, rule))
+        if not self.scores:
+            raise RuleError('No scores defined')
+
+        # Rules grouped by the column they read, so each column is pulled from a batch once
+        self._rules_by_field: Dict[str, List[int]] = {}
+        for index, rule in enumerate(self.rules):
+            self._rules_by_field.setdefault(rule.field, []).append(index)
+
+        if np is not None:
+            self._weights = np.zeros((len(self.rules), len(self.scores)))
+            for index, rule in enumerate(self.rules):
+                self._weights[index, self.scores.index(rule.score)] = rule.points
+            self._caps = np.array(self.caps)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'RuleSet':
+        path = Path(path or settings.edp_rules_path or DEFAULT_RULES_PATH)
+        try:
+            with open(path, encoding='utf-8') as f:
+                spec = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise RuleError(f"Could not read EDP rules from {path}: {e}") from e
+        return cls(spec)
+
+    def _compile(self, score: str, rule: Dict[str, Any]) -> Rule:
+        op = rule.get('op')
+        if op not in OPS:
+            raise RuleError(f"{score}: unknown operator {op!r}; expected one of {sorted(OPS)}")
+        if not rule.get('field'):
+            raise RuleError(f"{score}: rule without a field")
+        value = rule.get('value')
+        if op in NUMERIC_OPS:
+            if not isinstance(value, (int, float)):
+                raise RuleError(f"{score}: '{op}' on {rule['field']} needs a numeric value")
+            value = float(value)
+        elif op == 'in':
+            if not isinstance(value, list):
+                raise RuleError(f"{score}: 'in' on {rule['field']} needs a list value")
+            value = tuple(value)
+        return Rule(score=score, field=rule['field'], op=op, points=float(rule.get('points', 0)), value=value)
+
+    # --- Scoring ---
+
+    def score(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Pain scores of one evidence record"""
+        totals = dict.fromkeys(self.scores, 0.0)
+        for rule in self.rules:
+            amount = rule.amount(record.get(rule.field))
+            if amount:
+                totals[rule.score] += amount * rule.points
+        return {score: as_score(min(totals[score], cap)) for score, cap in zip(self.scores, self.caps)}
+
+    def apply(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Write the pain scores into the record"""
+        record.update(self.score(record))
+        return record
+
+    def score_batch(self, records: List[Dict[str, Any]]):
+        """
+        Pain scores of many records as an (records x scores) array, columns in
+        self.scores order; a list of rows when numpy is not installed.
+        """
+        if np is None:
+            return [[row[score] for score in self.scores] for row in map(self.score, records)]
+        return np.minimum(self._firing(records) @ self._weights, self._caps)
+
+    def apply_batch(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Write the pain scores into every record"""
+        for record, row in zip(records, self.score_batch(records)):
+            record.update({score: as_score(value) for score, value in zip(self.scores, row)})
+        return records
+
+    def _firing(self, records: List[Dict[str, Any]]):
+        """(records x rules) matrix of rule amounts"""
+        count = len(records)
+        firing = np.zeros((count, len(self.rules)))
+        for field, indices in self._rules_by_field.items():
+            values = [record.get(field) for record in records]
+            numbers = None
+            for index in indices:
+                rule = self.rules[index]
+                if rule.op in NUMERIC_OPS:
+                    if numbers is None:
+                        numbers = np.fromiter(map(_number, values), dtype=float, count=count)
+                    if rule.op == 'excess':
+                        firing[:, index] = np.maximum(numbers - rule.value, 0.0)
+                    else:
+                        firing[:, index] = COMPARISONS[rule.op](numbers, rule.value)
+                else:
+                    firing[:, index] = np.fromiter(map(rule.amount, values), dtype=float, count=count)
+        return firing
+
+    def describe(self) -> List[Tuple[str, str]]:
+        """(score, rule) pairs in readable form"""
+        described = []
+        for rule in self.rules:
+            value = as_score(rule.value) if rule.op in NUMERIC_OPS else rule.value
+            condition = rule.op if value is None else f"{rule.op} {value!r}"
+            described.append((rule.score, f"{rule.field} {condition}: +{as_score(rule.points)}"))
+        return described
+
+
+_rules: Optional[RuleSet] = None
+_rules_lock = threading.Lock()
+
+
+def get_edp_rules() -> RuleSet:
+    """Process-wide rule set from the configured rules file"""
+    global _rules
+    if _rules is None:
+        with _rules_lock:
+            if _rules is None:
+                _rules = RuleSet.load()
+                logger.debug(f"Loaded {len(_rules.rules)} EDP rules ({_rules.fingerprint})")
+    return _rules
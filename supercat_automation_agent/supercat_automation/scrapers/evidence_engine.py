@@ -0,0 +1,280 @@
+# scrapers/evidence_engine.py
+"""
+Shared fetch-and-parse engine behind both website evidence schemas.
+A site is fetched, parsed, crawled and sized from its sitemaps once into a
+SiteSnapshot. The v1 extractor (edp_evidence dicts) and the v2 extractor
+(EDPx_* columns) are projections of that snapshot. A company that goes
+through MultiSourcePainDetector and the v2 pipeline in the same process is
+therefore rendered and parsed only once. Recent snapshots are kept in a small
+in-process cache; across processes the page cache still saves the fetches.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Any, Optional, Iterable
+
+from bs4 import BeautifulSoup
+
+from .crawl_planner import CrawlPlanner
+from .domain_health import get_domain_health_registry
+from .driver_pool import fetch_rendered_html
+from .html_parser import ParsedPage, parse_page, parse_soup
+from .page_archive import KIND_CATALOG
+from .page_cache import normalize_url
+from .sitemap import CatalogEstimate, SitemapReader
+from .tiered_fetcher import TieredFetcher
+
+try:
+    from supercat_automation.config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_V1 = 'v1'
+SCHEMA_V2 = 'v2'
+SCHEMAS = (SCHEMA_V1, SCHEMA_V2)
+
+
+@dataclass
+class SiteSnapshot:
+    """
+    One site as fetched and parsed. Shallow snapshots hold the homepage only;
+    full ones add the crawled subpages and the sitemap catalog estimate.
+    """
+    domain: str
+    html: str = ''
+    final_url: str = ''
+    elapsed: float = 0.0
+    tier: str = 'Unknown'
+    page: Optional[ParsedPage] = None
+    subpages: List[Dict[str, Any]] = field(default_factory=list)
+    catalog: Optional[CatalogEstimate] = None
+    full: bool = False
+    error: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    _soup: Optional[BeautifulSoup] = field(default=None, repr=False)
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        """Homepage soup for the v1 checks; built on demand when the parser backend makes none"""
+        if self._soup is None:
+            self._soup = self.page.soup if self.page is not None and self.page.soup is not None else parse_soup(self.html)
+        return self._soup
+
+    @property
+    def text_content(self) -> str:
+        """Lowercased visible homepage text"""
+        return self.page.text_content if self.page is not None else self.soup.get_text().lower()
+
+    def crawled_html(self, url: str) -> Optional[str]:
+        """HTML of a subpage the crawl already fetched, if it did"""
+        key = normalize_url(url)
+        for subpage in self.subpages:
+            if key in (normalize_url(subpage['url']), normalize_url(subpage.get('final_url') or subpage['url'])):
+                return subpage['html']
+        return None
+
+
+class EvidenceEngine:
+    """
+    Fetches sites into snapshots and projects them into either evidence schema.
+    Concurrent requests for the same site wait for the first one's snapshot.
+    """
+
+    def __init__(self, replay: Optional[bool] = None, cache_size: Optional[int] = None,
+                 cache_ttl: Optional[float] = None):
+        # Replay re-scores archived pages offline, so it skips the network checks
+        self.replay = replay if replay is not None else settings.archive_replay
+        self.cache_size = cache_size if cache_size is not None else settings.evidence_snapshot_cache_size
+        self.cache_ttl = cache_ttl or settings.evidence_snapshot_ttl_seconds
+
+        # Static HTTP first, browser render only for pages that need JavaScript
+        self.fetcher = TieredFetcher(render=self._render, replay=self.replay)
+
+        # Catalog, dealer, resources and events pages fetched alongside the homepage
+        self.crawl_planner = CrawlPlanner()
+
+        # Dead, parked and marketplace-redirect domains are skipped before any fetch
+        self.domain_health = None if self.replay else get_domain_health_registry()
+
+        # Product and category URLs listed in sitemaps size the catalog without rendering it
+        self.sitemaps = SitemapReader() if (
+            not self.replay and settings.sitemap_catalog_enabled) else None
+
+        self.stats = {
+            'snapshots': 0,
+            'reused': 0,
+            'upgraded': 0
+        }
+        self._snapshots: 'OrderedDict[str, SiteSnapshot]' = OrderedDict()
+        self._site_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._projectors: Dict[str, Any] = {}
+
+    def snapshot(self, domain: str, full: bool = True) -> SiteSnapshot:
+        """Fetched and parsed site, reusing a recent snapshot; full adds the crawl and the catalog"""
+        if not domain.startswith('http'):
+            domain = f'https://{domain}'
+        key = normalize_url(domain)
+
+        with self._site_lock(key):
+            snapshot = self._cached(key)
+            if snapshot is not None and (snapshot.full or not full or snapshot.error):
+                self.stats['reused'] += 1
+                return snapshot
+
+            if snapshot is None:
+                snapshot = self._fetch(domain)
+                self.stats['snapshots'] += 1
+            else:
+                self.stats['upgraded'] += 1
+            if full and not snapshot.error:
+                self._complete(snapshot)
+            self._store(key, snapshot)
+            return snapshot
+
+    def analyze(self, domain: str, schemas: Iterable[str] = SCHEMAS) -> Dict[str, Dict[str, Any]]:
+        """Results for each requested schema from one fetch of the site"""
+        schemas = list(schemas)
+        snapshot = self.snapshot(domain, full=SCHEMA_V2 in schemas)
+        return {schema: self.project(snapshot, schema) for schema in schemas}
+
+    def project(self, snapshot: SiteSnapshot, schema: str) -> Dict[str, Any]:
+        """One schema's results for a snapshot"""
+        return self._projector(schema).analyze_snapshot(snapshot)
+
+    def estimate_catalog(self, url: str) -> Optional[CatalogEstimate]:
+        """
+        Catalog size from the site's sitemaps, or None when it has none or they are disabled.
+        Live estimates are archived with the pages and replay reads them back.
+        """
+        if self.replay:
+            return self._replay_catalog(url)
+        if self.sitemaps is None:
+            return None
+        try:
+            catalog = self.sitemaps.estimate_catalog(url)
+        except Exception as e:
+            logger.debug(f"Sitemap catalog estimate failed for {url}: {e}")
+            return None
+        self._archive_catalog(url, catalog)
+        return catalog if catalog.found else None
+
+    def _archive_catalog(self, url: str, catalog: CatalogEstimate):
+        # Sites without sitemaps are archived too, so replay does not find a stale estimate
+        archive = self.fetcher.archive
+        if archive is None:
+            return
+        try:
+            archive.put(url, json.dumps(asdict(catalog)), KIND_CATALOG)
+        except Exception as e:
+            logger.warning(f"Page archive write failed for the catalog of {url}: {e}")
+
+    def _replay_catalog(self, url: str) -> Optional[CatalogEstimate]:
+        archived = self.fetcher.archive.get(url, KIND_CATALOG)
+        if archived is None:
+            return None
+        try:
+            catalog = CatalogEstimate(**json.loads(archived.html))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable archived catalog for {url}: {e}")
+            return None
+        return catalog if catalog.found else None
+
+    def _fetch(self, domain: str) -> SiteSnapshot:
+        """Homepage fetch and parse"""
+        if self.domain_health:
+            health = self.domain_health.check_sync(domain)
+            if not health.ok:
+                return SiteSnapshot(domain=domain, error=health.describe())
+
+        try:
+            fetch = self.fetcher.fetch_sync(domain)
+        except Exception as e:
+            logger.error(f"Error analyzing {domain}: {e}")
+            return SiteSnapshot(domain=domain, error=str(e))
+
+        snapshot = SiteSnapshot(domain=domain, html=fetch['html'], final_url=fetch['final_url'],
+                                elapsed=fetch['elapsed'], tier=fetch['tier'])
+        try:
+            snapshot.page = parse_page(fetch['html'])
+        except Exception as e:
+            # The projections parse again and report the error in their own shape
+            logger.warning(f"Could not parse {domain}: {e}")
+        return snapshot
+
+    def _complete(self, snapshot: SiteSnapshot):
+        """Crawl the most relevant internal pages within the budget and read the sitemaps"""
+        if snapshot.page is not None:
+            try:
+                snapshot.subpages = self.crawl_planner.crawl_sync(
+                    self.fetcher, snapshot.final_url, snapshot.page.features.links
+                )
+            except Exception as e:
+                logger.warning(f"Crawl failed for {snapshot.domain}, using the homepage only: {e}")
+        snapshot.catalog = self.estimate_catalog(snapshot.final_url)
+        snapshot.full = True
+
+    def _render(self, url: str) -> str:
+        """Fully rendered HTML from a pooled Selenium driver"""
+        return fetch_rendered_html(url, settle=True)  # Wait for dynamic content
+
+    def _projector(self, schema: str):
+        if schema not in self._projectors:
+            # The extractors import this module, so they are only imported once needed
+            if schema == SCHEMA_V1:
+                from .website_evidence import WebsiteEvidenceExtractor
+                self._projectors[schema] = WebsiteEvidenceExtractor(engine=self)
+            elif schema == SCHEMA_V2:
+                from .website_evidence_v2 import WebsiteEvidenceExtractorV2
+                self._projectors[schema] = WebsiteEvidenceExtractorV2(engine=self)
+            else:
+                raise ValueError(f"Unknown evidence schema '{schema}'; expected one of {SCHEMAS}")
+        return self._projectors[schema]
+
+    # --- Snapshot cache ---
+
+    def _site_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._site_locks.setdefault(key, threading.Lock())
+
+    def _cached(self, key: str) -> Optional[SiteSnapshot]:
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is None:
+                return None
+            if time.time() - snapshot.created > self.cache_ttl:
+                del self._snapshots[key]
+                return None
+            self._snapshots.move_to_end(key)
+            return snapshot
+
+    def _store(self, key: str, snapshot: SiteSnapshot):
+        with self._lock:
+            if self.cache_size <= 0:
+                self._site_locks.pop(key, None)
+                return
+            self._snapshots[key] = snapshot
+            self._snapshots.move_to_end(key)
+            while len(self._snapshots) > self.cache_size:
+                evicted, _ = self._snapshots.popitem(last=False)
+                self._site_locks.pop(evicted, None)
+
+
+_engines: Dict[bool, EvidenceEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_evidence_engine(replay: Optional[bool] = None) -> EvidenceEngine:
+    """Process-wide engine shared by the v1 and v2 extractors"""
+    replay = bool(replay if replay is not None else settings.archive_replay)
+    if replay not in _engines:
+        with _engines_lock:
+            if replay not in _engines:
+                _engines[replay] = EvidenceEngine(replay=replay)
+    return _engines[replay]
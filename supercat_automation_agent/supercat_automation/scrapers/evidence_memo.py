@@ -0,0 +1,149 @@
+# scrapers/evidence_memo.py
+"""
+Memo of finished website evidence results.
+Each domain's last result is stored with the SHA-256 of the HTML it was
+computed from and the extractor version that computed it. When a page comes
+back unchanged the stored result is reused without parsing or scoring.
+Bumping the extractor's version constant invalidates every stored result.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .page_cache import normalize_url
+
+try:
+    from supercat_automation.config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS evidence (
+    domain_key TEXT PRIMARY KEY,
+    html_digest TEXT NOT NULL,
+    version TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+"""
+
+
+def html_digest(html: str) -> str:
+    return hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+
+class EvidenceMemo:
+    """
+    (domain, HTML digest, extractor version) -> evidence dict.
+    Keeps one result per domain; a newer page or version replaces it.
+    Safe to use from several threads; each process opens its own connection.
+    """
+
+    def __init__(self, version: str, directory: Optional[str] = None):
+        self.version = str(version)
+        self.directory = Path(directory or settings.evidence_memo_dir)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stored': 0
+        }
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+
+    def get(self, domain: str, digest: str) -> Optional[Dict[str, Any]]:
+        """Stored result for this exact page and extractor version; None otherwise"""
+        domain_key = normalize_url(domain)
+        with self._lock:
+            try:
+                row = self._db().execute(
+                    'SELECT result FROM evidence WHERE domain_key = ? AND html_digest = ? AND version = ?',
+                    (domain_key, digest, self.version)
+                ).fetchone()
+                if row is not None:
+                    self._db().execute(
+                        'UPDATE evidence SET last_access = ? WHERE domain_key = ?', (time.time(), domain_key)
+                    )
+                    self._db().commit()
+            except sqlite3.Error as e:
+                # A broken memo only costs a re-analysis
+                logger.warning(f"Evidence memo lookup failed for {domain}: {e}")
+                row = None
+
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+        return json.loads(row[0])
+
+    def put(self, domain: str, digest: str, result: Dict[str, Any]):
+        """Remember the result computed from a page, replacing the domain's previous one"""
+        now = time.time()
+        with self._lock:
+            try:
+                self._db().execute(
+                    'INSERT OR REPLACE INTO evidence (domain_key, html_digest, version, result, created_at, last_access) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (normalize_url(domain), digest, self.version, json.dumps(result, default=str), now, now)
+                )
+                self._db().commit()
+                self.stats['stored'] += 1
+            except sqlite3.Error as e:
+                logger.warning(f"Could not memoize evidence for {domain}: {e}")
+
+    def invalidate(self, domain: str):
+        with self._lock:
+            self._db().execute('DELETE FROM evidence WHERE domain_key = ?', (normalize_url(domain),))
+            self._db().commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so reopen in child processes
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(str(self.directory / 'evidence.sqlite'), timeout=30, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(SCHEMA)
+            self._conn_pid = os.getpid()
+
+            # Results from any other extractor version can never be served again
+            purged = self._conn.execute('DELETE FROM evidence WHERE version != ?', (self.version,)).rowcount
+            self._conn.commit()
+            if purged > 0:
+                logger.info(f"Dropped {purged} memoized evidence results from other extractor versions")
+        return self._conn
+
+
+_memos: Dict[str, EvidenceMemo] = {}
+_memo_lock = threading.Lock()
+
+
+def get_evidence_memo(version: str) -> Optional[EvidenceMemo]:
+    """Process-wide memo for an extractor version, or None when memoization is disabled"""
+    if not settings.evidence_memo_enabled:
+        return None
+    version = str(version)
+    if version not in _memos:
+        with _memo_lock:
+            if version not in _memos:
+                memo = EvidenceMemo(version)
+                atexit.register(memo.close)
+                _memos[version] = memo
+    return _memos[version]
@@ -0,0 +1,233 @@
+# scrapers/evidence_workers.py
+"""
+Process-isolated website evidence extraction for long batch runs.
+Each domain is analyzed by WebsiteEvidenceExtractorV2 in a worker process.
+Each worker process is replaced after a fixed number of domains, or as soon
+as it reports memory above the RSS limit. BeautifulSoup
+trees, Chrome drivers and other per-domain garbage therefore die with their
+process instead of piling up in the orchestrating one. Results cross the
+process boundary as compressed JSON records.
+The same worker functions back the async engine's parse stage, which sends
+fetched HTML to a process pool for parsing and scoring.
+"""
+
+import asyncio
+import atexit
+import dataclasses
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.util import Finalize
+from typing import Dict, List, Any, Optional, Tuple
+
+from .evidence_memo import html_digest
+from .html_parser import ParsedPage, parse_page
+from .sitemap import CatalogEstimate
+from .website_evidence_v2 import WebsiteEvidenceExtractorV2
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    from supercat_automation.config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Per-process extractor, created on a worker's first task
+_extractor = None
+
+
+def encode_record(result: Dict[str, Any]) -> bytes:
+    """Compact serialized form of an evidence result"""
+    return zlib.compress(json.dumps(result, separators=(',', ':'), default=str).encode('utf-8'))
+
+
+def decode_record(record: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(record).decode('utf-8'))
+
+
+def current_rss_mb() -> float:
+    """Resident memory of this process and its children (Chrome, chromedriver) in MB"""
+    if psutil is not None:
+        process = psutil.Process()
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / (1024 * 1024)
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        # Peak rather than current RSS; kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _init_worker():
+    # Worker processes skip atexit on exit, so pooled drivers and caches are closed here instead
+    Finalize(None, atexit._run_exitfuncs, exitpriority=0)
+
+
+def new_worker_executor(workers: int) -> ProcessPoolExecutor:
+    """Process pool for evidence work"""
+    # Spawned workers inherit no threads, sockets or SQLite handles from the parent
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker
+    )
+
+
+def _worker_extractor(replay: bool) -> WebsiteEvidenceExtractorV2:
+    global _extractor
+    if _extractor is None:
+        _extractor = WebsiteEvidenceExtractorV2(replay=replay)
+    return _extractor
+
+
+def _analyze_in_worker(domain: str, replay: bool) -> Tuple[bytes, float]:
+    """Analyze one domain in a worker; returns the encoded result and the worker's RSS"""
+    result = _worker_extractor(replay).analyze_website_comprehensive(domain)
+    return encode_record(result), current_rss_mb()
+
+
+def parse_in_worker(html: str, replay: bool = False) -> Tuple[ParsedPage, str]:
+    """
+    Parse a page in a worker. The soup and every copy of the HTML stay behind;
+    text, features, the HTML keywords found and the HTML's digest come back,
+    so the page crosses the process boundary once, on its way in.
+    """
+    page = parse_page(html)
+    html_keywords = frozenset(_worker_extractor(replay).html_matcher.found(page.features.html_lower))
+    features = dataclasses.replace(page.features, html_lower='')
+    return dataclasses.replace(page, soup=None, features=features, html_keywords=html_keywords), html_digest(html)
+
+
+def score_in_worker(replay: bool, domain: str, html: str, load_time: float, fetch_tier: str,
+                    subpages: List[Dict[str, Any]], page: Optional[ParsedPage],
+                    catalog: Optional[CatalogEstimate] = None, page_digest: Optional[str] = None) -> Dict[str, Any]:
+    """WebsiteEvidenceExtractorV2.analyze_html in a worker; html may be '' when page and page_digest are given"""
+    return _worker_extractor(replay).analyze_html(domain, html, load_time, fetch_tier, subpages=subpages, page=page,
+                                                  catalog=catalog, page_digest=page_digest)
+
+
+class _WorkerSlot:
+    """One worker process in an executor of its own, so it can be replaced alone"""
+
+    def __init__(self):
+        self.executor = new_worker_executor(1)
+        self.submitted = 0
+        self.in_flight = 0
+
+
+class EvidenceWorkerPool:
+    """
+    Drop-in replacement for AsyncEvidenceEngine that analyzes domains in
+    worker processes. Each worker runs in a single-process executor and is
+    recycled on its own: after max_tasks_per_child domains, or when it
+    reports more than max_rss_mb, new domains go to a fresh process while the
+    old one finishes what it already has. The other workers keep running.
+    (ProcessPoolExecutor's own max_tasks_per_child can deadlock with queued
+    work on Python 3.11.) The in-process extractor only builds results for
+    crashed workers.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_tasks_per_child: Optional[int] = None,
+                 max_rss_mb: Optional[float] = None, extractor: Optional[WebsiteEvidenceExtractorV2] = None):
+        self.workers = workers or settings.evidence_worker_processes
+        self.max_tasks_per_child = max_tasks_per_child or settings.evidence_worker_max_tasks
+        self.max_rss_mb = max_rss_mb or settings.evidence_worker_max_rss_mb
+        self.extractor = extractor or WebsiteEvidenceExtractorV2()
+        self.replay = self.extractor.replay
+        self.stats = {
+            'analyzed': 0,
+            'recycled': 0,
+            'crashed': 0,
+            'peak_rss_mb': 0.0
+        }
+        self._slots: List[_WorkerSlot] = []
+
+    async def start(self):
+        if not self._slots:
+            self._slots = [_WorkerSlot() for _ in range(self.workers)]
+
+    async def close(self):
+        """Stop the workers once their current domains finish"""
+        if self._slots:
+            slots, self._slots = self._slots, []
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(
+                loop.run_in_executor(None, functools.partial(slot.executor.shutdown, wait=True, cancel_futures=True))
+                for slot in slots
+            ))
+
+    async def analyze(self, domain: str) -> Dict[str, Any]:
+        """Analyze one domain in a worker; same result dict as analyze_website_comprehensive"""
+        await self.start()
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            slot = self._next_slot()
+            slot.in_flight += 1
+            try:
+                record, rss_mb = await loop.run_in_executor(slot.executor, _analyze_in_worker, domain, self.replay)
+                break
+            except BrokenProcessPool as e:
+                # The worker died (Chrome crash, OOM kill) and took its queued domains with it;
+                # those get one more try on a fresh process
+                self.stats['crashed'] += 1
+                self._recycle(slot)
+                if attempt:
+                    logger.error(f"Evidence worker crashed while analyzing {domain}: {e}")
+                    return self.extractor.error_results(domain, f"Evidence worker crashed: {e}")
+            finally:
+                slot.in_flight -= 1
+
+        self.stats['analyzed'] += 1
+        self.stats['peak_rss_mb'] = max(self.stats['peak_rss_mb'], rss_mb)
+        if rss_mb > self.max_rss_mb:
+            logger.info(f"Evidence worker at {rss_mb:.0f} MB (limit {self.max_rss_mb} MB); recycling it")
+            self._recycle(slot)
+        return decode_record(record)
+
+    async def analyze_many(self, domains: List[str]) -> List[Dict[str, Any]]:
+        """Analyze a list of domains concurrently, preserving input order"""
+        return await asyncio.gather(*(self.analyze(domain) for domain in domains))
+
+    def _next_slot(self) -> _WorkerSlot:
+        """Least busy worker, replaced first if it has had its share of domains"""
+        slot = min(self._slots, key=lambda candidate: candidate.in_flight)
+        if slot.submitted >= self.max_tasks_per_child:
+            slot = self._recycle(slot)
+        slot.submitted += 1
+        return slot
+
+    def _recycle(self, slot: _WorkerSlot) -> _WorkerSlot:
+        """Replace one worker unless another task already did; the old process drains in the background"""
+        if slot not in self._slots:
+            return slot
+        self.stats['recycled'] += 1
+        fresh = _WorkerSlot()
+        self._slots[self._slots.index(slot)] = fresh
+        slot.executor.shutdown(wait=False)
+        return fresh
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1,121 @@
+# scrapers/exhibitor_stream.py
+"""
+Consumers of the streamed exhibitor list.
+Scrapers yield exhibitors in batches as each page or scroll batch is parsed
+(BaseTradeshowScraper.stream_exhibitor_list), and every batch is handed to
+each sink while scraping goes on. BatchedExhibitorWriter saves them to the
+database in batches; EvidenceQueue analyzes their websites. A crash halfway
+through a directory keeps everything streamed before it.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Any, Callable, Optional, Set
+
+from config.settings import settings
+from database.connection import db
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedExhibitorWriter:
+    """
+    Saves streamed exhibitors through a blocking bulk save function, in a
+    thread, in batches of batch_size. One batch is written at a time; the
+    scraper only waits when the previous batch is still being written.
+    """
+
+    def __init__(self, save: Callable[[List[Dict[str, Any]]], int], batch_size: Optional[int] = None):
+        self.save = save
+        self.batch_size = batch_size or settings.exhibitor_write_batch_size
+        self.saved = 0
+        self.batches = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._pending: Optional[asyncio.Task] = None
+
+    async def put(self, exhibitors: List[Dict[str, Any]]):
+        self._buffer.extend(exhibitors)
+        if len(self._buffer) >= self.batch_size:
+            await self._flush()
+
+    async def close(self) -> int:
+        """Write what is left and wait for it; returns how many exhibitors were saved"""
+        await self._flush()
+        if self._pending:
+            await self._pending
+            self._pending = None
+        return self.saved
+
+    async def _flush(self):
+        if self._pending:
+            await self._pending
+            self._pending = None
+        batch, self._buffer = self._buffer, []
+        if batch:
+            self._pending = asyncio.ensure_future(self._write(batch))
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        try:
+            self.saved += await asyncio.to_thread(self.save, batch)
+            self.batches += 1
+        except Exception as e:
+            logger.error(f"Failed to save a batch of {len(batch)} exhibitors: {e}")
+
+
+class EvidenceQueue:
+    """
+    Analyzes the websites of streamed exhibitors with an evidence engine
+    (AsyncEvidenceEngine or EvidenceWorkerPool) while scraping continues.
+    Each domain is analyzed once, however many scrapers stream it, and results
+    are keyed by the domain as stored on the company row. The queue is
+    bounded, so a scraper streaming faster than the analysis waits in put().
+    """
+
+    def __init__(self, engine, concurrency: Optional[int] = None, queue_size: Optional[int] = None):
+        self.engine = engine
+        self.concurrency = concurrency or settings.evidence_concurrency
+        self.queue_size = queue_size or settings.scraper_evidence_queue_size or self.concurrency * 4
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._seen: Set[str] = set()
+        self._workers: List[asyncio.Task] = []
+        self._started = False
+        self._start_lock = asyncio.Lock()
+
+    async def put(self, exhibitors: List[Dict[str, Any]]):
+        await self._start()
+        for exhibitor in exhibitors:
+            domain = db.clean_domain(exhibitor.get('website'))
+            if domain and domain not in self._seen:
+                self._seen.add(domain)
+                await self._queue.put(domain)
+
+    async def _start(self):
+        """Start the engine, then the workers; scrapers streaming at once all wait for it"""
+        async with self._start_lock:
+            if not self._started:
+                await self.engine.start()
+                self._workers = [asyncio.ensure_future(self._work()) for _ in range(self.concurrency)]
+                self._started = True
+
+    async def close(self) -> Dict[str, Dict[str, Any]]:
+        """Finish the queued domains and close the engine; returns evidence by domain"""
+        if self._started:
+            await self._queue.join()
+            for worker in self._workers:
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._workers = []
+            self._started = False
+            await self.engine.close()
+        return self.results
+
+    async def _work(self):
+        while True:
+            domain = await self._queue.get()
+            try:
+                self.results[domain] = await self.engine.analyze(domain)
+            except Exception as e:
+                logger.error(f"Evidence analysis failed for {domain}: {e}")
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,307 @@
+# scrapers/host_scheduler.py
+"""
+Central politeness scheduler for outbound page fetches.
+Many hosts can be fetched at once, but each host gets a bounded number of
+concurrent requests and a minimum gap between request starts. The gap is
+the configured host delay or the site's robots.txt Crawl-delay, whichever is
+longer. robots.txt is fetched once per site and cached, in memory and in the
+page cache. Waiting for a busy host never holds a global slot, so one slow
+site cannot stall work on the others; throughput grows with the number of
+distinct hosts instead of being fixed by sleeps between companies.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+import requests
+
+from .page_cache import PageCache, get_page_cache
+
+try:
+    from supercat_automation.config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+KIND_ROBOTS = 'robots'
+ROBOTS_TIMEOUT = 5
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+class FetchDisallowed(Exception):
+    """robots.txt does not allow fetching the URL"""
+
+
+def host_key(url: str) -> str:
+    """Politeness key for a URL: the hostname, lowercased, without a leading www."""
+    if '://' not in url:
+        url = f'https://{url}'
+    host = (urlsplit(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def _site_root(url: str) -> str:
+    if '://' not in url:
+        url = f'https://{url}'
+    parts = urlsplit(url)
+    return f'{parts.scheme}://{parts.netloc}'
+
+
+class _HostState:
+    """Turn-taking bookkeeping for one host"""
+
+    def __init__(self, concurrency: int):
+        self.next_start = 0.0
+        self.slots = threading.BoundedSemaphore(concurrency)
+
+
+class HostScheduler:
+    """
+    Per-host concurrency and spacing under a global concurrency cap.
+    slot() is for coroutines and slot_sync() for threads; both check
+    robots.txt first and raise FetchDisallowed for excluded URLs.
+    """
+
+    def __init__(self, global_concurrency: Optional[int] = None, per_host_concurrency: Optional[int] = None,
+                 host_delay: Optional[float] = None, respect_robots: Optional[bool] = None,
+                 cache: Optional[PageCache] = None):
+        self.global_concurrency = global_concurrency or settings.fetch_global_concurrency
+        self.per_host_concurrency = per_host_concurrency or settings.fetch_per_host_concurrency
+        self.host_delay = host_delay if host_delay is not None else settings.fetch_host_delay_seconds
+        self.respect_robots = (respect_robots if respect_robots is not None
+                               else settings.robots_txt_respect)
+        self.max_crawl_delay = settings.robots_max_crawl_delay
+        self.robots_ttl = settings.robots_cache_hours * 3600
+        self.cache = cache if cache is not None else get_page_cache()
+
+        self.stats = {
+            'requests': 0,
+            'hosts': 0,
+            'waited_seconds': 0.0,
+            'robots_fetched': 0,
+            'disallowed': 0
+        }
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, _HostState] = {}
+        self._robots: Dict[str, Tuple[Optional[RobotFileParser], float]] = {}
+        self._robots_locks: Dict[str, threading.Lock] = {}
+        self._global_slots = threading.BoundedSemaphore(self.global_concurrency)
+
+        # asyncio primitives belong to one event loop; rebuilt if the loop changes
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_global: Optional[asyncio.Semaphore] = None
+        self._async_hosts: Dict[str, asyncio.Semaphore] = {}
+        self._robots_tasks: Dict[str, asyncio.Task] = {}
+
+    # --- Async ---
+
+    @asynccontextmanager
+    async def slot(self, url: str, session: Optional[aiohttp.ClientSession] = None):
+        """Wait for this host's turn and a global slot, then hold both for one request"""
+        await self._check_robots(url, session)
+        self._bind_loop()
+        key = host_key(url)
+
+        async with self._async_host(key):
+            wait = self._reserve(url)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            async with self._async_global:
+                yield
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._async_global = asyncio.Semaphore(self.global_concurrency)
+            self._async_hosts = {}
+            self._robots_tasks = {}
+
+    def _async_host(self, key: str) -> asyncio.Semaphore:
+        if key not in self._async_hosts:
+            self._async_hosts[key] = asyncio.Semaphore(self.per_host_concurrency)
+        return self._async_hosts[key]
+
+    async def _check_robots(self, url: str, session: Optional[aiohttp.ClientSession]):
+        if not self.respect_robots:
+            return
+        root = _site_root(url)
+        parser = self._cached_robots(root)
+        if parser is False:
+            self._bind_loop()
+            # One robots.txt fetch per site even when many of its pages are queued
+            task = self._robots_tasks.get(root)
+            if task is None:
+                task = asyncio.ensure_future(self._fetch_robots_async(root, session))
+                self._robots_tasks[root] = task
+            try:
+                parser = await asyncio.shield(task)
+            finally:
+                if task.done():
+                    self._robots_tasks.pop(root, None)
+        self._enforce_robots(url, parser)
+
+    async def _fetch_robots_async(self, root: str, session: Optional[aiohttp.ClientSession]) -> Optional[RobotFileParser]:
+        loop = asyncio.get_running_loop()
+        body = await loop.run_in_executor(None, self._stored_robots, root)
+        if body is None:
+            status, text = None, ''
+            try:
+                timeout = aiohttp.ClientTimeout(total=ROBOTS_TIMEOUT)
+                if session is None:
+                    async with aiohttp.ClientSession(headers={'User-Agent': USER_AGENT}) as own_session:
+                        async with own_session.get(f'{root}/robots.txt', timeout=timeout) as response:
+                            status, text = response.status, await response.text(errors='replace')
+                else:
+                    async with session.get(f'{root}/robots.txt', timeout=timeout) as response:
+                        status, text = response.status, await response.text(errors='replace')
+            except Exception as e:
+                logger.debug(f"Could not fetch robots.txt for {root}: {e}")
+            body = await loop.run_in_executor(None, self._store_robots, root, status, text)
+        return self._remember_robots(root, body)
+
+    # --- Sync ---
+
+    @contextmanager
+    def slot_sync(self, url: str):
+        """Blocking variant of slot() for worker threads"""
+        self._check_robots_sync(url)
+        state = self._host_state(host_key(url))
+
+        with state.slots:
+            wait = self._reserve(url)
+            if wait > 0:
+                time.sleep(wait)
+            with self._global_slots:
+                yield
+
+    def _check_robots_sync(self, url: str):
+        if not self.respect_robots:
+            return
+        self._enforce_robots(url, self._robots_sync(url))
+
+    def sitemaps_sync(self, url: str) -> List[str]:
+        """Sitemap URLs a site lists in its robots.txt"""
+        parser = self._robots_sync(url)
+        return list(parser.site_maps() or []) if parser else []
+
+    def _robots_sync(self, url: str) -> Optional[RobotFileParser]:
+        """Parsed robots.txt for a URL's site, fetched at most once per site and TTL"""
+        root = _site_root(url)
+        parser = self._cached_robots(root)
+        if parser is False:
+            with self._lock:
+                lock = self._robots_locks.setdefault(root, threading.Lock())
+            with lock:
+                parser = self._cached_robots(root)
+                if parser is False:
+                    body = self._stored_robots(root)
+                    if body is None:
+                        status, text = None, ''
+                        try:
+                            response = requests.get(f'{root}/robots.txt', timeout=ROBOTS_TIMEOUT,
+                                                    headers={'User-Agent': USER_AGENT})
+                            status, text = response.status_code, response.text
+                        except Exception as e:
+                            logger.debug(f"Could not fetch robots.txt for {root}: {e}")
+                        body = self._store_robots(root, status, text)
+                    parser = self._remember_robots(root, body)
+        return parser
+
+    # --- Shared ---
+
+    def _host_state(self, key: str) -> _HostState:
+        with self._lock:
+            state = self._hosts.get(key)
+            if state is None:
+                state = self._hosts[key] = _HostState(self.per_host_concurrency)
+                self.stats['hosts'] += 1
+            return state
+
+    def _reserve(self, url: str) -> float:
+        """Book the next start time on this host; returns how long to wait for it"""
+        state = self._host_state(host_key(url))
+        delay = max(self.host_delay, self._crawl_delay(url))
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, state.next_start)
+            state.next_start = start + delay
+            self.stats['requests'] += 1
+            self.stats['waited_seconds'] += start - now
+        return start - now
+
+    def _crawl_delay(self, url: str) -> float:
+        parser = self._cached_robots(_site_root(url))
+        if not parser:
+            return 0.0
+        delay = parser.crawl_delay(USER_AGENT) or 0
+        return min(float(delay), self.max_crawl_delay)
+
+    def _cached_robots(self, root: str):
+        """Parsed robots.txt, None if the site has none, or False if not known yet"""
+        entry = self._robots.get(root)
+        if entry is None or entry[1] < time.time():
+            return False
+        return entry[0]
+
+    def _remember_robots(self, root: str, body: str) -> Optional[RobotFileParser]:
+        parser = None
+        if body.strip():
+            parser = RobotFileParser()
+            parser.parse(body.splitlines())
+        self._robots[root] = (parser, time.time() + self.robots_ttl)
+        return parser
+
+    def _stored_robots(self, root: str) -> Optional[str]:
+        """robots.txt body from the page cache if fetched within the TTL"""
+        if self.cache is None:
+            return None
+        try:
+            cached = self.cache.get(f'{root}/robots.txt', KIND_ROBOTS)
+        except Exception as e:
+            logger.debug(f"Page cache read failed for {root}/robots.txt: {e}")
+            return None
+        if cached and cached.age < self.robots_ttl:
+            return cached.html
+        return None
+
+    def _store_robots(self, root: str, status: Optional[int], text: str) -> str:
+        """Body to parse for a robots.txt response; only definite answers are cached"""
+        self.stats['robots_fetched'] += 1
+        if status is None or status >= 500:
+            # Unreachable or erroring: allow for now, ask again next run
+            return ''
+        body = text if status < 400 else ''  # No robots.txt means everything is allowed
+        if self.cache is not None:
+            try:
+                self.cache.put(f'{root}/robots.txt', body, KIND_ROBOTS, status=status)
+            except Exception as e:
+                logger.debug(f"Page cache write failed for {root}/robots.txt: {e}")
+        return body
+
+    def _enforce_robots(self, url: str, parser: Optional[RobotFileParser]):
+        if parser is not None and not parser.can_fetch(USER_AGENT, url):
+            self.stats['disallowed'] += 1
+            raise FetchDisallowed(f"robots.txt disallows {url}")
+
+
+_scheduler: Optional[HostScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_host_scheduler() -> HostScheduler:
+    """Process-wide scheduler shared by every fetcher"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = HostScheduler()
+    return _scheduler
@@ -0,0 +1,284 @@
+# scrapers/html_parser.py
+"""
+Pluggable HTML parser backend for website evidence extraction.
+The backend is chosen with the HTML_PARSER_BACKEND setting:
+  - html.parser: Python's built-in parser through BeautifulSoup (default)
+  - lxml: libxml2 through BeautifulSoup
+  - selectolax: the lexbor engine, walked directly without building a soup
+Every backend yields the same PageFeatures and the same visible text up to
+whitespace, so the EDP analyzers give the same results whichever one is
+configured. Parsers repair
+broken markup differently (misnested forms, links or templates), so
+benchmark_parsers.py reports any saved page where a backend disagrees with
+html.parser.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import FrozenSet, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from .dom_features import (
+    PageFeatures, NAV_CLASS_TERMS, FILTER_CLASS_TERMS, DOWNLOAD_EXTENSIONS,
+    NAV_LINKS_PER_CONTAINER, PRODUCT_COUNT_PATTERN, FIRST_NUMBER, collect_page_features
+)
+
+try:
+    import lxml  # noqa: F401
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    from supercat_automation.config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+BACKEND_HTML_PARSER = 'html.parser'
+BACKEND_LXML = 'lxml'
+BACKEND_SELECTOLAX = 'selectolax'
+BACKENDS = (BACKEND_HTML_PARSER, BACKEND_LXML, BACKEND_SELECTOLAX)
+
+_warned_backends = set()
+
+
+@dataclass
+class ParsedPage:
+    """What the analyzers need from a parsed page"""
+    backend: str
+    text_content: str  # Lowercased visible text, as soup.get_text().lower()
+    features: PageFeatures
+    soup: Optional[BeautifulSoup] = None  # Only for the BeautifulSoup backends
+    # Set when features.html_lower was dropped after scanning it: the HTML keywords it held
+    html_keywords: Optional[FrozenSet[str]] = None
+
+
+def available_backends() -> List[str]:
+    """Backends whose parser library is installed"""
+    backends = [BACKEND_HTML_PARSER]
+    if lxml is not None:
+        backends.append(BACKEND_LXML)
+    if LexborHTMLParser is not None:
+        backends.append(BACKEND_SELECTOLAX)
+    return backends
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Configured backend, falling back to html.parser when it is not installed"""
+    backend = backend or settings.html_parser_backend
+    if backend in available_backends():
+        return backend
+
+    if backend not in _warned_backends:
+        _warned_backends.add(backend)
+        logger.warning(f"HTML parser backend '{backend}' is not available, using {BACKEND_HTML_PARSER}")
+    return BACKEND_HTML_PARSER
+
+
+def parse_soup(html: str, backend: Optional[str] = None) -> BeautifulSoup:
+    """
+    BeautifulSoup tree for code that navigates the soup directly.
+    selectolax does not build soups, so it maps to the fastest soup builder.
+    """
+    backend = resolve_backend(backend)
+    if backend == BACKEND_SELECTOLAX:
+        backend = BACKEND_LXML if lxml is not None else BACKEND_HTML_PARSER
+    return BeautifulSoup(html, backend)
+
+
+def parse_page(html: str, backend: Optional[str] = None) -> ParsedPage:
+    """Parse a page and collect its text and DOM features in one go"""
+    backend = resolve_backend(backend)
+
+    if backend == BACKEND_SELECTOLAX:
+        text_content, features = _collect_lexbor(html)
+        return ParsedPage(backend=backend, text_content=text_content, features=features)
+
+    soup = BeautifulSoup(html, backend)
+    return ParsedPage(
+        backend=backend,
+        text_content=soup.get_text().lower(),
+        features=collect_page_features(soup, html),
+        soup=soup
+    )
+
+
+# --- selectolax / lexbor ---
+
+# lexbor moves <template> bodies out of the tree; BeautifulSoup parses them inline
+_TEMPLATE_TAG = re.compile(r'<(/?)template\b', re.I)
+LEXBOR_TEMPLATE = 'x-template'
+
+# Ancestors whose strings BeautifulSoup files as Template/RubyText strings, not text
+NESTED_NON_TEXT_TAGS = (LEXBOR_TEMPLATE, 'rt', 'rp')
+
+
+def _collect_lexbor(html: str) -> Tuple[str, PageFeatures]:
+    """Mirror of collect_page_features() and get_text() over a lexbor tree"""
+    features = PageFeatures(html_lower=html.lower())
+    tree = LexborHTMLParser(_TEMPLATE_TAG.sub(r'<\1' + LEXBOR_TEMPLATE, html))
+    if tree.root is None:
+        return '', features
+
+    walk = _LexborWalk(features, nested=tree.css_first(', '.join(NESTED_NON_TEXT_TAGS)) is not None)
+    walk.visit(tree.root.parent)
+    return ''.join(walk.text_parts).lower(), features
+
+
+class _LexborWalk:
+    """One document-order walk filling PageFeatures the way the soup walk does"""
+
+    def __init__(self, features: PageFeatures, nested: bool):
+        self.features = features
+        self.nested = nested  # Page has template/ruby strings needing an ancestor check
+        self.text_parts: List[str] = []
+        self.nav_link_counts = {}
+
+    def visit(self, root):
+        features = self.features
+
+        for node in root.traverse(include_text=True):
+            if node.is_text_node:
+                text = node.text(deep=False)
+                if not self._excluded(node):
+                    self.text_parts.append(text)
+                _count_products(text, features)
+                continue
+
+            if node.is_comment_node:
+                _count_products(node.comment_content or '', features)
+                continue
+
+            if not node.is_element_node:
+                continue
+
+            name = node.tag
+            attrs = node.attributes
+
+            if name == 'a':
+                link_text = self._text(node)
+                if self.nav_link_counts:
+                    self._credit_nav_link(node, link_text.strip())
+                if 'href' in attrs:
+                    href = attrs['href'] or ''
+                    href_lower = href.lower()
+                    features.links.append((href, link_text.lower()))
+                    if '.pdf' in href_lower:
+                        features.pdf_link_count += 1
+                    if any(ext in href_lower for ext in DOWNLOAD_EXTENSIONS):
+                        features.download_hrefs.append(href_lower)
+
+            elif name == 'input':
+                features.input_count += 1
+                if attrs.get('type') == 'search':
+                    features.search_type_inputs += 1
+                placeholder = attrs.get('placeholder')
+                if placeholder and 'search' in placeholder.lower():
+                    features.search_placeholder_inputs += 1
+                if _lexbor_class_matches(attrs, FILTER_CLASS_TERMS):
+                    features.filter_options.append(f"Input: {_attr(attrs, 'name', 'unknown')}")
+
+            elif name == 'select':
+                features.select_count += 1
+                if _lexbor_class_matches(attrs, FILTER_CLASS_TERMS) and len(node.css('option')) > 1:
+                    features.filter_options.append(f"Select: {_attr(attrs, 'name', 'unknown')}")
+
+            elif name == 'button':
+                button_text = _lexbor_string(node)
+                if button_text and 'search' in button_text.lower():
+                    features.search_buttons += 1
+
+            elif name == 'form':
+                features.form_actions.append(_attr(attrs, 'action', '').lower())
+
+            elif name == 'meta':
+                meta_name = attrs.get('name')
+                if meta_name:
+                    features.meta_tags[meta_name] = _attr(attrs, 'content', '')
+
+            elif name == 'script':
+                src = attrs.get('src')
+                if src:
+                    features.script_srcs.append(src)
+
+            elif name == 'link':
+                if 'stylesheet' in (attrs.get('rel') or '').split():
+                    features.stylesheet_count += 1
+
+            if name in ('nav', 'ul', 'div') and _lexbor_class_matches(attrs, NAV_CLASS_TERMS):
+                self.nav_link_counts[node.mem_id] = 0
+            if name in ('div', 'section') and _lexbor_class_matches(attrs, ('brand',)):
+                features.brand_block_count += 1
+
+    def _excluded(self, text_node) -> bool:
+        """Strings BeautifulSoup leaves out of get_text()"""
+        parent = text_node.parent
+        if parent is not None and parent.tag in ('script', 'style'):
+            return True
+        if self.nested:
+            while parent is not None:
+                if parent.tag in NESTED_NON_TEXT_TAGS:
+                    return True
+                parent = parent.parent
+        return False
+
+    def _text(self, node) -> str:
+        """Same strings as Tag.get_text()"""
+        if not self.nested and node.css_first('script, style') is None:
+            return node.text(deep=True)
+        return ''.join(
+            child.text(deep=False) for child in node.traverse(include_text=True)
+            if child.is_text_node and not self._excluded(child)
+        )
+
+    def _credit_nav_link(self, link, text: str):
+        """Credit a link to each enclosing nav container that still has room"""
+        parent = link.parent
+        while parent is not None:
+            count = self.nav_link_counts.get(parent.mem_id)
+            if count is not None and count < NAV_LINKS_PER_CONTAINER:
+                self.nav_link_counts[parent.mem_id] = count + 1
+                if len(text) > 2 and len(text) < 50:
+                    self.features.nav_link_texts.append(text)
+            parent = parent.parent
+
+
+def _count_products(text: str, features: PageFeatures):
+    if PRODUCT_COUNT_PATTERN.search(text):
+        match = FIRST_NUMBER.search(text)
+        if match:
+            features.sku_count_max = max(features.sku_count_max, int(match.group(1)))
+
+
+def _attr(attrs: dict, name: str, default: str) -> str:
+    """BeautifulSoup reports valueless attributes as '' where lexbor gives None"""
+    if name not in attrs:
+        return default
+    return attrs[name] or ''
+
+
+def _lexbor_class_matches(attrs: dict, terms: Tuple[str, ...]) -> bool:
+    classes = (attrs.get('class') or '').split()
+    return any(term in value.lower() for value in classes for term in terms)
+
+
+def _lexbor_string(node) -> Optional[str]:
+    """Same as Tag.string: the only string below a chain of single children"""
+    while True:
+        children = list(node.iter(include_text=True))
+        if len(children) != 1:
+            return None
+        child = children[0]
+        if child.is_text_node:
+            return child.text(deep=False)
+        if child.is_comment_node:
+            return child.comment_content
+        node = child
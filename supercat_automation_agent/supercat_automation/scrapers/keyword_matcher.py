@@ -0,0 +1,114 @@
+# scrapers/keyword_matcher.py
+"""
+Multi-pattern keyword matching for the website extractors.
+All keyword tables are compiled into one pattern up front, so a page is
+scanned once no matter how many tables or keywords are checked against it.
+Uses an Aho-Corasick automaton when pyahocorasick is installed and a single
+combined regex otherwise; both give the same answers as `keyword in text`.
+"""
+
+import logging
+import re
+from typing import Dict, Iterable, List, Set
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordMatcher:
+    """
+    Match many categorized keyword tables against a text in a single pass.
+    scan() returns {category: [keywords found]} with keywords in table order;
+    categories without a hit are left out.
+    """
+
+    def __init__(self, tables: Dict[str, Iterable[str]]):
+        self.tables: Dict[str, List[str]] = {category: list(keywords) for category, keywords in tables.items()}
+        self.keywords: List[str] = sorted({keyword for keywords in self.tables.values() for keyword in keywords if keyword})
+
+        # A hit on a keyword implies a hit on every other keyword it contains
+        self._implied: Dict[str, Set[str]] = {
+            keyword: {other for other in self.keywords if other in keyword}
+            for keyword in self.keywords
+        }
+        # Keywords that can start inside a hit and run past its end, which a
+        # non-overlapping regex scan would step over
+        self._overlapping: Dict[str, Set[str]] = {
+            keyword: {other for other in self.keywords if _overlaps_end(keyword, other)}
+            for keyword in self.keywords
+        }
+
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+            self._pattern = None
+        else:
+            self._automaton = None
+            # Longest keyword first at each position; shorter ones come from _implied
+            self._pattern = re.compile(_trie_pattern(self.keywords))
+
+    def found(self, text: str) -> Set[str]:
+        """Every keyword that occurs anywhere in text"""
+        if not text or not self.keywords:
+            return set()
+
+        if self._automaton is not None:
+            return {keyword for _, keyword in self._automaton.iter(text)}
+
+        found = set()
+        unchecked = set()
+        for keyword in set(self._pattern.findall(text)):
+            found |= self._implied[keyword]
+            unchecked |= self._overlapping[keyword]
+        found.update(keyword for keyword in unchecked - found if keyword in text)
+        return found
+
+    def scan(self, text: str) -> Dict[str, List[str]]:
+        """Keywords found in text, grouped by category"""
+        return self.group(self.found(text))
+
+    def group(self, found: Iterable[str]) -> Dict[str, List[str]]:
+        """Group keywords returned by found() by category, as scan() does"""
+        found = set(found)
+        hits = {}
+        for category, keywords in self.tables.items():
+            matched = [keyword for keyword in keywords if keyword in found]
+            if matched:
+                hits[category] = matched
+        return hits
+
+
+def _overlaps_end(keyword: str, other: str) -> bool:
+    """True if a proper suffix of keyword is a proper prefix of other"""
+    return any(other.startswith(keyword[i:]) and len(keyword) - i < len(other)
+               for i in range(1, len(keyword)))
+
+
+def _trie_pattern(keywords: List[str]) -> str:
+    """Regex alternation shaped like a trie so each position tries one branch per character"""
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+    return _node_pattern(trie)
+
+
+def _node_pattern(node: Dict) -> str:
+    terminal = '' in node
+    branches = [re.escape(char) + _node_pattern(child) for char, child in sorted(node.items()) if char != '']
+    if not branches:
+        return ''
+
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if terminal:
+        # Prefer the longer keyword, fall back to the one ending here
+        body = '(?:' + body + ')?'
+    return body
@@ -7,13 +7,15 @@ resolving the 'coroutine was never awaited' error.
 
 import logging
 import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 from pathlib import Path # ADDED for file path operations
 
 from scrapers.vegas_market import VegasMarketScraper
 from scrapers.high_point import HighPointMarketScraper
 from scrapers.americasmart import AmericasmartScraper
+from scrapers.base_scraper import create_browser_pool
+from scrapers.exhibitor_stream import EvidenceQueue
 from database.connection import db
 from config.settings import settings
 
@@ -22,22 +24,47 @@ logger = logging.getLogger(__name__)
 class ScraperOrchestrator:
     """Manages and coordinates all async trade show scrapers."""
 
-    def __init__(self):
-        """Initialize the orchestrator with scraper instances."""
+    def __init__(self, analyze_evidence: Optional[bool] = None):
+        """
+        Initialize the orchestrator with scraper instances.
+        With analyze_evidence (default: SCRAPER_EVIDENCE_ENABLED), exhibitor
+        websites are analyzed as they stream in, alongside the database writes.
+        """
         self.scrapers = {
             'vegas_market': VegasMarketScraper(),
             'high_point': HighPointMarketScraper(),
             'americasmart': AmericasmartScraper(),
         }
+        self.analyze_evidence = settings.scraper_evidence_enabled if analyze_evidence is None else analyze_evidence
+        self.evidence: Dict[str, Dict[str, Any]] = {}
 
     async def run_all_scrapers(self) -> List[Dict[str, Any]]:
-        """Runs all configured scrapers concurrently using asyncio.gather."""
-        logger.info(f"Starting concurrent run for {len(self.scrapers)} scrapers.")
-        
-        tasks = [instance.run() for name, instance in self.scrapers.items()]
+        """
+        Runs all configured scrapers concurrently using asyncio.gather.
+        They share one browser; at most max_concurrent_scrapers hold a context at a time.
+        """
+        logger.info(f"Starting concurrent run for {len(self.scrapers)} scrapers "
+                    f"(up to {settings.max_concurrent_scrapers} at once).")
         
-        # return_exceptions=True prevents one failed scraper from stopping the others.
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        browser_pool = create_browser_pool(settings.max_concurrent_scrapers)
+        evidence_queue = self._new_evidence_queue() if self.analyze_evidence else None
+        exhibitor_sinks = [evidence_queue] if evidence_queue else []
+        try:
+            tasks = [instance.run(browser_pool, exhibitor_sinks) for name, instance in self.scrapers.items()]
+            
+            # return_exceptions=True prevents one failed scraper from stopping the others.
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            await browser_pool.close()
+            if evidence_queue:
+                # Every scraper's writer has finished, so the companies exist to attach evidence to
+                self.evidence = await evidence_queue.close()
+        logger.info(f"Browser pool: {browser_pool.stats['launches']} launches, "
+                    f"{browser_pool.stats['contexts_created']} contexts created, "
+                    f"{browser_pool.stats['contexts_reused']} reused")
+        if self.evidence:
+            saved = await asyncio.to_thread(db.bulk_save_website_evidence, self.evidence)
+            logger.info(f"🔍 Analyzed {len(self.evidence)} exhibitor websites while scraping; saved evidence for {saved}")
 
         processed_results = []
         for i, result in enumerate(results):
@@ -58,6 +85,11 @@ class ScraperOrchestrator:
         self.generate_scraping_report(processed_results)
         return processed_results
 
+    def _new_evidence_queue(self) -> EvidenceQueue:
+        """Evidence analysis for streamed exhibitor websites, on its own browser"""
+        from scrapers.async_evidence import AsyncEvidenceEngine
+        return EvidenceQueue(AsyncEvidenceEngine())
+    
     def _update_scraping_metrics(self, result: Dict[str, Any]):
         """Update database metrics after a successful scrape."""
         try:
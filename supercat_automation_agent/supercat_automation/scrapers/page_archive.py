@@ -0,0 +1,264 @@
+# scrapers/page_archive.py
+"""
+WARC-style archive of every page the evidence fetchers download.
+Each static response or browser render is appended as one gzip-compressed
+WARC record (URL, status, headers, body, fetch timing) to rotating
+.warc.gz files; a SQLite index maps (URL, kind) to the latest record's file
+offset. Replay mode reads pages back from the archive instead of the network,
+so scoring changes can be re-run over thousands of companies offline with
+deterministic results. Sitemap catalog estimates are archived alongside the
+pages as small JSON records, since replay reads no sitemaps.
+"""
+
+import atexit
+import gzip
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.client import responses as HTTP_REASONS
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .page_cache import KIND_STATIC, normalize_url
+
+try:
+    from supercat_automation.config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Record kind for a site's sitemap CatalogEstimate, stored as JSON
+KIND_CATALOG = 'catalog'
+
+# Bodies are stored decoded, so transfer-level headers no longer describe them
+DROPPED_HEADERS = ('content-encoding', 'transfer-encoding', 'content-length')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    url_key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    final_url TEXT,
+    status INTEGER,
+    elapsed REAL,
+    digest TEXT NOT NULL,
+    file TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    archived_at REAL NOT NULL,
+    PRIMARY KEY (url_key, kind)
+);
+"""
+
+
+class ArchiveMiss(LookupError):
+    """Replay mode asked for a page the archive does not hold"""
+
+
+@dataclass
+class ArchivedPage:
+    """A page read back from the archive"""
+    url: str
+    kind: str
+    html: str
+    final_url: str
+    status: int
+    elapsed: float
+    archived_at: float
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+def _warc_date(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _parse_fields(block: bytes) -> Dict[str, str]:
+    fields = {}
+    for line in block.decode('utf-8', errors='replace').split('\r\n')[1:]:
+        name, sep, value = line.partition(':')
+        if sep:
+            fields[name.strip()] = value.strip()
+    return fields
+
+
+class PageArchive:
+    """
+    Append-only page archive with a latest-record index.
+    A record is skipped when the URL's latest archived body is identical,
+    so re-fetching unchanged sites does not grow the archive. Each process
+    writes its own files; the index is shared.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_file_bytes: Optional[int] = None):
+        self.directory = Path(directory or settings.page_archive_dir)
+        self.max_file_bytes = max_file_bytes or settings.page_archive_max_file_mb * 1024 * 1024
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.stats = {
+            'written': 0,
+            'unchanged': 0,
+            'read': 0,
+            'missing': 0
+        }
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._file: Optional[Path] = None
+
+    # --- Writing ---
+
+    def put(self, url: str, html: str, kind: str = KIND_STATIC, final_url: Optional[str] = None,
+            status: int = 200, headers: Optional[Dict[str, str]] = None, elapsed: float = 0.0) -> bool:
+        """Archive a fetched page; False if the latest record already has this body"""
+        body = (html or '').encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()
+        url_key = normalize_url(url)
+        now = time.time()
+
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                'SELECT digest, status FROM records WHERE url_key = ? AND kind = ?', (url_key, kind)
+            ).fetchone()
+            if row and row == (digest, status):
+                self.stats['unchanged'] += 1
+                return False
+
+            record = self._record(url, kind, body, digest, final_url or url, status, headers or {}, elapsed, now)
+            path = self._current_file()
+            with open(path, 'ab') as f:
+                offset = f.tell()
+                f.write(record)
+
+            db.execute(
+                'INSERT OR REPLACE INTO records (url_key, kind, url, final_url, status, elapsed, digest, file, '
+                'offset, length, archived_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (url_key, kind, url, final_url or url, status, elapsed, digest, path.name, offset, len(record), now)
+            )
+            db.commit()
+            self.stats['written'] += 1
+        return True
+
+    def has(self, url: str, kind: str = KIND_STATIC) -> bool:
+        with self._lock:
+            return self._db().execute(
+                'SELECT 1 FROM records WHERE url_key = ? AND kind = ?', (normalize_url(url), kind)
+            ).fetchone() is not None
+
+    # --- Reading ---
+
+    def get(self, url: str, kind: str = KIND_STATIC) -> Optional[ArchivedPage]:
+        """Latest archived copy of a page, or None"""
+        with self._lock:
+            row = self._db().execute(
+                'SELECT url, final_url, status, elapsed, file, offset, length, archived_at '
+                'FROM records WHERE url_key = ? AND kind = ?', (normalize_url(url), kind)
+            ).fetchone()
+        if row is None:
+            self.stats['missing'] += 1
+            return None
+
+        try:
+            with open(self.directory / row[4], 'rb') as f:
+                f.seek(row[5])
+                record = gzip.decompress(f.read(row[6]))
+        except (OSError, EOFError) as e:
+            logger.warning(f"Could not read archived {kind} page for {url}: {e}")
+            self.stats['missing'] += 1
+            return None
+
+        headers, html = self._parse(record)
+        self.stats['read'] += 1
+        return ArchivedPage(
+            url=row[0], kind=kind, html=html, final_url=row[1] or row[0], status=row[2] or 200,
+            elapsed=row[3] or 0.0, archived_at=row[7], headers=headers
+        )
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # --- Internals ---
+
+    def _record(self, url: str, kind: str, body: bytes, digest: str, final_url: str, status: int,
+                headers: Dict[str, str], elapsed: float, now: float) -> bytes:
+        """One gzip member holding a WARC record; renders are snapshots, not HTTP responses"""
+        if kind == KIND_STATIC:
+            http_headers = [f'HTTP/1.1 {status} {HTTP_REASONS.get(status, "")}'.rstrip()]
+            http_headers += [f'{k}: {v}' for k, v in headers.items() if str(k).lower() not in DROPPED_HEADERS]
+            http_headers.append(f'Content-Length: {len(body)}')
+            block = ('\r\n'.join(http_headers) + '\r\n\r\n').encode('utf-8') + body
+            warc_type, content_type = 'response', 'application/http; msgtype=response'
+        else:
+            block = body
+            warc_type = 'resource'
+            content_type = 'application/json' if kind == KIND_CATALOG else 'text/html; charset=utf-8'
+
+        warc_headers = [
+            'WARC/1.1',
+            f'WARC-Type: {warc_type}',
+            f'WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>',
+            f'WARC-Date: {_warc_date(now)}',
+            f'WARC-Target-URI: {url}',
+            f'WARC-Payload-Digest: sha256:{digest}',
+            f'X-Fetch-Kind: {kind}',
+            f'X-Fetch-Elapsed: {elapsed:.3f}',
+            f'X-Final-URI: {final_url}',
+            f'Content-Type: {content_type}',
+            f'Content-Length: {len(block)}'
+        ]
+        record = ('\r\n'.join(warc_headers) + '\r\n\r\n').encode('utf-8') + block + b'\r\n\r\n'
+        return gzip.compress(record, compresslevel=6)
+
+    def _parse(self, record: bytes) -> Tuple[Dict[str, str], str]:
+        """HTTP headers and body of a decompressed record"""
+        warc_block, _, block = record.partition(b'\r\n\r\n')
+        block = block[:int(_parse_fields(warc_block).get('Content-Length', len(block)))]
+        if b'msgtype=response' not in warc_block:
+            return {}, block.decode('utf-8', errors='replace')
+        http_block, _, body = block.partition(b'\r\n\r\n')
+        return _parse_fields(http_block), body.decode('utf-8', errors='replace')
+
+    def _current_file(self) -> Path:
+        """This process's open archive file, rotated once it reaches the size cap"""
+        if (self._file is None or not self._file.name.endswith(f'-{os.getpid()}.warc.gz')
+                or (self._file.exists() and self._file.stat().st_size >= self.max_file_bytes)):
+            # Microseconds, so a file filled within the same second still rotates to a new name
+            stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+            self._file = self.directory / f'pages-{stamp}-{os.getpid()}.warc.gz'
+        return self._file
+
+    def _db(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so reopen in child processes
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(str(self.directory / 'index.sqlite'), timeout=30, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(SCHEMA)
+            self._conn_pid = os.getpid()
+        return self._conn
+
+
+_archive: Optional[PageArchive] = None
+_archive_lock = threading.Lock()
+
+
+def get_page_archive() -> Optional[PageArchive]:
+    """Process-wide archive, or None when archiving is disabled"""
+    global _archive
+    if not settings.page_archive_enabled:
+        return None
+    if _archive is None:
+        with _archive_lock:
+            if _archive is None:
+                _archive = PageArchive()
+                atexit.register(_archive.close)
+    return _archive
@@ -0,0 +1,349 @@
+# scrapers/page_cache.py
+"""
+Persistent, content-addressed cache of fetched and rendered pages.
+Bodies are stored once per distinct content as gzip files named by their
+SHA-256; a SQLite index maps normalized URLs to bodies together with the
+response headers, validators (ETag / Last-Modified) and fetch time.
+Entries expire after a TTL and can be revalidated with a conditional GET;
+the cache is kept under a size cap by evicting least recently used pages.
+"""
+
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+try:
+    from supercat_automation.config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+KIND_STATIC = 'static'
+KIND_RENDERED = 'rendered'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bodies (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    url_key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    final_url TEXT,
+    digest TEXT NOT NULL,
+    status INTEGER,
+    headers TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    elapsed REAL,
+    fetched_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (url_key, kind)
+);
+CREATE INDEX IF NOT EXISTS idx_pages_last_access ON pages (last_access);
+CREATE INDEX IF NOT EXISTS idx_pages_digest ON pages (digest);
+"""
+
+
+def normalize_url(url: str) -> str:
+    """Cache key for a URL: scheme and host lowercased, default port, fragment and query order dropped"""
+    if '://' not in url:
+        url = f'https://{url}'
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f'{host}:{port}'
+    path = parts.path or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+@dataclass
+class CachedPage:
+    """A cached page body with the metadata it was fetched with"""
+    url: str
+    kind: str
+    html: str
+    final_url: str
+    status: int
+    fetched_at: float
+    elapsed: float = 0.0
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def is_fresh(self, ttl_seconds: float) -> bool:
+        return self.age < ttl_seconds
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Request headers that let the server answer 304 Not Modified"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """
+    On-disk page cache shared by the static and rendered fetch tiers.
+    Safe to use from several threads; each process opens its own connection.
+    """
+
+    def __init__(self, directory: Optional[str] = None, ttl_seconds: Optional[float] = None,
+                 max_bytes: Optional[int] = None):
+        self.directory = Path(directory or settings.page_cache_dir)
+        self.ttl_seconds = ttl_seconds or settings.page_cache_ttl_hours * 3600
+        self.max_bytes = max_bytes or settings.page_cache_max_mb * 1024 * 1024
+        self.bodies_dir = self.directory / 'bodies'
+        self.bodies_dir.mkdir(parents=True, exist_ok=True)
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'revalidated': 0,
+            'stored': 0,
+            'evicted': 0
+        }
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+
+    # --- Lookups ---
+
+    def get(self, url: str, kind: str = KIND_STATIC) -> Optional[CachedPage]:
+        """Cached page for a URL whether fresh or stale; None if absent"""
+        url_key = normalize_url(url)
+        with self._lock:
+            row = self._db().execute(
+                'SELECT url, final_url, digest, status, headers, etag, last_modified, elapsed, fetched_at '
+                'FROM pages WHERE url_key = ? AND kind = ?', (url_key, kind)
+            ).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+
+            html = self._read_body(row[2])
+            if html is None:
+                # Body file went missing; drop the dangling entry
+                self._db().execute('DELETE FROM pages WHERE url_key = ? AND kind = ?', (url_key, kind))
+                self._db().commit()
+                self.stats['misses'] += 1
+                return None
+
+            self._db().execute(
+                'UPDATE pages SET last_access = ? WHERE url_key = ? AND kind = ?', (time.time(), url_key, kind)
+            )
+            self._db().commit()
+
+        page = CachedPage(
+            url=row[0], kind=kind, html=html, final_url=row[1] or row[0], status=row[3] or 200,
+            headers=json.loads(row[4] or '{}'), etag=row[5], last_modified=row[6],
+            elapsed=row[7] or 0.0, fetched_at=row[8]
+        )
+        if page.is_fresh(self.ttl_seconds):
+            self.stats['hits'] += 1
+        else:
+            self.stats['stale'] += 1
+        return page
+
+    def get_fresh(self, url: str, kind: str = KIND_STATIC) -> Optional[CachedPage]:
+        """Cached page only if it is still within the TTL"""
+        page = self.get(url, kind)
+        return page if page and page.is_fresh(self.ttl_seconds) else None
+
+    # --- Updates ---
+
+    def put(self, url: str, html: str, kind: str = KIND_STATIC, final_url: Optional[str] = None,
+            status: int = 200, headers: Optional[Dict[str, str]] = None, elapsed: float = 0.0) -> CachedPage:
+        """Store a page body and its metadata, replacing any previous entry for the URL"""
+        headers = {str(k): str(v) for k, v in (headers or {}).items()}
+        lowered = {k.lower(): v for k, v in headers.items()}
+        now = time.time()
+
+        with self._lock:
+            digest = self._write_body(html)
+            db = self._db()
+            db.execute(
+                'INSERT OR REPLACE INTO pages (url_key, kind, url, final_url, digest, status, headers, etag, '
+                'last_modified, elapsed, fetched_at, last_access) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (normalize_url(url), kind, url, final_url or url, digest, status, json.dumps(headers),
+                 lowered.get('etag'), lowered.get('last-modified'), elapsed, now, now)
+            )
+            db.commit()
+            self.stats['stored'] += 1
+
+            if self.total_bytes() > self.max_bytes:
+                self.evict()
+
+        return CachedPage(
+            url=url, kind=kind, html=html, final_url=final_url or url, status=status, fetched_at=now,
+            elapsed=elapsed, etag=lowered.get('etag'), last_modified=lowered.get('last-modified'), headers=headers
+        )
+
+    def touch(self, url: str, kind: str = KIND_STATIC):
+        """Restart the TTL of an entry the origin confirmed unchanged (HTTP 304)"""
+        now = time.time()
+        with self._lock:
+            self._db().execute(
+                'UPDATE pages SET fetched_at = ?, last_access = ? WHERE url_key = ? AND kind = ?',
+                (now, now, normalize_url(url), kind)
+            )
+            self._db().commit()
+            self.stats['revalidated'] += 1
+
+    def invalidate(self, url: str):
+        """Forget every cached variant of a URL"""
+        with self._lock:
+            self._db().execute('DELETE FROM pages WHERE url_key = ?', (normalize_url(url),))
+            self._db().commit()
+            self._delete_orphan_bodies()
+
+    # --- Size management ---
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._db().execute('SELECT COALESCE(SUM(size), 0) FROM bodies').fetchone()[0]
+
+    def evict(self, target_bytes: Optional[int] = None) -> int:
+        """Drop least recently used pages until the bodies fit in target_bytes (90% of the cap by default)"""
+        target_bytes = int(self.max_bytes * 0.9) if target_bytes is None else target_bytes
+        evicted = 0
+        with self._lock:
+            db = self._db()
+            self._delete_orphan_bodies()
+            total = self.total_bytes()
+            while total > target_bytes:
+                rows = db.execute(
+                    'SELECT url_key, kind, digest FROM pages ORDER BY last_access ASC LIMIT 50'
+                ).fetchall()
+                if not rows:
+                    break
+                # One page at a time, so eviction stops as soon as the bodies fit
+                for url_key, kind, digest in rows:
+                    if total <= target_bytes:
+                        break
+                    db.execute('DELETE FROM pages WHERE url_key = ? AND kind = ?', (url_key, kind))
+                    evicted += 1
+                    total -= self._delete_body_if_orphaned(digest)
+                db.commit()
+
+            self.stats['evicted'] += evicted
+        if evicted:
+            logger.info(f"Evicted {evicted} pages from page cache")
+        return evicted
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # --- Internals ---
+
+    def _db(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so reopen in child processes
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(str(self.directory / 'index.sqlite'), timeout=30, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(SCHEMA)
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def _body_path(self, digest: str) -> Path:
+        return self.bodies_dir / digest[:2] / f'{digest}.html.gz'
+
+    def _write_body(self, html: str) -> str:
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._body_path(digest)
+
+        with self._lock:
+            db = self._db()
+            if db.execute('SELECT 1 FROM bodies WHERE digest = ?', (digest,)).fetchone() and path.exists():
+                return digest
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            db.execute(
+                'INSERT OR REPLACE INTO bodies (digest, size, created_at) VALUES (?, ?, ?)',
+                (digest, path.stat().st_size, time.time())
+            )
+            db.commit()
+        return digest
+
+    def _read_body(self, digest: str) -> Optional[str]:
+        try:
+            with gzip.open(self._body_path(digest), 'rb') as f:
+                return f.read().decode('utf-8')
+        except (OSError, EOFError) as e:
+            logger.debug(f"Could not read cached body {digest}: {e}")
+            return None
+
+    def _delete_body_if_orphaned(self, digest: str) -> int:
+        """Delete a body no page refers to any more; returns the bytes freed"""
+        db = self._db()
+        if db.execute('SELECT 1 FROM pages WHERE digest = ? LIMIT 1', (digest,)).fetchone():
+            return 0
+        row = db.execute('SELECT size FROM bodies WHERE digest = ?', (digest,)).fetchone()
+        try:
+            self._body_path(digest).unlink()
+        except FileNotFoundError:
+            pass
+        db.execute('DELETE FROM bodies WHERE digest = ?', (digest,))
+        return row[0] if row else 0
+
+    def _delete_orphan_bodies(self):
+        db = self._db()
+        orphans = db.execute(
+            'SELECT digest FROM bodies WHERE digest NOT IN (SELECT digest FROM pages)'
+        ).fetchall()
+        for (digest,) in orphans:
+            try:
+                self._body_path(digest).unlink()
+            except FileNotFoundError:
+                pass
+        db.executemany('DELETE FROM bodies WHERE digest = ?', orphans)
+        db.commit()
+
+
+_cache: Optional[PageCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """Process-wide page cache, or None when caching is disabled"""
+    global _cache
+    if not settings.page_cache_enabled:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PageCache()
+                atexit.register(_cache.close)
+    return _cache
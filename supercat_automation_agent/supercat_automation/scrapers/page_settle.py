@@ -0,0 +1,157 @@
+# scrapers/page_settle.py
+"""
+Readiness-based "page settled" detection for browser renders.
+A page counts as settled once the document has parsed, no fetch/XHR call is
+outstanding, and neither the network nor the DOM has changed for a quiet
+window. Fast pages settle in milliseconds, slow ones get the time they need
+up to a hard cap. Works with Playwright pages (async) and Selenium drivers.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+try:
+    from supercat_automation.config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.1
+
+# Request types that stay open by design and never go idle
+LONG_LIVED_RESOURCE_TYPES = ('websocket', 'eventsource', 'media')
+
+# Installs window.__pageSettle once per document. Activity is any content
+# change (attribute churn from animations is ignored), any finished resource,
+# and fetch/XHR calls starting or ending. Installed before page scripts run
+# when possible so wrapped fetch/XHR see every call.
+SETTLE_PROBE_JS = """
+if (!window.__pageSettle) {
+    const state = window.__pageSettle = {inflight: 0, lastActivity: 0};
+    const touch = () => { state.lastActivity = performance.now(); };
+    state.lastActivity = performance.getEntriesByType('resource')
+        .reduce((latest, entry) => Math.max(latest, entry.responseEnd), 0);
+    new MutationObserver(touch).observe(document, {subtree: true, childList: true, characterData: true});
+    if (window.PerformanceObserver) {
+        try { new PerformanceObserver(touch).observe({type: 'resource'}); } catch (e) {}
+    }
+    if (window.fetch) {
+        const fetch = window.fetch;
+        window.fetch = function () {
+            state.inflight++; touch();
+            const done = () => { state.inflight = Math.max(0, state.inflight - 1); touch(); };
+            return fetch.apply(this, arguments).then(
+                response => { done(); return response; },
+                error => { done(); throw error; });
+        };
+    }
+    if (window.XMLHttpRequest) {
+        const send = XMLHttpRequest.prototype.send;
+        XMLHttpRequest.prototype.send = function () {
+            state.inflight++; touch();
+            this.addEventListener('loadend', () => { state.inflight = Math.max(0, state.inflight - 1); touch(); }, {once: true});
+            return send.apply(this, arguments);
+        };
+    }
+}
+"""
+
+SETTLE_STATE_JS = SETTLE_PROBE_JS + """
+return {
+    ready: document.readyState !== 'loading',
+    inflight: window.__pageSettle.inflight,
+    quiet: performance.now() - window.__pageSettle.lastActivity
+};
+"""
+
+
+def _limits(quiet_ms: Optional[float], max_seconds: Optional[float]):
+    quiet_ms = quiet_ms or settings.page_settle_quiet_ms
+    max_seconds = max_seconds or settings.page_settle_max_seconds
+    return quiet_ms, max_seconds
+
+
+def _is_settled(state, quiet_ms: float) -> bool:
+    return bool(state) and state['ready'] and state['inflight'] == 0 and state['quiet'] >= quiet_ms
+
+
+# --- Playwright ---
+
+async def install_settle_probe(page):
+    """Install the probe ahead of page scripts for every document the page loads"""
+    await page.add_init_script(SETTLE_PROBE_JS)
+
+
+async def wait_for_settled(page, quiet_ms: Optional[float] = None, max_seconds: Optional[float] = None) -> bool:
+    """
+    Wait until a Playwright page has settled; True if it did before max_seconds.
+    Network activity is also tracked from Playwright's own request events,
+    which see requests the in-page probe cannot (scripts, styles, iframes).
+    """
+    quiet_ms, max_seconds = _limits(quiet_ms, max_seconds)
+    start = time.monotonic()
+    pending = set()
+    last_network = [0.0]
+
+    def on_request(request):
+        if request.resource_type not in LONG_LIVED_RESOURCE_TYPES:
+            pending.add(request)
+            last_network[0] = time.monotonic()
+
+    def on_done(request):
+        pending.discard(request)
+        last_network[0] = time.monotonic()
+
+    page.on('request', on_request)
+    page.on('requestfinished', on_done)
+    page.on('requestfailed', on_done)
+    try:
+        while True:
+            try:
+                state = await page.evaluate(f'() => {{ {SETTLE_STATE_JS} }}')
+            except Exception:
+                # Navigating; the new document counts as activity
+                state = None
+
+            now = time.monotonic()
+            if _is_settled(state, quiet_ms) and not pending and (now - last_network[0]) * 1000 >= quiet_ms:
+                logger.debug(f"Page settled after {now - start:.2f}s")
+                return True
+            if now - start >= max_seconds:
+                logger.debug(f"Page still busy after {max_seconds}s cap")
+                return False
+            await asyncio.sleep(POLL_INTERVAL)
+    finally:
+        page.remove_listener('request', on_request)
+        page.remove_listener('requestfinished', on_done)
+        page.remove_listener('requestfailed', on_done)
+
+
+# --- Selenium ---
+
+def install_settle_probe_driver(driver):
+    """Install the probe ahead of page scripts for every document a Chrome driver loads"""
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': SETTLE_PROBE_JS})
+
+
+def wait_for_settled_driver(driver, quiet_ms: Optional[float] = None, max_seconds: Optional[float] = None) -> bool:
+    """Wait until a Selenium page has settled; True if it did before max_seconds"""
+    quiet_ms, max_seconds = _limits(quiet_ms, max_seconds)
+    start = time.monotonic()
+    while True:
+        try:
+            state = driver.execute_script(SETTLE_STATE_JS)
+        except Exception:
+            state = None
+
+        elapsed = time.monotonic() - start
+        if _is_settled(state, quiet_ms):
+            logger.debug(f"Page settled after {elapsed:.2f}s")
+            return True
+        if elapsed >= max_seconds:
+            logger.debug(f"Page still busy after {max_seconds}s cap")
+            return False
+        time.sleep(POLL_INTERVAL)
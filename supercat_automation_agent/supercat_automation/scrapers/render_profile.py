@@ -0,0 +1,260 @@
+# scrapers/render_profile.py
+"""
+Lightweight browser render profile for evidence page loads.
+The EDP indicators only read the DOM, so renders skip images, media, fonts
+and known analytics/ads hosts, turn off browser features nothing reads, and
+stop loading once a page has pulled in max_page_bytes. Works with both
+browser stacks:
+  - Playwright: request interception through page.route()
+  - Selenium: Chrome DevTools URL blocking, measured from the performance log
+Each render produces a RenderReport with the bytes loaded and an estimate of
+the bytes and time the blocking saved.
+"""
+
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+try:
+    from supercat_automation.config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+BLOCKED_RESOURCE_TYPES = ('image', 'media', 'font')
+
+# Analytics, tag managers, ads and session recorders
+BLOCKED_HOSTS = (
+    'google-analytics.com', 'googletagmanager.com', 'googleadservices.com', 'googlesyndication.com',
+    'doubleclick.net', 'adservice.google.com', 'connect.facebook.net', 'facebook.com/tr',
+    'analytics.tiktok.com', 'bat.bing.com', 'clarity.ms', 'hotjar.com', 'hotjar.io',
+    'fullstory.com', 'mouseflow.com', 'crazyegg.com', 'luckyorange.com', 'segment.com',
+    'segment.io', 'mixpanel.com', 'amplitude.com', 'heap.io', 'heapanalytics.com',
+    'snap.licdn.com', 'px.ads.linkedin.com', 'ads-twitter.com', 'static.ads-twitter.com',
+    'pinimg.com/ct', 'ct.pinterest.com', 'quantserve.com', 'scorecardresearch.com',
+    'criteo.com', 'criteo.net', 'taboola.com', 'outbrain.com', 'adroll.com', 'newrelic.com',
+    'nr-data.net', 'hs-analytics.net', 'hs-scripts.com', 'hubspot.com/analytics'
+)
+
+# Used where the browser cannot tell us the resource type before the request (DevTools URL blocking)
+BLOCKED_EXTENSIONS = {
+    'image': ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.svg', '.ico', '.bmp', '.tif', '.tiff'),
+    'media': ('.mp4', '.webm', '.mov', '.m4v', '.m3u8', '.mp3', '.ogg', '.wav'),
+    'font': ('.woff', '.woff2', '.ttf', '.otf', '.eot')
+}
+
+# Typical transfer sizes, used to estimate what a blocked request would have cost
+TYPICAL_BYTES = {
+    'image': 60_000,
+    'media': 750_000,
+    'font': 35_000,
+    'tracker': 25_000
+}
+
+# DevTools resource types as reported in the performance log
+CDP_RESOURCE_TYPES = {'Image': 'image', 'Media': 'media', 'Font': 'font'}
+
+CHROME_ARGUMENTS = [
+    '--mute-audio',
+    '--autoplay-policy=user-gesture-required',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-notifications',
+    '--disable-translate',
+    '--disable-features=MediaRouter,OptimizationHints,Translate',
+    '--no-first-run',
+    '--metrics-recording-only'
+]
+
+
+@dataclass
+class RenderReport:
+    """What one render loaded, what it skipped, and what that saved"""
+    url: str
+    requests: int = 0
+    bytes_loaded: int = 0
+    blocked: Dict[str, int] = field(default_factory=dict)  # category -> blocked requests
+    capped: bool = False
+    elapsed: float = 0.0  # Navigation time, excluding any settle wait
+
+    @property
+    def blocked_count(self) -> int:
+        return sum(self.blocked.values())
+
+    @property
+    def bytes_saved(self) -> int:
+        """Estimated bytes the blocked requests would have transferred"""
+        return sum(TYPICAL_BYTES.get(category, 0) * count for category, count in self.blocked.items())
+
+    @property
+    def seconds_saved(self) -> float:
+        """Estimated download time saved, at the throughput this render achieved"""
+        if not self.bytes_loaded or not self.elapsed:
+            return 0.0
+        return self.bytes_saved / (self.bytes_loaded / self.elapsed)
+
+    def block(self, category: str):
+        self.blocked[category] = self.blocked.get(category, 0) + 1
+
+    def summary(self) -> str:
+        capped = ', byte cap hit' if self.capped else ''
+        return (f"{self.url}: {self.bytes_loaded / 1024:.0f} KB in {self.requests} requests, "
+                f"{self.blocked_count} blocked (~{self.bytes_saved / 1024:.0f} KB, "
+                f"~{self.seconds_saved:.1f}s saved){capped}")
+
+
+class RenderProfile:
+    """
+    Decides which requests a render may make and keeps running totals of
+    what was saved. One profile is shared by every render of a pool.
+    """
+
+    def __init__(self, block_resources: Optional[bool] = None, max_page_bytes: Optional[int] = None):
+        self.block_resources = (block_resources if block_resources is not None
+                                else settings.render_block_resources)
+        self.max_page_bytes = max_page_bytes or settings.render_max_page_mb * 1024 * 1024
+
+        self.totals = {
+            'renders': 0,
+            'requests': 0,
+            'blocked': 0,
+            'capped': 0,
+            'bytes_loaded': 0,
+            'bytes_saved': 0,
+            'seconds_saved': 0.0
+        }
+        self._lock = threading.Lock()
+
+    def classify(self, url: str, resource_type: Optional[str] = None) -> Optional[str]:
+        """Category a request is blocked under, or None to let it through"""
+        if not self.block_resources:
+            return None
+        if resource_type in BLOCKED_RESOURCE_TYPES:
+            return resource_type
+
+        parts = urlsplit(url)
+        host_path = f'{(parts.hostname or "").lower()}{parts.path}'
+        if any(blocked in host_path for blocked in BLOCKED_HOSTS):
+            return 'tracker'
+
+        if resource_type is None:
+            path = parts.path.lower()
+            for category, extensions in BLOCKED_EXTENSIONS.items():
+                if path.endswith(extensions):
+                    return category
+        return None
+
+    def record(self, report: RenderReport):
+        """Add a finished render to the totals and log its savings"""
+        with self._lock:
+            self.totals['renders'] += 1
+            self.totals['requests'] += report.requests
+            self.totals['blocked'] += report.blocked_count
+            self.totals['capped'] += int(report.capped)
+            self.totals['bytes_loaded'] += report.bytes_loaded
+            self.totals['bytes_saved'] += report.bytes_saved
+            self.totals['seconds_saved'] += report.seconds_saved
+        logger.info(f"Rendered {report.summary()}")
+
+    # --- Browser options ---
+
+    def chrome_arguments(self) -> List[str]:
+        """Chrome switches that turn off features no evidence indicator reads"""
+        return list(CHROME_ARGUMENTS) if self.block_resources else []
+
+    def context_options(self) -> Dict[str, str]:
+        """Playwright context options; service workers would bypass request interception"""
+        return {'service_workers': 'block'} if self.block_resources else {}
+
+    def blocked_url_patterns(self) -> List[str]:
+        """DevTools Network.setBlockedURLs patterns equivalent to classify()"""
+        if not self.block_resources:
+            return []
+        patterns = [f'*{host}*' for host in BLOCKED_HOSTS]
+        for extensions in BLOCKED_EXTENSIONS.values():
+            for extension in extensions:
+                patterns.append(f'*{extension}')
+                patterns.append(f'*{extension}?*')
+        return patterns
+
+    # --- Playwright ---
+
+    async def attach(self, page, report: RenderReport):
+        """Intercept a Playwright page's requests for the duration of one render"""
+
+        async def handle_route(route):
+            request = route.request
+            category = self.classify(request.url, request.resource_type)
+            if category is None and request.resource_type != 'document' and report.bytes_loaded >= self.max_page_bytes:
+                report.capped = True
+                category = 'over_cap'
+            if category is not None:
+                report.block(category)
+                await route.abort()
+            else:
+                report.requests += 1
+                await route.continue_()
+
+        async def count_bytes(request):
+            try:
+                sizes = await request.sizes()
+                report.bytes_loaded += sizes['responseBodySize'] + sizes['responseHeadersSize']
+            except Exception:
+                # Page or context already closed
+                pass
+
+        await page.route('**/*', handle_route)
+        page.on('requestfinished', count_bytes)
+
+    # --- Selenium ---
+
+    def prepare_driver(self, driver):
+        """Install DevTools URL blocking on a freshly started Chrome driver"""
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_url_patterns()})
+
+    def drain_driver_log(self, driver):
+        """Discard performance log entries left over from earlier navigations"""
+        try:
+            driver.get_log('performance')
+        except Exception:
+            pass
+
+    def read_driver_log(self, driver, report: RenderReport):
+        """Fold the performance log since the last read into the report"""
+        try:
+            entries = driver.get_log('performance')
+        except Exception as e:
+            logger.debug(f"Performance log unavailable: {e}")
+            return
+
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.loadingFinished':
+                report.requests += 1
+                report.bytes_loaded += int(params.get('encodedDataLength', 0))
+            elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+                report.block(CDP_RESOURCE_TYPES.get(params.get('type'), 'tracker'))
+
+    def enforce_byte_cap(self, driver, report: RenderReport) -> bool:
+        """Stop loading a Selenium page that went over the byte cap; True if it did"""
+        if report.bytes_loaded < self.max_page_bytes:
+            return False
+        report.capped = True
+        try:
+            driver.execute_script('window.stop();')
+        except Exception as e:
+            logger.debug(f"Could not stop page load: {e}")
+        return True
@@ -0,0 +1,115 @@
+# scrapers/rescan.py
+"""
+Change detection for incremental website re-scans.
+Before a previously scanned site is rendered and scored again, two cheap
+checks decide whether anything changed since the last scan:
+  1. the newest <lastmod> in the site's sitemaps, when it publishes them;
+  2. otherwise a conditional GET of the homepage with the ETag and
+     Last-Modified validators stored in the page cache (falling back to
+     comparing the body when the server ignores them).
+Only changed sites need the full evidence pass; unchanged ones just get
+their scan timestamp bumped.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Union
+
+import requests
+
+from .evidence_memo import html_digest
+from .host_scheduler import HostScheduler, get_host_scheduler
+from .page_cache import PageCache, KIND_STATIC, KIND_RENDERED, get_page_cache
+from .sitemap import SitemapReader, parse_w3c_datetime
+
+try:
+    from supercat_automation.config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+@dataclass
+class RescanDecision:
+    """Whether a site needs a full re-scan, and why"""
+    domain: str
+    changed: bool
+    reason: str
+
+
+class ChangeDetector:
+    """Decides per site whether a re-scan is needed; safe to call from worker threads"""
+
+    def __init__(self, cache: Optional[PageCache] = None, sitemap_reader: Optional[SitemapReader] = None,
+                 scheduler: Optional[HostScheduler] = None, timeout: Optional[float] = None):
+        self.cache = cache if cache is not None else get_page_cache()
+        self.scheduler = scheduler or get_host_scheduler()
+        self.sitemaps = sitemap_reader or SitemapReader(scheduler=self.scheduler)
+        self.timeout = timeout or settings.static_fetch_timeout
+        self.stats = {
+            'changed': 0,
+            'unchanged': 0,
+            'reasons': {}
+        }
+        self._session = requests.Session()
+        self._session.headers.update({'User-Agent': USER_AGENT})
+
+    def check(self, domain: str, last_scan: Union[str, datetime, None]) -> RescanDecision:
+        """Compare a site against the time it was last scanned"""
+        if not domain:
+            return self._decide(domain, True, 'no_domain')
+        url = domain if domain.startswith('http') else f'https://{domain}'
+
+        last_scan = parse_w3c_datetime(last_scan) if isinstance(last_scan, str) else last_scan
+        if last_scan is None:
+            return self._decide(domain, True, 'never_scanned')
+        if last_scan.tzinfo is None:
+            last_scan = last_scan.astimezone()
+
+        try:
+            # Index <lastmod> values are enough; child sitemaps are not read
+            summary = self.sitemaps.summarize(url, follow_index=False)
+            if summary.latest_lastmod is not None:
+                changed = summary.latest_lastmod > last_scan
+                return self._decide(domain, changed, 'sitemap_lastmod' if changed else 'sitemap_unchanged')
+            return self._conditional_get(domain, url)
+        except Exception as e:
+            logger.debug(f"Change check failed for {domain}: {e}")
+            return self._decide(domain, True, 'check_failed')
+
+    def _conditional_get(self, domain: str, url: str) -> RescanDecision:
+        cached = self.cache.get(url, KIND_STATIC) if self.cache is not None else None
+        if cached is None:
+            return self._decide(domain, True, 'no_stored_page')
+
+        with self.scheduler.slot_sync(url):
+            response = self._session.get(url, timeout=self.timeout, headers=cached.conditional_headers())
+
+        if response.status_code == 304:
+            self._touch(url)
+            return self._decide(domain, False, 'not_modified')
+        if response.status_code >= 400:
+            return self._decide(domain, True, f'http_{response.status_code}')
+
+        # Servers without validators answer 200 every time; compare the bodies instead
+        if html_digest(response.text) == html_digest(cached.html):
+            self._touch(url)
+            return self._decide(domain, False, 'same_content')
+
+        # Keep the new body so the re-scan's static fetch is a cache hit
+        self.cache.put(url, response.text, KIND_STATIC, final_url=response.url, status=response.status_code,
+                       headers=response.headers, elapsed=response.elapsed.total_seconds())
+        return self._decide(domain, True, 'modified')
+
+    def _touch(self, url: str):
+        self.cache.touch(url, KIND_STATIC)
+        self.cache.touch(url, KIND_RENDERED)
+
+    def _decide(self, domain: str, changed: bool, reason: str) -> RescanDecision:
+        self.stats['changed' if changed else 'unchanged'] += 1
+        self.stats['reasons'][reason] = self.stats['reasons'].get(reason, 0) + 1
+        return RescanDecision(domain=domain, changed=changed, reason=reason)
@@ -0,0 +1,270 @@
+# scrapers/sitemap.py
+"""
+Streaming sitemap reader.
+Finds a site's sitemaps (robots.txt Sitemap: lines, else /sitemap.xml) and
+reads them with an incremental XML parser as the bytes arrive, so sitemaps
+with tens of thousands of URLs never become a full document in memory.
+Gzipped sitemaps and sitemap indexes are handled. Reports the URL count and
+the newest <lastmod>, which is enough to tell whether a site changed since a
+given time without rendering any page. Counting the product and category
+URLs a site lists gives its catalog size the same way.
+"""
+
+import logging
+import re
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+from urllib.parse import urljoin, urlsplit
+from xml.etree.ElementTree import XMLPullParser, ParseError
+
+import requests
+
+from .host_scheduler import HostScheduler, FetchDisallowed, get_host_scheduler
+
+try:
+    from supercat_automation.config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+CHUNK_BYTES = 64 * 1024
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Catalog URL shapes of common storefronts and manufacturer sites; product
+# patterns are tried first since products often sit under a category path
+PRODUCT_PATH = re.compile(
+    r'/(?:products?|items?|sku|dp|p|pd|shop/products?)/[^/?#]+|-p-\d+|/p\d{3,}', re.I
+)
+CATEGORY_PATH = re.compile(
+    r'/(?:collections?|categor(?:y|ies)|product-category|product_cat|c|catalog|departments?|shop)/[^/?#]+', re.I
+)
+# Platform sitemap names: Shopify sitemap_products_1.xml, WooCommerce product-sitemap.xml, ...
+PRODUCT_SITEMAP = re.compile(r'product(?![-_]?cat)', re.I)
+CATEGORY_SITEMAP = re.compile(r'collection|categor|product[-_]?cat', re.I)
+
+
+def parse_w3c_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Timezone-aware datetime for a sitemap lastmod or stored timestamp; naive values are local time"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            # Year-month only ('2024-05') is valid W3C datetime
+            parsed = datetime.strptime(value[:7], '%Y-%m')
+        except ValueError:
+            return None
+        return parsed.replace(tzinfo=timezone.utc)
+    if parsed.tzinfo is None:
+        # Date-only lastmods mean the whole day in UTC; naive datetimes are our own local timestamps
+        return parsed.replace(tzinfo=timezone.utc) if len(value) <= 10 else parsed.astimezone()
+    return parsed
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _sitemap_name(url: str) -> str:
+    return urlsplit(url).path.rsplit('/', 1)[-1]
+
+
+def classify_catalog_url(url: str, sitemap: str = '') -> Optional[str]:
+    """'product', 'category' or None for a sitemap URL; the sitemap's own name wins when it says"""
+    name = _sitemap_name(sitemap)
+    if CATEGORY_SITEMAP.search(name):
+        return 'category'
+    if PRODUCT_SITEMAP.search(name):
+        return 'product'
+    path = urlsplit(url).path
+    if PRODUCT_PATH.search(path):
+        return 'product'
+    if CATEGORY_PATH.search(path):
+        return 'category'
+    return None
+
+
+@dataclass
+class SitemapSummary:
+    """What the sitemaps of one site contain"""
+    sitemaps: List[str] = field(default_factory=list)
+    url_count: int = 0
+    lastmod_count: int = 0
+    latest_lastmod: Optional[datetime] = None
+    truncated: bool = False
+
+    @property
+    def found(self) -> bool:
+        return bool(self.sitemaps)
+
+    def note_lastmod(self, value: Optional[str]):
+        lastmod = parse_w3c_datetime(value)
+        if lastmod is not None:
+            self.lastmod_count += 1
+            if self.latest_lastmod is None or lastmod > self.latest_lastmod:
+                self.latest_lastmod = lastmod
+
+
+@dataclass
+class CatalogEstimate:
+    """Catalog size of a site, counted from the URLs its sitemaps list"""
+    product_count: int = 0
+    category_count: int = 0
+    url_count: int = 0
+    sitemaps: List[str] = field(default_factory=list)
+    truncated: bool = False
+
+    @property
+    def found(self) -> bool:
+        return bool(self.sitemaps)
+
+    def note_url(self, loc: str, lastmod: Optional[str], sitemap: str):
+        kind = classify_catalog_url(loc, sitemap)
+        if kind == 'product':
+            self.product_count += 1
+        elif kind == 'category':
+            self.category_count += 1
+
+
+class SitemapReader:
+    """
+    Reads a site's sitemaps within a sitemap and URL budget.
+    An on_url callback sees every <url> entry (loc, lastmod, sitemap) as it
+    streams past.
+    Requests go through the shared politeness scheduler.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, max_sitemaps: Optional[int] = None,
+                 max_urls: Optional[int] = None, scheduler: Optional[HostScheduler] = None):
+        self.timeout = timeout or settings.static_fetch_timeout
+        self.max_sitemaps = max_sitemaps or settings.sitemap_max_files
+        self.max_urls = max_urls or settings.sitemap_max_urls
+        self.scheduler = scheduler or get_host_scheduler()
+        self._session = requests.Session()
+        self._session.headers.update({'User-Agent': USER_AGENT})
+
+    def find_sitemaps(self, domain: str) -> List[str]:
+        """Sitemaps listed in robots.txt, or the conventional /sitemap.xml"""
+        root = domain if domain.startswith('http') else f'https://{domain}'
+        try:
+            listed = self.scheduler.sitemaps_sync(root)
+        except Exception as e:
+            logger.debug(f"Could not read robots.txt sitemaps for {root}: {e}")
+            listed = []
+        return listed or [urljoin(root, '/sitemap.xml')]
+
+    def summarize(self, domain: str, follow_index: bool = True,
+                  on_url: Optional[Callable[[str, Optional[str], str], None]] = None,
+                  prefer: Optional[Callable[[str], bool]] = None) -> SitemapSummary:
+        """
+        Stream a site's sitemaps and summarize them.
+        With follow_index=False, sitemap indexes contribute their own
+        <sitemap><lastmod> values instead of having every child read.
+        Child sitemaps matching prefer are read before the rest of the budget.
+        """
+        summary = SitemapSummary()
+        queue = self.find_sitemaps(domain)
+        seen = set()
+
+        while queue and len(seen) < self.max_sitemaps:
+            url = queue.pop(0)
+            if url in seen:
+                continue
+            seen.add(url)
+            try:
+                children = self._read(url, summary, on_url)
+            except FetchDisallowed as e:
+                logger.debug(f"Skipping sitemap: {e}")
+                continue
+            except (requests.RequestException, ParseError, zlib.error) as e:
+                logger.debug(f"Could not read sitemap {url}: {e}")
+                continue
+            summary.sitemaps.append(url)
+            if follow_index:
+                children = [child for child in children if child not in seen]
+                if prefer:
+                    queue = ([child for child in children if prefer(child)] + queue
+                             + [child for child in children if not prefer(child)])
+                else:
+                    queue.extend(children)
+            if summary.url_count >= self.max_urls:
+                summary.truncated = True
+                break
+
+        if queue:
+            summary.truncated = True
+        return summary
+
+    def estimate_catalog(self, domain: str) -> CatalogEstimate:
+        """Count product and category URLs, reading product and category sitemaps first"""
+        estimate = CatalogEstimate()
+        summary = self.summarize(
+            domain, on_url=estimate.note_url,
+            prefer=lambda url: bool(PRODUCT_SITEMAP.search(_sitemap_name(url))
+                                    or CATEGORY_SITEMAP.search(_sitemap_name(url)))
+        )
+        estimate.url_count = summary.url_count
+        estimate.sitemaps = summary.sitemaps
+        estimate.truncated = summary.truncated
+        return estimate
+
+    def _read(self, url: str, summary: SitemapSummary,
+              on_url: Optional[Callable[[str, Optional[str], str], None]]) -> List[str]:
+        """Stream one sitemap into the summary; returns child sitemaps if it is an index"""
+        parser = XMLPullParser(events=('start', 'end'))
+        children = []
+        entry = {}
+        root = None
+        decompressor = None
+
+        with self.scheduler.slot_sync(url):
+            response = self._session.get(url, timeout=self.timeout, stream=True)
+        with response:
+            if response.status_code >= 400:
+                raise requests.HTTPError(f'HTTP {response.status_code}', response=response)
+
+            first = True
+            for chunk in response.iter_content(CHUNK_BYTES):
+                if first:
+                    # .xml.gz files arrive still compressed (no Content-Encoding header)
+                    if chunk.startswith(GZIP_MAGIC):
+                        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                    first = False
+                parser.feed(decompressor.decompress(chunk) if decompressor else chunk)
+
+                for event, element in parser.read_events():
+                    if event == 'start':
+                        if root is None:
+                            root = element
+                        continue
+                    name = _local_name(element.tag)
+                    if name in ('loc', 'lastmod'):
+                        # The entry's own <loc> comes first; image and video extensions reuse the name
+                        entry.setdefault(name, (element.text or '').strip())
+                        continue
+                    if name == 'url':
+                        summary.url_count += 1
+                        summary.note_lastmod(entry.get('lastmod'))
+                        if on_url and entry.get('loc'):
+                            on_url(entry['loc'], entry.get('lastmod'), url)
+                    elif name == 'sitemap':
+                        summary.note_lastmod(entry.get('lastmod'))
+                        if entry.get('loc'):
+                            children.append(entry['loc'])
+                    else:
+                        continue
+                    # Drop finished entries so memory stays flat however long the sitemap is
+                    entry = {}
+                    root.clear()
+                    if summary.url_count >= self.max_urls:
+                        break
+
+                if summary.url_count >= self.max_urls:
+                    break
+        return children
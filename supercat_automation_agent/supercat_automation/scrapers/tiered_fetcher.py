@@ -0,0 +1,360 @@
+# scrapers/tiered_fetcher.py
+"""
+Tiered page fetcher for website evidence extraction.
+Tries a plain HTTP GET first and only escalates to a headless browser render
+when cheap signals say the static HTML is not usable. Every page fetched from
+the network is written to the page archive; in replay mode pages are served
+from the archive alone.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Dict, List, Any, Optional, Callable, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+import requests
+
+from .driver_pool import fetch_rendered_html
+from .host_scheduler import HostScheduler, FetchDisallowed, get_host_scheduler
+from .page_archive import PageArchive, ArchiveMiss, get_page_archive
+from .page_cache import PageCache, CachedPage, KIND_STATIC, KIND_RENDERED, get_page_cache
+
+try:
+    from supercat_automation.config.settings import settings
+except ImportError:
+    from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+TIER_STATIC = 'static'
+TIER_RENDERED = 'rendered'
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# Markup that only appears in client-rendered app shells
+SPA_SHELL_MARKERS = [
+    re.compile(r'<div[^>]+id=["\'](root|app|__next|__nuxt|gatsby-focus-wrapper)["\'][^>]*>\s*</div>', re.I),
+    re.compile(r'<app-root[^>]*>\s*</app-root>', re.I),
+    re.compile(r'\bng-app\b|\bng-version=', re.I),
+]
+
+NOSCRIPT_WARNING = re.compile(
+    r'<noscript[^>]*>[^<]*(enable javascript|javascript is (disabled|required)|requires javascript|turn on javascript)',
+    re.I
+)
+
+_SCRIPT_STYLE = re.compile(r'<(script|style)[^>]*>.*?</\1>', re.I | re.S)
+_TAGS = re.compile(r'<[^>]+>')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def detect_render_need(html: str, min_text_ratio: Optional[float] = None) -> List[str]:
+    """
+    Return the reasons static HTML is not good enough for evidence extraction.
+    An empty list means the static response can be analyzed as-is.
+    A page counts as empty when it has no visible text, however small it is.
+    """
+    if min_text_ratio is None:
+        min_text_ratio = settings.render_min_text_ratio
+
+    visible_text = _WHITESPACE.sub(' ', _TAGS.sub(' ', _SCRIPT_STYLE.sub(' ', html or ''))).strip()
+    if not visible_text:
+        return ['empty_body']
+
+    reasons = []
+    if any(marker.search(html) for marker in SPA_SHELL_MARKERS):
+        reasons.append('spa_shell')
+    if NOSCRIPT_WARNING.search(html):
+        reasons.append('noscript_warning')
+
+    text_ratio = len(visible_text) / len(html)
+    if text_ratio < min_text_ratio:
+        reasons.append('low_text_ratio')
+
+    return reasons
+
+
+class TieredFetcher:
+    """
+    Fetch pages through a static HTTP tier, escalating to a browser render only
+    for pages that need JavaScript. Records which tier served each domain's homepage.
+    Both tiers read through the persistent page cache when it is enabled, and
+    every network request waits for its host's turn in the shared scheduler.
+    Raises FetchDisallowed when robots.txt excludes the URL.
+    With replay on, nothing touches the network: pages come from the archive
+    with their recorded timings, and ArchiveMiss is raised for unknown URLs.
+    """
+
+    def __init__(self, render: Optional[Callable] = None,
+                 timeout: Optional[float] = None,
+                 cache: Optional[PageCache] = None,
+                 scheduler: Optional[HostScheduler] = None,
+                 archive: Optional[PageArchive] = None,
+                 replay: Optional[bool] = None):
+        self.render = render or fetch_rendered_html
+        self.timeout = timeout or settings.static_fetch_timeout
+        self.cache = cache if cache is not None else get_page_cache()
+        self.scheduler = scheduler or get_host_scheduler()
+        self.replay = replay if replay is not None else settings.archive_replay
+        self.archive = archive if archive is not None else get_page_archive()
+        if self.replay and self.archive is None:
+            self.archive = PageArchive()
+        self.tier_by_domain: Dict[str, str] = {}
+        self.stats = {
+            'static': 0,
+            'rendered': 0,
+            'render_reasons': {},
+            'cache_hits': 0,
+            'revalidated': 0,
+            'replayed': 0
+        }
+        self._session = requests.Session()
+        self._session.headers.update(DEFAULT_HEADERS)
+
+    async def fetch(self, url: str, session: Optional[aiohttp.ClientSession] = None) -> Dict[str, Any]:
+        """Fetch a page asynchronously; sync renderers and cache I/O run in a worker thread"""
+        loop = asyncio.get_running_loop()
+        if self.replay:
+            return await loop.run_in_executor(None, self._replay, url)
+
+        cached, fresh = await loop.run_in_executor(None, self._fresh_static, url)
+        if fresh:
+            html, final_url, elapsed, unchanged = cached.html, cached.final_url, cached.elapsed, False
+            reasons = detect_render_need(html)
+        else:
+            start_time = time.time()
+            try:
+                request_headers = cached.conditional_headers() if cached else {}
+                async with self.scheduler.slot(url, session):
+                    # Time the request itself, not the wait for the host's turn
+                    start_time = time.time()
+                    if session is None:
+                        async with aiohttp.ClientSession(headers=DEFAULT_HEADERS) as own_session:
+                            html, final_url, status, headers = await self._get_static(own_session, url, request_headers)
+                    else:
+                        html, final_url, status, headers = await self._get_static(session, url, request_headers)
+                    elapsed = time.time() - start_time
+                html, final_url, reasons, unchanged = await loop.run_in_executor(
+                    None, self._static_result, url, cached, html, final_url, status, headers, elapsed
+                )
+            except FetchDisallowed:
+                raise
+            except Exception as e:
+                logger.debug(f"Static fetch failed for {url}: {e}")
+                html, final_url, reasons, unchanged = '', url, ['static_fetch_failed'], False
+                elapsed = time.time() - start_time
+
+        if reasons:
+            rendered = await loop.run_in_executor(None, self._cached_render, url, unchanged)
+            if rendered is None:
+                async with self.scheduler.slot(url, session):
+                    render_start = time.time()
+                    if asyncio.iscoroutinefunction(self.render):
+                        html = await self.render(url)
+                    else:
+                        html = await loop.run_in_executor(None, self.render, url)
+                    render_elapsed = time.time() - render_start
+                await loop.run_in_executor(None, self._store_render, url, html, render_elapsed)
+            else:
+                html, render_elapsed = rendered.html, rendered.elapsed
+            elapsed += render_elapsed
+            final_url = url
+
+        return self._record(url, final_url, html, reasons, elapsed)
+
+    def fetch_sync(self, url: str) -> Dict[str, Any]:
+        """Blocking variant of fetch() for the synchronous extractors"""
+        if self.replay:
+            return self._replay(url)
+
+        cached, fresh = self._fresh_static(url)
+        if fresh:
+            html, final_url, elapsed, unchanged = cached.html, cached.final_url, cached.elapsed, False
+            reasons = detect_render_need(html)
+        else:
+            start_time = time.time()
+            try:
+                request_headers = cached.conditional_headers() if cached else {}
+                with self.scheduler.slot_sync(url):
+                    start_time = time.time()
+                    response = self._session.get(url, timeout=self.timeout, headers=request_headers)
+                    elapsed = time.time() - start_time
+                html, final_url, reasons, unchanged = self._static_result(
+                    url, cached, response.text, response.url, response.status_code, response.headers, elapsed
+                )
+            except FetchDisallowed:
+                raise
+            except Exception as e:
+                logger.debug(f"Static fetch failed for {url}: {e}")
+                html, final_url, reasons, unchanged = '', url, ['static_fetch_failed'], False
+                elapsed = time.time() - start_time
+
+        if reasons:
+            rendered = self._cached_render(url, unchanged)
+            if rendered is None:
+                with self.scheduler.slot_sync(url):
+                    render_start = time.time()
+                    html = self.render(url)
+                    render_elapsed = time.time() - render_start
+                self._store_render(url, html, render_elapsed)
+            else:
+                html, render_elapsed = rendered.html, rendered.elapsed
+            elapsed += render_elapsed
+            final_url = url
+
+        return self._record(url, final_url, html, reasons, elapsed)
+
+    def render_rate(self) -> float:
+        """Share of fetches, homepages and crawled subpages alike, that needed the browser tier"""
+        total = self.stats['static'] + self.stats['rendered']
+        return self.stats['rendered'] / total if total else 0.0
+
+    async def _get_static(self, session: aiohttp.ClientSession, url: str, headers: Optional[Dict[str, str]] = None):
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with session.get(url, timeout=timeout, allow_redirects=True, headers=headers) as response:
+            html = await response.text(errors='replace')
+            return html, str(response.url), response.status, dict(response.headers)
+
+    # --- Tier decisions shared by fetch() and fetch_sync() ---
+
+    def _fresh_static(self, url: str) -> Tuple[Optional[CachedPage], bool]:
+        """Cached static copy of a page, and whether it is fresh enough to skip the request"""
+        cached = self._cache_get(url, KIND_STATIC)
+        if cached and cached.is_fresh(self.cache.ttl_seconds):
+            self.stats['cache_hits'] += 1
+            self._archive_cached(url, cached)
+            return cached, True
+        return cached, False
+
+    def _static_result(self, url: str, cached: Optional[CachedPage], html: str, final_url: str,
+                       status: int, headers: Dict[str, str], elapsed: float) -> Tuple[str, str, List[str], bool]:
+        """
+        Store a static response and decide whether the page needs a render.
+        Returns the page's HTML, final URL, render reasons and whether a 304
+        confirmed the cached copy.
+        """
+        unchanged = False
+        if status == 304 and cached:
+            html, final_url, status, unchanged = cached.html, cached.final_url, cached.status, True
+            self._revalidated(url)
+            self._archive_cached(url, cached)
+        else:
+            if status < 400:
+                self._cache_put(url, html, KIND_STATIC, final_url, status, headers, elapsed)
+            self._archive_put(url, html, KIND_STATIC, final_url, status, headers, elapsed)
+        reasons = [f'http_{status}'] if status >= 400 else detect_render_need(html)
+        return html, final_url, reasons, unchanged
+
+    def _store_render(self, url: str, html: str, elapsed: float):
+        self._cache_put(url, html, KIND_RENDERED, elapsed=elapsed)
+        self._archive_put(url, html, KIND_RENDERED, elapsed=elapsed)
+
+    # --- Page cache ---
+
+    def _cache_get(self, url: str, kind: str) -> Optional[CachedPage]:
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.get(url, kind)
+        except Exception as e:
+            logger.warning(f"Page cache read failed for {url}: {e}")
+            return None
+
+    def _cache_put(self, url: str, html: str, kind: str, final_url: Optional[str] = None,
+                   status: int = 200, headers: Optional[Dict[str, str]] = None, elapsed: float = 0.0):
+        if self.cache is None or not html:
+            return
+        try:
+            self.cache.put(url, html, kind, final_url=final_url, status=status, headers=headers, elapsed=elapsed)
+        except Exception as e:
+            logger.warning(f"Page cache write failed for {url}: {e}")
+
+    def _revalidated(self, url: str):
+        """The origin answered 304, so both the static and the rendered copy are still current"""
+        self.stats['revalidated'] += 1
+        try:
+            self.cache.touch(url, KIND_STATIC)
+            self.cache.touch(url, KIND_RENDERED)
+        except Exception as e:
+            logger.warning(f"Page cache update failed for {url}: {e}")
+
+    def _cached_render(self, url: str, static_unchanged: bool) -> Optional[CachedPage]:
+        """Cached render if still fresh, or if the static page was just revalidated"""
+        cached = self._cache_get(url, KIND_RENDERED)
+        if cached and (static_unchanged or cached.is_fresh(self.cache.ttl_seconds)):
+            self.stats['cache_hits'] += 1
+            self._archive_cached(url, cached)
+            return cached
+        return None
+
+    # --- Page archive ---
+
+    def _archive_put(self, url: str, html: str, kind: str, final_url: Optional[str] = None,
+                     status: int = 200, headers: Optional[Dict[str, str]] = None, elapsed: float = 0.0):
+        if self.archive is None:
+            return
+        try:
+            self.archive.put(url, html, kind, final_url=final_url, status=status,
+                             headers=dict(headers or {}), elapsed=elapsed)
+        except Exception as e:
+            logger.warning(f"Page archive write failed for {url}: {e}")
+
+    def _archive_cached(self, url: str, cached: CachedPage):
+        """Archive a page served from the cache unless the archive already has it"""
+        if self.archive is None:
+            return
+        try:
+            if not self.archive.has(url, cached.kind):
+                self._archive_put(url, cached.html, cached.kind, cached.final_url, cached.status,
+                                  cached.headers, cached.elapsed)
+        except Exception as e:
+            logger.warning(f"Page archive lookup failed for {url}: {e}")
+
+    def _replay(self, url: str) -> Dict[str, Any]:
+        """Serve a fetch from the archive, choosing the tier the same way a live fetch would"""
+        static = self.archive.get(url, KIND_STATIC)
+        if static is not None:
+            html, final_url, elapsed = static.html, static.final_url, static.elapsed
+            reasons = [f'http_{static.status}'] if static.status >= 400 else detect_render_need(html)
+        else:
+            html, final_url, elapsed = '', url, 0.0
+            reasons = ['static_fetch_failed']
+
+        if reasons:
+            rendered = self.archive.get(url, KIND_RENDERED)
+            if rendered is None:
+                raise ArchiveMiss(f"No archived page for {url}" if static is None
+                                  else f"No archived render for {url}")
+            html, final_url = rendered.html, url
+            elapsed += rendered.elapsed
+
+        self.stats['replayed'] += 1
+        return self._record(url, final_url, html, reasons, elapsed)
+
+    def _record(self, url: str, final_url: str, html: str, reasons: List[str], elapsed: float) -> Dict[str, Any]:
+        tier = TIER_RENDERED if reasons else TIER_STATIC
+        parts = urlparse(url)
+        domain = parts.netloc or url
+        # A domain's tier is its homepage's; crawled subpages and catalog pages don't change it
+        if parts.path in ('', '/') and not parts.query:
+            self.tier_by_domain[domain] = tier
+        self.stats[tier] += 1
+        for reason in reasons:
+            self.stats['render_reasons'][reason] = self.stats['render_reasons'].get(reason, 0) + 1
+
+        if reasons:
+            logger.info(f"Rendered {domain} in browser ({', '.join(reasons)})")
+
+        return {
+            'url': url,
+            'final_url': final_url,
+            'html': html,
+            'tier': tier,
+            'render_reasons': reasons,
+            'elapsed': elapsed
+        }
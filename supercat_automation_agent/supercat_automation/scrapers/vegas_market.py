@@ -2,20 +2,29 @@
 """
 Vegas Market Scraper - Production-Ready Version
 Implements multiple fallback strategies and robust error handling
+The exhibitor API found by interception is recorded and replayed without a
+browser, so later runs pull the whole directory over HTTP in seconds.
+Exhibitor detail pages are visited concurrently from a bounded page pool.
+Exhibitors are streamed in batches (each replayed API page as it arrives)
+so they are saved and analyzed while the rest are still being scraped.
 """
 
 import json
 import logging
 import asyncio
-import random
-from typing import Dict, List, Any, Optional, Set
+from typing import Dict, List, Any, AsyncIterator, Optional, Set, Tuple
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
 import re
 
 from playwright.async_api import Page, Route, Request, Response, TimeoutError as PlaywrightTimeoutError
 from bs4 import BeautifulSoup, Tag
+from config.settings import settings
+from .api_replay import ApiReplayer, ReplayError, ReplayAuthError, discover_endpoint, load_endpoint, save_endpoint
 from .base_scraper import BaseTradeshowScraper
+from .browser_pool import PagePool
+from .host_scheduler import host_key
+from .page_settle import install_settle_probe, wait_for_settled
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +48,12 @@ class VegasMarketScraper(BaseTradeshowScraper):
         ]
         self.api_data = []
         self.intercepted_responses = []
+        # (url, method, headers, post data, JSON) of each captured exhibitor API response
+        self.api_captures = []
+        self.api_replayer = ApiReplayer()
+        self.api_recipe_name = 'vegas_market'
+        # Detail pages still allowed in the current scrape
+        self._detail_pages_left = settings.exhibitor_detail_max_pages
         
     async def scrape_trade_show_info(self, page: Page) -> Dict[str, Any]:
         """Scrape Las Vegas Market general information with fallbacks"""
@@ -69,11 +84,48 @@ class VegasMarketScraper(BaseTradeshowScraper):
     
     async def scrape_exhibitor_list(self, page: Page) -> List[Dict[str, Any]]:
         """
-        Main scraping method with multiple strategies
+        Main scraping method with multiple strategies; the whole stream as one list
         """
         exhibitors = []
-        
-        # Strategy 1: Try API interception first
+        async for batch in self.stream_exhibitor_list(page):
+            exhibitors.extend(batch)
+        return exhibitors
+    
+    async def stream_exhibitor_list(self, page: Page) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield unique exhibitors in batches: each replayed API page as it arrives,
+        otherwise the result of the browser strategies. Websites missing from a
+        batch are resolved from detail pages before it is yielded.
+        """
+        seen: Set[str] = set()
+        found = 0
+        self._detail_pages_left = settings.exhibitor_detail_max_pages
+        
+        # Track fetch/XHR from the first script on, so settle waits see every API call
+        await install_settle_probe(page)
+        
+        # Strategy 0: Replay the exhibitor API recorded by an earlier run, no browser needed
+        if settings.api_replay_enabled:
+            logger.info("Strategy 0: Replaying recorded exhibitor API...")
+            async for batch in self._stream_api_replay():
+                batch = self._deduplicate_exhibitors(batch, seen)
+                found += len(batch)
+                async for resolved in self._stream_exhibitor_websites(page, batch):
+                    yield resolved
+        
+        if found < 10:
+            exhibitors = self._deduplicate_exhibitors(await self._scrape_via_browser(page), seen)
+            found += len(exhibitors)
+            async for resolved in self._stream_exhibitor_websites(page, exhibitors):
+                yield resolved
+        
+        logger.info(f"Total unique exhibitors found: {found}")
+    
+    async def _scrape_via_browser(self, page: Page) -> List[Dict[str, Any]]:
+        """
+        Strategies 1-4, in the browser, until one finds enough exhibitors
+        """
+        # Strategy 1: Try API interception (records the API for replay)
         logger.info("Strategy 1: Attempting API interception...")
         exhibitors = await self._scrape_via_api_interception(page)
         
@@ -89,10 +141,6 @@ class VegasMarketScraper(BaseTradeshowScraper):
             logger.info("Strategy 4: Attempting sitemap/static page scraping...")
             exhibitors = await self._scrape_via_sitemap(page)
         
-        # Deduplicate
-        exhibitors = self._deduplicate_exhibitors(exhibitors)
-        
-        logger.info(f"Total unique exhibitors found: {len(exhibitors)}")
         return exhibitors
     
     async def _scrape_via_api_interception(self, page: Page) -> List[Dict[str, Any]]:
@@ -124,6 +172,9 @@ class VegasMarketScraper(BaseTradeshowScraper):
                         if 'json' in content_type:
                             data = await response.json()
                             self.api_data.append(data)
+                            request = response.request
+                            self.api_captures.append((url, request.method, await request.all_headers(),
+                                                      request.post_data, data))
                             logger.info(f"Captured API response from: {url}")
                 except Exception as e:
                     logger.debug(f"Could not parse response from {url}: {e}")
@@ -139,13 +190,18 @@ class VegasMarketScraper(BaseTradeshowScraper):
                 await page.goto(url, timeout=60000, wait_until='networkidle')
                 
                 # Wait for potential API calls
-                await asyncio.sleep(5)
+                await wait_for_settled(page)
                 
                 # Check if we got data
                 if self.api_data:
                     exhibitors = self._parse_api_data(self.api_data)
                     if exhibitors:
                         logger.info(f"Found {len(exhibitors)} exhibitors via API interception")
+                        if settings.api_replay_enabled:
+                            # The page only loaded some pages of the API; pull the rest directly
+                            replayed = await self._replay_captured_api(page)
+                            if len(replayed) > len(exhibitors):
+                                return replayed
                         return exhibitors
                         
             except Exception as e:
@@ -154,6 +210,51 @@ class VegasMarketScraper(BaseTradeshowScraper):
         
         return exhibitors
     
+    async def _scrape_via_api_replay(self, endpoint=None) -> List[Dict[str, Any]]:
+        """Pull every page of the exhibitor API over HTTP"""
+        exhibitors = []
+        async for batch in self._stream_api_replay(endpoint):
+            exhibitors.extend(batch)
+        return exhibitors
+    
+    async def _stream_api_replay(self, endpoint=None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Exhibitors of each exhibitor API page as it arrives over HTTP.
+        Uses the recorded endpoint unless one is given; stops when the API
+        rejects the recorded cookies or tokens, so interception refreshes them.
+        """
+        endpoint = endpoint or load_endpoint(self.api_recipe_name)
+        if not endpoint:
+            return
+        found = 0
+        try:
+            async for batch in self.api_replayer.iter_pages(endpoint, lambda payload: self._parse_api_data([payload])):
+                found += len(batch)
+                yield batch
+        except ReplayAuthError as e:
+            logger.info(f"Recorded exhibitor API needs fresh cookies or tokens ({e}); refreshing in the browser")
+        except ReplayError as e:
+            logger.warning(f"Exhibitor API replay failed: {e}")
+        logger.info(f"Found {found} exhibitors via API replay")
+    
+    async def _replay_captured_api(self, page: Page) -> List[Dict[str, Any]]:
+        """Record the captured API call that returned the most exhibitors, then replay it"""
+        best, best_count = None, 0
+        for capture in self.api_captures:
+            count = len(self._parse_api_data([capture[-1]]))
+            if count > best_count:
+                best, best_count = capture, count
+        if not best:
+            return []
+        
+        url, method, headers, post_data, data = best
+        endpoint = discover_endpoint(url, method, headers, post_data, data, best_count,
+                                     cookies=await page.context.cookies())
+        logger.info(f"Recorded exhibitor API {endpoint.method} {endpoint.url} "
+                    f"({endpoint.style or 'single request'}, total {endpoint.total or 'unknown'})")
+        save_endpoint(self.api_recipe_name, endpoint)
+        return await self._scrape_via_api_replay(endpoint)
+    
     async def _scrape_via_dom(self, page: Page) -> List[Dict[str, Any]]:
         """
         Strategy 2: Traditional DOM scraping with smart selectors
@@ -246,7 +347,7 @@ class VegasMarketScraper(BaseTradeshowScraper):
                     logger.info(f"Searching with letter: {letter}")
                     
                     await page.goto(search_url, timeout=30000, wait_until='networkidle')
-                    await asyncio.sleep(2)
+                    await wait_for_settled(page)
                     
                     # Extract results
                     results = await self._extract_search_results(page)
@@ -292,15 +393,12 @@ class VegasMarketScraper(BaseTradeshowScraper):
                 # Extract exhibitor URLs from sitemap
                 exhibitor_urls = re.findall(r'<loc>(.*?exhibitor.*?)</loc>', content, re.IGNORECASE)
                 
-                # Visit each exhibitor page (limit to prevent overload)
-                for ex_url in exhibitor_urls[:50]:
-                    try:
-                        await page.goto(ex_url, timeout=20000)
-                        exhibitor = await self._extract_exhibitor_from_page(page)
-                        if exhibitor:
-                            exhibitors.append(exhibitor)
-                    except:
-                        continue
+                # Visit the exhibitor pages concurrently (limit to prevent overload)
+                detail_urls = exhibitor_urls[:settings.exhibitor_detail_max_pages]
+                async for ex_url, exhibitor in self._iter_exhibitor_details(page, detail_urls):
+                    if exhibitor:
+                        exhibitor['detail_url'] = ex_url
+                        exhibitors.append(exhibitor)
                         
                 if exhibitors:
                     return exhibitors
@@ -311,6 +409,86 @@ class VegasMarketScraper(BaseTradeshowScraper):
         
         return exhibitors
     
+    async def _iter_exhibitor_details(self, page: Page, urls: List[str]) -> AsyncIterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Visit exhibitor detail pages concurrently in pages of the scraper's context.
+        Yields (url, exhibitor or None) as each page finishes; a page that takes
+        longer than the detail timeout yields None instead of holding up the rest.
+        """
+        timeout = settings.exhibitor_detail_timeout
+        
+        async with PagePool(page.context, settings.exhibitor_detail_concurrency) as pool:
+            async def visit(url: str):
+                try:
+                    async with pool.page() as detail_page:
+                        return url, await asyncio.wait_for(self._visit_exhibitor_page(detail_page, url), timeout)
+                except asyncio.TimeoutError:
+                    logger.debug(f"Exhibitor page timed out after {timeout}s: {url}")
+                except Exception as e:
+                    logger.debug(f"Failed to extract exhibitor page {url}: {e}")
+                return url, None
+            
+            tasks = [asyncio.ensure_future(visit(url)) for url in urls]
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    yield await finished
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _visit_exhibitor_page(self, page: Page, url: str) -> Optional[Dict[str, Any]]:
+        await page.goto(url, timeout=settings.exhibitor_detail_timeout * 1000)
+        return await self._extract_exhibitor_from_page(page)
+    
+    async def _stream_exhibitor_websites(self, page: Page, exhibitors: List[Dict[str, Any]]) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Fill in websites from detail pages for exhibitors that have none yet.
+        A 'website' on the show's own site is the exhibitor's detail page, not its website.
+        Yields the exhibitors that need no visit first, then the others as their
+        detail pages finish; at most exhibitor_detail_max_pages pages per scrape.
+        """
+        ready: List[Dict[str, Any]] = []
+        pending: Dict[str, List[Dict[str, Any]]] = {}
+        for exhibitor in exhibitors:
+            website = exhibitor.get('website')
+            if website and self._is_show_url(website):
+                exhibitor.setdefault('detail_url', urljoin(self.base_url, exhibitor.pop('website')))
+            elif website:
+                ready.append(exhibitor)
+                continue
+            if exhibitor.get('detail_url'):
+                pending.setdefault(urljoin(self.base_url, exhibitor['detail_url']), []).append(exhibitor)
+            else:
+                ready.append(exhibitor)
+        
+        budget = max(self._detail_pages_left, 0)
+        urls = list(pending)[:budget]
+        self._detail_pages_left = budget - len(urls)
+        for url in list(pending)[len(urls):]:
+            ready.extend(pending.pop(url))
+        if ready:
+            yield ready
+        if not urls:
+            return
+        
+        logger.info(f"Resolving {len(urls)} exhibitor websites from detail pages...")
+        resolved = 0
+        async for url, details in self._iter_exhibitor_details(page, urls):
+            website = (details or {}).get('website')
+            if website and not self._is_show_url(website):
+                resolved += 1
+                for exhibitor in pending[url]:
+                    exhibitor['website'] = website
+                    if details.get('booth_number'):
+                        exhibitor.setdefault('booth_number', details['booth_number'])
+            yield pending[url]
+        logger.info(f"Resolved {resolved} of {len(urls)} exhibitor websites from detail pages")
+    
+    def _is_show_url(self, url: str) -> bool:
+        """True for relative links and links on the trade show's own site"""
+        return host_key(urljoin(self.base_url, url)) == host_key(self.base_url)
+    
     async def _smart_infinite_scroll(self, page: Page, max_scrolls: int = 50):
         """
         Intelligent infinite scroll with multiple strategies
@@ -333,7 +511,7 @@ class VegasMarketScraper(BaseTradeshowScraper):
                     button = await page.query_selector(selector)
                     if button:
                         await button.click()
-                        await asyncio.sleep(2)
+                        await wait_for_settled(page)
                     else:
                         break
             except:
@@ -347,8 +525,8 @@ class VegasMarketScraper(BaseTradeshowScraper):
             # Scroll down
             await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
             
-            # Random wait to appear human
-            await asyncio.sleep(random.uniform(1.5, 3.0))
+            # Wait for the next batch to load
+            await wait_for_settled(page)
             
             # Check for new content
             new_height = await page.evaluate('document.body.scrollHeight')
@@ -359,9 +537,9 @@ class VegasMarketScraper(BaseTradeshowScraper):
                 # Try scrolling up a bit then down again (sometimes triggers load)
                 if same_height_count == 2:
                     await page.evaluate('window.scrollTo(0, document.body.scrollHeight - 1000)')
-                    await asyncio.sleep(1)
+                    await wait_for_settled(page)
                     await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                    await asyncio.sleep(2)
+                    await wait_for_settled(page)
                 
                 if same_height_count >= 3:
                     logger.info("No new content after 3 attempts, stopping scroll")
@@ -396,7 +574,7 @@ class VegasMarketScraper(BaseTradeshowScraper):
                 button = await page.query_selector(selector)
                 if button and await button.is_visible():
                     await button.click()
-                    await asyncio.sleep(1)
+                    await wait_for_settled(page)
                     logger.debug(f"Closed popup with selector: {selector}")
             except:
                 continue
@@ -630,14 +808,22 @@ class VegasMarketScraper(BaseTradeshowScraper):
                 exhibitor['website'] = str(item[field]).strip()
                 break
         
+        # Common field names for the exhibitor's page on the show site
+        detail_fields = ['detailUrl', 'detail_url', 'profileUrl', 'profile_url', 'permalink']
+        
+        for field in detail_fields:
+            if field in item and item[field]:
+                exhibitor['detail_url'] = str(item[field]).strip()
+                break
+        
         # Store raw data for debugging
         exhibitor['raw_api_data'] = item
         
         return exhibitor if exhibitor.get('company_name') else None
     
-    def _deduplicate_exhibitors(self, exhibitors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Remove duplicate exhibitors based on company name"""
-        seen = set()
+    def _deduplicate_exhibitors(self, exhibitors: List[Dict[str, Any]], seen: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """Remove duplicate exhibitors based on company name; pass `seen` to dedupe across batches"""
+        seen = set() if seen is None else seen
         unique = []
         
         for exhibitor in exhibitors:
@@ -6,10 +6,9 @@ import logging
 import re
 import requests
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
+from .evidence_engine import EvidenceEngine, SiteSnapshot, get_evidence_engine
+from .keyword_matcher import KeywordMatcher
+from .html_parser import parse_soup
 from typing import Dict, List, Any, Optional, Optional
 from datetime import datetime
 # from selenium import webdriver
@@ -23,14 +22,34 @@ class WebsiteEvidenceExtractor:
     """
     Extracts specific evidence of the 5 proven EDPs from websites
     Each method maps to validated pain points from 14 won deals
+    Pages come from the shared EvidenceEngine, which the v2 extractor also reads
     """
     
-    def __init__(self):
+    def __init__(self, engine: Optional[EvidenceEngine] = None):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         
+        # Static HTTP first, browser render only for pages that need JavaScript;
+        # homepages are fetched and parsed once for v1 and v2 alike
+        self.engine = engine or get_evidence_engine()
+        self.fetcher = self.engine.fetcher
+        self.domain_health = self.engine.domain_health
+        
+        # Keyword signals checked against the visible page text, matched in one scan
+        self.keyword_matcher = KeywordMatcher({
+            'portal': ['dealer login', 'rep login', 'partner portal', 'sales portal'],
+            'modern_framework': ['react', 'vue', 'angular', 'webpack'],
+            'rep_locator': ['find a rep', 'find a dealer', 'where to buy', 'locate a representative'],
+            'rep_resources': ['rep resources', 'sales resources', 'partner resources', 'dealer resources'],
+            'territory': ['territory', 'territories', 'region', 'coverage area'],
+            'login_types': ['dealer login', 'customer login', 'trade login', 'rep login'],
+            'login': ['login'],
+            'price': ['price'],
+            'trade_shows': ['vegas market', 'high point market', 'neocon', 'lightovation']
+        })
+        
         # Map website indicators to proven EDPs
         self.edp_indicators = {
             'sales_enablement_collapse': {
@@ -87,22 +106,6 @@ class WebsiteEvidenceExtractor:
             }
         }
     
-    def _get_dynamic_html(self, url: str) -> str:
-        """
-        Uses Selenium to fetch fully rendered HTML (including JS content)
-        """
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=chrome_options)
-        driver.get(url)
-        html = driver.page_source
-        driver.quit()
-        return html
-
     def analyze_website(self, domain: str) -> Dict[str, Any]:
         """
         Complete website analysis for all 5 EDPs
@@ -113,6 +116,13 @@ class WebsiteEvidenceExtractor:
         if not domain.startswith('http'):
             domain = f'https://{domain}'
         
+        # Static fetch, escalating to a Selenium render when JS is required;
+        # reuses the homepage if the v2 extractor just fetched it
+        return self.analyze_snapshot(self.engine.snapshot(domain, full=False))
+    
+    def analyze_snapshot(self, snapshot: SiteSnapshot) -> Dict[str, Any]:
+        """Map an already fetched and parsed site to the 5 EDPs"""
+        domain = snapshot.domain
         results = {
             'domain': domain,
             'scan_timestamp': datetime.now().isoformat(),
@@ -122,22 +132,26 @@ class WebsiteEvidenceExtractor:
             'tam_indicators': {}
         }
         
+        # Known dead, parked or redirected domains and failed fetches
+        if snapshot.error:
+            results['error'] = snapshot.error
+            return results
+        
         try:
-            # Use Selenium to fetch fully rendered HTML
-            html = self._get_dynamic_html(domain)
-            soup = BeautifulSoup(html, 'html.parser')
-            text_content = soup.get_text().lower()
+            soup = snapshot.soup
+            text_content = snapshot.text_content
+            hits = self.keyword_matcher.scan(text_content)
 
             # Check each EDP
             for edp_name, edp_config in self.edp_indicators.items():
-                evidence = self._check_edp_indicators(domain, edp_name, edp_config, soup, text_content)
+                evidence = self._check_edp_indicators(domain, edp_name, edp_config, soup, hits, snapshot)
                 results['edp_evidence'][edp_name] = evidence
                 # Add specific findings for messaging
                 if evidence['score'] > 0.5:
                     results['specific_findings'].extend(evidence['specific_issues'])
 
             # Extract additional context
-            results['personalization_hooks'] = self._extract_personalization_data(soup)
+            results['personalization_hooks'] = self._extract_personalization_data(soup, hits)
             results['tam_indicators'] = self._identify_tam_tier_indicators(results)
 
         except Exception as e:
@@ -146,7 +160,8 @@ class WebsiteEvidenceExtractor:
 
         return results
     
-    def _check_edp_indicators(self, domain: str, edp_name: str, config: Dict, soup: BeautifulSoup, text_content: str) -> Dict:
+    def _check_edp_indicators(self, domain: str, edp_name: str, config: Dict, soup: BeautifulSoup, hits: Dict[str, List[str]],
+                              snapshot: Optional[SiteSnapshot] = None) -> Dict:
         """
         Check specific indicators for each EDP
         """
@@ -161,22 +176,22 @@ class WebsiteEvidenceExtractor:
         
         # Check each indicator based on EDP type
         if edp_name == 'sales_enablement_collapse':
-            evidence = self._check_sales_enablement_indicators(domain, soup, text_content)
+            evidence = self._check_sales_enablement_indicators(domain, soup, hits)
         elif edp_name == 'technology_obsolescence':
-            evidence = self._check_technology_indicators(domain, soup, text_content)
+            evidence = self._check_technology_indicators(domain, soup, hits)
         elif edp_name == 'rep_performance_crisis':
-            evidence = self._check_rep_indicators(domain, soup, text_content)
+            evidence = self._check_rep_indicators(domain, soup, hits)
         elif edp_name == 'sku_complexity':
-            evidence = self._check_catalog_indicators(domain, soup)
+            evidence = self._check_catalog_indicators(domain, soup, snapshot)
         elif edp_name == 'channel_conflict':
-            evidence = self._check_channel_indicators(domain, soup)
+            evidence = self._check_channel_indicators(domain, soup, hits)
         
         # Apply weight from won deals
         evidence['weighted_score'] = evidence['score'] * config['weight']
         
         return evidence
     
-    def _check_sales_enablement_indicators(self, domain: str, soup: BeautifulSoup, text_content: str) -> Dict:
+    def _check_sales_enablement_indicators(self, domain: str, soup: BeautifulSoup, hits: Dict[str, List[str]]) -> Dict:
         """Check for sales enablement collapse indicators"""
         
         evidence = {
@@ -212,8 +227,7 @@ class WebsiteEvidenceExtractor:
                 evidence['score'] += 0.30
             
             # Check for dealer/rep portal
-            portal_indicators = ['dealer login', 'rep login', 'partner portal', 'sales portal']
-            portal_found = any(indicator in text_content for indicator in portal_indicators)
+            portal_found = 'portal' in hits
             
             if not portal_found:
                 evidence['indicators_found'].append('no_dealer_portal')
@@ -233,7 +247,7 @@ class WebsiteEvidenceExtractor:
         
         return evidence
     
-    def _check_technology_indicators(self, domain: str, soup: BeautifulSoup, text_content: str) -> Dict:
+    def _check_technology_indicators(self, domain: str, soup: BeautifulSoup, hits: Dict[str, List[str]]) -> Dict:
         """Check for technology obsolescence indicators"""
         
         evidence = {
@@ -267,8 +281,7 @@ class WebsiteEvidenceExtractor:
                         break
 
             # Check for modern features
-            modern_indicators = ['react', 'vue', 'angular', 'webpack']
-            has_modern = any(ind in text_content for ind in modern_indicators)
+            has_modern = 'modern_framework' in hits
             
             if not has_modern:
                 evidence['indicators_found'].append('no_modern_framework')
@@ -288,7 +301,7 @@ class WebsiteEvidenceExtractor:
         
         return evidence
     
-    def _check_rep_indicators(self, domain: str, soup: BeautifulSoup, text_content: str) -> Dict:
+    def _check_rep_indicators(self, domain: str, soup: BeautifulSoup, hits: Dict[str, List[str]]) -> Dict:
         """Check for rep performance crisis indicators"""
         
         evidence = {
@@ -300,8 +313,7 @@ class WebsiteEvidenceExtractor:
         
         try:
             # Check for rep locator
-            locator_indicators = ['find a rep', 'find a dealer', 'where to buy', 'locate a representative']
-            has_locator = any(ind in text_content for ind in locator_indicators)
+            has_locator = 'rep_locator' in hits
             
             if not has_locator:
                 evidence['indicators_found'].append('no_rep_locator')
@@ -309,8 +321,7 @@ class WebsiteEvidenceExtractor:
                 evidence['score'] += 0.35
             
             # Check for rep resources
-            resource_indicators = ['rep resources', 'sales resources', 'partner resources', 'dealer resources']
-            has_resources = any(ind in text_content for ind in resource_indicators)
+            has_resources = 'rep_resources' in hits
             
             if not has_resources:
                 evidence['indicators_found'].append('no_rep_resources')
@@ -318,8 +329,7 @@ class WebsiteEvidenceExtractor:
                 evidence['score'] += 0.35
             
             # Check for territory information
-            territory_indicators = ['territory', 'territories', 'region', 'coverage area']
-            has_territory = any(ind in text_content for ind in territory_indicators)
+            has_territory = 'territory' in hits
             
             if not has_territory:
                 evidence['indicators_found'].append('no_territory_info')
@@ -339,7 +349,8 @@ class WebsiteEvidenceExtractor:
         
         return evidence
     
-    def _check_catalog_indicators(self, domain: str, home_soup: BeautifulSoup) -> Dict:
+    def _check_catalog_indicators(self, domain: str, home_soup: BeautifulSoup,
+                                  snapshot: Optional[SiteSnapshot] = None) -> Dict:
         """Check for SKU complexity indicators"""
         
         evidence = {
@@ -358,9 +369,11 @@ class WebsiteEvidenceExtractor:
                 evidence['score'] += 0.10
                 return evidence
 
-            # Use Selenium to fetch fully rendered HTML for the catalog/product page
-            html = self._get_dynamic_html(product_page_url)
-            soup = BeautifulSoup(html, 'html.parser')
+            # Fetch the catalog/product page, rendering only if the static HTML is unusable,
+            # unless the crawl for the v2 columns already brought it in
+            html = (snapshot.crawled_html(product_page_url) if snapshot else None) or \
+                self.fetcher.fetch_sync(product_page_url)['html']
+            soup = parse_soup(html)
 
             # Check for filtering options (heuristic: less than 3 is poor for B2B)
             filter_elements = soup.find_all(['select', 'input'], 
@@ -504,7 +517,7 @@ class WebsiteEvidenceExtractor:
                         return f"{domain.rstrip('/')}/{href}"
         return None
 
-    def _check_channel_indicators(self, domain: str, soup: BeautifulSoup) -> Dict:
+    def _check_channel_indicators(self, domain: str, soup: BeautifulSoup, hits: Dict[str, List[str]]) -> Dict:
         """
         Check for channel conflict indicators
         """
@@ -515,16 +528,14 @@ class WebsiteEvidenceExtractor:
             'specific_issues': []
         }
         try:
-            text_content = soup.get_text().lower()
             # Check for multiple login types
-            login_types = ['dealer login', 'customer login', 'trade login', 'rep login']
-            login_count = sum(1 for login in login_types if login in text_content)
+            login_count = len(hits.get('login_types', []))
             if login_count >= 2:
                 evidence['indicators_found'].append('multiple_portals')
                 evidence['specific_issues'].append(f'{login_count} different login portals found')
                 evidence['score'] += 0.35
             # Check pricing visibility
-            if 'login' in text_content and 'price' in text_content:
+            if 'login' in hits and 'price' in hits:
                 evidence['indicators_found'].append('hidden_pricing')
                 evidence['specific_issues'].append('Pricing requires login - channel conflict likely')
                 evidence['score'] += 0.30
@@ -540,7 +551,7 @@ class WebsiteEvidenceExtractor:
         else:
             evidence['evidence_strength'] = 'none'
         return evidence
-    def _extract_personalization_data(self, soup: BeautifulSoup) -> List[Dict]:
+    def _extract_personalization_data(self, soup: BeautifulSoup, hits: Dict[str, List[str]]) -> List[Dict]:
         """Extract specific data points for message personalization"""
         hooks = []
         
@@ -554,14 +565,11 @@ class WebsiteEvidenceExtractor:
                 })
             
             # Look for trade shows mentioned
-            text_content = soup.get_text().lower()
-            trade_shows = ['vegas market', 'high point market', 'neocon', 'lightovation']
-            for show in trade_shows:
-                if show.lower() in text_content:
-                    hooks.append({
-                        'type': 'trade_show',
-                        'value': show
-                    })
+            for show in hits.get('trade_shows', []):
+                hooks.append({
+                    'type': 'trade_show',
+                    'value': show
+                })
             
             # Extract product categories from navigation
             nav = soup.find('nav') or soup.find('div', class_='navigation')
@@ -7,29 +7,52 @@ Integrates with validated PSI calculator and message generator
 import logging
 import re
 import requests
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
+from .evidence_engine import EvidenceEngine, SiteSnapshot, get_evidence_engine
+from .dom_features import PageFeatures, merge_page_features
+from .html_parser import ParsedPage, parse_page
+from .keyword_matcher import KeywordMatcher
+from .evidence_memo import get_evidence_memo, html_digest
+from .edp_rules import get_edp_rules
+from .sitemap import CatalogEstimate
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import time
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever a change to parsing, keyword tables or scoring would change
+# the results; memoized results from other versions are then discarded
+EXTRACTOR_VERSION = '2.3'
+
 class WebsiteEvidenceExtractorV2:
     """
     Enhanced website evidence extractor for comprehensive EDP analysis
     Matches the detailed structure from SuperCat_EDP_Analysis.csv
+    Fetching and parsing are done by the shared EvidenceEngine; this class
+    projects its snapshots into the EDPx_* columns.
     """
     
-    def __init__(self):
+    def __init__(self, replay: Optional[bool] = None, engine: Optional[EvidenceEngine] = None):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         
+        # Fetches, crawls and parses once for both evidence schemas
+        self.engine = engine or get_evidence_engine(replay)
+        self.fetcher = self.engine.fetcher
+        self.crawl_planner = self.engine.crawl_planner
+        self.domain_health = self.engine.domain_health
+        
+        # Replay re-scores archived pages offline, so it skips the network and the memo
+        self.replay = self.engine.replay
+        
+        # Results already computed from the same HTML by this extractor version
+        self.memo = None if self.replay else get_evidence_memo(EXTRACTOR_VERSION)
+        
+        # Pain score weights live in config/edp_rules.json
+        self.rules = get_edp_rules()
+        
         # Trade shows to detect
         self.trade_shows = {
             'High Point Market': ['high point market', 'hpmkt', 'highpoint'],
@@ -51,21 +74,225 @@ class WebsiteEvidenceExtractorV2:
             'service worker', 'intersection observer', 'viewport meta',
             'html5', 'es modules', 'webauthn', 'progressive web app'
         ]
+        
+        # CMS platforms to detect
+        self.cms_indicators = {
+            'wordpress': ['wp-content', 'wordpress'],
+            'shopify': ['shopify', 'myshopify'],
+            'magento': ['magento'],
+            'drupal': ['drupal'],
+            'squarespace': ['squarespace'],
+            'wix': ['wix.com']
+        }
+        
+        # Legacy technology to detect
+        self.legacy_indicators = {
+            'flash': ['flash', 'swf'],
+            'old_jquery': ['jquery-1.', 'jquery/1.'],
+            'old_wordpress': ['wp-content/themes/twentyten', 'wp-content/themes/twentyeleven'],
+            'old_bootstrap': ['bootstrap-2.', 'bootstrap/2.'],
+            'ie_specific': ['<!--[if IE', 'filter:progid']
+        }
+        
+        # Product types to detect
+        self.product_keywords = {
+            'furniture': ['furniture', 'seating', 'tables', 'chairs', 'sofas', 'beds'],
+            'lighting': ['lighting', 'lamps', 'fixtures', 'chandeliers', 'sconces'],
+            'outdoor': ['outdoor', 'patio', 'garden', 'exterior'],
+            'decor': ['decor', 'accessories', 'art', 'mirrors', 'rugs']
+        }
+        
+        # Keyword signals matched against the visible page text
+        self.text_keywords = {
+            'configurator': ['configure', 'customize', 'build your', 'options', 'configurator'],
+            'rep_locator': ['find a rep', 'find a dealer', 'where to buy', 'locate a representative', 'rep locator'],
+            'rep_portal': ['rep login', 'dealer login', 'partner portal', 'sales portal', 'rep portal'],
+            'rep_resources': ['rep resources', 'sales resources', 'partner resources', 'dealer resources', 'sales tools'],
+            'territory': ['territory', 'territories', 'region', 'coverage area', 'sales territory'],
+            'complex': ['complex'],
+            'national': ['nationwide', 'national'],
+            'regional': ['regional'],
+            'direct_sales': ['direct sales', 'buy direct', 'factory direct'],
+            'dealer_network': ['dealer', 'authorized dealer', 'showroom', 'retailer'],
+            'ecommerce': ['add to cart', 'buy now', 'shop online', 'e-commerce', 'online store'],
+            'trade_program': ['trade program', 'trade only', 'to the trade', 'designer program'],
+            'contract_sales': ['contract sales', 'hospitality', 'commercial', 'project sales'],
+            'hidden_pricing': ['call for price', 'request quote'],
+            'login': ['login'],
+            'price': ['price'],
+            'public_pricing': ['$', 'price', 'cost'],
+            'comparison': ['compare', 'comparison', 'compare products', 'side by side'],
+            'wishlist': ['wishlist', 'favorites', 'save', 'quote', 'request quote'],
+            'project_boards': ['project', 'mood board', 'inspiration', 'collection', 'project board'],
+            'modern_features': self.modern_features,
+            'integration': ['api', 'integration', 'webhook', 'rest', 'graphql', 'oauth'],
+            'high_point_market': ['high point market'],
+            'audience_trade': ['trade only', 'to the trade', 'designer'],
+            'audience_b2b': ['b2b', 'wholesale', 'dealer'],
+            'audience_b2c': ['retail', 'consumer', 'buy now'],
+            'geo_worldwide': ['worldwide', 'international', 'global'],
+            'geo_usa': ['nationwide', 'national', 'usa', 'america'],
+            'geo_regional': ['regional', 'local']
+        }
+        for show_name, keywords in self.trade_shows.items():
+            self.text_keywords[f'trade_show:{show_name}'] = keywords
+        for category, keywords in self.product_keywords.items():
+            self.text_keywords[f'product:{category}'] = keywords
+        
+        # Keyword signals matched against the raw HTML
+        self.html_keywords = {
+            'modern_features': self.modern_features,
+            'js_frameworks': self.js_frameworks,
+            'cdn': ['cdn', 'cloudflare', 'amazonaws', 'fastly', 'maxcdn']
+        }
+        for cms, indicators in self.cms_indicators.items():
+            self.html_keywords[f'cms:{cms}'] = indicators
+        for tech, indicators in self.legacy_indicators.items():
+            self.html_keywords[f'legacy:{tech}'] = indicators
+        
+        # One scan of the text and one of the HTML answer every keyword check
+        self.text_matcher = KeywordMatcher(self.text_keywords)
+        self.html_matcher = KeywordMatcher(self.html_keywords)
     
     def analyze_website_comprehensive(self, domain: str) -> Dict[str, Any]:
         """
         Comprehensive website analysis matching CSV structure
         """
         
+        return self.analyze_snapshot(self.engine.snapshot(domain))
+    
+    def analyze_snapshot(self, snapshot: SiteSnapshot) -> Dict[str, Any]:
+        """Score a site the engine already fetched, crawled and parsed"""
+        if snapshot.error:
+            return self.error_results(snapshot.domain, snapshot.error)
+        return self.analyze_html(snapshot.domain, snapshot.html, snapshot.elapsed, snapshot.tier,
+                                 subpages=snapshot.subpages, page=snapshot.page, catalog=snapshot.catalog)
+    
+    def estimate_catalog(self, url: str) -> Optional[CatalogEstimate]:
+        """Catalog size from the site's sitemaps, or None when it has none or they are disabled"""
+        return self.engine.estimate_catalog(url)
+    
+    def analyze_html(self, domain: str, html: str, load_time: float, fetch_tier: str = 'Unknown',
+                     subpages: Optional[List[Dict[str, Any]]] = None,
+                     page: Optional[ParsedPage] = None,
+                     catalog: Optional[CatalogEstimate] = None,
+                     page_digest: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Score already-fetched HTML; shared by the sync extractor and the async engine.
+        subpages are crawled fetch results whose features are merged with the homepage's;
+        page is the homepage if the caller already parsed it; catalog is the sitemap count.
+        A caller holding only the parsed page passes the homepage's html_digest as
+        page_digest instead of its HTML.
+        """
+        
         if not domain.startswith('http'):
             domain = f'https://{domain}'
+        subpages = subpages or []
+        
+        # Unchanged pages: reuse the stored result without parsing or scoring
+        digest = None
+        if self.memo:
+            catalog_key = f'{catalog.product_count}/{catalog.category_count}' if catalog else ''
+            parts = ([page_digest or html_digest(html), catalog_key]
+                     + [html_digest(subpage['html']) for subpage in subpages])
+            digest = html_digest('\0'.join(parts))
+        if digest:
+            memoized = self.memo.get(domain, digest)
+            if memoized is not None:
+                # Same pages, but this fetch's timing and tier; rescored so
+                # edited rule weights apply without re-analyzing
+                self._apply_fetch(memoized, load_time, fetch_tier, subpages)
+                return self.rules.apply(memoized)
+        
+        results = self._new_results(domain)
+        self._apply_fetch(results, load_time, fetch_tier, subpages)
+        
+        try:
+            # Parse with the configured backend and walk the DOM once;
+            # every analyzer reads from the collected features
+            page = page or parse_page(html)
+            text_content = page.text_content
+            features = page.features
+            
+            # Crawled pages add their text and features to the homepage's
+            parsed = []
+            if subpages:
+                parsed = [parse_page(subpage['html']) for subpage in subpages]
+                text_content = '\n'.join([text_content] + [sub.text_content for sub in parsed])
+                features = merge_page_features(features, [sub.features for sub in parsed])
+            
+            # Scan text and HTML once for every keyword table
+            text_hits = self.text_matcher.scan(text_content)
+            if page.html_keywords is None:
+                html_hits = self.html_matcher.scan(features.html_lower)
+            else:
+                # A parse worker scanned the homepage HTML and kept only the keywords found
+                found = set(page.html_keywords)
+                for sub in parsed:
+                    found |= self.html_matcher.found(sub.features.html_lower)
+                html_hits = self.html_matcher.group(found)
+            
+            # Analyze each EDP category
+            self._analyze_edp1_sku_complexity(features, text_hits, results, catalog)
+            self._analyze_edp2_rep_management(features, text_hits, results)
+            self._analyze_edp6_channel_conflict(features, text_hits, results)
+            self._analyze_edp7_sales_enablement(features, text_hits, results)
+            self._analyze_edp8_technology(domain, features, text_content, text_hits, html_hits, results)
+            
+            # Extract additional context
+            self._extract_trade_shows(text_hits, results)
+            self._extract_product_context(features, text_hits, results)
+            self._extract_technical_details(features, results)
+            
+            # Calculate pain scores
+            self._calculate_pain_scores(results)
+            
+        except Exception as e:
+            logger.error(f"Error analyzing {domain}: {e}")
+            results['error'] = str(e)
+            return results
         
-        results = {
+        if digest:
+            self.memo.put(domain, digest, results)
+        
+        return results
+    
+    def _apply_fetch(self, results: Dict[str, Any], load_time: float, fetch_tier: str,
+                     subpages: List[Dict[str, Any]]):
+        """Fields that describe this fetch rather than the page content"""
+        results['scan_timestamp'] = datetime.now().isoformat()
+        results['EDP8_Load_Time_Seconds'] = round(load_time, 1)
+        results['Fetch_Tier'] = fetch_tier
+        results['Pages_Analyzed'] = 1 + len(subpages)
+        results['Crawled_Pages'] = [subpage.get('final_url') or subpage['url'] for subpage in subpages]
+        
+        # Page speed scoring (simplified), on the rounded time as reported
+        load_time = results['EDP8_Load_Time_Seconds']
+        if load_time < 2:
+            results['EDP8_Page_Speed_Score'] = 'Good'
+        elif load_time < 4:
+            results['EDP8_Page_Speed_Score'] = 'Average'
+        else:
+            results['EDP8_Page_Speed_Score'] = 'Poor'
+    
+    def error_results(self, domain: str, error: str) -> Dict[str, Any]:
+        """Default-valued results for a domain that could not be fetched"""
+        if not domain.startswith('http'):
+            domain = f'https://{domain}'
+        results = self._new_results(domain)
+        results['error'] = error
+        return results
+    
+    def _new_results(self, domain: str) -> Dict[str, Any]:
+        """Result skeleton with every CSV column at its default value"""
+        return {
             'domain': domain,
             'scan_timestamp': datetime.now().isoformat(),
             
             # EDP1: SKU Complexity Analysis
             'EDP1_SKU_Count_Estimate': 0,
+            'EDP1_SKU_Estimate_Source': 'Unknown',
+            'EDP1_Sitemap_Product_Count': 0,
             'EDP1_Product_Categories': [],
             'EDP1_Category_Count': 0,
             'EDP1_Configuration_Options': False,
@@ -151,135 +378,61 @@ class WebsiteEvidenceExtractorV2:
             'Has_Events_Page': False,
             'Broken_Links_Count': 0,
             'Uses_Modern_CSS': False,
-            'Website_Tech_Stack': []
+            'Website_Tech_Stack': [],
+            'Fetch_Tier': 'Unknown',
+            'Pages_Analyzed': 0,
+            'Crawled_Pages': []
         }
-        
-        try:
-            # Get page content with timing
-            start_time = time.time()
-            html = self._get_dynamic_html(domain)
-            load_time = time.time() - start_time
-            results['EDP8_Load_Time_Seconds'] = round(load_time, 1)
-            
-            soup = BeautifulSoup(html, 'html.parser')
-            text_content = soup.get_text().lower()
-            
-            # Analyze each EDP category
-            self._analyze_edp1_sku_complexity(soup, text_content, results)
-            self._analyze_edp2_rep_management(soup, text_content, results)
-            self._analyze_edp6_channel_conflict(soup, text_content, results)
-            self._analyze_edp7_sales_enablement(soup, text_content, results)
-            self._analyze_edp8_technology(domain, soup, text_content, results)
-            
-            # Extract additional context
-            self._extract_trade_shows(text_content, results)
-            self._extract_product_context(soup, text_content, results)
-            self._extract_technical_details(soup, html, results)
-            
-            # Calculate pain scores
-            self._calculate_pain_scores(results)
-            
-        except Exception as e:
-            logger.error(f"Error analyzing {domain}: {e}")
-            results['error'] = str(e)
-        
-        return results
-    
-    def _get_dynamic_html(self, url: str) -> str:
-        """Get fully rendered HTML using Selenium"""
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-logging')
-        chrome_options.add_argument('--log-level=3')
-        
-        driver = webdriver.Chrome(
-            service=ChromeService(ChromeDriverManager().install()), 
-            options=chrome_options
-        )
-        
-        try:
-            driver.get(url)
-            time.sleep(3)  # Wait for dynamic content
-            html = driver.page_source
-        finally:
-            driver.quit()
-        
-        return html
     
-    def _analyze_edp1_sku_complexity(self, soup: BeautifulSoup, text_content: str, results: Dict):
+    def _analyze_edp1_sku_complexity(self, features: PageFeatures, hits: Dict[str, List[str]], results: Dict,
+                                     catalog: Optional[CatalogEstimate] = None):
         """Analyze EDP1: SKU Complexity indicators"""
         
         # Product search detection
-        search_elements = soup.find_all(['input'], attrs={'type': 'search'}) or \
-                         soup.find_all(['input'], attrs={'placeholder': lambda x: x and 'search' in x.lower()}) or \
-                         soup.find_all(['button'], string=lambda x: x and 'search' in x.lower())
+        search_count = features.search_element_count
         
-        results['EDP1_Has_Search'] = len(search_elements) > 0
+        results['EDP1_Has_Search'] = search_count > 0
         
         if results['EDP1_Has_Search']:
-            results['EDP1_Search_Sophistication'] = 'Advanced' if len(search_elements) > 2 else 'Basic'
-        
-        # Product categories detection
-        nav_elements = soup.find_all(['nav', 'ul', 'div'], class_=lambda x: x and any(
-            term in x.lower() for term in ['nav', 'menu', 'category', 'product']
-        ))
+            results['EDP1_Search_Sophistication'] = 'Advanced' if search_count > 2 else 'Basic'
         
-        categories = []
-        for nav in nav_elements:
-            links = nav.find_all('a')
-            for link in links[:10]:  # Limit to avoid noise
-                text = link.get_text().strip()
-                if len(text) > 2 and len(text) < 50:
-                    categories.append(text)
+        # Product categories detection (first 10 links of each nav/menu container)
+        categories = features.nav_link_texts
         
         results['EDP1_Product_Categories'] = list(set(categories))[:20]  # Limit and dedupe
         results['EDP1_Category_Count'] = len(results['EDP1_Product_Categories'])
         
         # Filter options detection
-        filter_elements = soup.find_all(['select', 'input'], attrs={
-            'class': lambda x: x and any(term in x.lower() for term in ['filter', 'sort', 'refine'])
-        })
-        
-        filter_options = []
-        for element in filter_elements:
-            if element.name == 'select':
-                options = element.find_all('option')
-                if len(options) > 1:
-                    filter_options.append(f"Select: {element.get('name', 'unknown')}")
-            else:
-                filter_options.append(f"Input: {element.get('name', 'unknown')}")
+        filter_options = list(features.filter_options)
         
         results['EDP1_Filter_Options'] = filter_options
         results['EDP1_Filter_Count'] = len(filter_options)
         
         # Configurator detection
-        config_keywords = ['configure', 'customize', 'build your', 'options', 'configurator']
-        results['EDP1_Has_Configurator'] = any(keyword in text_content for keyword in config_keywords)
+        results['EDP1_Has_Configurator'] = 'configurator' in hits
         results['EDP1_Configuration_Options'] = results['EDP1_Has_Configurator']
         
         # Catalog format detection
-        pdf_links = soup.find_all('a', href=lambda x: x and '.pdf' in x.lower())
-        if len(pdf_links) > 5:
+        if features.pdf_link_count > 5:
             results['EDP1_Catalog_Format'] = 'PDF-heavy'
         elif results['EDP1_Has_Search']:
             results['EDP1_Catalog_Format'] = 'Interactive catalog'
         else:
             results['EDP1_Catalog_Format'] = 'Basic website'
         
-        # SKU count estimation (heuristic)
-        product_indicators = soup.find_all(string=re.compile(r'\d+\s*(products|items|SKUs)', re.I))
-        if product_indicators:
-            for indicator in product_indicators:
-                match = re.search(r'(\d+)', indicator)
-                if match:
-                    results['EDP1_SKU_Count_Estimate'] = max(results['EDP1_SKU_Count_Estimate'], int(match.group(1)))
+        # SKU count estimation: a stated count on the page, or the product pages the sitemaps list
+        results['EDP1_SKU_Count_Estimate'] = max(results['EDP1_SKU_Count_Estimate'], features.sku_count_max)
+        if features.sku_count_max:
+            results['EDP1_SKU_Estimate_Source'] = 'Page text'
+        if catalog and catalog.product_count:
+            results['EDP1_Sitemap_Product_Count'] = catalog.product_count
+            if catalog.product_count > results['EDP1_SKU_Count_Estimate']:
+                results['EDP1_SKU_Count_Estimate'] = catalog.product_count
+                results['EDP1_SKU_Estimate_Source'] = 'Sitemap'
         
         # If no explicit count, estimate from categories and complexity
         if results['EDP1_SKU_Count_Estimate'] == 0:
+            results['EDP1_SKU_Estimate_Source'] = 'Navigation heuristic'
             if results['EDP1_Category_Count'] > 15:
                 results['EDP1_SKU_Count_Estimate'] = 5000
             elif results['EDP1_Category_Count'] > 8:
@@ -289,73 +442,66 @@ class WebsiteEvidenceExtractorV2:
             else:
                 results['EDP1_SKU_Count_Estimate'] = 500
     
-    def _analyze_edp2_rep_management(self, soup: BeautifulSoup, text_content: str, results: Dict):
+    def _analyze_edp2_rep_management(self, features: PageFeatures, hits: Dict[str, List[str]], results: Dict):
         """Analyze EDP2: Rep Management indicators"""
         
         # Rep locator detection
-        locator_keywords = ['find a rep', 'find a dealer', 'where to buy', 'locate a representative', 'rep locator']
-        results['EDP2_Has_Rep_Locator'] = any(keyword in text_content for keyword in locator_keywords)
+        results['EDP2_Has_Rep_Locator'] = 'rep_locator' in hits
         
         # Rep portal detection
-        portal_keywords = ['rep login', 'dealer login', 'partner portal', 'sales portal', 'rep portal']
-        rep_login_found = []
-        for keyword in portal_keywords:
-            if keyword in text_content:
-                rep_login_found.append(keyword)
+        rep_login_found = hits.get('rep_portal', [])
         
         results['EDP2_Rep_Portal_Exists'] = len(rep_login_found) > 0
         results['EDP2_Rep_Login_Keywords'] = rep_login_found
         
         # Rep resources detection
-        resource_keywords = ['rep resources', 'sales resources', 'partner resources', 'dealer resources', 'sales tools']
-        results['EDP2_Rep_Resources_Accessible'] = any(keyword in text_content for keyword in resource_keywords)
+        results['EDP2_Rep_Resources_Accessible'] = 'rep_resources' in hits
         
         # Territory structure detection
-        territory_keywords = ['territory', 'territories', 'region', 'coverage area', 'sales territory']
-        results['EDP2_Territory_Structure_Visible'] = any(keyword in text_content for keyword in territory_keywords)
+        results['EDP2_Territory_Structure_Visible'] = 'territory' in hits
         
         if results['EDP2_Territory_Structure_Visible']:
-            results['EDP2_Territory_Complexity'] = 'High' if 'complex' in text_content else 'Medium'
+            results['EDP2_Territory_Complexity'] = 'High' if 'complex' in hits else 'Medium'
         else:
             results['EDP2_Territory_Complexity'] = 'Low'
         
         # Rep count estimation (heuristic based on company indicators)
-        if 'nationwide' in text_content or 'national' in text_content:
+        if 'national' in hits:
             results['EDP2_Rep_Count_Estimate'] = 100
-        elif 'regional' in text_content or len(rep_login_found) > 1:
+        elif 'regional' in hits or len(rep_login_found) > 1:
             results['EDP2_Rep_Count_Estimate'] = 50
         elif results['EDP2_Has_Rep_Locator']:
             results['EDP2_Rep_Count_Estimate'] = 20
         else:
             results['EDP2_Rep_Count_Estimate'] = 10
     
-    def _analyze_edp6_channel_conflict(self, soup: BeautifulSoup, text_content: str, results: Dict):
+    def _analyze_edp6_channel_conflict(self, features: PageFeatures, hits: Dict[str, List[str]], results: Dict):
         """Analyze EDP6: Channel Conflict indicators"""
         
         channels = []
         
         # Direct sales detection
-        if any(term in text_content for term in ['direct sales', 'buy direct', 'factory direct']):
+        if 'direct_sales' in hits:
             channels.append('Direct Sales')
             results['EDP6_Has_Direct_Sales'] = True
         
         # Dealer network detection
-        if any(term in text_content for term in ['dealer', 'authorized dealer', 'showroom', 'retailer']):
+        if 'dealer_network' in hits:
             channels.append('Dealer Network')
             results['EDP6_Has_Dealer_Network'] = True
         
         # E-commerce detection
-        if any(term in text_content for term in ['add to cart', 'buy now', 'shop online', 'e-commerce', 'online store']):
+        if 'ecommerce' in hits:
             channels.append('E-commerce')
             results['EDP6_Has_Ecommerce'] = True
         
         # Trade program detection
-        if any(term in text_content for term in ['trade program', 'trade only', 'to the trade', 'designer program']):
+        if 'trade_program' in hits:
             channels.append('Trade Program')
             results['EDP6_Has_Trade_Program'] = True
         
         # Contract sales detection
-        if any(term in text_content for term in ['contract sales', 'hospitality', 'commercial', 'project sales']):
+        if 'contract_sales' in hits:
             channels.append('Contract Sales')
             results['EDP6_Has_Contract_Sales'] = True
         
@@ -363,21 +509,20 @@ class WebsiteEvidenceExtractorV2:
         results['EDP6_Channel_Count'] = len(channels)
         
         # Pricing transparency analysis
-        if 'call for price' in text_content or 'request quote' in text_content:
+        if 'hidden_pricing' in hits:
             results['EDP6_Pricing_Transparency'] = 'None'
-        elif 'login' in text_content and 'price' in text_content:
+        elif 'login' in hits and 'price' in hits:
             results['EDP6_Pricing_Transparency'] = 'Login required'
-        elif any(term in text_content for term in ['$', 'price', 'cost']):
+        elif 'public_pricing' in hits:
             results['EDP6_Pricing_Transparency'] = 'Public pricing'
         else:
             results['EDP6_Pricing_Transparency'] = 'Quote only'
         
         # Brand detection (simplified)
-        brand_indicators = soup.find_all(['div', 'section'], class_=lambda x: x and 'brand' in x.lower())
-        results['EDP6_Brand_Count'] = min(len(brand_indicators), 10)  # Cap at reasonable number
+        results['EDP6_Brand_Count'] = min(features.brand_block_count, 10)  # Cap at reasonable number
         results['EDP6_Multi_Brand_Detected'] = results['EDP6_Brand_Count'] > 1
     
-    def _analyze_edp7_sales_enablement(self, soup: BeautifulSoup, text_content: str, results: Dict):
+    def _analyze_edp7_sales_enablement(self, features: PageFeatures, hits: Dict[str, List[str]], results: Dict):
         """Analyze EDP7: Sales Enablement indicators"""
         
         # Product search (already analyzed in EDP1)
@@ -387,32 +532,25 @@ class WebsiteEvidenceExtractorV2:
         results['EDP7_Has_Advanced_Filters'] = results['EDP1_Filter_Count'] > 3
         
         # Comparison tool detection
-        comparison_keywords = ['compare', 'comparison', 'compare products', 'side by side']
-        results['EDP7_Has_Comparison_Tool'] = any(keyword in text_content for keyword in comparison_keywords)
+        results['EDP7_Has_Comparison_Tool'] = 'comparison' in hits
         
         # Wishlist/quotes detection
-        wishlist_keywords = ['wishlist', 'favorites', 'save', 'quote', 'request quote']
-        results['EDP7_Has_Wishlist_Quotes'] = any(keyword in text_content for keyword in wishlist_keywords)
+        results['EDP7_Has_Wishlist_Quotes'] = 'wishlist' in hits
         
         # Project boards detection
-        project_keywords = ['project', 'mood board', 'inspiration', 'collection', 'project board']
-        results['EDP7_Has_Project_Boards'] = any(keyword in text_content for keyword in project_keywords)
+        results['EDP7_Has_Project_Boards'] = 'project_boards' in hits
         
         # Mobile optimization detection
-        viewport_meta = soup.find('meta', attrs={'name': 'viewport'})
-        results['EDP7_Has_Mobile_Optimization'] = viewport_meta is not None
+        results['EDP7_Has_Mobile_Optimization'] = features.has_viewport_meta
         results['Mobile_Viewport_Meta'] = results['EDP7_Has_Mobile_Optimization']
         
         # Downloadable assets detection
-        download_links = soup.find_all('a', href=lambda x: x and any(
-            ext in x.lower() for ext in ['.pdf', '.zip', '.doc', '.xls', '.dwg', '.cad']
-        ))
+        download_links = features.download_hrefs
         results['EDP7_Has_Downloadable_Assets'] = len(download_links) > 0
         
         # Resource formats
         resource_formats = []
-        for link in download_links[:10]:  # Limit check
-            href = link.get('href', '').lower()
+        for href in download_links[:10]:  # Limit check
             if '.pdf' in href:
                 resource_formats.append('PDF')
             elif '.zip' in href:
@@ -428,7 +566,7 @@ class WebsiteEvidenceExtractorV2:
         results['EDP7_Resource_Format_Count'] = len(results['EDP7_Resource_Formats'])
         
         # Login requirements for resources
-        results['EDP7_Requires_Login_Resources'] = 'login' in text_content and len(download_links) > 0
+        results['EDP7_Requires_Login_Resources'] = 'login' in hits and len(download_links) > 0
         
         # Missing tools identification
         missing_tools = []
@@ -445,70 +583,41 @@ class WebsiteEvidenceExtractorV2:
         
         results['EDP7_Missing_Tools'] = missing_tools
     
-    def _analyze_edp8_technology(self, domain: str, soup: BeautifulSoup, text_content: str, results: Dict):
+    def _analyze_edp8_technology(self, domain: str, features: PageFeatures, text_content: str,
+                                 text_hits: Dict[str, List[str]], html_hits: Dict[str, List[str]], results: Dict):
         """Analyze EDP8: Technology Obsolescence indicators"""
         
         # SSL detection
         results['EDP8_Has_SSL'] = domain.startswith('https')
         
-        # Page speed scoring (simplified)
-        load_time = results['EDP8_Load_Time_Seconds']
-        if load_time < 2:
-            results['EDP8_Page_Speed_Score'] = 'Good'
-        elif load_time < 4:
-            results['EDP8_Page_Speed_Score'] = 'Average'
-        else:
-            results['EDP8_Page_Speed_Score'] = 'Poor'
-        
         # Modern features detection
-        modern_features_found = []
-        html_content = str(soup).lower()
-        
-        for feature in self.modern_features:
-            if feature in html_content or feature in text_content:
-                modern_features_found.append(feature)
+        modern_found = set(html_hits.get('modern_features', [])) | set(text_hits.get('modern_features', []))
+        modern_features_found = [feature for feature in self.modern_features if feature in modern_found]
         
         results['EDP8_Modern_Features'] = modern_features_found
         results['EDP8_Modern_Feature_Count'] = len(modern_features_found)
         
         # JavaScript frameworks detection
-        js_frameworks_found = []
-        for framework in self.js_frameworks:
-            if framework in html_content:
-                js_frameworks_found.append(framework)
+        js_frameworks_found = html_hits.get('js_frameworks', [])
         
         results['JavaScript_Frameworks'] = js_frameworks_found
         results['Has_Modern_JS_Framework'] = len(js_frameworks_found) > 0
         
         # Integration signals detection
-        integration_signals = []
-        integration_keywords = ['api', 'integration', 'webhook', 'rest', 'graphql', 'oauth']
-        for keyword in integration_keywords:
-            if keyword in text_content:
-                integration_signals.append(keyword)
+        integration_signals = text_hits.get('integration', [])
         
         results['EDP8_Integration_Signals'] = integration_signals
         results['EDP8_Integration_Count'] = len(integration_signals)
         results['EDP8_Has_API'] = 'api' in integration_signals
         
         # CMS detection
-        cms_indicators = {
-            'wordpress': ['wp-content', 'wordpress'],
-            'shopify': ['shopify', 'myshopify'],
-            'magento': ['magento'],
-            'drupal': ['drupal'],
-            'squarespace': ['squarespace'],
-            'wix': ['wix.com']
-        }
-        
-        for cms, indicators in cms_indicators.items():
-            if any(indicator in html_content for indicator in indicators):
+        for cms in self.cms_indicators:
+            if f'cms:{cms}' in html_hits:
                 results['EDP8_CMS_Detected'] = cms.title()
                 break
         
         # CDN detection
-        cdn_indicators = ['cdn', 'cloudflare', 'amazonaws', 'fastly', 'maxcdn']
-        results['EDP8_Uses_CDN'] = any(indicator in html_content for indicator in cdn_indicators)
+        results['EDP8_Uses_CDN'] = 'cdn' in html_hits
         
         # Copyright year detection
         copyright_matches = re.findall(r'©?\s*(\d{4})', text_content)
@@ -523,18 +632,7 @@ class WebsiteEvidenceExtractorV2:
         results['EDP8_Staleness_Score'] = min(year_diff * 20, 100)  # 20 points per year, max 100
         
         # Legacy technology detection
-        legacy_tech = []
-        legacy_indicators = {
-            'flash': ['flash', 'swf'],
-            'old_jquery': ['jquery-1.', 'jquery/1.'],
-            'old_wordpress': ['wp-content/themes/twentyten', 'wp-content/themes/twentyeleven'],
-            'old_bootstrap': ['bootstrap-2.', 'bootstrap/2.'],
-            'ie_specific': ['<!--[if IE', 'filter:progid']
-        }
-        
-        for tech, indicators in legacy_indicators.items():
-            if any(indicator in html_content for indicator in indicators):
-                legacy_tech.append(tech)
+        legacy_tech = [tech for tech in self.legacy_indicators if f'legacy:{tech}' in html_hits]
         
         results['EDP8_Legacy_Tech_Found'] = legacy_tech
         results['EDP8_Has_Legacy_Tech'] = len(legacy_tech) > 0
@@ -549,97 +647,78 @@ class WebsiteEvidenceExtractorV2:
         
         results['Website_Tech_Stack'] = tech_stack
     
-    def _extract_trade_shows(self, text_content: str, results: Dict):
+    def _extract_trade_shows(self, hits: Dict[str, List[str]], results: Dict):
         """Extract trade show mentions and dates"""
         
-        trade_shows_found = []
-        for show_name, keywords in self.trade_shows.items():
-            if any(keyword in text_content for keyword in keywords):
-                trade_shows_found.append(show_name)
+        trade_shows_found = [show_name for show_name in self.trade_shows if f'trade_show:{show_name}' in hits]
         
         results['Trade_Shows_Mentioned'] = trade_shows_found
         results['Trade_Show_Count'] = len(trade_shows_found)
         
         # Simple next show detection (would need more sophisticated date parsing in production)
-        if 'high point market' in text_content:
+        if 'high_point_market' in hits:
             results['Next_Trade_Show'] = 'High Point Market'
             results['Weeks_To_Next_Show'] = 9  # Example - would calculate from actual dates
     
-    def _extract_product_context(self, soup: BeautifulSoup, text_content: str, results: Dict):
+    def _extract_product_context(self, features: PageFeatures, hits: Dict[str, List[str]], results: Dict):
         """Extract product types and business context"""
         
         # Product types detection
-        product_keywords = {
-            'furniture': ['furniture', 'seating', 'tables', 'chairs', 'sofas', 'beds'],
-            'lighting': ['lighting', 'lamps', 'fixtures', 'chandeliers', 'sconces'],
-            'outdoor': ['outdoor', 'patio', 'garden', 'exterior'],
-            'decor': ['decor', 'accessories', 'art', 'mirrors', 'rugs']
-        }
-        
-        product_types = []
-        for category, keywords in product_keywords.items():
-            if any(keyword in text_content for keyword in keywords):
-                product_types.append(category)
+        product_types = [category for category in self.product_keywords if f'product:{category}' in hits]
         
         results['Product_Types'] = product_types
         
         # Target audience detection
-        if any(term in text_content for term in ['trade only', 'to the trade', 'designer']):
+        if 'audience_trade' in hits:
             results['Target_Audience'] = 'Trade only'
-        elif any(term in text_content for term in ['b2b', 'wholesale', 'dealer']):
+        elif 'audience_b2b' in hits:
             results['Target_Audience'] = 'B2B wholesale'
-        elif any(term in text_content for term in ['retail', 'consumer', 'buy now']):
+        elif 'audience_b2c' in hits:
             results['Target_Audience'] = 'B2C retail'
         else:
             results['Target_Audience'] = 'Mixed'
         
         # Geographic presence
-        if any(term in text_content for term in ['worldwide', 'international', 'global']):
+        if 'geo_worldwide' in hits:
             results['Geographic_Presence'] = 'Worldwide'
-        elif any(term in text_content for term in ['nationwide', 'national', 'usa', 'america']):
+        elif 'geo_usa' in hits:
             results['Geographic_Presence'] = 'USA'
-        elif any(term in text_content for term in ['regional', 'local']):
+        elif 'geo_regional' in hits:
             results['Geographic_Presence'] = 'Regional'
         else:
             results['Geographic_Presence'] = 'Unknown'
     
-    def _extract_technical_details(self, soup: BeautifulSoup, html: str, results: Dict):
+    def _extract_technical_details(self, features: PageFeatures, results: Dict):
         """Extract additional technical details"""
         
         # Search endpoint detection
-        forms = soup.find_all('form')
-        for form in forms:
-            action = form.get('action', '').lower()
+        for action in features.form_actions:
             if any(term in action for term in ['search', 'query', 'find']):
                 results['Has_Search_Endpoint'] = True
                 break
         
         # Resources page detection
-        links = soup.find_all('a', href=True)
-        for link in links:
-            href = link.get('href', '').lower()
-            text = link.get_text().lower()
+        links = features.links
+        for href, text in links:
+            href = href.lower()
             if any(term in href or term in text for term in ['resource', 'download', 'library']):
                 results['Has_Resources_Page'] = True
                 break
         
         # Events page detection
-        for link in links:
-            href = link.get('href', '').lower()
-            text = link.get_text().lower()
+        for href, text in links:
+            href = href.lower()
             if any(term in href or term in text for term in ['event', 'show', 'trade', 'calendar']):
                 results['Has_Events_Page'] = True
                 break
         
         # Modern CSS detection
-        css_links = soup.find_all('link', rel='stylesheet')
-        results['Uses_Modern_CSS'] = len(css_links) > 0
+        results['Uses_Modern_CSS'] = features.stylesheet_count > 0
         
         # Broken links detection (simplified - just count 404-prone patterns)
         broken_patterns = ['#', 'javascript:void', 'mailto:']
         broken_count = 0
-        for link in links[:50]:  # Limit check for performance
-            href = link.get('href', '')
+        for href, _ in links[:50]:  # Limit check for performance
             if any(pattern in href for pattern in broken_patterns):
                 broken_count += 1
         
@@ -648,63 +727,8 @@ class WebsiteEvidenceExtractorV2:
     def _calculate_pain_scores(self, results: Dict):
         """Calculate pain scores for each EDP based on indicators found"""
         
-        # EDP1: SKU Complexity Pain Score
-        score = 0
-        if not results['EDP1_Has_Search']:
-            score += 40
-        if results['EDP1_SKU_Count_Estimate'] > 2000:
-            score += 30
-        if results['EDP1_Filter_Count'] < 3:
-            score += 20
-        if results['EDP1_Has_Configurator']:
-            score += 10
-        results['EDP1_SKU_Complexity_Pain_Score'] = min(score, 100)
-        
-        # EDP2: Rep Performance Pain Score
-        score = 0
-        if not results['EDP2_Has_Rep_Locator']:
-            score += 35
-        if not results['EDP2_Rep_Portal_Exists']:
-            score += 50
-        if not results['EDP2_Rep_Resources_Accessible']:
-            score += 15
-        results['EDP2_Rep_Performance_Pain_Score'] = min(score, 100)
-        
-        # EDP6: Channel Conflict Pain Score
-        score = 0
-        if results['EDP6_Channel_Count'] > 2:
-            score += (results['EDP6_Channel_Count'] - 2) * 20
-        if results['EDP6_Pricing_Transparency'] in ['None', 'Quote only']:
-            score += 40
-        if results['EDP6_Multi_Brand_Detected']:
-            score += 20
-        results['EDP6_Channel_Conflict_Pain_Score'] = min(score, 100)
-        
-        # EDP7: Sales Enablement Pain Score
-        score = 0
-        if not results['EDP7_Has_Product_Search']:
-            score += 40
-        if not results['EDP7_Has_Mobile_Optimization']:
-            score += 35
-        if not results['EDP7_Has_Comparison_Tool']:
-            score += 15
-        if not results['EDP7_Has_Downloadable_Assets']:
-            score += 10
-        results['EDP7_Sales_Enablement_Pain_Score'] = min(score, 100)
-        
-        # EDP8: Technology Obsolescence Pain Score
-        score = 0
-        if not results['EDP8_Has_SSL']:
-            score += 50
-        if results['EDP8_Page_Speed_Score'] == 'Poor':
-            score += 30
-        elif results['EDP8_Page_Speed_Score'] == 'Average':
-            score += 15
-        if results['EDP8_Modern_Feature_Count'] < 2:
-            score += 20
-        if results['EDP8_Has_Legacy_Tech']:
-            score += 25
-        results['EDP8_Tech_Obsolescence_Pain_Score'] = min(score, 100)
+        # Indicator weights and caps come from the declarative rules
+        self.rules.apply(results)
         
         # Add specific missing features summary
         missing_features = []
@@ -0,0 +1,29 @@
+# tests/conftest.py
+"""
+Shared setup for the unit tests.
+Settings need credentials to load, so placeholders are set before anything
+imports config.settings. The process-wide caches are switched off and every
+cache directory points into a temporary directory, so the tests never touch
+the real cache/; tests that need a cache build their own.
+"""
+
+import os
+import sys
+import tempfile
+
+os.environ.setdefault('SUPABASE_URL', 'https://example.supabase.co')
+os.environ.setdefault('SUPABASE_KEY', 'test-key')
+os.environ.setdefault('OPENAI_API_KEY', 'sk-test')
+os.environ['PAGE_CACHE_ENABLED'] = 'false'
+os.environ['EVIDENCE_MEMO_ENABLED'] = 'false'
+os.environ['PAGE_ARCHIVE_ENABLED'] = 'false'
+os.environ['DOMAIN_HEALTH_ENABLED'] = 'false'
+os.environ['ROBOTS_TXT_RESPECT'] = 'false'
+
+_cache_root = tempfile.mkdtemp(prefix='supercat-tests-')
+for name, directory in (('PAGE_CACHE_DIR', 'pages'), ('EVIDENCE_MEMO_DIR', 'evidence'),
+                        ('PAGE_ARCHIVE_DIR', 'archive'), ('API_REPLAY_DIR', 'api_endpoints')):
+    os.environ[name] = os.path.join(_cache_root, directory)
+os.environ['DOMAIN_HEALTH_DB'] = os.path.join(_cache_root, 'domain_health.sqlite')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
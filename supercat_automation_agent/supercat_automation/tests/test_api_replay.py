@@ -0,0 +1,133 @@
+# tests/test_api_replay.py
+"""Pagination detection in captured API requests, and replaying every page"""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+
+from scrapers.api_replay import ApiEndpoint, ApiReplayer, ReplayAuthError, discover_endpoint, find_total
+
+RECORDS = [{'id': i, 'name': f'Exhibitor {i}'} for i in range(95)]
+MAX_PAGE_SIZE = 20
+
+
+def test_page_number_in_the_query():
+    endpoint = discover_endpoint('https://api.expo.com/exhibitors?page=3&pageSize=50&q=', 'get', {}, None,
+                                 {'meta': {'totalCount': 480}}, records=50)
+    assert (endpoint.style, endpoint.page_location, endpoint.page_param) == ('page', 'query', 'page')
+    assert (endpoint.first, endpoint.size_param, endpoint.page_size, endpoint.total) == (1, 'pageSize', 50, 480)
+    assert endpoint.url == 'https://api.expo.com/exhibitors'
+
+    url, params, body = endpoint.request(2)
+    assert params == {'page': '3', 'pageSize': '50', 'q': ''}
+    assert body is None
+
+
+def test_offset_in_a_json_body():
+    endpoint = discover_endpoint('https://api.expo.com/search', 'POST', {}, json.dumps({'offset': 40, 'limit': 20}),
+                                 {'total': 95}, records=20)
+    assert (endpoint.style, endpoint.page_location, endpoint.first, endpoint.page_size) == ('offset', 'body', 0, 20)
+    assert endpoint.request(2)[2] == {'offset': 40, 'limit': 20}
+
+
+def test_graphql_variables():
+    post_data = json.dumps({'query': 'query List($pageNumber: Int)', 'variables': {'pageNumber': 0, 'perPage': 25}})
+    endpoint = discover_endpoint('https://expo.com/graphql', 'POST', {}, post_data, {}, records=25)
+    assert (endpoint.style, endpoint.page_location, endpoint.first) == ('page', 'variables', 0)
+    assert endpoint.request(3)[2]['variables'] == {'pageNumber': 3, 'perPage': 25}
+
+
+def test_size_without_a_parameter_comes_from_the_response():
+    endpoint = discover_endpoint('https://api.expo.com/exhibitors?p=1', 'GET', {}, None, [], records=36)
+    assert (endpoint.page_param, endpoint.size_param, endpoint.page_size) == ('p', None, 36)
+    assert endpoint.with_page_size(100) is endpoint
+
+
+def test_single_request_endpoint():
+    endpoint = discover_endpoint('https://api.expo.com/exhibitors?lang=en', 'GET', {}, 'not json',
+                                 {'data': {'recordsTotal': '12'}}, records=12)
+    assert not endpoint.paginated
+    assert endpoint.total == 12
+    assert endpoint.request(5)[1] == {'lang': 'en'}
+
+
+def test_only_replayable_headers_and_site_cookies_are_kept():
+    headers = {'Authorization': 'Bearer t', 'X-Api-Key': 'k', 'Cookie': 'a=b', 'sec-ch-ua': '"Chromium"',
+               'Accept': 'application/json'}
+    cookies = [{'name': 'session', 'value': '1', 'domain': '.expo.com'},
+               {'name': 'tracker', 'value': '2', 'domain': 'ads.example.net'}]
+    endpoint = discover_endpoint('https://api.expo.com/exhibitors?page=1', 'GET', headers, None, {}, 10, cookies)
+    assert endpoint.headers == {'Authorization': 'Bearer t', 'X-Api-Key': 'k', 'Accept': 'application/json'}
+    assert endpoint.cookies == {'session': '1'}
+
+
+def test_find_total():
+    assert find_total({'pagination': {'total_items': 7}}) == 7
+    assert find_total({'items': []}) is None
+    assert find_total([1, 2]) is None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    report_total = True
+    ignore_page = False
+    status = 200
+
+    def do_GET(self):
+        if self.status != 200:
+            self.send_response(self.status)
+            self.end_headers()
+            return
+        query = dict(parse_qsl(urlsplit(self.path).query))
+        size = min(int(query.get('pageSize', 10)), MAX_PAGE_SIZE)
+        page = 1 if self.ignore_page else int(query.get('page', 1))
+        payload = {'items': RECORDS[(page - 1) * size:page * size]}
+        if self.report_total:
+            payload['meta'] = {'total': len(RECORDS)}
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps(payload).encode('utf-8'))
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.report_total, _Handler.ignore_page, _Handler.status = True, False, 200
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+
+
+def _replay(server, total=None):
+    endpoint = ApiEndpoint(url=server + '/exhibitors', params={'page': '1', 'pageSize': '10'}, page_param='page',
+                           style='page', first=1, size_param='pageSize', page_size=10, total=total)
+    replayer = ApiReplayer(concurrency=4, page_size=50, max_pages=50, timeout=5)
+    return asyncio.run(replayer.fetch_all(endpoint, lambda payload: payload['items'])), replayer
+
+
+@pytest.mark.parametrize('report_total', [True, False])
+def test_replay_steps_by_the_size_the_api_allows(server, report_total):
+    _Handler.report_total = report_total
+    records, replayer = _replay(server)
+    assert sorted(record['id'] for record in records) == list(range(95))
+    assert replayer.stats['pages'] == 5
+
+
+def test_replay_stops_when_the_api_ignores_the_page(server):
+    _Handler.ignore_page, _Handler.report_total = True, False
+    records, _ = _replay(server)
+    assert records == RECORDS[:MAX_PAGE_SIZE]
+
+
+def test_rejected_credentials_need_a_browser(server):
+    _Handler.status = 403
+    with pytest.raises(ReplayAuthError):
+        _replay(server)
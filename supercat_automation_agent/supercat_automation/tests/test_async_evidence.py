@@ -0,0 +1,147 @@
+# tests/test_async_evidence.py
+"""The async engine scores like the extractor while fetching several domains at once"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from scrapers import async_evidence, evidence_workers
+from scrapers.async_evidence import AsyncEvidenceEngine
+from scrapers.host_scheduler import HostScheduler
+from scrapers.website_evidence_v2 import WebsiteEvidenceExtractorV2
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'evidence'
+PAGES = {f'/{name}': (FIXTURES / f'{name}.html').read_text(encoding='utf-8')
+         for name in ('acme_lighting', 'heritage_furniture', 'casa_outdoor', 'placeholder')}
+PAGES['/shell'] = '<html><body><div id="root"></div><script src="/app.js"></script></body></html>'
+RENDERED = PAGES['/acme_lighting']
+
+
+class _Handler(BaseHTTPRequestHandler):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        body = PAGES.get(self.path)
+        with self.lock:
+            type(self).active += 1
+            type(self).peak = max(type(self).peak, type(self).active)
+        try:
+            time.sleep(0.05)
+            self.send_response(200 if body else 404)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.end_headers()
+            self.wfile.write((body or 'Not found').encode('utf-8'))
+        finally:
+            with self.lock:
+                type(self).active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.active = _Handler.peak = 0
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    extractor = WebsiteEvidenceExtractorV2(replay=False)
+    extractor.memo = None
+    extractor.crawl_planner.max_pages = 0
+    extractor.estimate_catalog = lambda url: None
+    # The CPU stage runs on threads here, with the same extractor
+    monkeypatch.setattr(evidence_workers, '_extractor', extractor)
+    monkeypatch.setattr(async_evidence, 'new_worker_executor', lambda workers: ThreadPoolExecutor(workers))
+    return extractor
+
+
+def _engine(extractor, concurrency=2):
+    engine = AsyncEvidenceEngine(concurrency=concurrency, extractor=extractor, parse_processes=2)
+    engine.fetcher.scheduler = HostScheduler(host_delay=0, respect_robots=False)
+    engine.fetcher.cache = None
+
+    async def render(url):
+        engine.rendered.append(url)
+        return RENDERED
+
+    engine.rendered = []
+    engine.fetcher.render = render
+    return engine
+
+
+def _without_timestamp(result):
+    return {key: value for key, value in result.items() if key != 'scan_timestamp'}
+
+
+def test_results_match_the_extractor_in_input_order(server, extractor):
+    names = ['acme_lighting', 'heritage_furniture', 'casa_outdoor', 'placeholder']
+    domains = [f'{server}/{name}' for name in names]
+
+    async def run():
+        async with _engine(extractor) as engine:
+            return await engine.analyze_many(domains)
+
+    results = asyncio.run(run())
+
+    assert [result['domain'] for result in results] == domains
+    for name, result in zip(names, results):
+        expected = extractor.analyze_html(result['domain'], PAGES[f'/{name}'],
+                                          result['EDP8_Load_Time_Seconds'], 'static')
+        assert _without_timestamp(result) == _without_timestamp(expected)
+    # No more homepages in flight than the engine's concurrency
+    assert _Handler.peak <= 2
+
+
+def test_javascript_shell_is_rendered(server, extractor):
+    async def run():
+        async with _engine(extractor) as engine:
+            return await engine.analyze(f'{server}/shell'), engine.rendered
+
+    result, rendered = asyncio.run(run())
+
+    assert rendered == [f'{server}/shell']
+    assert result['Fetch_Tier'] == 'rendered'
+    expected = extractor.analyze_html(result['domain'], RENDERED, result['EDP8_Load_Time_Seconds'], 'rendered')
+    assert _without_timestamp(result) == _without_timestamp(expected)
+
+
+def test_unreachable_domain_gives_error_results(extractor):
+    async def unreachable(url):
+        raise ConnectionError('browser could not connect')
+
+    async def run():
+        async with _engine(extractor) as engine:
+            # A failed static fetch falls back to a render, which fails too
+            engine.fetcher.render = unreachable
+            return await engine.analyze('http://127.0.0.1:9/')
+
+    result = asyncio.run(run())
+    assert 'browser could not connect' in result['error']
+    assert _without_timestamp(result) == _without_timestamp(extractor.error_results('http://127.0.0.1:9/',
+                                                                                    result['error']))
+
+
+def test_scoring_failure_is_reported_per_domain(server, extractor, monkeypatch):
+    def broken(*args, **kwargs):
+        raise ValueError('malformed page')
+
+    async def run():
+        async with _engine(extractor) as engine:
+            monkeypatch.setattr(async_evidence, 'score_in_worker', broken)
+            return await engine.analyze_many([f'{server}/acme_lighting', f'{server}/placeholder'])
+
+    results = asyncio.run(run())
+    assert [result['error'] for result in results] == ['malformed page', 'malformed page']
@@ -0,0 +1,194 @@
+# tests/test_browser_pool.py
+"""Shared browser, isolated and reused contexts, and page pools, against a fake Playwright"""
+
+import asyncio
+
+import pytest
+
+from scrapers import browser_pool
+from scrapers.browser_pool import BrowserContextPool, PagePool
+
+
+class _Page:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+        if self in self.context.pages:
+            self.context.pages.remove(self)
+
+
+class _Context:
+    def __init__(self, options):
+        self.options = options
+        self.pages = []
+        self.closed = False
+
+    async def new_page(self):
+        page = _Page(self)
+        self.pages.append(page)
+        return page
+
+    async def close(self):
+        self.closed = True
+
+
+class _Browser:
+    def __init__(self, how):
+        self.how = how
+        self.connected = True
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        self.contexts.append(_Context(options))
+        return self.contexts[-1]
+
+    async def close(self):
+        self.connected = False
+
+
+class _Playwright:
+    def __init__(self):
+        self.browsers = []
+        self.stopped = False
+        self.chromium = self
+
+    async def launch(self, **options):
+        self.browsers.append(_Browser(('launch', options)))
+        return self.browsers[-1]
+
+    async def connect_over_cdp(self, url):
+        self.browsers.append(_Browser(('cdp', url)))
+        return self.browsers[-1]
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def playwright(monkeypatch):
+    instance = _Playwright()
+    monkeypatch.setattr(browser_pool, 'async_playwright', lambda: instance)
+    return instance
+
+
+def test_contexts_share_one_browser_within_the_limit(playwright):
+    active, peak = [0], [0]
+
+    async def scrape(pool):
+        async with pool.context() as context:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await context.new_page()
+            await asyncio.sleep(0.01)
+            active[0] -= 1
+            return context
+
+    async def run():
+        async with BrowserContextPool(max_contexts=2) as pool:
+            return await asyncio.gather(*(scrape(pool) for _ in range(5))), pool
+
+    contexts, pool = asyncio.run(run())
+
+    assert len(playwright.browsers) == 1 and pool.stats['launches'] == 1
+    assert peak[0] == 2
+    # Without reuse every lease is a fresh context, closed on release
+    assert len(set(map(id, contexts))) == 5 and all(context.closed for context in contexts)
+    assert playwright.stopped and not playwright.browsers[0].connected
+
+
+def test_released_contexts_are_reset_and_reused_for_the_same_options(playwright):
+    async def run():
+        pool = BrowserContextPool(max_contexts=2, reuse_contexts=True)
+        async with pool.context() as first:
+            await first.new_page()
+        async with pool.context() as second:
+            pass
+        async with pool.context(locale='fr-FR') as other:
+            pass
+        await pool.close()
+        return pool, first, second, other
+
+    pool, first, second, other = asyncio.run(run())
+
+    assert second is first and first.pages == []
+    assert other is not first and other.options['locale'] == 'fr-FR'
+    assert pool.stats['contexts_created'] == 2 and pool.stats['contexts_reused'] == 1
+    assert first.closed and other.closed
+
+
+def test_disconnected_browser_is_replaced(playwright):
+    async def run():
+        pool = BrowserContextPool(max_contexts=2, reuse_contexts=True)
+        async with pool.context() as first:
+            pass
+        playwright.browsers[0].connected = False
+        async with pool.context() as second:
+            pass
+        await pool.close()
+        return pool, first, second
+
+    pool, first, second = asyncio.run(run())
+
+    assert len(playwright.browsers) == 2 and pool.stats['launches'] == 2
+    # The idle context died with the old browser
+    assert second is not first and pool.stats['contexts_reused'] == 0
+
+
+def test_remote_browser_over_cdp(playwright):
+    async def run():
+        async with BrowserContextPool(cdp_url='wss://browser.example:9222') as pool:
+            async with pool.context():
+                pass
+
+    asyncio.run(run())
+    assert playwright.browsers[0].how == ('cdp', 'wss://browser.example:9222')
+
+
+def test_page_pool_reuses_clean_pages_and_drops_failed_ones():
+    context = _Context({})
+
+    async def run():
+        async with PagePool(context, size=2) as pages:
+            async with pages.page() as first:
+                pass
+            async with pages.page() as second:
+                assert second is first
+            with pytest.raises(TimeoutError):
+                async with pages.page() as failed:
+                    raise TimeoutError('navigation timed out')
+            async with pages.page() as fresh:
+                pass
+            return first, failed, fresh
+
+    first, failed, fresh = asyncio.run(run())
+    assert failed is first and failed.closed
+    assert fresh is not first and fresh.closed
+
+
+def test_page_pool_bounds_open_pages():
+    context = _Context({})
+    peak = [0]
+
+    async def visit(pages):
+        async with pages.page():
+            peak[0] = max(peak[0], len(context.pages))
+            await asyncio.sleep(0.01)
+
+    async def run():
+        async with PagePool(context, size=3) as pages:
+            await asyncio.gather(*(visit(pages) for _ in range(10)))
+
+    asyncio.run(run())
+    assert peak[0] == 3 and context.pages == []
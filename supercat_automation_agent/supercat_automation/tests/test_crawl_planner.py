@@ -0,0 +1,113 @@
+# tests/test_crawl_planner.py
+"""Which subpages a crawl picks, and that slow pages do not hold it past its budget"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from scrapers.crawl_planner import CrawlPlanner
+
+BASE = 'https://www.acme.com/'
+LINKS = [
+    ('/products', 'Products'),
+    ('/products/pendants', 'Pendants'),
+    ('/products/lighting/pendants/brass', 'Brass'),
+    ('https://acme.com/collections', 'Shop all'),
+    ('/dealer-locator', 'Find a dealer'),
+    ('/resources', 'Downloads'),
+    ('/events', 'See us at High Point Market'),
+    ('/about', 'About us'),
+    ('/catalogs/acme-2021.pdf', 'Catalog PDF'),
+    ('/account/login', 'Dealer login'),
+    ('https://other.com/products', 'Partner products'),
+    ('mailto:sales@acme.com', 'Email sales'),
+    ('#top', 'Back to top'),
+    ('/', 'Home'),
+    ('/products#reviews', 'Products'),
+]
+
+
+def test_only_relevant_internal_pages_are_planned():
+    plan = CrawlPlanner(max_pages=20, max_seconds=5).plan(BASE, LINKS)
+    urls = [target.url for target in plan]
+
+    assert len(urls) == len(set(urls)) == 7
+    assert 'https://www.acme.com/about' not in urls
+    assert not any(url.endswith('.pdf') or 'login' in url or 'other.com' in url for url in urls)
+    # The fragment variant is the same page as /products
+    assert urls.count('https://www.acme.com/products') == 1
+
+
+def test_each_category_gets_a_turn_before_any_gets_a_second():
+    plan = CrawlPlanner(max_pages=4, max_seconds=5).plan(BASE, LINKS)
+    assert [(target.category, target.url) for target in plan] == [
+        ('catalog', 'https://www.acme.com/products'),
+        ('dealer', 'https://www.acme.com/dealer-locator'),
+        ('resources', 'https://www.acme.com/resources'),
+        ('events', 'https://www.acme.com/events'),
+    ]
+
+
+def test_catalog_links_rank_by_match_then_depth():
+    plan = CrawlPlanner(max_pages=20, max_seconds=5).plan(BASE, LINKS)
+    catalog = [target for target in plan if target.category == 'catalog']
+    # Path and anchor text both match beat path only, and deeper pages rank lower
+    assert [target.url for target in catalog] == [
+        'https://www.acme.com/products', 'https://acme.com/collections',
+        'https://www.acme.com/products/pendants', 'https://www.acme.com/products/lighting/pendants/brass']
+    assert catalog[0].score == pytest.approx(3.0 * 1.75)
+
+
+def test_zero_budget_plans_nothing():
+    assert CrawlPlanner(max_pages=0, max_seconds=5).plan(BASE, LINKS) == []
+
+
+class _Fetcher:
+    """Serves every page after a delay; /events never arrives in time, /resources fails"""
+
+    def __init__(self, slow=1.0):
+        self.slow = slow
+        self.release = threading.Event()
+
+    def _page(self, url):
+        if url.endswith('/resources'):
+            raise ConnectionError('reset')
+        return {'url': url, 'final_url': url, 'html': f'<html>{url}</html>', 'tier': 'static'}
+
+    def fetch_sync(self, url):
+        if url.endswith('/events'):
+            self.release.wait(self.slow)
+        return self._page(url)
+
+    async def fetch(self, url, session=None):
+        if url.endswith('/events'):
+            await asyncio.sleep(self.slow)
+        return self._page(url)
+
+
+def _check_crawl(planner, pages, elapsed):
+    assert elapsed < 0.5
+    assert [(page['category'], page['url']) for page in pages] == [
+        ('catalog', 'https://www.acme.com/products'),
+        ('dealer', 'https://www.acme.com/dealer-locator'),
+    ]
+    assert planner.stats == {'planned': 4, 'fetched': 2, 'failed': 1, 'over_budget': 1}
+
+
+def test_sync_crawl_drops_pages_past_the_budget():
+    planner, fetcher = CrawlPlanner(max_pages=4, max_seconds=0.2), _Fetcher()
+    start = time.monotonic()
+    try:
+        pages = planner.crawl_sync(fetcher, BASE, LINKS)
+        _check_crawl(planner, pages, time.monotonic() - start)
+    finally:
+        fetcher.release.set()
+
+
+def test_async_crawl_cancels_pages_past_the_budget():
+    planner = CrawlPlanner(max_pages=4, max_seconds=0.2)
+    start = time.monotonic()
+    pages = asyncio.run(planner.crawl(_Fetcher(), BASE, LINKS))
+    _check_crawl(planner, pages, time.monotonic() - start)
@@ -0,0 +1,191 @@
+# tests/test_database.py
+"""Bulk company and exhibitor writes against an in-memory stand-in for the Supabase client"""
+
+import pytest
+
+from config.settings import settings
+from database import connection
+from database.connection import DatabaseManager
+from scrapers import base_scraper
+from scrapers.base_scraper import BaseTradeshowScraper
+
+REQUIRED = {'companies': ('company_name',)}
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    """The chain of builder calls the database manager makes, run on execute()"""
+
+    def __init__(self, client, table):
+        self.client, self.table = client, table
+        self.action, self.payload, self.on_conflict, self.filters = None, None, None, []
+
+    def select(self, columns='*'):
+        self.action = 'select'
+        return self
+
+    def insert(self, rows):
+        self.action, self.payload = 'insert', rows
+        return self
+
+    def upsert(self, rows, on_conflict=''):
+        self.action, self.payload, self.on_conflict = 'upsert', rows, tuple(on_conflict.split(','))
+        return self
+
+    def update(self, values):
+        self.action, self.payload = 'update', values
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def execute(self):
+        self.client.calls.append((self.table, self.action))
+        if self.client.failures:
+            raise self.client.failures.pop(0)
+        rows = self.client.tables.setdefault(self.table, [])
+        if self.action == 'select':
+            return _Result([dict(row) for row in rows if all(test(row) for test in self.filters)])
+        if self.action == 'update':
+            matched = [row for row in rows if all(test(row) for test in self.filters)]
+            for row in matched:
+                row.update(self.payload)
+            return _Result([dict(row) for row in matched])
+
+        stored = []
+        for new in self.payload:
+            existing = None
+            if self.action == 'upsert':
+                existing = next((row for row in rows if all(row.get(key) == new.get(key) and new.get(key) is not None
+                                                            for key in self.on_conflict)), None)
+            if existing is not None:
+                existing.update(new)
+                stored.append(dict(existing))
+                continue
+            # A new row must satisfy the table's NOT NULL columns
+            if any(not new.get(column) for column in REQUIRED.get(self.table, ())):
+                raise ValueError(f'null value violates not-null constraint on {self.table}')
+            row = {'id': len(rows) + 1, **new}
+            rows.append(row)
+            stored.append(dict(row))
+        return _Result(stored)
+
+
+class _FakeSupabase:
+    def __init__(self):
+        self.tables = {}
+        self.calls = []
+        self.failures = []
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(connection.time, 'sleep', lambda seconds: None)
+    manager = object.__new__(DatabaseManager)
+    manager.client = _FakeSupabase()
+    return manager
+
+
+def test_companies_are_deduped_by_domain_and_name(manager):
+    stored = manager.bulk_upsert_companies([
+        {'company_name': 'Acme', 'domain': 'https://Acme.com/about'},
+        {'company_name': 'Acme Lighting', 'domain': 'acme.com'},
+        {'company_name': 'Studio North', 'domain': ''},
+        {'company_name': 'studio north', 'domain': None},
+        {'company_name': 'Globex', 'domain': 'globex.com'},
+    ])
+    companies = manager.client.tables['companies']
+    assert sorted((row['company_name'], row['domain']) for row in companies) == [
+        ('Acme Lighting', 'acme.com'), ('Globex', 'globex.com'), ('studio north', None)]
+    assert len(stored) == 3
+
+
+def test_domainless_companies_match_existing_rows_by_name(manager):
+    manager.client.tables['companies'] = [
+        {'id': 1, 'company_name': 'Studio North', 'domain': None},
+        {'id': 2, 'company_name': 'Lumen', 'domain': 'lumen.com'},
+    ]
+    stored = manager.bulk_upsert_companies([{'company_name': 'Studio North'}, {'company_name': 'Lumen'}])
+
+    assert sorted(row['id'] for row in stored) == [1, 3]
+    assert [row['company_name'] for row in manager.client.tables['companies']].count('Studio North') == 1
+
+
+def test_failed_batch_is_retried_then_skipped(manager, monkeypatch):
+    monkeypatch.setattr(settings, 'db_upsert_batch_size', 2)
+    companies = [{'company_name': f'Company {i}', 'domain': f'company{i}.com'} for i in range(5)]
+
+    # Three errors in a row give up on the first batch only; the second batch's one error is retried
+    manager.client.failures = [ConnectionError('down')] * 3 + [ConnectionError('reset')]
+    stored = manager.bulk_upsert_companies(companies)
+
+    assert sorted(row['domain'] for row in stored) == ['company2.com', 'company3.com', 'company4.com']
+    assert len(manager.client.tables['companies']) == 3
+
+
+def test_exhibitor_links_are_deduped_per_show(manager):
+    links = [{'trade_show_id': 7, 'company_id': 1, 'booth_number': 'A1'},
+             {'trade_show_id': 7, 'company_id': 1, 'booth_number': 'A2'},
+             {'trade_show_id': 7, 'company_id': 2, 'booth_number': None}]
+    assert manager.bulk_link_exhibitors(links) == 2
+    assert manager.bulk_link_exhibitors(links) == 2
+    assert [row['booth_number'] for row in manager.client.tables['exhibitors']] == ['A2', None]
+
+
+class _Show(BaseTradeshowScraper):
+    async def scrape_trade_show_info(self, page):
+        return {}
+
+    async def scrape_exhibitor_list(self, page):
+        return []
+
+
+def test_saved_exhibitors_keep_their_booths(manager, monkeypatch):
+    monkeypatch.setattr(base_scraper, 'db', manager)
+    scraper = _Show('Lightovation', 'https://example.com')
+    scraper.trade_show_id = 7
+
+    linked = scraper._save_exhibitors([
+        {'company_name': 'Acme Lighting Inc.', 'website': 'https://www.acme.com/', 'booth_number': 'A1'},
+        {'company_name': 'Acme Lighting', 'website': 'www.acme.com', 'booth_number': 'A1'},
+        {'company_name': 'Studio North LLC', 'booth_number': 'B7'},
+        {'company_name': 'Lumen Co.', 'website': 'lumen.com'},
+        {'company_name': '', 'website': 'nameless.com', 'booth_number': 'C1'},
+    ])
+
+    assert linked == 3
+    companies = {row['id']: row for row in manager.client.tables['companies']}
+    booths = {companies[link['company_id']]['company_name']: link['booth_number']
+              for link in manager.client.tables['exhibitors']}
+    assert booths == {'Acme Lighting': 'A1', 'Studio North': 'B7', 'Lumen': None}
+    assert all(row['source'] == 'Lightovation_exhibitor' for row in companies.values())
+
+
+def test_website_evidence_only_updates_known_companies(manager):
+    manager.client.tables['companies'] = [
+        {'id': 1, 'company_name': 'Acme', 'domain': 'acme.com'},
+        {'id': 2, 'company_name': 'Globex', 'domain': 'globex.com'},
+    ]
+    updated = manager.bulk_save_website_evidence({
+        'acme.com': {'EDP1_Has_Search': True},
+        'globex.com': {'error': 'timeout'},
+        'unknown.com': {'EDP1_Has_Search': False},
+    })
+
+    assert updated == 1
+    companies = manager.client.tables['companies']
+    assert len(companies) == 2
+    assert companies[0]['website_evidence'] == {'EDP1_Has_Search': True}
+    assert 'last_website_scan' in companies[0] and 'website_evidence' not in companies[1]
@@ -0,0 +1,145 @@
+# tests/test_domain_health.py
+"""Pre-flight classification, backoff and what gets stored"""
+
+import socket
+import time
+
+import pytest
+import requests
+
+from scrapers import domain_health
+from scrapers.domain_health import (
+    DomainHealthRegistry, classify_response, STATUS_HEALTHY, STATUS_PARKED, STATUS_MARKETPLACE,
+    STATUS_HTTP_ERROR, STATUS_DNS_FAILURE, STATUS_UNREACHABLE, STATUS_INCONCLUSIVE
+)
+from scrapers.host_scheduler import HostScheduler
+
+
+@pytest.fixture
+def registry(tmp_path):
+    scheduler = HostScheduler(host_delay=0, respect_robots=False)
+    registry = DomainHealthRegistry(path=str(tmp_path / 'health.sqlite'), timeout=1, scheduler=scheduler)
+    yield registry
+    registry.close()
+
+
+class _Response:
+    def __init__(self, url, status_code=200, body=b'<html><body>Welcome</body></html>'):
+        self.url = url
+        self.status_code = status_code
+        self.encoding = 'utf-8'
+        self.raw = self
+        self._body = body
+
+    def read(self, size, decode_content=True):
+        return self._body[:size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def test_classify_response():
+    assert classify_response('https://acme.com', 'https://www.acme.com/', 200, 'Welcome')[0] == STATUS_HEALTHY
+    assert classify_response('https://acme.com', 'https://www.sedo.com/x', 200, '')[0] == STATUS_PARKED
+    assert classify_response('https://acme.com', 'https://www.etsy.com/shop/acme', 200, '')[0] == STATUS_MARKETPLACE
+    assert classify_response('https://acme.com', 'https://acme.com/', 200, 'Buy this domain today')[0] == STATUS_PARKED
+    # One generic phrase alone is not a parking page
+    assert classify_response('https://acme.com', 'https://acme.com/', 200, 'Related searches')[0] == STATUS_HEALTHY
+    assert classify_response('https://acme.com', 'https://acme.com/', 503, '')[0] == STATUS_HTTP_ERROR
+    assert classify_response('https://acme.com', 'https://acme.com/', 403, '')[0] == STATUS_HEALTHY
+
+
+def test_failures_back_off_exponentially(registry):
+    base = registry.backoff_base
+    first = registry.record('acme.com', STATUS_UNREACHABLE, 'refused')
+    second = registry.record('acme.com', STATUS_UNREACHABLE, 'refused')
+    third = registry.record('https://www.acme.com/', STATUS_UNREACHABLE, 'refused')
+
+    assert (first.failures, second.failures, third.failures) == (1, 2, 3)
+    assert third.next_check_at - third.checked_at == pytest.approx(base * 4)
+
+    # A healthy check resets the failure count
+    healthy = registry.record('acme.com', STATUS_HEALTHY)
+    assert healthy.failures == 0
+    assert healthy.next_check_at - healthy.checked_at == pytest.approx(registry.healthy_ttl)
+
+
+def test_backoff_is_capped(registry):
+    for _ in range(20):
+        health = registry.record('acme.com', STATUS_HTTP_ERROR, 'HTTP 500')
+    assert health.next_check_at - health.checked_at == pytest.approx(registry.backoff_max)
+
+
+def test_bad_domain_is_skipped_until_recheck(registry, monkeypatch):
+    registry.record('acme.com', STATUS_PARKED, 'parking page')
+    monkeypatch.setattr(requests, 'get', pytest.fail)
+
+    health = registry.check_sync('acme.com')
+    assert health.status == STATUS_PARKED and health.from_registry and not health.ok
+    assert registry.stats['skipped'] == 1
+
+    registry.forget('acme.com')
+    assert registry.get('acme.com') is None
+
+
+def test_healthy_preflight_is_stored(registry, monkeypatch):
+    monkeypatch.setattr(registry, '_resolve_sync', lambda host: None)
+    monkeypatch.setattr(requests, 'get', lambda url, **kwargs: _Response(url))
+
+    health = registry.check_sync('acme.com')
+    assert health.ok and health.status == STATUS_HEALTHY
+    assert registry.get('acme.com').status == STATUS_HEALTHY
+
+
+def test_dns_failure_is_stored(registry, monkeypatch):
+    def fail(host):
+        raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+    monkeypatch.setattr(registry, '_resolve_sync', fail)
+
+    health = registry.check_sync('acme.com')
+    assert health.status == STATUS_DNS_FAILURE and not health.ok
+    assert registry.get('acme.com').failures == 1
+
+
+@pytest.mark.parametrize('error', [
+    requests.ReadTimeout('read timed out'),
+    requests.ConnectTimeout('connect timed out'),
+    requests.exceptions.SSLError('certificate verify failed'),
+])
+def test_timeouts_and_tls_errors_are_inconclusive(registry, monkeypatch, error):
+    monkeypatch.setattr(registry, '_resolve_sync', lambda host: None)
+
+    def get(url, **kwargs):
+        assert 'verify' not in kwargs
+        raise error
+    monkeypatch.setattr(requests, 'get', get)
+
+    health = registry.check_sync('acme.com')
+    assert health.status == STATUS_INCONCLUSIVE and health.ok
+    assert registry.get('acme.com') is None
+    assert registry.stats['inconclusive'] == 1
+
+
+def test_slow_dns_lookup_is_inconclusive(registry, monkeypatch):
+    monkeypatch.setattr(domain_health.socket, 'getaddrinfo', lambda *args, **kwargs: time.sleep(3))
+    registry.timeout = 0.1
+
+    started = time.monotonic()
+    health = registry.check_sync('acme.com')
+    assert time.monotonic() - started < 2
+    assert health.status == STATUS_INCONCLUSIVE
+    assert registry.get('acme.com') is None
+
+
+def test_connection_error_is_stored(registry, monkeypatch):
+    monkeypatch.setattr(registry, '_resolve_sync', lambda host: None)
+
+    def get(url, **kwargs):
+        raise requests.ConnectionError('connection refused')
+    monkeypatch.setattr(requests, 'get', get)
+
+    assert registry.check_sync('acme.com').status == STATUS_UNREACHABLE
+    assert registry.get('acme.com').status == STATUS_UNREACHABLE
@@ -0,0 +1,213 @@
+# tests/test_driver_pool.py
+"""Leasing, reusing and retiring pooled Chrome drivers, against a fake webdriver"""
+
+import json
+import threading
+
+import pytest
+
+pytest.importorskip('selenium')
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from scrapers import driver_pool
+from scrapers.driver_pool import ChromeDriverPool, fetch_rendered_html
+from scrapers.page_settle import SETTLE_STATE_JS
+from scrapers.render_profile import RenderProfile
+
+
+def _network_event(method, **params):
+    return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+
+class _FakeDriver:
+    def __init__(self, service=None, options=None):
+        self.options = options
+        self.visited = []
+        self.cdp = []
+        self.cookies_cleared = 0
+        self.quit_called = False
+        self.dead = False
+        self.log = []
+        self.network = []
+        self.page_source = '<html><body>Rendered</body></html>'
+
+    def _check(self):
+        if self.dead:
+            raise WebDriverException('chrome not reachable')
+
+    def set_page_load_timeout(self, seconds):
+        self.page_load_timeout = seconds
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp.append(command)
+
+    def execute_script(self, script):
+        self._check()
+        if script == SETTLE_STATE_JS:
+            return {'ready': True, 'inflight': 0, 'quiet': 10_000}
+        return 1
+
+    def get(self, url):
+        self._check()
+        self.visited.append(url)
+        self.log.extend(self.network)
+
+    def get_log(self, kind):
+        entries, self.log = self.log, []
+        return entries
+
+    def delete_all_cookies(self):
+        self._check()
+        self.cookies_cleared += 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def drivers(monkeypatch):
+    started = []
+
+    def chrome(service=None, options=None):
+        started.append(_FakeDriver(service, options))
+        return started[-1]
+
+    monkeypatch.setattr(driver_pool.webdriver, 'Chrome', chrome)
+    monkeypatch.setattr(driver_pool, 'ChromeService', lambda path: path)
+    monkeypatch.setattr(driver_pool, '_driver_path', '/usr/bin/chromedriver')
+    return started
+
+
+def _pool(size=2, max_pages=10):
+    return ChromeDriverPool(size=size, max_pages=max_pages, page_load_timeout=15,
+                            render_profile=RenderProfile(block_resources=True))
+
+
+def test_drivers_are_reused_and_reset_between_leases(drivers):
+    pool = _pool()
+    for url in ('https://a.com', 'https://b.com'):
+        with pool.lease() as driver:
+            driver.get(url)
+
+    assert len(drivers) == 1 and pool.stats['drivers_started'] == 1
+    assert drivers[0].visited == ['https://a.com', 'about:blank', 'https://b.com', 'about:blank']
+    assert drivers[0].cookies_cleared == 2
+    # Started with resource blocking and the settle probe installed
+    assert drivers[0].cdp == ['Network.enable', 'Network.setBlockedURLs', 'Page.addScriptToEvaluateOnNewDocument']
+    assert drivers[0].page_load_timeout == 15
+
+
+def test_worn_out_driver_is_recycled(drivers):
+    pool = _pool(max_pages=2)
+    for _ in range(3):
+        with pool.lease():
+            pass
+
+    assert len(drivers) == 2 and drivers[0].quit_called and not drivers[1].quit_called
+    assert pool.stats['drivers_recycled'] == 1
+
+
+def test_crashed_driver_is_discarded(drivers):
+    pool = _pool()
+    with pytest.raises(WebDriverException):
+        with pool.lease():
+            raise WebDriverException('tab crashed')
+    with pool.lease() as driver:
+        assert driver is drivers[1]
+
+    assert drivers[0].quit_called
+    assert pool.stats['drivers_crashed'] == 1
+    # Other errors leave the driver in the pool
+    with pytest.raises(ValueError):
+        with pool.lease():
+            raise ValueError('bad page')
+    with pool.lease() as driver:
+        assert driver is drivers[1]
+
+
+def test_page_load_timeout_keeps_the_driver(drivers):
+    pool = _pool()
+    with pytest.raises(TimeoutException):
+        with pool.lease() as driver:
+            raise TimeoutException('timed out receiving message from renderer')
+    with pool.lease() as driver:
+        assert driver is drivers[0]
+
+    assert len(drivers) == 1 and not drivers[0].quit_called
+    assert pool.stats['drivers_crashed'] == 0
+    # Reset on check-in, which is where a session that did die would show
+    assert drivers[0].visited == ['about:blank', 'about:blank']
+
+
+def test_timed_out_driver_that_cannot_be_reset_is_discarded(drivers):
+    pool = _pool()
+    with pytest.raises(TimeoutException):
+        with pool.lease():
+            drivers[0].dead = True
+            raise TimeoutException('timed out')
+
+    assert drivers[0].quit_called and pool.stats['drivers_crashed'] == 1
+
+
+def test_unhealthy_idle_driver_is_replaced_on_lease(drivers):
+    pool = _pool()
+    pool.warm_up(1)
+    drivers[0].dead = True
+
+    with pool.lease() as driver:
+        assert driver is drivers[1]
+    assert drivers[0].quit_called and pool.stats['drivers_crashed'] == 1
+
+
+def test_pool_size_bounds_concurrent_leases(drivers):
+    pool = _pool(size=1)
+    leased, release = threading.Event(), threading.Event()
+
+    def hold():
+        with pool.lease():
+            leased.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    leased.wait(5)
+    try:
+        with pytest.raises(TimeoutError):
+            with pool.lease(timeout=0.05):
+                pass
+    finally:
+        release.set()
+        holder.join(5)
+
+    with pool.lease(timeout=1) as driver:
+        assert driver is drivers[0]
+
+
+def test_warm_up_and_close(drivers):
+    pool = _pool(size=2)
+    pool.warm_up(5)
+    assert len(drivers) == 2
+
+    pool.close()
+    assert all(driver.quit_called for driver in drivers)
+    with pytest.raises(RuntimeError):
+        with pool.lease():
+            pass
+
+
+def test_rendered_html_is_measured_and_recorded(drivers, monkeypatch):
+    pool = _pool()
+    pool.warm_up(1)
+    monkeypatch.setattr(driver_pool, '_pool', pool)
+    driver = drivers[0]
+    # Entries left over from an earlier navigation are not counted
+    driver.log = [_network_event('Network.loadingFinished', encodedDataLength=900_000)]
+    driver.network = [_network_event('Network.loadingFinished', encodedDataLength=4096),
+                      _network_event('Network.loadingFailed', type='Image', blockedReason='inspector')]
+
+    html = fetch_rendered_html('https://acme.com', settle=True)
+
+    assert html == driver.page_source and driver.visited[0] == 'https://acme.com'
+    totals = pool.render_profile.totals
+    assert (totals['renders'], totals['requests'], totals['bytes_loaded'], totals['blocked']) == (1, 1, 4096, 1)
@@ -0,0 +1,159 @@
+# tests/test_edp_rules.py
+"""Rule compilation, and that the rules score like the hand-written code they replaced"""
+
+import json
+import random
+
+import pytest
+
+from scrapers import edp_rules
+from scrapers.edp_rules import RuleSet, RuleError, as_score
+
+
+def _legacy_scores(results):
+    """The if/else scoring the shipped rules file replaced"""
+    scores = {}
+    score = 0
+    if not results['EDP1_Has_Search']:
+        score += 40
+    if results['EDP1_SKU_Count_Estimate'] > 2000:
+        score += 30
+    if results['EDP1_Filter_Count'] < 3:
+        score += 20
+    if results['EDP1_Has_Configurator']:
+        score += 10
+    scores['EDP1_SKU_Complexity_Pain_Score'] = min(score, 100)
+
+    score = 0
+    if not results['EDP2_Has_Rep_Locator']:
+        score += 35
+    if not results['EDP2_Rep_Portal_Exists']:
+        score += 50
+    if not results['EDP2_Rep_Resources_Accessible']:
+        score += 15
+    scores['EDP2_Rep_Performance_Pain_Score'] = min(score, 100)
+
+    score = 0
+    if results['EDP6_Channel_Count'] > 2:
+        score += (results['EDP6_Channel_Count'] - 2) * 20
+    if results['EDP6_Pricing_Transparency'] in ['None', 'Quote only']:
+        score += 40
+    if results['EDP6_Multi_Brand_Detected']:
+        score += 20
+    scores['EDP6_Channel_Conflict_Pain_Score'] = min(score, 100)
+
+    score = 0
+    if not results['EDP7_Has_Product_Search']:
+        score += 40
+    if not results['EDP7_Has_Mobile_Optimization']:
+        score += 35
+    if not results['EDP7_Has_Comparison_Tool']:
+        score += 15
+    if not results['EDP7_Has_Downloadable_Assets']:
+        score += 10
+    scores['EDP7_Sales_Enablement_Pain_Score'] = min(score, 100)
+
+    score = 0
+    if not results['EDP8_Has_SSL']:
+        score += 50
+    if results['EDP8_Page_Speed_Score'] == 'Poor':
+        score += 30
+    elif results['EDP8_Page_Speed_Score'] == 'Average':
+        score += 15
+    if results['EDP8_Modern_Feature_Count'] < 2:
+        score += 20
+    if results['EDP8_Has_Legacy_Tech']:
+        score += 25
+    scores['EDP8_Tech_Obsolescence_Pain_Score'] = min(score, 100)
+    return scores
+
+
+def _records(count, seed=3):
+    rng = random.Random(seed)
+    flag = lambda: rng.random() < 0.5
+    return [{
+        'EDP1_Has_Search': flag(),
+        'EDP1_SKU_Count_Estimate': rng.choice([0, 150, 2000, 2001, 12000]),
+        'EDP1_Filter_Count': rng.randint(0, 6),
+        'EDP1_Has_Configurator': flag(),
+        'EDP2_Has_Rep_Locator': flag(),
+        'EDP2_Rep_Portal_Exists': flag(),
+        'EDP2_Rep_Resources_Accessible': flag(),
+        'EDP6_Channel_Count': rng.randint(0, 9),
+        'EDP6_Pricing_Transparency': rng.choice(['None', 'Quote only', 'Partial', 'Full']),
+        'EDP6_Multi_Brand_Detected': flag(),
+        'EDP7_Has_Product_Search': flag(),
+        'EDP7_Has_Mobile_Optimization': flag(),
+        'EDP7_Has_Comparison_Tool': flag(),
+        'EDP7_Has_Downloadable_Assets': flag(),
+        'EDP8_Has_SSL': flag(),
+        'EDP8_Page_Speed_Score': rng.choice(['Good', 'Average', 'Poor']),
+        'EDP8_Modern_Feature_Count': rng.randint(0, 5),
+        'EDP8_Has_Legacy_Tech': flag(),
+    } for _ in range(count)]
+
+
+@pytest.fixture(params=['numpy', 'plain'])
+def rules(request, monkeypatch):
+    if request.param == 'numpy':
+        if edp_rules.np is None:
+            pytest.skip('numpy is not installed')
+    else:
+        monkeypatch.setattr(edp_rules, 'np', None)
+    return RuleSet.load(edp_rules.DEFAULT_RULES_PATH)
+
+
+def test_shipped_rules_score_like_the_legacy_code(rules):
+    for record in _records(500):
+        assert rules.score(record) == _legacy_scores(record)
+
+
+def test_batch_scores_match_single_scores(rules):
+    records = _records(200, seed=11)
+    batch = rules.score_batch(records)
+    for record, row in zip(records, batch):
+        assert [as_score(value) for value in row] == list(rules.score(record).values())
+
+    applied = rules.apply_batch([dict(record) for record in records])
+    assert applied == [rules.apply(dict(record)) for record in records]
+
+
+def test_missing_columns_score_as_absent(rules):
+    scores = rules.score({})
+    assert scores['EDP2_Rep_Performance_Pain_Score'] == 100
+    assert scores == dict(zip(rules.scores, (as_score(v) for v in rules.score_batch([{}])[0])))
+
+
+@pytest.mark.parametrize('rule, message', [
+    ({'field': 'x', 'op': 'between', 'points': 5}, 'unknown operator'),
+    ({'op': 'true', 'points': 5}, 'without a field'),
+    ({'field': 'x', 'op': 'gt', 'value': 'many', 'points': 5}, 'numeric value'),
+    ({'field': 'x', 'op': 'in', 'value': 'None', 'points': 5}, 'list value'),
+])
+def test_malformed_rules_are_rejected(rule, message):
+    with pytest.raises(RuleError, match=message):
+        RuleSet({'scores': {'Pain': {'cap': 100, 'rules': [rule]}}})
+
+
+def test_rules_file_errors(tmp_path):
+    with pytest.raises(RuleError, match='No scores'):
+        RuleSet({'scores': {}})
+
+    broken = tmp_path / 'rules.json'
+    broken.write_text('{"scores": ', encoding='utf-8')
+    with pytest.raises(RuleError, match='Could not read'):
+        RuleSet.load(str(broken))
+
+
+def test_weight_change_is_a_data_change(tmp_path):
+    spec = json.loads(edp_rules.DEFAULT_RULES_PATH.read_text(encoding='utf-8'))
+    spec['scores']['EDP1_SKU_Complexity_Pain_Score']['rules'][0]['points'] = 45
+    path = tmp_path / 'rules.json'
+    path.write_text(json.dumps(spec), encoding='utf-8')
+
+    shipped, changed = RuleSet.load(edp_rules.DEFAULT_RULES_PATH), RuleSet.load(str(path))
+    assert shipped.fingerprint != changed.fingerprint
+    record = _records(1)[0]
+    record['EDP1_Has_Search'] = False
+    assert (changed.score(record)['EDP1_SKU_Complexity_Pain_Score']
+            == min(shipped.score(record)['EDP1_SKU_Complexity_Pain_Score'] + 5, 100))
@@ -0,0 +1,75 @@
+# tests/test_evidence_memo.py
+"""Memoized evidence results: invalidation and reuse on unchanged pages"""
+
+import pytest
+
+from scrapers.evidence_memo import EvidenceMemo, html_digest
+from scrapers.website_evidence_v2 import WebsiteEvidenceExtractorV2
+
+PAGE = """<html><head><title>Acme Lighting</title></head><body>
+<input type="search" placeholder="Search products">
+<p>Find a sales rep in your territory. Dealer locator. Over 500 products.</p>
+<a href="/catalog.pdf">Download catalog</a>
+</body></html>"""
+
+
+@pytest.fixture
+def memo(tmp_path):
+    memo = EvidenceMemo('1', directory=str(tmp_path))
+    yield memo
+    memo.close()
+
+
+@pytest.fixture
+def extractor(memo):
+    extractor = WebsiteEvidenceExtractorV2(replay=False)
+    extractor.memo = memo
+    return extractor
+
+
+def test_memo_hit_needs_same_page(memo):
+    memo.put('https://acme.com', html_digest('a'), {'score': 1})
+    assert memo.get('acme.com', html_digest('a')) == {'score': 1}
+    assert memo.get('https://acme.com/', html_digest('b')) is None
+
+
+def test_newer_page_replaces_result(memo):
+    memo.put('https://acme.com', html_digest('a'), {'score': 1})
+    memo.put('https://acme.com', html_digest('b'), {'score': 2})
+    assert memo.get('https://acme.com', html_digest('a')) is None
+    assert memo.get('https://acme.com', html_digest('b')) == {'score': 2}
+
+
+def test_invalidate(memo):
+    memo.put('https://acme.com', html_digest('a'), {'score': 1})
+    memo.invalidate('https://acme.com')
+    assert memo.get('https://acme.com', html_digest('a')) is None
+
+
+def test_version_bump_drops_results(memo, tmp_path):
+    memo.put('https://acme.com', html_digest('a'), {'score': 1})
+    newer = EvidenceMemo('2', directory=str(tmp_path))
+    try:
+        assert newer.get('https://acme.com', html_digest('a')) is None
+    finally:
+        newer.close()
+    # The purge removed the old version's rows for every reader
+    assert memo.get('https://acme.com', html_digest('a')) is None
+
+
+def test_memo_hit_reports_this_fetch(extractor, memo):
+    first = extractor.analyze_html('acme.com', PAGE, 1.2, 'static')
+    assert memo.stats['stored'] == 1
+
+    second = extractor.analyze_html('acme.com', PAGE, 5.4, 'rendered')
+    assert memo.stats['hits'] == 1
+    assert second['EDP8_Load_Time_Seconds'] == 5.4
+    assert second['EDP8_Page_Speed_Score'] == 'Poor'
+    assert second['Fetch_Tier'] == 'rendered'
+    assert second['scan_timestamp'] >= first['scan_timestamp']
+
+    # Speed feeds the technology score, so the hit matches a fresh analysis
+    extractor.memo = None
+    fresh = extractor.analyze_html('acme.com', PAGE, 5.4, 'rendered')
+    for field in ('EDP8_Page_Speed_Score', 'EDP8_Tech_Obsolescence_Pain_Score'):
+        assert second[field] == fresh[field]
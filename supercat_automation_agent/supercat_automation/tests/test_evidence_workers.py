@@ -0,0 +1,153 @@
+# tests/test_evidence_workers.py
+"""Worker functions behind the async engine's CPU stage and the worker pool"""
+
+import asyncio
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from scrapers import evidence_workers
+from scrapers.evidence_memo import EvidenceMemo
+from scrapers.evidence_workers import (
+    EvidenceWorkerPool, decode_record, encode_record, parse_in_worker, score_in_worker
+)
+from scrapers.website_evidence_v2 import WebsiteEvidenceExtractorV2
+
+PAGE = """<html><body>
+<nav class="main-menu"><a href="/products">Products</a><a href="/dealers">Find a Dealer</a></nav>
+<input type="search" placeholder="Search">
+<p>Browse 2,400 products from our wholesale catalog. Become a sales rep.</p>
+<a href="/catalog.pdf">Catalog PDF</a>
+</body></html>"""
+SUBPAGES = [{'url': 'https://acme.com/dealers', 'final_url': 'https://acme.com/dealers',
+             'html': '<html><body><p>Dealer locator: find a showroom near you</p></body></html>'}]
+
+
+@pytest.fixture
+def extractor(tmp_path, monkeypatch):
+    memo = EvidenceMemo('test', directory=str(tmp_path))
+    extractor = WebsiteEvidenceExtractorV2(replay=False)
+    extractor.memo = memo
+    # score_in_worker runs in this process here, with the same extractor
+    monkeypatch.setattr(evidence_workers, '_extractor', extractor)
+    yield extractor
+    memo.close()
+
+
+def _without_timestamp(result):
+    return {key: value for key, value in result.items() if key != 'scan_timestamp'}
+
+
+def test_parsed_page_scores_like_the_html(extractor):
+    page, page_digest = parse_in_worker(PAGE)
+    assert page.soup is None
+    # What crosses to the scoring worker holds no copy of the HTML besides the parsed page
+    assert PAGE.encode() not in pickle.dumps((page, page_digest))
+
+    from_page = score_in_worker(False, 'acme.com', '', 1.5, 'static', SUBPAGES, page, None, page_digest)
+    extractor.memo = None
+    from_html = extractor.analyze_html('acme.com', PAGE, 1.5, 'static', subpages=SUBPAGES)
+
+    assert _without_timestamp(from_page) == _without_timestamp(from_html)
+
+
+def test_parsed_page_crosses_back_without_the_html(extractor):
+    # Mostly markup: scripts, styles and attributes the analyzers only keyword-scan
+    html = ('<html><head><script src="https://cdn.shopify.com/s/react.js"></script>'
+            + '<style>.grid{display:flex}</style>' * 400 + '</head><body>'
+            + '<div class="product-card" data-sku="AC-1042">Brass pendant</div>' * 200 + '</body></html>')
+    payload = pickle.dumps(parse_in_worker(html))
+
+    assert html.lower().encode() not in payload
+    assert len(payload) < len(html) // 4
+
+    page, page_digest = parse_in_worker(html)
+    assert page.html_keywords >= {'react', 'cdn'}
+    from_page = score_in_worker(False, 'acme.com', '', 1.5, 'static', SUBPAGES, page, None, page_digest)
+    extractor.memo = None
+    from_html = extractor.analyze_html('acme.com', html, 1.5, 'static', subpages=SUBPAGES)
+    assert _without_timestamp(from_page) == _without_timestamp(from_html)
+
+
+def test_parsed_page_and_html_share_memo_entries(extractor):
+    extractor.analyze_html('acme.com', PAGE, 1.5, 'static', subpages=SUBPAGES)
+    page, page_digest = parse_in_worker(PAGE)
+    score_in_worker(False, 'acme.com', '', 1.5, 'static', SUBPAGES, page, None, page_digest)
+    assert extractor.memo.stats['hits'] == 1
+
+
+def test_encoded_records_round_trip():
+    result = {'domain': 'https://acme.com', 'EDP1_Filter_Options': ['Select: size'], 'score': 42.5}
+    assert decode_record(encode_record(result)) == result
+
+
+class _FakeWorkers:
+    """Stands in for worker processes: threads running a scripted analysis"""
+
+    def __init__(self, monkeypatch, rss_mb=None, crash=()):
+        self.rss_mb = rss_mb or {}
+        self.crash = set(crash)
+        self.executors = []
+        monkeypatch.setattr(evidence_workers, 'new_worker_executor', self._new_executor)
+        monkeypatch.setattr(evidence_workers, '_analyze_in_worker', self._analyze)
+
+    def _new_executor(self, workers):
+        executor = ThreadPoolExecutor(max_workers=workers)
+        self.executors.append(executor)
+        return executor
+
+    def _analyze(self, domain, replay):
+        if domain in self.crash:
+            self.crash.discard(domain)
+            raise BrokenProcessPool('worker died')
+        return encode_record({'domain': domain}), self.rss_mb.get(domain, 100.0)
+
+
+def _pool(**kwargs):
+    return EvidenceWorkerPool(extractor=WebsiteEvidenceExtractorV2(replay=False), **kwargs)
+
+
+def test_only_the_worker_over_the_rss_limit_is_recycled(monkeypatch):
+    fake = _FakeWorkers(monkeypatch, rss_mb={'big.com': 2048.0})
+    pool = _pool(workers=2, max_tasks_per_child=100, max_rss_mb=1024)
+
+    async def run():
+        async with pool:
+            first = [slot.executor for slot in pool._slots]
+            await pool.analyze('small.com')
+            await pool.analyze('big.com')
+            return first, [slot.executor for slot in pool._slots]
+
+    before, after = asyncio.run(run())
+    assert pool.stats['recycled'] == 1
+    assert pool.stats['peak_rss_mb'] == 2048.0
+    assert sum(old is new for old, new in zip(before, after)) == 1
+    assert len(fake.executors) == 3
+
+
+def test_workers_are_replaced_after_their_share_of_domains(monkeypatch):
+    _FakeWorkers(monkeypatch)
+    pool = _pool(workers=2, max_tasks_per_child=2, max_rss_mb=1024)
+
+    async def run():
+        async with pool:
+            return [await pool.analyze(f'site{i}.com') for i in range(6)]
+
+    results = asyncio.run(run())
+    assert [result['domain'] for result in results] == [f'site{i}.com' for i in range(6)]
+    # 2 workers x 2 domains each, then each is replaced once for the last 2 domains
+    assert pool.stats['recycled'] == 2
+
+
+def test_crashed_worker_is_replaced_and_domain_retried(monkeypatch):
+    _FakeWorkers(monkeypatch, crash=['flaky.com'])
+    pool = _pool(workers=1, max_tasks_per_child=100, max_rss_mb=1024)
+
+    async def run():
+        async with pool:
+            return await pool.analyze('flaky.com')
+
+    assert asyncio.run(run()) == {'domain': 'flaky.com'}
+    assert pool.stats['crashed'] == 1 and pool.stats['recycled'] == 1
@@ -0,0 +1,112 @@
+# tests/test_exhibitor_details.py
+"""Resolving exhibitor websites from detail pages visited concurrently from a page pool"""
+
+import asyncio
+
+import pytest
+
+from config.settings import settings
+from scrapers.vegas_market import VegasMarketScraper
+
+SHOW = 'https://www.lasvegasmarket.com'
+DETAILS = {
+    f'{SHOW}/exhibitor/lumen': ({'company_name': 'Lumen', 'website': 'https://lumen.com', 'booth_number': 'B-12'}, 0.02),
+    f'{SHOW}/exhibitor/casa': ({'company_name': 'Casa', 'website': 'https://casa.com', 'booth_number': None}, 0.01),
+    f'{SHOW}/exhibitor/slow': ({'company_name': 'Slow', 'website': 'https://slow.com'}, 5),
+    f'{SHOW}/exhibitor/inhouse': ({'company_name': 'In House', 'website': f'{SHOW}/brands/inhouse'}, 0.01),
+}
+
+
+class _Page:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class _Context:
+    def __init__(self):
+        self.opened = 0
+
+    async def new_page(self):
+        self.opened += 1
+        return _Page(self)
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    monkeypatch.setattr(settings, 'exhibitor_detail_concurrency', 2)
+    monkeypatch.setattr(settings, 'exhibitor_detail_timeout', 0.5)
+    monkeypatch.setattr(settings, 'exhibitor_detail_max_pages', 10)
+    scraper = VegasMarketScraper()
+    scraper.visited, scraper.active, scraper.peak = [], 0, 0
+
+    async def visit(page, url):
+        scraper.visited.append(url)
+        scraper.active += 1
+        scraper.peak = max(scraper.peak, scraper.active)
+        try:
+            details, delay = DETAILS[url]
+            await asyncio.sleep(delay)
+            return dict(details)
+        finally:
+            scraper.active -= 1
+
+    scraper._visit_exhibitor_page = visit
+    return scraper
+
+
+def _stream(scraper, exhibitors):
+    page = _Page(_Context())
+
+    async def run():
+        return [batch async for batch in scraper._stream_exhibitor_websites(page, exhibitors)]
+
+    return asyncio.run(run()), page.context
+
+
+def test_websites_are_resolved_from_detail_pages(scraper):
+    exhibitors = [
+        {'company_name': 'Acme', 'website': 'https://acme.com'},
+        {'company_name': 'Lumen', 'detail_url': '/exhibitor/lumen'},
+        {'company_name': 'Lumen Lighting', 'website': f'{SHOW}/exhibitor/lumen'},
+        {'company_name': 'Casa', 'website': '/exhibitor/casa', 'booth_number': 'C-1'},
+        {'company_name': 'Slow', 'detail_url': f'{SHOW}/exhibitor/slow'},
+        {'company_name': 'In House', 'detail_url': '/exhibitor/inhouse'},
+        {'company_name': 'Nowhere'},
+    ]
+    batches, context = _stream(scraper, exhibitors)
+
+    # Known websites need no visit and come first
+    assert [e['company_name'] for e in batches[0]] == ['Acme', 'Nowhere']
+    # One visit per detail page, even when two exhibitors share it, within the pool size
+    assert sorted(scraper.visited) == sorted(DETAILS)
+    assert scraper.peak == 2 and context.opened <= 2
+
+    websites = {e['company_name']: e.get('website') for batch in batches for e in batch}
+    assert websites == {'Acme': 'https://acme.com', 'Nowhere': None, 'Lumen': 'https://lumen.com',
+                        'Lumen Lighting': 'https://lumen.com', 'Casa': 'https://casa.com',
+                        'Slow': None, 'In House': None}
+    booths = {e['company_name']: e.get('booth_number') for batch in batches for e in batch}
+    assert booths['Lumen'] == 'B-12' and booths['Casa'] == 'C-1'
+    # The timed out page is yielded last instead of holding up the rest
+    assert [e['company_name'] for e in batches[-1]] == ['Slow']
+
+
+def test_detail_pages_stay_within_the_per_scrape_budget(scraper):
+    scraper._detail_pages_left = 1
+    exhibitors = [{'company_name': 'Lumen', 'detail_url': '/exhibitor/lumen'},
+                  {'company_name': 'Casa', 'detail_url': '/exhibitor/casa'}]
+    batches, _ = _stream(scraper, exhibitors)
+
+    assert scraper.visited == [f'{SHOW}/exhibitor/lumen']
+    assert [[e['company_name'] for e in batch] for batch in batches] == [['Casa'], ['Lumen']]
+    assert scraper._detail_pages_left == 0
+
+    batches, _ = _stream(scraper, [{'company_name': 'In House', 'detail_url': '/exhibitor/inhouse'}])
+    assert len(scraper.visited) == 1 and batches == [[{'company_name': 'In House', 'detail_url': '/exhibitor/inhouse'}]]
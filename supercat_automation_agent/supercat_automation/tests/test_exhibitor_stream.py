@@ -0,0 +1,190 @@
+# tests/test_exhibitor_stream.py
+"""Streamed exhibitors reaching the batched writer and the evidence queue while scraping goes on"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from scrapers.base_scraper import BaseTradeshowScraper
+from scrapers.exhibitor_stream import BatchedExhibitorWriter, EvidenceQueue
+
+
+def _exhibitors(*names):
+    return [{'company_name': name, 'website': f'https://{name.lower()}.com'} for name in names]
+
+
+class _Saver:
+    """Blocking bulk save that takes a while, failing for batches holding a 'Broken' exhibitor"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.batches = []
+        self.writing = threading.Event()
+
+    def __call__(self, batch):
+        self.writing.set()
+        time.sleep(self.delay)
+        if any(exhibitor['company_name'] == 'Broken' for exhibitor in batch):
+            raise ConnectionError('database unavailable')
+        self.batches.append([exhibitor['company_name'] for exhibitor in batch])
+        return len(batch)
+
+
+def test_writer_saves_in_batches_and_the_rest_on_close():
+    saver = _Saver()
+    writer = BatchedExhibitorWriter(saver, batch_size=3)
+
+    async def run():
+        await writer.put(_exhibitors('A', 'B'))
+        await writer.put(_exhibitors('C', 'D'))
+        await writer.put(_exhibitors('E'))
+        return await writer.close()
+
+    assert asyncio.run(run()) == 5
+    assert saver.batches == [['A', 'B', 'C', 'D'], ['E']]
+    assert writer.batches == 2
+
+
+def test_scraping_goes_on_while_a_batch_is_written():
+    saver = _Saver(delay=0.2)
+    writer = BatchedExhibitorWriter(saver, batch_size=1)
+
+    async def run():
+        await writer.put(_exhibitors('A'))
+        # The loop is free while the first batch is in the database thread
+        start = time.monotonic()
+        await asyncio.sleep(0.01)
+        assert time.monotonic() - start < 0.1
+        await asyncio.to_thread(saver.writing.wait, 1)
+        await writer.put(_exhibitors('B'))
+        return await writer.close()
+
+    assert asyncio.run(run()) == 2
+    assert saver.batches == [['A'], ['B']]
+
+
+def test_failed_batch_does_not_stop_the_stream():
+    writer = BatchedExhibitorWriter(_Saver(delay=0), batch_size=2)
+
+    async def run():
+        await writer.put(_exhibitors('A', 'Broken'))
+        await writer.put(_exhibitors('C', 'D'))
+        return await writer.close()
+
+    assert asyncio.run(run()) == 2
+    assert writer.batches == 1
+
+
+class _Engine:
+    def __init__(self, start_delay=0.0):
+        self.start_delay = start_delay
+        self.started = self.closed = 0
+        self.ready = False
+        self.analyzed = []
+        self.active = self.peak = 0
+        self.release = None
+
+    async def start(self):
+        self.started += 1
+        await asyncio.sleep(self.start_delay)
+        self.ready = True
+
+    async def close(self):
+        self.closed += 1
+
+    async def analyze(self, domain):
+        assert self.ready, 'analyze called before start finished'
+        if self.release is not None:
+            await self.release.wait()
+        self.analyzed.append(domain)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if domain == 'broken.com':
+            raise TimeoutError('render timed out')
+        return {'domain': domain}
+
+
+def test_evidence_queue_analyzes_each_domain_once():
+    engine = _Engine()
+    queue = EvidenceQueue(engine, concurrency=2)
+
+    async def run():
+        await queue.put(_exhibitors('Acme', 'Lumen', 'Broken'))
+        await queue.put([{'company_name': 'Acme Lighting', 'website': 'https://acme.com/about'},
+                         {'company_name': 'No Site'}] + _exhibitors('Casa', 'Globex'))
+        return await queue.close()
+
+    results = asyncio.run(run())
+
+    assert sorted(engine.analyzed) == ['acme.com', 'broken.com', 'casa.com', 'globex.com', 'lumen.com']
+    assert sorted(results) == ['acme.com', 'casa.com', 'globex.com', 'lumen.com']
+    assert engine.peak == 2 and (engine.started, engine.closed) == (1, 1)
+
+
+def test_scrapers_streaming_at_once_wait_for_the_engine_to_start():
+    engine = _Engine(start_delay=0.05)
+    queue = EvidenceQueue(engine, concurrency=2)
+
+    async def run():
+        await asyncio.gather(queue.put(_exhibitors('Acme')), queue.put(_exhibitors('Lumen')))
+        return await queue.close()
+
+    assert sorted(asyncio.run(run())) == ['acme.com', 'lumen.com']
+    assert engine.started == 1
+
+
+def test_fast_scraper_waits_for_room_in_the_queue():
+    engine = _Engine()
+    queue = EvidenceQueue(engine, concurrency=1, queue_size=2)
+    names = [f'Company{i}' for i in range(10)]
+
+    async def run():
+        engine.release = asyncio.Event()
+        streaming = asyncio.ensure_future(queue.put(_exhibitors(*names)))
+        await asyncio.sleep(0.05)
+        # One domain with the stuck worker, two queued, the scraper waiting on the rest
+        assert not streaming.done() and queue._queue.qsize() == 2
+        engine.release.set()
+        await streaming
+        return await queue.close()
+
+    assert len(asyncio.run(run())) == 10
+
+
+class _Show(BaseTradeshowScraper):
+    """Streams two batches, repeating an exhibitor, then fails"""
+
+    async def scrape_trade_show_info(self, page):
+        return {}
+
+    async def scrape_exhibitor_list(self, page):
+        return []
+
+    async def stream_exhibitor_list(self, page):
+        yield _exhibitors('Acme', 'Lumen')
+        yield _exhibitors('Lumen', 'Casa') + [{'company_name': '', 'website': 'nameless.com'}]
+        raise RuntimeError('directory page crashed')
+
+
+class _Sink:
+    def __init__(self):
+        self.batches = []
+
+    async def put(self, exhibitors):
+        self.batches.append([exhibitor['company_name'] for exhibitor in exhibitors])
+
+
+def test_what_was_streamed_before_a_failure_is_saved():
+    saver = _Saver(delay=0)
+    writer, sink = BatchedExhibitorWriter(saver, batch_size=100), _Sink()
+    scraper = _Show('Lightovation', 'https://example.com')
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(scraper._stream_exhibitors(None, writer, [sink]))
+
+    assert sink.batches == [['Acme', 'Lumen'], ['Casa']]
+    assert saver.batches == [['Acme', 'Lumen', 'Casa']] and writer.saved == 3
@@ -0,0 +1,89 @@
+# tests/test_full_pipeline_v2.py
+"""Batched companies keep their OpenAI and Clay calls paced"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import full_pipeline_v2
+from full_pipeline_v2 import SuperCatPipelineV2
+
+
+class _Calls:
+    """Records when each outbound call ran and how many overlapped"""
+
+    def __init__(self):
+        self.started = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            self.started.append(time.monotonic())
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def leave(self):
+        with self._lock:
+            self.active -= 1
+
+
+class _Evidence:
+    async def analyze(self, domain):
+        return {'domain': domain}
+
+
+class _Psi:
+    def calculate_dual_psi(self, company_data, website_evidence):
+        methodology = {'psi_score': 80.0, 'tier': 'TIER_A_IMMEDIATE', 'qualification_decision': True}
+        return {'weighted_methodology': methodology, 'averaged_methodology': methodology}
+
+
+class _Messages:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def generate_validated_campaign(self, company_data, website_evidence):
+        self.calls.enter()
+        time.sleep(0.05)
+        self.calls.leave()
+        return {'campaign_type': 'crisis_intervention'}
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr(full_pipeline_v2, 'supabase', None)
+    pipeline = SuperCatPipelineV2()
+    pipeline._api_delay = 0.1
+    pipeline.calls = _Calls()
+    pipeline.evidence_engine = _Evidence()
+    pipeline.psi_calculator = _Psi()
+    pipeline.message_generator = _Messages(pipeline.calls)
+    pipeline.clay_webhook_url = 'https://clay.example/webhook'
+
+    async def send_to_clay_v2(*args):
+        pipeline.calls.enter()
+        await asyncio.sleep(0.05)
+        pipeline.calls.leave()
+
+    pipeline.send_to_clay_v2 = send_to_clay_v2
+    return pipeline
+
+
+def test_concurrent_companies_share_the_api_pacing(pipeline):
+    companies = [{'company_name': f'Company {i}', 'domain': f'company{i}.com'} for i in range(3)]
+
+    async def run():
+        return await asyncio.gather(*(pipeline.process_company_v2(company) for company in companies))
+
+    results = asyncio.run(run())
+    assert [result['status'] for result in results] == ['completed'] * 3
+
+    # 3 campaigns and 3 Clay sends, one at a time and at least the delay apart
+    assert len(pipeline.calls.started) == 6
+    assert pipeline.calls.peak == 1
+    gaps = [later - earlier for earlier, later in zip(pipeline.calls.started, pipeline.calls.started[1:])]
+    assert min(gaps) >= 0.09
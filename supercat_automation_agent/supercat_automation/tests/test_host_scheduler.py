@@ -0,0 +1,129 @@
+# tests/test_host_scheduler.py
+"""Per-host spacing and concurrency, and robots.txt handling"""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scrapers.host_scheduler import HostScheduler, FetchDisallowed, host_key
+
+ROBOTS = """User-agent: *
+Disallow: /private
+Crawl-delay: 3
+Sitemap: https://acme.com/sitemap.xml
+"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    robots_status = 200
+    robots_requests = 0
+
+    def do_GET(self):
+        if self.path == '/robots.txt':
+            type(self).robots_requests += 1
+            self.send_response(self.robots_status)
+            self.end_headers()
+            if self.robots_status == 200:
+                self.wfile.write(ROBOTS.encode('utf-8'))
+            return
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.robots_status = 200
+    _Handler.robots_requests = 0
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+
+
+def _scheduler(**kwargs):
+    kwargs.setdefault('respect_robots', False)
+    return HostScheduler(global_concurrency=8, **kwargs)
+
+
+def test_host_key_ignores_www_and_case():
+    assert host_key('https://WWW.Acme.com/shop') == 'acme.com'
+    assert host_key('acme.com') == 'acme.com'
+    assert host_key('https://shop.acme.com') == 'shop.acme.com'
+
+
+def test_requests_to_one_host_are_spaced():
+    scheduler = _scheduler(host_delay=5)
+    assert scheduler._reserve('https://acme.com/a') == 0
+    assert scheduler._reserve('https://www.acme.com/b') == pytest.approx(5, abs=0.1)
+    assert scheduler._reserve('https://acme.com/c') == pytest.approx(10, abs=0.1)
+    # Other hosts do not wait behind acme.com
+    assert scheduler._reserve('https://globex.com/') == 0
+    assert scheduler.stats['hosts'] == 2
+
+
+def test_per_host_concurrency_bounds_async_slots():
+    scheduler = _scheduler(host_delay=0, per_host_concurrency=1)
+    active = {'acme.com': 0, 'globex.com': 0}
+    peak = {'acme.com': 0, 'globex.com': 0}
+    both = []
+
+    async def request(url):
+        key = host_key(url)
+        async with scheduler.slot(url):
+            active[key] += 1
+            peak[key] = max(peak[key], active[key])
+            both.append(all(active.values()))
+            await asyncio.sleep(0.02)
+            active[key] -= 1
+
+    async def run():
+        urls = [f'https://{host}/{i}' for i in range(3) for host in ('acme.com', 'globex.com')]
+        await asyncio.gather(*(request(url) for url in urls))
+
+    asyncio.run(run())
+    assert peak == {'acme.com': 1, 'globex.com': 1}
+    assert any(both)
+
+
+def test_robots_disallow_raises_in_both_paths(server):
+    scheduler = _scheduler(host_delay=0, respect_robots=True)
+
+    with scheduler.slot_sync(server + '/products'):
+        pass
+    with pytest.raises(FetchDisallowed):
+        with scheduler.slot_sync(server + '/private/prices'):
+            pass
+
+    async def run():
+        async with scheduler.slot(server + '/private'):
+            pass
+
+    with pytest.raises(FetchDisallowed):
+        asyncio.run(run())
+
+    assert _Handler.robots_requests == 1
+    assert scheduler.stats['disallowed'] == 2
+    assert scheduler.sitemaps_sync(server + '/') == ['https://acme.com/sitemap.xml']
+
+
+def test_crawl_delay_stretches_the_host_delay(server):
+    scheduler = _scheduler(host_delay=1, respect_robots=True)
+    scheduler._robots_sync(server + '/')
+    assert scheduler._reserve(server + '/a') == 0
+    assert scheduler._reserve(server + '/b') == pytest.approx(3, abs=0.1)
+
+
+@pytest.mark.parametrize('status', [404, 503])
+def test_missing_or_failing_robots_allows_everything(server, status):
+    _Handler.robots_status = status
+    scheduler = _scheduler(host_delay=0, respect_robots=True)
+    with scheduler.slot_sync(server + '/private'):
+        pass
+    assert scheduler._robots_sync(server + '/') is None
+    assert _Handler.robots_requests == 1
@@ -0,0 +1,93 @@
+# tests/test_html_parser.py
+"""The selectolax walk must match the BeautifulSoup walk it replaces"""
+
+from dataclasses import asdict
+
+import pytest
+
+from scrapers.html_parser import (
+    BACKEND_HTML_PARSER, BACKEND_SELECTOLAX, parse_page, resolve_backend
+)
+
+pytest.importorskip('selectolax')
+
+CATALOG_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+  <title>Acme Lighting | Wholesale</title>
+  <meta name="description" content="Wholesale lighting catalog">
+  <meta name="robots">
+  <link rel="stylesheet" href="/css/site.css">
+  <link rel="preload stylesheet" href="/css/print.css">
+  <script src="https://cdn.shopify.com/s/shop.js"></script>
+  <script>var catalog = {"products": 1200};</script>
+  <style>.nav { color: red; }</style>
+</head>
+<body>
+  <nav class="main-nav">
+    <ul class="menu">
+      <li><a href="/lamps">Table Lamps</a></li>
+      <li><a href="/pendants">Pendants</a></li>
+      <li><a href="/sconces">Wall <b>Sconces</b></a></li>
+      <li><a href="/x">X</a></li>
+    </ul>
+  </nav>
+  <div class="brand-list"><a href="/brands/acme">Acme</a></div>
+  <section class="brands">Featured</section>
+  <form action="/Search" method="get">
+    <input type="search" name="q" placeholder="Search products">
+    <input class="filter-color" name="color">
+    <select class="filter-size" name="size"><option>S</option><option>M</option></select>
+    <select name="sort"><option>Price</option></select>
+    <button>Search</button>
+    <button><span>Go</span></button>
+  </form>
+  <p>Showing 1-24 of 1,200 products</p>
+  <!-- 350 items in stock -->
+  <a href="/files/Catalog-2024.PDF">Download the catalog</a>
+  <a href="/files/price-list.xlsx">Price list</a>
+  <a>No href</a>
+  <template><p>Hidden template text</p></template>
+  <ruby>Kanji<rt>kana</rt></ruby>
+</body>
+</html>
+"""
+
+PLAIN_PAGE = """<html><body>
+<h1>Welcome to our showroom</h1>
+<p>We sell furniture to retailers across the country.</p>
+<a href="mailto:sales@example.com">Contact sales</a>
+</body></html>
+"""
+
+
+@pytest.mark.parametrize('html', [CATALOG_PAGE, PLAIN_PAGE, '', '<p>fragment only</p>'])
+def test_selectolax_matches_soup_walk(html):
+    soup_page = parse_page(html, BACKEND_HTML_PARSER)
+    lexbor_page = parse_page(html, BACKEND_SELECTOLAX)
+
+    assert lexbor_page.backend == BACKEND_SELECTOLAX
+    assert lexbor_page.soup is None
+    # Parsers keep different whitespace between blocks; the words must match
+    assert lexbor_page.text_content.split() == soup_page.text_content.split()
+    assert asdict(lexbor_page.features) == asdict(soup_page.features)
+
+
+def test_catalog_page_features():
+    features = parse_page(CATALOG_PAGE, BACKEND_SELECTOLAX).features
+
+    assert features.sku_count_max == 350
+    assert features.pdf_link_count == 1
+    assert features.search_type_inputs == 1
+    assert features.search_buttons == 1
+    assert features.stylesheet_count == 2
+    assert features.form_actions == ['/search']
+    assert features.filter_options == ['Input: color', 'Select: size']
+    # Each link counts once for each nav container around it
+    assert features.nav_link_texts == ['Table Lamps', 'Table Lamps', 'Pendants', 'Pendants',
+                                       'Wall Sconces', 'Wall Sconces']
+    assert 'hidden template text' not in parse_page(CATALOG_PAGE, BACKEND_SELECTOLAX).text_content
+
+
+def test_unknown_backend_falls_back_to_html_parser():
+    assert resolve_backend('no-such-parser') == BACKEND_HTML_PARSER
@@ -0,0 +1,66 @@
+# tests/test_keyword_matcher.py
+"""The compiled matcher answers exactly like `keyword in text`"""
+
+import random
+
+import pytest
+
+from scrapers import keyword_matcher
+from scrapers.keyword_matcher import KeywordMatcher
+from scrapers.website_evidence_v2 import WebsiteEvidenceExtractorV2
+
+TABLES = {
+    'search': ['search', 'sea', 'arch', 'search bar'],
+    'dealers': ['dealer', 'dealer locator', 'locator', 'deal'],
+    'overlap': ['abc', 'bcd', 'cde', 'abcde', 'b'],
+}
+
+
+def _naive_scan(tables, text):
+    hits = {}
+    for category, keywords in tables.items():
+        matched = [keyword for keyword in keywords if keyword in text]
+        if matched:
+            hits[category] = matched
+    return hits
+
+
+@pytest.fixture(params=['regex', 'automaton'])
+def backend(request, monkeypatch):
+    if request.param == 'automaton':
+        if keyword_matcher.ahocorasick is None:
+            pytest.skip('pyahocorasick is not installed')
+    else:
+        monkeypatch.setattr(keyword_matcher, 'ahocorasick', None)
+    return request.param
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    'use the search bar or the dealer locator',
+    'abcde',
+    'xabcdex bcd',
+    'researcher',
+    'dealerlocator',
+])
+def test_scan_matches_substring_checks(backend, text):
+    assert KeywordMatcher(TABLES).scan(text) == _naive_scan(TABLES, text)
+
+
+def test_random_texts_match_substring_checks(backend):
+    rng = random.Random(7)
+    alphabet = 'abcde '
+    tables = {f'table{i}': [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(6)]
+              for i in range(4)}
+    matcher = KeywordMatcher(tables)
+    for _ in range(300):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        assert matcher.scan(text) == _naive_scan(tables, text), text
+
+
+def test_extractor_tables_match_substring_checks(backend):
+    extractor = WebsiteEvidenceExtractorV2(replay=False)
+    text = ('find a dealer near you. search our wholesale catalog of 2,400 products. '
+            'become a sales rep. request a quote. filter by size and color. login to your account.')
+    matcher = KeywordMatcher(extractor.text_keywords)
+    assert matcher.scan(text) == _naive_scan(extractor.text_keywords, text)
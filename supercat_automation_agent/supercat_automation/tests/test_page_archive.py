@@ -0,0 +1,132 @@
+# tests/test_page_archive.py
+"""Archiving fetches and replaying them offline"""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scrapers.evidence_engine import EvidenceEngine
+from scrapers.host_scheduler import HostScheduler
+from scrapers.page_archive import PageArchive, ArchiveMiss
+from scrapers.page_cache import KIND_RENDERED
+from scrapers.sitemap import CatalogEstimate
+from scrapers.tiered_fetcher import TieredFetcher, TIER_STATIC, TIER_RENDERED
+
+PAGES = {
+    '/': '<html><body><h1>Acme Lighting</h1><p>Wholesale fixtures for retailers.</p></body></html>',
+    '/shell': '<html><body><div id="root"></div><script src="/app.js"></script></body></html>',
+}
+RENDERED = '<html><body><p>Rendered catalog</p></body></html>'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = PAGES.get(self.path)
+        self.send_response(200 if body else 404)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.end_headers()
+        self.wfile.write((body or 'Not found').encode('utf-8'))
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = PageArchive(directory=str(tmp_path / 'archive'))
+    yield archive
+    archive.close()
+
+
+def test_put_and_get_round_trip(archive):
+    html = '<html><body><p>Caf\u00e9 lighting \u2013 2,400 products</p></body></html>'
+    assert archive.put('https://Acme.com/#top', html, final_url='https://www.acme.com/',
+                       headers={'ETag': '"v1"'}, elapsed=0.8)
+
+    page = archive.get('https://acme.com/')
+    assert page.html == html
+    assert page.final_url == 'https://www.acme.com/'
+    assert (page.status, page.elapsed) == (200, 0.8)
+    assert page.headers.get('ETag') == '"v1"'
+    assert archive.get('https://acme.com/', KIND_RENDERED) is None
+
+
+def test_unchanged_pages_are_not_rewritten(archive):
+    assert archive.put('https://acme.com/', PAGES['/'])
+    assert not archive.put('https://acme.com/', PAGES['/'])
+    assert archive.put('https://acme.com/', PAGES['/'] + '<p>New range</p>')
+    assert archive.get('https://acme.com/').html.endswith('<p>New range</p>')
+    assert archive.stats['written'] == 2 and archive.stats['unchanged'] == 1
+
+
+def test_records_survive_file_rollover(tmp_path):
+    archive = PageArchive(directory=str(tmp_path / 'archive'), max_file_bytes=200)
+    try:
+        for i in range(5):
+            archive.put(f'https://site{i}.com/', PAGES['/'] + f'<p>{i}</p>')
+        assert len(list((tmp_path / 'archive').glob('*.warc.gz'))) > 1
+        assert all(archive.get(f'https://site{i}.com/').html.endswith(f'<p>{i}</p>') for i in range(5))
+    finally:
+        archive.close()
+
+
+def test_replay_serves_what_the_live_fetch_saw(server, archive):
+    live = TieredFetcher(render=lambda url: RENDERED, replay=False, archive=archive,
+                         scheduler=HostScheduler(host_delay=0, respect_robots=False))
+    replay = TieredFetcher(render=None, replay=True, archive=archive)
+
+    for path, tier in (('/', TIER_STATIC), ('/shell', TIER_RENDERED)):
+        fetched = live.fetch_sync(server + path)
+        replayed = asyncio.run(replay.fetch(server + path))
+        assert replayed['tier'] == fetched['tier'] == tier
+        assert replayed['html'] == fetched['html']
+        assert replayed['render_reasons'] == fetched['render_reasons']
+
+    with pytest.raises(ArchiveMiss):
+        replay.fetch_sync(server + '/never-fetched')
+
+
+class _Sitemaps:
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    def estimate_catalog(self, url):
+        return self.catalog
+
+
+def _engine(archive, replay, sitemaps=None):
+    engine = EvidenceEngine(replay=replay)
+    engine.fetcher.archive = archive
+    engine.sitemaps = sitemaps
+    return engine
+
+
+def test_catalog_estimate_replays_from_archive(archive):
+    catalog = CatalogEstimate(product_count=3000, category_count=40, url_count=3200,
+                              sitemaps=['https://acme.com/sitemap_products_1.xml'], truncated=True)
+    live = _engine(archive, replay=False, sitemaps=_Sitemaps(catalog))
+    assert live.estimate_catalog('https://acme.com/') == catalog
+
+    replayed = _engine(archive, replay=True).estimate_catalog('https://acme.com/')
+    assert replayed == catalog
+
+
+def test_site_without_sitemaps_replays_as_none(archive):
+    live = _engine(archive, replay=False, sitemaps=_Sitemaps(CatalogEstimate()))
+    assert live.estimate_catalog('https://acme.com/') is None
+    assert _engine(archive, replay=True).estimate_catalog('https://acme.com/') is None
+
+
+def test_unarchived_catalog_replays_as_none(archive):
+    assert _engine(archive, replay=True).estimate_catalog('https://never-fetched.com/') is None
@@ -0,0 +1,137 @@
+# tests/test_page_cache.py
+"""Page cache TTL, conditional revalidation and LRU eviction"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scrapers import page_cache
+from scrapers.host_scheduler import HostScheduler
+from scrapers.page_cache import PageCache, KIND_STATIC, KIND_RENDERED, normalize_url
+from scrapers.tiered_fetcher import TieredFetcher
+
+PAGE = '<html><body><h1>Acme Lighting</h1><p>Wholesale fixtures for retailers.</p></body></html>'
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(page_cache.time, 'time', clock.time)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PageCache(directory=str(tmp_path / 'pages'), ttl_seconds=3600, max_bytes=10 * 1024 * 1024)
+    yield cache
+    cache.close()
+
+
+def test_normalized_urls_share_an_entry():
+    assert normalize_url('Acme.com') == 'https://acme.com/'
+    assert normalize_url('HTTPS://acme.com:443/shop?b=2&a=1#top') == 'https://acme.com/shop?a=1&b=2'
+    assert normalize_url('http://acme.com:8080/') == 'http://acme.com:8080/'
+
+
+def test_entries_go_stale_after_the_ttl(cache, clock):
+    cache.put('https://acme.com/', PAGE, headers={'ETag': '"v1"'})
+    assert cache.get_fresh('acme.com').html == PAGE
+
+    clock.now += 3601
+    assert cache.get_fresh('acme.com') is None
+    stale = cache.get('acme.com')
+    assert stale.html == PAGE
+    assert stale.conditional_headers() == {'If-None-Match': '"v1"'}
+    assert cache.stats['hits'] == 1 and cache.stats['stale'] == 2
+
+    cache.touch('https://acme.com/')
+    assert cache.get_fresh('acme.com').html == PAGE
+
+
+def test_static_and_rendered_copies_are_separate(cache):
+    cache.put('https://acme.com/', PAGE, KIND_STATIC)
+    assert cache.get('https://acme.com/', KIND_RENDERED) is None
+    cache.put('https://acme.com/', PAGE + '<p>rendered</p>', KIND_RENDERED)
+    assert cache.get('https://acme.com/', KIND_STATIC).html == PAGE
+
+
+def test_identical_bodies_are_stored_once(cache):
+    cache.put('https://acme.com/', PAGE)
+    size = cache.total_bytes()
+    cache.put('https://www.acme.com/', PAGE)
+    assert cache.total_bytes() == size
+
+    cache.invalidate('https://acme.com/')
+    assert cache.get('https://www.acme.com/').html == PAGE
+    cache.invalidate('https://www.acme.com/')
+    assert cache.total_bytes() == 0
+
+
+def test_least_recently_used_pages_are_evicted(cache, clock):
+    for i in range(3):
+        clock.now += 1
+        cache.put(f'https://site{i}.com/', PAGE + f'<p>{i}</p>')
+    clock.now += 1
+    cache.get('https://site0.com/')
+
+    # Room for two bodies: site1 was used least recently
+    cache.evict(target_bytes=cache.total_bytes() * 2 // 3 + 1)
+    assert cache.get('https://site1.com/') is None
+    assert cache.get('https://site0.com/') is not None
+    assert cache.get('https://site2.com/') is not None
+    assert cache.stats['evicted'] == 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('ETag', '"v1"')
+        self.end_headers()
+        self.wfile.write(PAGE.encode('utf-8'))
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.requests = []
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+
+
+def test_fetcher_revalidates_stale_pages(server, cache, clock):
+    fetcher = TieredFetcher(render=lambda url: PAGE, replay=False, cache=cache,
+                            scheduler=HostScheduler(host_delay=0, respect_robots=False))
+    url = server + '/'
+
+    assert fetcher.fetch_sync(url)['html'] == PAGE
+    assert fetcher.fetch_sync(url)['html'] == PAGE
+    # The second fetch was a fresh cache hit and never reached the server
+    assert _Handler.requests == [None]
+
+    clock.now += 3601
+    assert fetcher.fetch_sync(url)['html'] == PAGE
+    assert _Handler.requests == [None, '"v1"']
+    assert cache.stats['revalidated'] >= 1
+    assert cache.get_fresh(url) is not None
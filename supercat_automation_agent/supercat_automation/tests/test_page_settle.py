@@ -0,0 +1,111 @@
+# tests/test_page_settle.py
+"""When a render counts as settled, for Selenium drivers and Playwright pages"""
+
+import asyncio
+import time
+
+import pytest
+
+from scrapers import page_settle
+from scrapers.page_settle import SETTLE_PROBE_JS, SETTLE_STATE_JS, wait_for_settled, wait_for_settled_driver
+
+QUIET = {'ready': True, 'inflight': 0, 'quiet': 1_000}
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(page_settle, 'POLL_INTERVAL', 0.01)
+
+
+class _Driver:
+    def __init__(self, states):
+        self.states = list(states)
+        self.polls = 0
+
+    def execute_script(self, script):
+        assert script == SETTLE_STATE_JS
+        self.polls += 1
+        state = self.states.pop(0) if len(self.states) > 1 else self.states[0]
+        if isinstance(state, Exception):
+            raise state
+        return state
+
+
+def test_driver_waits_for_document_requests_and_quiet():
+    driver = _Driver([
+        RuntimeError('navigating'),
+        {'ready': False, 'inflight': 0, 'quiet': 5_000},
+        {'ready': True, 'inflight': 1, 'quiet': 5_000},
+        {'ready': True, 'inflight': 0, 'quiet': 100},
+        QUIET,
+    ])
+    assert wait_for_settled_driver(driver, quiet_ms=500, max_seconds=5)
+    assert driver.polls == 5
+
+
+def test_driver_gives_up_at_the_cap():
+    driver = _Driver([{'ready': True, 'inflight': 2, 'quiet': 5_000}])
+    start = time.monotonic()
+    assert not wait_for_settled_driver(driver, quiet_ms=500, max_seconds=0.1)
+    assert 0.1 <= time.monotonic() - start < 1
+
+
+def test_fast_page_settles_on_the_first_poll():
+    driver = _Driver([QUIET])
+    assert wait_for_settled_driver(driver, quiet_ms=500, max_seconds=5)
+    assert driver.polls == 1
+
+
+def test_probe_is_part_of_every_state_read():
+    # The state script installs the probe itself when the init script missed the document
+    assert SETTLE_STATE_JS.startswith(SETTLE_PROBE_JS)
+
+
+class _Request:
+    def __init__(self, resource_type):
+        self.resource_type = resource_type
+
+
+class _Page:
+    """Fires the scheduled request events when the given poll is reached"""
+
+    def __init__(self, events):
+        self.events = events
+        self.listeners = {}
+        self.polls = 0
+
+    def on(self, event, handler):
+        self.listeners.setdefault(event, []).append(handler)
+
+    def remove_listener(self, event, handler):
+        self.listeners[event].remove(handler)
+
+    async def evaluate(self, script):
+        self.polls += 1
+        for event, request in self.events.get(self.polls, []):
+            for handler in list(self.listeners.get(event, [])):
+                handler(request)
+        return QUIET
+
+
+def test_page_waits_for_requests_the_probe_cannot_see():
+    stylesheet = _Request('stylesheet')
+    page = _Page({1: [('request', stylesheet)], 5: [('requestfinished', stylesheet)]})
+
+    start = time.monotonic()
+    assert asyncio.run(wait_for_settled(page, quiet_ms=50, max_seconds=5))
+
+    # Settled only once the request finished and the network stayed quiet after it
+    assert page.polls > 5
+    assert time.monotonic() - start >= 0.05
+    assert all(not handlers for handlers in page.listeners.values())
+
+
+def test_long_lived_requests_do_not_hold_the_page_open():
+    page = _Page({1: [('request', _Request('websocket')), ('request', _Request('eventsource'))]})
+    assert asyncio.run(wait_for_settled(page, quiet_ms=50, max_seconds=5))
+
+
+def test_page_gives_up_at_the_cap():
+    page = _Page({1: [('request', _Request('fetch'))]})
+    assert not asyncio.run(wait_for_settled(page, quiet_ms=50, max_seconds=0.1))
@@ -0,0 +1,178 @@
+# tests/test_render_profile.py
+"""Which requests a render may make, and the savings it reports"""
+
+import asyncio
+import fnmatch
+import json
+
+import pytest
+
+from scrapers.render_profile import RenderProfile, RenderReport, TYPICAL_BYTES
+
+
+@pytest.fixture
+def profile():
+    return RenderProfile(block_resources=True, max_page_bytes=10_000)
+
+
+@pytest.mark.parametrize('url, resource_type, category', [
+    ('https://acme.com/hero.jpg', 'image', 'image'),
+    ('https://acme.com/intro.mp4', 'media', 'media'),
+    ('https://acme.com/fonts/brand.woff2', 'font', 'font'),
+    ('https://www.google-analytics.com/analytics.js', 'script', 'tracker'),
+    ('https://connect.facebook.net/en_US/fbevents.js', 'script', 'tracker'),
+    ('https://acme.com/app.js', 'script', None),
+    ('https://acme.com/catalog', 'document', None),
+    # Without a resource type the extension decides
+    ('https://cdn.acme.com/img/lamp.WEBP', None, 'image'),
+    ('https://acme.com/fonts/brand.ttf', None, 'font'),
+    ('https://acme.com/products.json', None, None),
+])
+def test_classify(profile, url, resource_type, category):
+    assert profile.classify(url, resource_type) == category
+
+
+def test_disabled_profile_blocks_nothing():
+    profile = RenderProfile(block_resources=False)
+    assert profile.classify('https://acme.com/hero.jpg', 'image') is None
+    assert profile.chrome_arguments() == []
+    assert profile.context_options() == {}
+    assert profile.blocked_url_patterns() == []
+
+
+@pytest.mark.parametrize('url', [
+    'https://acme.com/hero.jpg',
+    'https://acme.com/hero.jpg?w=800',
+    'https://acme.com/fonts/brand.woff2',
+    'https://www.googletagmanager.com/gtm.js?id=GTM-1',
+    'https://acme.com/app.js',
+    'https://acme.com/catalog',
+])
+def test_devtools_patterns_block_what_classify_blocks(profile, url):
+    blocked = any(fnmatch.fnmatchcase(url, pattern) for pattern in profile.blocked_url_patterns())
+    assert blocked == (profile.classify(url) is not None)
+
+
+def test_report_savings():
+    report = RenderReport('https://acme.com', requests=10, bytes_loaded=200_000, elapsed=2.0)
+    report.block('image')
+    report.block('image')
+    report.block('tracker')
+
+    assert report.blocked_count == 3
+    assert report.bytes_saved == 2 * TYPICAL_BYTES['image'] + TYPICAL_BYTES['tracker']
+    assert report.seconds_saved == pytest.approx(report.bytes_saved / 100_000)
+    assert RenderReport('https://acme.com').seconds_saved == 0.0
+
+
+def test_totals_add_up(profile):
+    for bytes_loaded in (4_000, 6_000):
+        report = RenderReport('https://acme.com', requests=3, bytes_loaded=bytes_loaded, elapsed=1.0)
+        report.block('font')
+        profile.record(report)
+
+    totals = profile.totals
+    assert (totals['renders'], totals['requests'], totals['blocked'], totals['bytes_loaded']) == (2, 6, 2, 10_000)
+    assert totals['bytes_saved'] == 2 * TYPICAL_BYTES['font']
+
+
+class _Driver:
+    def __init__(self, entries):
+        self.entries = entries
+        self.scripts = []
+
+    def get_log(self, kind):
+        entries, self.entries = self.entries, []
+        return entries
+
+    def execute_script(self, script):
+        self.scripts.append(script)
+
+
+def _event(method, **params):
+    return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+
+def test_selenium_performance_log_and_byte_cap(profile):
+    driver = _Driver([
+        _event('Network.loadingFinished', encodedDataLength=6_000),
+        _event('Network.loadingFinished', encodedDataLength=5_000),
+        _event('Network.loadingFailed', type='Font', blockedReason='inspector'),
+        _event('Network.loadingFailed', type='Script', blockedReason='inspector'),
+        _event('Network.loadingFailed', type='XHR', errorText='net::ERR_ABORTED'),
+        {'message': 'not json'},
+    ])
+    report = RenderReport('https://acme.com')
+    assert not profile.enforce_byte_cap(driver, report)
+
+    profile.read_driver_log(driver, report)
+
+    assert (report.requests, report.bytes_loaded, report.blocked) == (2, 11_000, {'font': 1, 'tracker': 1})
+    assert profile.enforce_byte_cap(driver, report)
+    assert report.capped and driver.scripts == ['window.stop();']
+
+
+class _Request:
+    def __init__(self, url, resource_type, size=0):
+        self.url, self.resource_type, self.size = url, resource_type, size
+
+    async def sizes(self):
+        return {'responseBodySize': self.size, 'responseHeadersSize': 0}
+
+
+class _Route:
+    def __init__(self, request):
+        self.request = request
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = 'aborted'
+
+    async def continue_(self):
+        self.outcome = 'continued'
+
+
+class _Page:
+    def __init__(self):
+        self.handlers = {}
+
+    async def route(self, pattern, handler):
+        self.handlers['route'] = handler
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def load(self, requests):
+        """Route each request, and finish the ones allowed through, in order"""
+        routes = []
+        for request in requests:
+            route = _Route(request)
+            await self.handlers['route'](route)
+            if route.outcome == 'continued':
+                await self.handlers['requestfinished'](request)
+            routes.append(route.outcome)
+        return routes
+
+
+def test_playwright_interception_and_byte_cap(profile):
+    page = _Page()
+    report = RenderReport('https://acme.com')
+    requests = [
+        _Request('https://acme.com/', 'document', 3_000),
+        _Request('https://acme.com/hero.jpg', 'image'),
+        _Request('https://www.google-analytics.com/g/collect', 'xhr'),
+        _Request('https://acme.com/app.js', 'script', 8_000),
+        _Request('https://acme.com/more.js', 'script', 1_000),
+        _Request('https://acme.com/next', 'document', 2_000),
+    ]
+
+    async def run():
+        await profile.attach(page, report)
+        return await page.load(requests)
+
+    outcomes = asyncio.run(run())
+
+    # Over the cap, only documents still load
+    assert outcomes == ['continued', 'aborted', 'aborted', 'continued', 'aborted', 'continued']
+    assert report.blocked == {'image': 1, 'tracker': 1, 'over_cap': 1}
+    assert report.capped and (report.requests, report.bytes_loaded) == (3, 13_000)
@@ -0,0 +1,161 @@
+# tests/test_sitemap.py
+"""Streaming sitemap reads, including gzip and index files, re-scan decisions and catalog estimates"""
+
+import gzip
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scrapers.host_scheduler import HostScheduler
+from scrapers.page_cache import PageCache
+from scrapers.rescan import ChangeDetector
+from scrapers.sitemap import SitemapReader, classify_catalog_url, parse_w3c_datetime
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+FILES = {
+    '/robots.txt': 'User-agent: *\nAllow: /\nSitemap: {root}/sitemap_index.xml\n',
+    '/sitemap_index.xml': f'''<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex {NS}>
+  <sitemap><loc>{{root}}/sitemap_pages.xml</loc><lastmod>2024-03-01</lastmod></sitemap>
+  <sitemap><loc>{{root}}/sitemap_products_1.xml.gz</loc><lastmod>2024-05-20T10:00:00+00:00</lastmod></sitemap>
+</sitemapindex>''',
+    '/sitemap_pages.xml': f'''<?xml version="1.0" encoding="UTF-8"?>
+<urlset {NS} xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+  <url><loc>{{root}}/</loc><lastmod>2024-02-10</lastmod>
+    <image:image><image:loc>{{root}}/hero.jpg</image:loc></image:image></url>
+  <url><loc>{{root}}/about</loc></url>
+  <url><loc>{{root}}/collections/pendants</loc><lastmod>2024-04-02</lastmod></url>
+</urlset>''',
+    '/sitemap_products_1.xml.gz': f'''<?xml version="1.0" encoding="UTF-8"?>
+<urlset {NS}>
+''' + ''.join(f'  <url><loc>{{root}}/products/lamp-{i}</loc><lastmod>2024-05-{10 + i}</lastmod></url>\n'
+              for i in range(5)) + '</urlset>',
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        body = FILES.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        data = body.replace('{root}', f'http://127.0.0.1:{self.server.server_address[1]}').encode('utf-8')
+        if self.path.endswith('.gz'):
+            data = gzip.compress(data)
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.requests = []
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+
+
+@pytest.fixture
+def scheduler():
+    return HostScheduler(host_delay=0, respect_robots=True)
+
+
+def _reader(scheduler, **kwargs):
+    return SitemapReader(timeout=5, scheduler=scheduler, **kwargs)
+
+
+def test_w3c_datetimes():
+    assert parse_w3c_datetime('2024-05-20T10:00:00Z') == datetime(2024, 5, 20, 10, tzinfo=timezone.utc)
+    assert parse_w3c_datetime('2024-05-20') == datetime(2024, 5, 20, tzinfo=timezone.utc)
+    assert parse_w3c_datetime('2024-05') == datetime(2024, 5, 1, tzinfo=timezone.utc)
+    assert parse_w3c_datetime('yesterday') is None
+    assert parse_w3c_datetime(None) is None
+
+
+def test_index_children_and_gzip_are_read(server, scheduler):
+    seen = []
+    summary = _reader(scheduler).summarize(server, on_url=lambda loc, lastmod, sitemap: seen.append(loc))
+
+    assert summary.sitemaps == [server + '/sitemap_index.xml', server + '/sitemap_pages.xml',
+                                server + '/sitemap_products_1.xml.gz']
+    assert summary.url_count == 8
+    # Image extensions reuse <loc> but do not replace the page's own
+    assert server + '/hero.jpg' not in seen and server + '/' in seen
+    assert summary.latest_lastmod == datetime(2024, 5, 20, 10, tzinfo=timezone.utc)
+    assert not summary.truncated
+
+
+def test_index_lastmods_without_reading_children(server, scheduler):
+    summary = _reader(scheduler).summarize(server, follow_index=False)
+    assert summary.sitemaps == [server + '/sitemap_index.xml']
+    assert summary.url_count == 0
+    assert summary.latest_lastmod == datetime(2024, 5, 20, 10, tzinfo=timezone.utc)
+    assert not any(path.startswith('/sitemap_p') for path in _Handler.requests)
+
+
+def test_url_budget_truncates(server, scheduler):
+    summary = _reader(scheduler, max_urls=2).summarize(server)
+    assert summary.url_count == 2
+    assert summary.truncated
+
+
+def test_site_without_sitemaps(server, scheduler, monkeypatch):
+    monkeypatch.setitem(FILES, '/robots.txt', 'User-agent: *\nAllow: /\n')
+    summary = _reader(scheduler).summarize(server)
+    assert not summary.found
+    assert summary.latest_lastmod is None
+    assert '/sitemap.xml' in _Handler.requests
+
+
+@pytest.mark.parametrize('last_scan, changed, reason', [
+    ('2024-06-01T00:00:00+00:00', False, 'sitemap_unchanged'),
+    ('2024-05-01T00:00:00+00:00', True, 'sitemap_lastmod'),
+    (None, True, 'never_scanned'),
+])
+def test_rescan_decision_from_sitemap_lastmod(server, scheduler, tmp_path, last_scan, changed, reason):
+    cache = PageCache(directory=str(tmp_path / 'pages'), ttl_seconds=3600)
+    try:
+        detector = ChangeDetector(cache=cache, sitemap_reader=_reader(scheduler), scheduler=scheduler, timeout=5)
+        decision = detector.check(server, last_scan)
+    finally:
+        cache.close()
+    assert (decision.changed, decision.reason) == (changed, reason)
+
+
+@pytest.mark.parametrize('url, sitemap, kind', [
+    ('https://acme.com/products/brass-pendant', '', 'product'),
+    ('https://acme.com/collections/lighting/products/brass-pendant', '', 'product'),
+    ('https://acme.com/brass-pendant-p-1042.html', '', 'product'),
+    ('https://acme.com/collections/lighting', '', 'category'),
+    ('https://acme.com/product-category/pendants/', '', 'category'),
+    ('https://acme.com/about', '', None),
+    ('https://acme.com/brass-pendant', 'https://acme.com/product-sitemap.xml', 'product'),
+    ('https://acme.com/pendants', 'https://acme.com/product_cat-sitemap.xml', 'category'),
+])
+def test_catalog_url_classification(url, sitemap, kind):
+    assert classify_catalog_url(url, sitemap) == kind
+
+
+def test_catalog_estimate_counts_products_and_categories(server, scheduler):
+    estimate = _reader(scheduler).estimate_catalog(server)
+    assert (estimate.product_count, estimate.category_count, estimate.url_count) == (5, 1, 8)
+    assert estimate.found and not estimate.truncated
+
+
+def test_catalog_estimate_reads_product_sitemaps_first(server, scheduler):
+    # Room for the index and one child: the product sitemap wins over the pages one
+    estimate = _reader(scheduler, max_sitemaps=2).estimate_catalog(server)
+    assert estimate.sitemaps == [server + '/sitemap_index.xml', server + '/sitemap_products_1.xml.gz']
+    assert estimate.product_count == 5
+    assert estimate.truncated
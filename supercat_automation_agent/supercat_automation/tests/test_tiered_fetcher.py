@@ -0,0 +1,106 @@
+# tests/test_tiered_fetcher.py
+"""When the static tier is enough, and that both fetch paths decide alike"""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scrapers.host_scheduler import HostScheduler
+from scrapers.tiered_fetcher import TieredFetcher, detect_render_need, TIER_STATIC, TIER_RENDERED
+
+ARTICLE = '<html><body>' + '<p>Wholesale lighting for retailers and designers.</p>' * 20 + '</body></html>'
+PAGES = {
+    '/small': '<html><head><title>Acme</title></head><body><h1>Acme Lighting</h1></body></html>',
+    '/article': ARTICLE,
+    '/shell': '<html><body><div id="root"></div><script src="/app.js"></script></body></html>',
+    '/blank': '<html><head><script>var x = 1;</script></head><body>  </body></html>',
+}
+RENDERED = '<html><body><p>Rendered catalog</p></body></html>'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = PAGES.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.end_headers()
+        self.wfile.write(body.encode('utf-8'))
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+
+
+def _fetcher():
+    return TieredFetcher(render=lambda url: RENDERED, replay=False,
+                         scheduler=HostScheduler(host_delay=0, respect_robots=False))
+
+
+def test_small_complete_page_is_not_empty():
+    assert detect_render_need(PAGES['/small']) == []
+    assert detect_render_need(ARTICLE) == []
+
+
+def test_pages_without_visible_text_need_a_render():
+    assert detect_render_need('') == ['empty_body']
+    assert detect_render_need(PAGES['/blank']) == ['empty_body']
+    assert detect_render_need(PAGES['/shell']) == ['empty_body']
+
+
+def test_spa_shell_and_noscript_warnings():
+    shell = '<html><body><div id="root"></div><p>Loading the Acme catalog</p></body></html>'
+    assert 'spa_shell' in detect_render_need(shell)
+    noscript = '<html><body><noscript>Please enable JavaScript</noscript><p>Acme</p></body></html>'
+    assert 'noscript_warning' in detect_render_need(noscript)
+
+
+@pytest.mark.parametrize('path, tier, reasons', [
+    ('/small', TIER_STATIC, []),
+    ('/article', TIER_STATIC, []),
+    ('/shell', TIER_RENDERED, ['empty_body']),
+    ('/missing', TIER_RENDERED, ['http_404']),
+])
+def test_sync_and_async_fetch_agree(server, path, tier, reasons):
+    sync_fetcher, async_fetcher = _fetcher(), _fetcher()
+
+    sync_result = sync_fetcher.fetch_sync(server + path)
+    async_result = asyncio.run(async_fetcher.fetch(server + path))
+
+    for result in (sync_result, async_result):
+        assert result['tier'] == tier
+        assert result['render_reasons'] == reasons
+        assert result['html'] == (RENDERED if reasons else PAGES[path])
+    assert sync_fetcher.stats == async_fetcher.stats
+
+
+def test_render_rate_counts_every_fetch(server):
+    fetcher = _fetcher()
+    for path in ('/small', '/article', '/shell', '/missing'):
+        fetcher.fetch_sync(server + path)
+    assert fetcher.render_rate() == 0.5
+
+
+def test_domain_tier_is_the_homepage_tier(server, monkeypatch):
+    monkeypatch.setitem(PAGES, '/', ARTICLE)
+    fetcher = _fetcher()
+    host = server.split('://', 1)[1]
+
+    fetcher.fetch_sync(server + '/')
+    fetcher.fetch_sync(server + '/shell')
+    asyncio.run(fetcher.fetch(server + '/missing'))
+
+    assert fetcher.tier_by_domain == {host: TIER_STATIC}
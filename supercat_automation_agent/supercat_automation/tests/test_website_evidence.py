@@ -0,0 +1,84 @@
+# tests/test_website_evidence.py
+"""
+v1 evidence must match the pre-series extractor for the same pages.
+fixtures/evidence/baseline_v1.json holds what the original Selenium-era
+WebsiteEvidenceExtractor produced for each fixture homepage, with every
+catalog page it went on to fetch served from fixtures/evidence/catalog.html.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from config.settings import settings
+from scrapers.evidence_engine import SiteSnapshot
+from scrapers.html_parser import BACKEND_HTML_PARSER, BACKEND_LXML, BACKEND_SELECTOLAX, available_backends, parse_page
+from scrapers.website_evidence import WebsiteEvidenceExtractor
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'evidence'
+BASELINE = json.loads((FIXTURES / 'baseline_v1.json').read_text(encoding='utf-8'))
+CATALOG = (FIXTURES / 'catalog.html').read_text(encoding='utf-8')
+
+
+class _Fetcher:
+    def __init__(self):
+        self.urls = []
+
+    def fetch_sync(self, url):
+        self.urls.append(url)
+        return {'html': CATALOG, 'final_url': url, 'elapsed': 0.1, 'tier': 'static'}
+
+
+class _Engine:
+    def __init__(self):
+        self.fetcher = _Fetcher()
+        self.domain_health = None
+
+
+@pytest.fixture(params=[BACKEND_HTML_PARSER, BACKEND_LXML, BACKEND_SELECTOLAX])
+def backend(request, monkeypatch):
+    if request.param not in available_backends():
+        pytest.skip(f'{request.param} is not installed')
+    monkeypatch.setattr(settings, 'html_parser_backend', request.param)
+    return request.param
+
+
+def _snapshot(name, subpages=()):
+    case = BASELINE[name]
+    html = (FIXTURES / f'{name}.html').read_text(encoding='utf-8')
+    return SiteSnapshot(domain=case['domain'], html=html, final_url=case['domain'], tier='static',
+                        page=parse_page(html), subpages=list(subpages))
+
+
+@pytest.mark.parametrize('name', sorted(BASELINE))
+def test_matches_the_original_extractor(backend, name):
+    engine = _Engine()
+    results = WebsiteEvidenceExtractor(engine=engine).analyze_snapshot(_snapshot(name))
+    results.pop('scan_timestamp')
+
+    assert results == BASELINE[name]['expected']
+    # The catalog page is fetched exactly when the original fetched it
+    catalog_url = BASELINE[name]['catalog_url']
+    assert engine.fetcher.urls == ([catalog_url] if catalog_url else [])
+
+
+def test_crawled_catalog_page_is_not_fetched_again(backend):
+    name = next(name for name, case in sorted(BASELINE.items()) if case['catalog_url'])
+    engine = _Engine()
+    crawled = [{'url': BASELINE[name]['catalog_url'], 'html': CATALOG}]
+
+    results = WebsiteEvidenceExtractor(engine=engine).analyze_snapshot(_snapshot(name, crawled))
+    results.pop('scan_timestamp')
+
+    assert results == BASELINE[name]['expected']
+    assert engine.fetcher.urls == []
+
+
+def test_failed_fetch_is_reported_without_analysis():
+    engine = _Engine()
+    results = WebsiteEvidenceExtractor(engine=engine).analyze_snapshot(
+        SiteSnapshot(domain='https://gone.example', error='DNS lookup failed'))
+
+    assert results['error'] == 'DNS lookup failed'
+    assert results['edp_evidence'] == {} and engine.fetcher.urls == []
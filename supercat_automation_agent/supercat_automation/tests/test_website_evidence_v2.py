@@ -0,0 +1,55 @@
+# tests/test_website_evidence_v2.py
+"""
+v2 evidence must match the pre-series extractor field for field.
+fixtures/evidence/baseline_v2.json holds what the original Selenium-era
+WebsiteEvidenceExtractorV2 produced for each fixture page, loaded in 1.5s.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from config.settings import settings
+from scrapers.html_parser import BACKEND_HTML_PARSER, BACKEND_LXML, BACKEND_SELECTOLAX, available_backends
+from scrapers.website_evidence_v2 import WebsiteEvidenceExtractorV2
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'evidence'
+BASELINE = json.loads((FIXTURES / 'baseline_v2.json').read_text(encoding='utf-8'))
+# The original listed these through set(), so only their contents are comparable
+UNORDERED = {'EDP1_Product_Categories', 'EDP7_Resource_Formats'}
+
+
+@pytest.fixture(params=[BACKEND_HTML_PARSER, BACKEND_LXML, BACKEND_SELECTOLAX])
+def extractor(request, monkeypatch):
+    if request.param not in available_backends():
+        pytest.skip(f'{request.param} is not installed')
+    monkeypatch.setattr(settings, 'html_parser_backend', request.param)
+    extractor = WebsiteEvidenceExtractorV2(replay=False)
+    extractor.memo = None
+    return extractor
+
+
+@pytest.mark.parametrize('name', sorted(BASELINE))
+def test_matches_the_original_extractor(extractor, name):
+    case = BASELINE[name]
+    html = (FIXTURES / f'{name}.html').read_text(encoding='utf-8')
+
+    results = extractor.analyze_html(case['domain'], html, case['load_time'], 'static')
+
+    assert 'error' not in results
+    for field, expected in case['expected'].items():
+        actual = results[field]
+        if field in UNORDERED:
+            actual, expected = sorted(actual), sorted(expected)
+        assert actual == expected, field
+
+
+def test_batch_rescoring_matches(extractor):
+    records = []
+    for name, case in sorted(BASELINE.items()):
+        html = (FIXTURES / f'{name}.html').read_text(encoding='utf-8')
+        records.append(extractor.analyze_html(case['domain'], html, case['load_time'], 'static'))
+
+    rescored = extractor.rules.apply_batch([dict(record) for record in records])
+    assert rescored == records